@@ -0,0 +1,47 @@
+"""
+Admin API Routes
+Operational state of the backend's upstream protections, and request profiles
+"""
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import PlainTextResponse
+from auth.dependencies import require_admin_key
+from responses import FastJSONRoute
+from google_services.breaker import breaker_states, get_breaker
+from profiling import collapsed, get_profile_store
+
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=FastJSONRoute)
+
+
+@router.get("/breakers", dependencies=[Depends(require_admin_key)])
+def list_breakers():
+    """Circuit breaker state, rolling error/slow rates and rejections per Google API (requires X-Admin-Key)"""
+    return {"breakers": breaker_states()}
+
+
+@router.post("/breakers/{api}/reset", dependencies=[Depends(require_admin_key)])
+def reset_breaker(api: str):
+    """Force an API's circuit breaker closed (requires X-Admin-Key)"""
+    breaker = get_breaker(api)
+    if breaker is None:
+        raise HTTPException(status_code=404, detail=f"No circuit breaker for '{api}'")
+    breaker.reset()
+    return {"api": api, **breaker.snapshot()}
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin_key)])
+def list_profiles():
+    """Request profiles held by this instance, newest first (requires X-Admin-Key)"""
+    return {"profiles": get_profile_store().list()}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin_key)])
+def get_profile(profile_id: str):
+    """
+    A request profile in collapsed-stack format (requires X-Admin-Key).
+
+    Render it with e.g. `flamegraph.pl profile.txt > profile.svg` or load it in speedscope.
+    """
+    profile = get_profile_store().get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (profiles are kept per instance)")
+    return PlainTextResponse(collapsed(profile), headers={"X-Profile-Samples": str(profile["samples"])})
@@ -0,0 +1,130 @@
+"""
+Credentials Cache
+Bounded in-process cache of OAuth credentials per session
+
+Keeps active sessions off the MongoDB load_credentials round trip while
+holding worker memory flat: entries idle longer than the TTL expire, and the
+least-recently-used entry is evicted once the cache is full.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class _Entry:
+    __slots__ = ("credentials", "last_used")
+
+    def __init__(self, credentials: Any, last_used: float):
+        self.credentials = credentials
+        self.last_used = last_used
+
+
+_MISSING = object()
+
+
+class CredentialsCache:
+    """
+    Thread-safe LRU of session_id -> Credentials with an idle TTL.
+
+    Supports the dict operations auth.router uses (get, [], in, del, pop).
+    on_evict(session_id) is called for entries dropped by size or idle TTL.
+    """
+
+    def __init__(self, max_entries: int, idle_ttl: float, on_evict: Optional[Callable[[str], None]] = None):
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id: str, default: Any = None) -> Any:
+        now = time.monotonic()
+        dropped = None
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and now - entry.last_used > self.idle_ttl:
+                del self._entries[session_id]
+                self.expirations += 1
+                dropped, entry = session_id, None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                entry.last_used = now
+                self._entries.move_to_end(session_id)
+        if dropped is not None:
+            self._evicted([dropped])
+        return default if entry is None else entry.credentials
+
+    def __setitem__(self, session_id: str, credentials: Any):
+        now = time.monotonic()
+        dropped = []
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                entry.credentials = credentials
+                entry.last_used = now
+                self._entries.move_to_end(session_id)
+                return
+            self._entries[session_id] = _Entry(credentials, now)
+            # Expired entries sit at the LRU end; drop those first, then by size
+            while self._entries:
+                oldest_id, oldest = next(iter(self._entries.items()))
+                if now - oldest.last_used > self.idle_ttl:
+                    self.expirations += 1
+                elif len(self._entries) > self.max_entries:
+                    self.evictions += 1
+                else:
+                    break
+                del self._entries[oldest_id]
+                dropped.append(oldest_id)
+        self._evicted(dropped)
+
+    def __getitem__(self, session_id: str) -> Any:
+        credentials = self.get(session_id, _MISSING)
+        if credentials is _MISSING:
+            raise KeyError(session_id)
+        return credentials
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return entry is not None and time.monotonic() - entry.last_used <= self.idle_ttl
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            del self._entries[session_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, session_id: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        return default if entry is None else entry.credentials
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evicted(self, session_ids):
+        if self.on_evict is not None:
+            for session_id in session_ids:
+                self.on_evict(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "idle_ttl_seconds": self.idle_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -1,13 +1,16 @@
 """
 Shared dependencies for authentication across all routes
 """
+import hmac
 from fastapi import Cookie, HTTPException, Depends, Header
 from typing import Optional
+from config import ADMIN_API_KEY
+from tracing import span
 
 SESSION_COOKIE_NAME = "session_id"
 
 
-def get_session_id(
+async def get_session_id(
     session_id: Optional[str] = Cookie(None, alias=SESSION_COOKIE_NAME),
     authorization: Optional[str] = Header(None)
 ) -> Optional[str]:
@@ -22,11 +25,23 @@ def get_session_id(
     return session_id
 
 
-def require_session(session_id: Optional[str] = Depends(get_session_id)) -> str:
+async def require_session(session_id: Optional[str] = Depends(get_session_id)) -> str:
     """Require a valid session ID, raise 401 if not present"""
-    if not session_id:
-        raise HTTPException(
-            status_code=401, 
-            detail="Not authenticated. Please login first at /auth/login"
-        )
-    return session_id
+    with span("auth.require_session", {"auth.session_present": bool(session_id)}):
+        if not session_id:
+            raise HTTPException(
+                status_code=401, 
+                detail="Not authenticated. Please login first at /auth/login"
+            )
+        return session_id
+
+
+def is_admin_key(key: Optional[str]) -> bool:
+    """True if `key` matches ADMIN_API_KEY (always False while it is unset)"""
+    return bool(ADMIN_API_KEY and key and hmac.compare_digest(key, ADMIN_API_KEY))
+
+
+async def require_admin_key(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Require the X-Admin-Key header to match ADMIN_API_KEY (403 if unset or wrong)"""
+    if not is_admin_key(x_admin_key):
+        raise HTTPException(status_code=403, detail="Admin key required")
@@ -1,19 +1,30 @@
 from fastapi import APIRouter, HTTPException, Response, Cookie, Header
 from fastapi.responses import RedirectResponse
-from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from starlette.concurrency import run_in_threadpool
+from google_services.client import build_service, set_refresh_hook
+import contextvars
 import os
 import secrets
-from typing import Optional
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
 from config import (
     GOOGLE_CLIENT_ID,
     GOOGLE_CLIENT_SECRET,
     GOOGLE_REDIRECT_URI,
     SCOPES,
     FRONTEND_URL,
+    TOKEN_REFRESH_SKEW_SECONDS,
+    CREDENTIALS_CACHE_MAX_ENTRIES,
+    CREDENTIALS_CACHE_IDLE_TTL_SECONDS,
 )
+from auth.credentials_cache import CredentialsCache
 from database import save_credentials, load_credentials, delete_credentials, get_all_users
+from tracing import span
 
 # Allow scope changes (Google adds 'openid' automatically)
 os.environ["OAUTHLIB_RELAX_TOKEN_SCOPE"] = "1"
@@ -34,8 +45,45 @@ def get_cookie_settings():
         "max_age": 60 * 60 * 24 * 7,  # 7 days
     }
 
+# Per-session refresh locks (see refresh_session_credentials)
+_refresh_locks: Dict[str, threading.Lock] = {}
+_refresh_locks_guard = threading.Lock()
+
+
+def _forget_refresh_lock(session_id: str):
+    """Drop an idle session's lock; one held by a running refresh stays so waiters keep sharing it"""
+    with _refresh_locks_guard:
+        lock = _refresh_locks.get(session_id)
+        if lock is not None and lock.acquire(blocking=False):
+            del _refresh_locks[session_id]
+            lock.release()
+
+
 # In-memory cache per session (for serverless, this resets, so we rely on MongoDB)
-credentials_cache = {}
+credentials_cache = CredentialsCache(
+    max_entries=CREDENTIALS_CACHE_MAX_ENTRIES,
+    idle_ttl=CREDENTIALS_CACHE_IDLE_TTL_SECONDS,
+    on_evict=_forget_refresh_lock,
+)
+
+
+def create_oauth_flow():
+    """Build the OAuth flow (google_auth_oauthlib is imported on first login)"""
+    from google_auth_oauthlib.flow import Flow
+    
+    flow = Flow.from_client_config(
+        {
+            "web": {
+                "client_id": GOOGLE_CLIENT_ID,
+                "client_secret": GOOGLE_CLIENT_SECRET,
+                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+                "token_uri": "https://oauth2.googleapis.com/token",
+            }
+        },
+        scopes=SCOPES,
+    )
+    flow.redirect_uri = GOOGLE_REDIRECT_URI
+    return flow
 
 
 def extract_session_id(
@@ -55,7 +103,7 @@ def extract_session_id(
 def get_user_email_from_credentials(credentials):
     """Get the user's email from Google using credentials"""
     try:
-        service = build('oauth2', 'v2', credentials=credentials)
+        service = build_service('oauth2', 'v2', credentials)
         user_info = service.userinfo().get().execute()
         return user_info.get('email')
     except Exception as e:
@@ -63,42 +111,173 @@ def get_user_email_from_credentials(credentials):
         return None
 
 
+# One refresh at a time per session; other requests wait for its result
+_background_refreshes = set()
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="token-refresh")
+
+
+def _session_lock(session_id: str) -> threading.Lock:
+    with _refresh_locks_guard:
+        lock = _refresh_locks.get(session_id)
+        if lock is None:
+            lock = _refresh_locks[session_id] = threading.Lock()
+        return lock
+
+
+def refresh_due(creds) -> bool:
+    """True once credentials are within TOKEN_REFRESH_SKEW_SECONDS of expiry"""
+    if not creds.refresh_token:
+        return False
+    if creds.expiry is None:
+        return not creds.valid
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - timedelta(seconds=TOKEN_REFRESH_SKEW_SECONDS) <= now
+
+
+def refresh_session_credentials(session_id: str, creds, rejected_token: Optional[str] = None):
+    """
+    Refresh a session's token, serialized per session.
+    
+    Requests that arrive while a refresh is running wait for it and reuse its
+    result instead of calling the token endpoint and MongoDB again.
+    rejected_token is a token Google answered 401 to: it is replaced even if
+    it is not due yet, unless another request already replaced it.
+    """
+    with _session_lock(session_id):
+        current = credentials_cache.get(session_id, creds)
+        rejected = rejected_token is not None and current.token == rejected_token
+        if not rejected and not refresh_due(current):
+            return current
+        from google.auth.transport.requests import Request
+        current.refresh(Request())
+        save_credentials(current, session_id)
+        credentials_cache[session_id] = current
+        return current
+
+
+# Session each handed-out Credentials object belongs to (for the client refresh hook)
+_credential_sessions: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+
+
+def _owned(session_id: str, creds):
+    if creds is not None and _credential_sessions.get(creds) != session_id:
+        _credential_sessions[creds] = session_id
+    return creds
+
+
+def _refresh_request_credentials(creds, rejected_token: Optional[str] = None):
+    """google_services.client refresh hook: go through the session so the new token is shared and saved"""
+    session_id = _credential_sessions.get(creds)
+    if session_id is None:
+        from google.auth.transport.requests import Request
+        creds.refresh(Request())
+        return creds
+    return _owned(session_id, refresh_session_credentials(session_id, creds, rejected_token))
+
+
+set_refresh_hook(_refresh_request_credentials)
+
+
+def _background_refresh(session_id: str, creds):
+    try:
+        with span("auth.background_refresh"):
+            refresh_session_credentials(session_id, creds)
+    except Exception as e:
+        # The current token is still valid; the next request will retry
+        print(f"Error refreshing token in background: {e}")
+    finally:
+        with _refresh_locks_guard:
+            _background_refreshes.discard(session_id)
+
+
+def schedule_refresh(session_id: str, creds):
+    """Start an early refresh off the request path (at most one per session)"""
+    with _refresh_locks_guard:
+        if session_id in _background_refreshes:
+            return
+        _background_refreshes.add(session_id)
+    # In the caller's context, so the refresh shows up in its trace
+    _refresh_executor.submit(contextvars.copy_context().run, _background_refresh, session_id, creds)
+
+
+def _lookup_credentials(session_id: str, trace):
+    """get_credentials() body; records where the credentials came from on `trace`"""
+    # Check memory cache first, then the database
+    creds = credentials_cache.get(session_id)
+    trace.set("credentials.source", "cache")
+    if creds is None:
+        trace.set("credentials.source", "mongo")
+        with span("auth.load_credentials"):
+            creds = load_credentials(session_id)
+        if not creds:
+            trace.set("credentials.source", "none")
+            return None
+    
+    # Expired: refresh now (once per session, concurrent requests wait)
+    if creds.expired and creds.refresh_token:
+        trace.set("credentials.source", "refresh")
+        try:
+            with span("auth.refresh_token"):
+                return refresh_session_credentials(session_id, creds)
+        except Exception as e:
+            print(f"Error refreshing token: {e}")
+            # Token refresh failed, remove from cache
+            credentials_cache.pop(session_id, None)
+            return None
+    
+    credentials_cache[session_id] = creds
+    # Still valid but close to expiry: refresh in the background
+    if refresh_due(creds):
+        schedule_refresh(session_id, creds)
+    return creds
+
+
 def get_credentials(session_id: Optional[str] = None):
     """Get credentials for a specific session/user"""
     if not session_id:
         return None
+    with span("auth.get_credentials") as trace:
+        return _owned(session_id, _lookup_credentials(session_id, trace))
+
+
+# Credentials resolved once for a group of in-process sub-requests (see /batch)
+_resolved_credentials: ContextVar[Optional[Tuple[str, Any]]] = ContextVar("resolved_credentials", default=None)
+
+
+@contextmanager
+def resolved_credentials(session_id: str, credentials: Any):
+    """Serve get_credentials_async(session_id) from already-resolved credentials"""
+    token = _resolved_credentials.set((session_id, credentials))
+    try:
+        yield
+    finally:
+        _resolved_credentials.reset(token)
+
+
+async def get_credentials_async(session_id: Optional[str] = None):
+    """
+    Async variant of get_credentials for async routes.
     
-    # Check memory cache first
-    if session_id in credentials_cache:
-        creds = credentials_cache[session_id]
-        # Refresh if expired
-        if creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-                save_credentials(creds, session_id)
-                credentials_cache[session_id] = creds
-            except Exception as e:
-                print(f"Error refreshing token: {e}")
-                # Token refresh failed, remove from cache
-                del credentials_cache[session_id]
-                return None
-        return creds
-    
-    # Try loading from database using session_id as user identifier
-    creds = load_credentials(session_id)
-    if creds:
-        # Refresh if expired
-        if creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-                save_credentials(creds, session_id)
-            except Exception as e:
-                print(f"Error refreshing token: {e}")
-                return None
-        credentials_cache[session_id] = creds
-        return creds
+    Valid cached credentials are returned directly; MongoDB lookups and token
+    refreshes run in the threadpool so they never block the event loop.
+    """
+    if not session_id:
+        return None
     
-    return None
+    with span("auth.get_credentials") as trace:
+        resolved = _resolved_credentials.get()
+        if resolved is not None and resolved[0] == session_id and not resolved[1].expired:
+            trace.set("credentials.source", "resolved")
+            return resolved[1]
+        
+        creds = credentials_cache.get(session_id)
+        if creds is not None and not creds.expired:
+            trace.set("credentials.source", "cache")
+            if refresh_due(creds):
+                schedule_refresh(session_id, creds)
+            return _owned(session_id, creds)
+        
+        return _owned(session_id, await run_in_threadpool(_lookup_credentials, session_id, trace))
 
 
 router = APIRouter()
@@ -142,19 +321,7 @@ def login(
     # Generate a new state parameter that includes a new session ID
     new_session_id = secrets.token_urlsafe(32)
     
-    flow = Flow.from_client_config(
-        {
-            "web": {
-                "client_id": GOOGLE_CLIENT_ID,
-                "client_secret": GOOGLE_CLIENT_SECRET,
-                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-            }
-        },
-        scopes=SCOPES,
-    )
-
-    flow.redirect_uri = GOOGLE_REDIRECT_URI
+    flow = create_oauth_flow()
 
     # Use state parameter to pass session ID through OAuth flow
     auth_url, state = flow.authorization_url(
@@ -179,19 +346,7 @@ def callback(code: str, state: str, response: Response):
     try:
         session_id = state  # Session ID passed through OAuth state
         
-        flow = Flow.from_client_config(
-            {
-                "web": {
-                    "client_id": GOOGLE_CLIENT_ID,
-                    "client_secret": GOOGLE_CLIENT_SECRET,
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                }
-            },
-            scopes=SCOPES,
-        )
-
-        flow.redirect_uri = GOOGLE_REDIRECT_URI
+        flow = create_oauth_flow()
         flow.fetch_token(code=code)
 
         credentials = flow.credentials
@@ -273,9 +428,11 @@ def logout(
     """Clear stored credentials for current user session"""
     session_id = extract_session_id(session_cookie, authorization)
     if session_id:
-        # Remove from memory cache
-        if session_id in credentials_cache:
-            del credentials_cache[session_id]
+        # Remove from memory cache (in-flight requests no longer refresh into the session)
+        creds = credentials_cache.pop(session_id, None)
+        if creds is not None:
+            _credential_sessions.pop(creds, None)
+        _forget_refresh_lock(session_id)
         # Remove from database
         delete_credentials(session_id)
     
@@ -0,0 +1,147 @@
+"""
+Batch API Route
+Runs several API calls in one round trip
+
+POST /batch takes a list of sub-requests against the existing routes. The
+session is resolved once for the whole batch and handed to every sub-request,
+which then runs in-process through the full app (routing, validation, error
+handlers) with at most BATCH_MAX_CONCURRENCY of them at a time. Each result
+carries its own status and body, so one failing call doesn't fail the batch.
+"""
+import asyncio
+import json
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from pydantic import BaseModel, Field
+from auth.router import get_credentials_async, resolved_credentials
+from auth.dependencies import require_session
+from responses import FastJSONRoute
+from config import BATCH_MAX_CONCURRENCY, BATCH_MAX_OPERATIONS
+
+router = APIRouter(prefix="/batch", tags=["Batch"], route_class=FastJSONRoute)
+
+# Sub-requests may not target these (cookies/redirects, recursion, admin actions)
+BLOCKED_PREFIXES = ("/batch", "/auth", "/admin")
+
+
+class SubRequest(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str  # e.g. "/calendar/events" or "/gmail/messages?max_results=5"
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[SubRequest] = Field(..., min_length=1)
+
+
+async def dispatch_subrequest(request: Request, session_id: str, sub: SubRequest) -> Dict[str, Any]:
+    """Run one sub-request through the app and collect its status and body"""
+    parsed = urllib.parse.urlsplit(sub.path)
+    path = parsed.path
+    if not path.startswith("/") or path.startswith(BLOCKED_PREFIXES):
+        return {"id": sub.id, "status": 400, "body": {"detail": f"Path not allowed in a batch: {path}"}}
+
+    body = b"" if sub.body is None else json.dumps(sub.body).encode("utf-8")
+    headers = [
+        (b"authorization", f"Bearer {session_id}".encode("latin-1")),
+        (b"accept", b"application/json"),
+        (b"accept-encoding", b"identity"),
+    ]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": "1.1",
+        "method": sub.method.upper(),
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": parsed.query.encode("utf-8"),
+        "headers": headers,
+    }
+    if "state" in request.scope:
+        scope["state"] = dict(request.scope["state"])
+
+    sent = False
+    # Set once the sub-request has finished; until then the "client" stays
+    # connected, so streamed responses (NDJSON) aren't cancelled as disconnected
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    status = 500
+    content_type = ""
+    next_cursor = None
+    chunks: List[bytes] = []
+
+    async def send(message):
+        nonlocal status, content_type, next_cursor
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    content_type = value.decode("latin-1")
+                elif name.lower() == b"x-next-cursor":
+                    next_cursor = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        return {"id": sub.id, "status": 500, "body": {"detail": str(e)}}
+    finally:
+        finished.set()
+
+    raw = b"".join(chunks)
+    if content_type.startswith("application/json") and raw:
+        result = json.loads(raw)
+    else:
+        result = raw.decode("utf-8", "replace") if raw else None
+    outcome = {"id": sub.id, "status": status, "body": result}
+    if next_cursor is not None:
+        outcome["next_cursor"] = next_cursor
+    return outcome
+
+
+@router.post("")
+async def run_batch(batch: BatchRequest, request: Request, session_id: str = Depends(require_session)):
+    """
+    Run several API calls in one request.
+
+    Example body:
+    `{"requests": [{"id": "me", "path": "/user/me"}, {"id": "events", "path": "/calendar/events"}]}`
+
+    Results come back in request order as `{"id", "status", "body"}`, plus
+    `next_cursor` for a listing with more pages.
+    """
+    if len(batch.requests) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_OPERATIONS} requests per batch")
+
+    credentials = await get_credentials_async(session_id)
+    if not credentials:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+
+    limit = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def run(sub: SubRequest):
+        async with limit:
+            return await dispatch_subrequest(request, session_id, sub)
+
+    with resolved_credentials(session_id, credentials):
+        results = await asyncio.gather(*[run(sub) for sub in batch.requests])
+    return {"responses": results}
@@ -0,0 +1,183 @@
+"""
+Offline Load Benchmark
+Drives the real FastAPI app against the fake Google API server and reports
+throughput and latency percentiles per endpoint
+
+Run from the Backend directory:
+    python -m benchmarks.bench_load [--requests 500] [--concurrency 32] [--latency-ms 40]
+    python -m benchmarks.bench_load --save before.json
+    python -m benchmarks.bench_load --compare before.json
+
+The fake server (benchmarks/fake_google.py) runs on a local port and the
+backend is pointed at it with GOOGLE_API_ROOT_URL, so upstream traffic still
+goes through the real connection pools. Sessions are seeded straight into the
+in-memory credentials cache, so MongoDB and OAuth are never contacted. Requests
+are sent in-process through httpx's ASGI transport.
+
+--no-cache disables the response cache so every request reaches the fake
+server; --users spreads requests over several sessions.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from benchmarks.fake_google import FakeOptions, run_in_thread
+
+# (name, path) of the read endpoints exercised; Keep is not mounted in main.py
+ENDPOINTS = [
+    ("calendar.events", "/calendar/events"),
+    ("tasks.lists", "/tasks/lists"),
+    ("tasks.items", "/tasks/"),
+    ("gmail.messages", "/gmail/messages?max_results=10"),
+    ("gmail.labels", "/gmail/labels"),
+    ("drive.files", "/drive/files"),
+    ("drive.quota", "/drive/quota"),
+    ("contacts.list", "/contacts/"),
+    ("sheets.spreadsheet", "/sheets/bench-sheet"),
+    ("youtube.playlists", "/youtube/playlists"),
+    ("photos.albums", "/photos/albums"),
+    ("photos.media", "/photos/media"),
+    ("user.me", "/user/me"),
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def seed_sessions(users: int) -> List[str]:
+    """Put long-lived fake credentials for `users` sessions in the credentials cache"""
+    from google.oauth2.credentials import Credentials
+    from auth.router import credentials_cache
+
+    session_ids = []
+    expiry = datetime.utcnow() + timedelta(days=1)
+    for i in range(users):
+        session_id = f"bench-session-{i}"
+        credentials_cache[session_id] = Credentials(
+            token=f"bench-token-{i}",
+            refresh_token=f"bench-refresh-{i}",
+            token_uri="http://127.0.0.1/token",
+            client_id="bench-client",
+            client_secret="bench-secret",
+            expiry=expiry,
+        )
+        session_ids.append(session_id)
+    return session_ids
+
+
+async def drive_endpoint(client, path: str, session_ids: List[str], requests: int, concurrency: int) -> Dict[str, float]:
+    """Send `requests` GETs to path with `concurrency` workers"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            headers = {"Authorization": f"Bearer {session_ids[i % len(session_ids)]}"}
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def run_all(args) -> Dict[str, Dict[str, float]]:
+    import httpx
+    import main
+    from google_services.transport import close_async_client
+
+    session_ids = seed_sessions(args.users)
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for name, path in ENDPOINTS:
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            # Warm up: discovery parsing, resource trees, connections
+            await drive_endpoint(client, path, session_ids, min(args.concurrency, args.requests), args.concurrency)
+            results[name] = await drive_endpoint(client, path, session_ids, args.requests, args.concurrency)
+    await close_async_client()
+    return results
+
+
+def report(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]):
+    header = f"{'endpoint':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    print(header + ("   vs baseline (req/s, p95)" if baseline else ""))
+    for name, r in results.items():
+        line = f"{name:<20}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}"
+        before = baseline.get(name)
+        if before:
+            line += f"   {(r['rps'] / before['rps'] - 1) * 100:+6.1f}%  {(r['p95_ms'] / before['p95_ms'] - 1) * 100:+6.1f}%"
+        print(line)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=8, help="distinct sessions to spread requests over")
+    parser.add_argument("--latency-ms", type=float, default=40, help="fake upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--items", type=int, default=20, help="items per fake list response")
+    parser.add_argument("--text-bytes", type=int, default=200, help="size of fake text fields")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--rate-limit", type=float, default=0, help="per-user calls/s pacing (0 disables)")
+    parser.add_argument("--only", nargs="*", help="endpoint name prefixes to run (e.g. gmail drive.quota)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against results saved with --save")
+    args = parser.parse_args()
+
+    options = FakeOptions(args.latency_ms, args.jitter_ms, args.items, args.text_bytes)
+    server, root_url = run_in_thread(options)
+
+    # Must be set before the backend (and its config) is imported
+    os.environ["GOOGLE_API_ROOT_URL"] = root_url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark-key")
+    os.environ["GOOGLE_RATE_LIMIT_PER_SECOND"] = str(args.rate_limit)
+    if args.no_cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+    try:
+        results = asyncio.run(run_all(args))
+    finally:
+        server.should_exit = True
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved to {args.save}")
+    return 1 if any(r["errors"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,146 @@
+"""
+Response Pipeline Benchmark
+CPU time to serialize each list endpoint's payload and its size on the wire
+
+Run from the Backend directory:
+    python -m benchmarks.bench_responses [--items 250] [--iterations 200]
+    python -m benchmarks.bench_responses --save before.json
+    python -m benchmarks.bench_responses --compare before.json
+
+Payloads are real endpoint responses: the app is driven against the fake
+Google server (benchmarks/fake_google.py) once per endpoint. Each payload is
+then serialized repeatedly with FastAPI's default path (jsonable_encoder +
+stdlib json, as JSONResponse) and with responses.FastJSONResponse (orjson), and
+compressed with gzip and, if the brotli package is installed, brotli at the
+levels the middleware uses. Timings are per response, in microseconds.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict
+
+from benchmarks.fake_google import FakeOptions, run_in_thread
+
+# (name, path) of the list endpoints measured
+ENDPOINTS = [
+    ("calendar.events", "/calendar/events"),
+    ("tasks.items", "/tasks/"),
+    ("gmail.messages", "/gmail/messages?max_results=50"),
+    ("drive.files", "/drive/files?max_results=100"),
+    ("contacts.list", "/contacts/?max_results=250"),
+    ("sheets.read", "/sheets/bench-sheet/read"),
+    ("youtube.playlists", "/youtube/playlists?max_results=50"),
+    ("photos.media", "/photos/media?page_size=100"),
+]
+
+
+def time_per_call(fn: Callable[[], Any], iterations: int) -> float:
+    """Best-of-3 mean microseconds per call"""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - started) / iterations)
+    return best * 1e6
+
+
+async def fetch_payloads() -> Dict[str, Any]:
+    """Fetch each endpoint once (uncompressed) and return the decoded JSON"""
+    import httpx
+    import main
+    from benchmarks.bench_load import seed_sessions
+    from google_services.transport import close_async_client
+
+    session_id = seed_sessions(1)[0]
+    payloads = {}
+    headers = {"Authorization": f"Bearer {session_id}", "Accept-Encoding": "identity"}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for name, path in ENDPOINTS:
+            response = await client.get(path, headers=headers)
+            if response.status_code != 200:
+                print(f"⚠️ {name}: HTTP {response.status_code}, skipped")
+                continue
+            payloads[name] = response.json()
+    await close_async_client()
+    return payloads
+
+
+def measure(payload: Any, iterations: int) -> Dict[str, float]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    import responses
+
+    raw = responses.dumps(payload)
+    result = {
+        "bytes": len(raw),
+        "default_us": time_per_call(lambda: JSONResponse(jsonable_encoder(payload)), iterations),
+        "fast_us": time_per_call(lambda: responses.FastJSONResponse(payload), iterations),
+        "gzip_bytes": len(responses.compress(raw, "gzip")),
+        "gzip_us": time_per_call(lambda: responses.compress(raw, "gzip"), iterations),
+    }
+    if responses.brotli is not None:
+        result["br_bytes"] = len(responses.compress(raw, "br"))
+        result["br_us"] = time_per_call(lambda: responses.compress(raw, "br"), iterations)
+    return result
+
+
+def report(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]):
+    header = f"{'endpoint':<20}{'bytes':>9}{'default us':>12}{'orjson us':>11}{'speedup':>9}{'gzip bytes':>12}{'gzip us':>9}"
+    has_br = any("br_bytes" in r for r in results.values())
+    if has_br:
+        header += f"{'br bytes':>10}{'br us':>8}"
+    print(header + ("   vs baseline (orjson us)" if baseline else ""))
+    for name, r in results.items():
+        line = (
+            f"{name:<20}{r['bytes']:>9}{r['default_us']:>12.1f}{r['fast_us']:>11.1f}"
+            f"{r['default_us'] / r['fast_us']:>8.1f}x{r['gzip_bytes']:>12}{r['gzip_us']:>9.1f}"
+        )
+        if has_br:
+            line += f"{r.get('br_bytes', 0):>10}{r.get('br_us', 0):>8.1f}"
+        before = baseline.get(name)
+        if before:
+            line += f"   {(r['fast_us'] / before['fast_us'] - 1) * 100:+6.1f}%"
+        print(line)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=250, help="items per fake list response")
+    parser.add_argument("--text-bytes", type=int, default=200, help="size of fake text fields")
+    parser.add_argument("--iterations", type=int, default=200, help="serializations per timing run")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against results saved with --save")
+    args = parser.parse_args()
+
+    server, root_url = run_in_thread(FakeOptions(0, 0, args.items, args.text_bytes))
+    os.environ["GOOGLE_API_ROOT_URL"] = root_url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark-key")
+    os.environ["GOOGLE_RATE_LIMIT_PER_SECOND"] = "0"
+
+    try:
+        payloads = asyncio.run(fetch_payloads())
+    finally:
+        server.should_exit = True
+
+    results = {name: measure(payload, args.iterations) for name, payload in payloads.items()}
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved to {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,63 @@
+"""
+Service Client Factory Benchmark
+Compares per-request CPU cost of googleapiclient.build() against the cached
+client factory in google_services.client
+
+Run from the Backend directory:
+    python -m benchmarks.bench_service_factory [--iterations 200]
+
+Each iteration does what a request does before touching the network: build
+the client for a user, walk to the resource and create the HttpRequest.
+Only APIs with bundled discovery documents are measured so the benchmark
+runs offline; Photos additionally skips a discovery download per request.
+"""
+import argparse
+import time
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from google_services.client import build_service, clear_service_cache
+
+# (api, version, representative call made by the service module)
+CALLS = [
+    ("gmail", "v1", lambda s: s.users().messages().list(userId="me")),
+    ("drive", "v3", lambda s: s.files().list(pageSize=10)),
+    ("calendar", "v3", lambda s: s.events().list(calendarId="primary")),
+    ("sheets", "v4", lambda s: s.spreadsheets().values().get(spreadsheetId="id", range="Sheet1")),
+    ("people", "v1", lambda s: s.people().connections().list(resourceName="people/me", personFields="names")),
+    ("youtube", "v3", lambda s: s.playlists().list(part="snippet", mine=True)),
+    ("tasks", "v1", lambda s: s.tasklists().list()),
+    ("keep", "v1", lambda s: s.notes().list()),
+    ("oauth2", "v2", lambda s: s.userinfo().get()),
+]
+
+
+def _cpu_per_call(fn, iterations: int) -> float:
+    """Average CPU milliseconds per call of fn()"""
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) * 1000 / iterations
+
+
+def run(iterations: int):
+    credentials = Credentials(token="benchmark-token")
+    clear_service_cache()
+
+    print(f"{'api':<14}{'build() ms':>12}{'factory ms':>12}{'first use ms':>14}{'speedup':>10}")
+    for api, version, call in CALLS:
+        before = _cpu_per_call(
+            lambda: call(build(api, version, credentials=credentials, static_discovery=True)),
+            iterations,
+        )
+        # First use parses the document and builds the touched resources
+        first = _cpu_per_call(lambda: call(build_service(api, version, credentials)), 1)
+        after = _cpu_per_call(lambda: call(build_service(api, version, credentials)), iterations)
+        print(f"{api + '.' + version:<14}{before:>12.3f}{after:>12.3f}{first:>14.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    run(parser.parse_args().iterations)
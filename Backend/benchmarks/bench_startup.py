@@ -0,0 +1,103 @@
+"""
+Startup Import Benchmark
+Measures how long `import main` (the serverless entry point) takes and which
+modules it spends that time on
+
+Run from the Backend directory:
+    python -m benchmarks.bench_startup [--runs 5] [--top 20] [--budget-ms 1200]
+    python -m benchmarks.bench_startup --save startup.json
+    python -m benchmarks.bench_startup --compare startup.json
+
+Each run imports main in a fresh interpreter with `-X importtime`, so nothing
+is shared between runs. The median per-module cumulative time is reported.
+--budget-ms exits non-zero when the total exceeds the budget; --compare
+flags modules that got slower than a saved run or became new imports, e.g.
+an SDK that was meant to load lazily.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay off the cold-start path
+DEFERRED_MODULES = ["google.genai", "google_auth_oauthlib", "pymongo", "smart_assistant"]
+
+
+def _import_times() -> Dict[str, int]:
+    """Cumulative import time in microseconds per module for one `import main`"""
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "benchmark-key")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(runs: int) -> Dict[str, float]:
+    """Median cumulative import milliseconds per module over several runs"""
+    samples = [_import_times() for _ in range(runs)]
+    modules = set().union(*samples)
+    return {
+        module: statistics.median(sample.get(module, 0) for sample in samples) / 1000
+        for module in modules
+    }
+
+
+def run(runs: int, top: int, budget_ms: float, save: str, compare: str) -> int:
+    times = measure(runs)
+    total = times.get("main", 0.0)
+
+    print(f"{'module':<48}{'cumulative ms':>14}")
+    for module, ms in sorted(times.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{module:<48}{ms:>14.1f}")
+    print(f"\nimport main: {total:.1f} ms (median of {runs})")
+
+    failed = False
+    eager = [module for module in DEFERRED_MODULES if module in times]
+    if eager:
+        print(f"FAIL: imported at startup but should be deferred: {', '.join(eager)}")
+        failed = True
+
+    if budget_ms and total > budget_ms:
+        print(f"FAIL: over budget ({total:.1f} ms > {budget_ms:.1f} ms)")
+        failed = True
+
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        for module, ms in sorted(times.items(), key=lambda item: item[1], reverse=True):
+            before = baseline.get(module)
+            if before is None and ms >= 5:
+                print(f"NEW: {module} ({ms:.1f} ms)")
+            elif before is not None and ms - before >= 10 and ms > before * 1.25:
+                print(f"SLOWER: {module} {before:.1f} -> {ms:.1f} ms")
+
+    if save:
+        with open(save, "w") as f:
+            json.dump(times, f, indent=2, sort_keys=True)
+        print(f"Saved to {save}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=0)
+    parser.add_argument("--save", help="write per-module times to this JSON file")
+    parser.add_argument("--compare", help="report regressions against a saved JSON file")
+    args = parser.parse_args()
+    sys.exit(run(args.runs, args.top, args.budget_ms, args.save, args.compare))
@@ -0,0 +1,57 @@
+"""
+Batch Sub-request Check
+Runs a /batch of JSON and streamed sub-requests against the fake Google API
+server and fails unless every one comes back with a status 200 and a body
+
+Run from the Backend directory:
+    python -m benchmarks.check_batch
+
+Streamed routes (/search by default, /jobs/{id}/events) only produce a body
+if the in-process sub-request stays "connected" until it has finished.
+"""
+import asyncio
+import os
+import sys
+
+from benchmarks.fake_google import FakeOptions, run_in_thread
+
+SUBREQUESTS = [
+    {"id": "search.json", "path": "/search?q=fake&stream=false"},
+    {"id": "search.stream", "path": "/search?q=fake"},
+    {"id": "calendar.events", "path": "/calendar/events"},
+]
+
+
+async def run_check() -> int:
+    import httpx
+    import main
+    from benchmarks.bench_load import seed_sessions
+    from google_services.transport import close_async_client
+
+    session_id = seed_sessions(1)[0]
+    failures = 0
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=60) as client:
+        response = await client.post(
+            "/batch", json={"requests": SUBREQUESTS}, headers={"Authorization": f"Bearer {session_id}"},
+        )
+        response.raise_for_status()
+        for result in response.json()["responses"]:
+            ok = result["status"] == 200 and bool(result["body"])
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {result['id']:<18} status={result['status']} body={str(result['body'])[:60]!r}")
+    await close_async_client()
+    return failures
+
+
+if __name__ == "__main__":
+    server, root_url = run_in_thread(FakeOptions())
+    # Must be set before the backend (and its config) is imported
+    os.environ["GOOGLE_API_ROOT_URL"] = root_url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark-key")
+    os.environ["GOOGLE_RATE_LIMIT_PER_SECOND"] = "0"
+    try:
+        failed = asyncio.run(run_check())
+    finally:
+        server.should_exit = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,392 @@
+"""
+Fake Google API Server
+Local stand-in for the Google APIs used by this backend, for offline benchmarks
+
+Serves canned, deterministic responses for Calendar, Tasks, Gmail, Drive,
+People, Sheets, YouTube, Photos, Keep and OAuth2 userinfo, plus the Photos
+discovery document (the only one not bundled with googleapiclient). Point the
+backend at it with GOOGLE_API_ROOT_URL; every API is then served under
+{root}/{api}/...
+
+Run standalone from the Backend directory:
+    python -m benchmarks.fake_google [--port 8765] [--latency-ms 50] [--items 20]
+
+or start it in-process with run_in_thread() (see benchmarks/bench_load.py).
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class FakeOptions:
+    """Latency and payload shape of the fake responses"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, items: int = 20, text_bytes: int = 200):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.items = items
+        self.text_bytes = text_bytes
+
+    def text(self, seed: str) -> str:
+        return (seed + " ") * max(self.text_bytes // (len(seed) + 1), 1)
+
+
+def _count(request: Request, options: FakeOptions, *params: str) -> int:
+    for param in params:
+        if param in request.query_params:
+            return min(int(request.query_params[param]), options.items)
+    return options.items
+
+
+# ============== CANNED RESPONSES ==============
+
+def gmail_messages(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    n = _count(request, options, "maxResults")
+    return {"messages": [{"id": f"msg{i}", "threadId": f"thr{i}"} for i in range(n)], "resultSizeEstimate": n}
+
+
+def gmail_message(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    message_id = match.group(1)
+    return {
+        "id": message_id,
+        "threadId": f"thr-{message_id}",
+        "labelIds": ["INBOX", "UNREAD"],
+        "snippet": options.text("snippet"),
+        "payload": {
+            "mimeType": "text/plain",
+            "headers": [
+                {"name": "From", "value": "Sender <sender@example.com>"},
+                {"name": "To", "value": "me@example.com"},
+                {"name": "Subject", "value": f"Subject {message_id}"},
+                {"name": "Date", "value": "Mon, 1 Jan 2024 09:00:00 +0000"},
+            ],
+            "body": {"data": "SGVsbG8gd29ybGQ="},
+        },
+    }
+
+
+def gmail_labels(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"labels": [{"id": f"Label_{i}", "name": f"Label {i}", "type": "user"} for i in range(options.items)]}
+
+
+def calendar_events(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    n = _count(request, options, "maxResults")
+    return {"items": [
+        {
+            "id": f"evt{i}",
+            "summary": f"Event {i}",
+            "description": options.text("agenda"),
+            "start": {"dateTime": f"2030-01-01T{9 + i % 8:02d}:00:00Z"},
+            "end": {"dateTime": f"2030-01-01T{10 + i % 8:02d}:00:00Z"},
+            "htmlLink": f"https://calendar.example.com/evt{i}",
+        }
+        for i in range(n)
+    ]}
+
+
+def tasks_lists(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"items": [{"id": f"list{i}", "title": f"List {i}", "updated": "2024-01-01T00:00:00Z"} for i in range(3)]}
+
+
+def tasks_items(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"items": [
+        {"id": f"task{i}", "title": f"Task {i}", "notes": options.text("note"), "status": "needsAction", "due": "2030-01-02T00:00:00Z"}
+        for i in range(options.items)
+    ]}
+
+
+def drive_files(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    n = _count(request, options, "pageSize")
+    return {"files": [
+        {"id": f"file{i}", "name": f"File {i}.txt", "mimeType": "text/plain", "webViewLink": f"https://drive.example.com/file{i}",
+         "modifiedTime": "2024-01-01T00:00:00Z", "size": "1024"}
+        for i in range(n)
+    ]}
+
+
+def drive_file(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"id": match.group(1), "name": "File.txt", "mimeType": "text/plain", "size": "1024", "webViewLink": "https://drive.example.com/f"}
+
+
+def drive_about(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {
+        "storageQuota": {"limit": "16106127360", "usage": "1073741824", "usageInDrive": "536870912", "usageInDriveTrash": "0"},
+        "user": {"emailAddress": "me@example.com", "displayName": "Benchmark User"},
+    }
+
+
+def _person(i: int, options: FakeOptions) -> Dict[str, Any]:
+    return {
+        "resourceName": f"people/c{i}",
+        "names": [{"displayName": f"Contact {i}"}],
+        "emailAddresses": [{"value": f"contact{i}@example.com"}],
+        "phoneNumbers": [{"value": f"+1555000{i:04d}"}],
+        "organizations": [{"name": "Example Inc", "title": options.text("title")[:40]}],
+    }
+
+
+def people_connections(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    n = _count(request, options, "pageSize")
+    return {"connections": [_person(i, options) for i in range(n)], "totalPeople": n}
+
+
+def people_search(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"results": [{"person": _person(i, options)} for i in range(_count(request, options, "pageSize"))]}
+
+
+def people_other(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"otherContacts": [_person(i, options) for i in range(_count(request, options, "pageSize"))]}
+
+
+def sheets_spreadsheet(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    spreadsheet_id = match.group(1)
+    return {
+        "spreadsheetId": spreadsheet_id,
+        "properties": {"title": f"Sheet {spreadsheet_id}", "locale": "en_US"},
+        "sheets": [
+            {"properties": {"sheetId": i, "title": f"Tab {i}", "index": i, "gridProperties": {"rowCount": 1000, "columnCount": 26}}}
+            for i in range(3)
+        ],
+        "spreadsheetUrl": f"https://sheets.example.com/{spreadsheet_id}",
+    }
+
+
+def sheets_values(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"range": match.group(2), "majorDimension": "ROWS",
+            "values": [[f"r{row}c{col}" for col in range(5)] for row in range(options.items)]}
+
+
+def _youtube_items(kind: str, n: int, options: FakeOptions) -> List[Dict[str, Any]]:
+    return [
+        {
+            "kind": f"youtube#{kind}",
+            "id": f"{kind}{i}" if kind != "searchResult" else {"kind": "youtube#video", "videoId": f"vid{i}"},
+            "snippet": {
+                "title": f"{kind} {i}",
+                "description": options.text("description"),
+                "channelTitle": "Benchmark Channel",
+                "publishedAt": "2024-01-01T00:00:00Z",
+                "thumbnails": {"default": {"url": f"https://img.example.com/{i}.jpg"}},
+                "resourceId": {"videoId": f"vid{i}", "channelId": f"chan{i}"},
+            },
+            "contentDetails": {"itemCount": 10, "duration": "PT4M13S"},
+            "statistics": {"viewCount": "1000", "likeCount": "10", "subscriberCount": "100", "videoCount": "5"},
+        }
+        for i in range(n)
+    ]
+
+
+def youtube_resource(kind: str) -> Callable:
+    def handler(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+        n = _count(request, options, "maxResults")
+        return {"items": _youtube_items(kind, n, options), "pageInfo": {"totalResults": n}}
+    return handler
+
+
+def _media_item(i: int, options: FakeOptions) -> Dict[str, Any]:
+    return {
+        "id": f"media{i}",
+        "description": options.text("photo")[:100],
+        "productUrl": f"https://photos.example.com/media{i}",
+        "baseUrl": f"https://photos.example.com/base/media{i}",
+        "mimeType": "image/jpeg",
+        "filename": f"IMG_{i:04d}.jpg",
+        "mediaMetadata": {"creationTime": "2024-01-01T00:00:00Z", "width": "4032", "height": "3024"},
+    }
+
+
+def _album(i: int) -> Dict[str, Any]:
+    return {"id": f"album{i}", "title": f"Album {i}", "productUrl": f"https://photos.example.com/album{i}",
+            "mediaItemsCount": "25", "coverPhotoBaseUrl": f"https://photos.example.com/cover{i}"}
+
+
+def photos_albums(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"albums": [_album(i) for i in range(_count(request, options, "pageSize"))]}
+
+
+def photos_shared_albums(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"sharedAlbums": [_album(i) for i in range(_count(request, options, "pageSize"))]}
+
+
+def photos_album(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return _album(0) | {"id": match.group(1)}
+
+
+def photos_media_items(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"mediaItems": [_media_item(i, options) for i in range(_count(request, options, "pageSize"))]}
+
+
+def photos_media_item(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return _media_item(0, options) | {"id": match.group(1)}
+
+
+def keep_notes(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"notes": [
+        {"name": f"notes/n{i}", "title": f"Note {i}", "body": {"text": {"text": options.text("note")}},
+         "createTime": "2024-01-01T00:00:00Z", "updateTime": "2024-01-01T00:00:00Z", "trashed": False}
+        for i in range(_count(request, options, "pageSize"))
+    ]}
+
+
+def keep_note(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"name": f"notes/{match.group(1)}", "title": "Note", "body": {"text": {"text": options.text("note")}}}
+
+
+def userinfo(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return {"id": "1234567890", "email": "me@example.com", "verified_email": True, "name": "Benchmark User",
+            "given_name": "Benchmark", "family_name": "User", "picture": "https://img.example.com/me.jpg"}
+
+
+# ============== PHOTOS DISCOVERY ==============
+
+def _method(method_id: str, path: str, http_method: str, path_params=(), query_params=(), body: bool = False):
+    parameters = {name: {"type": "string", "location": "path", "required": True} for name in path_params}
+    parameters.update({name: {"type": "integer" if name == "pageSize" else "string", "location": "query"} for name in query_params})
+    method = {
+        "id": method_id, "path": path, "flatPath": path, "httpMethod": http_method,
+        "parameters": parameters, "parameterOrder": list(path_params), "response": {"$ref": "Object"},
+    }
+    if body:
+        method["request"] = {"$ref": "Object"}
+    return method
+
+
+PHOTOS_DISCOVERY = {
+    "kind": "discovery#restDescription",
+    "discoveryVersion": "v1",
+    "id": "photoslibrary:v1",
+    "name": "photoslibrary",
+    "version": "v1",
+    "rootUrl": "https://photoslibrary.googleapis.com/",
+    "servicePath": "",
+    "baseUrl": "https://photoslibrary.googleapis.com/",
+    "batchPath": "batch",
+    "protocol": "rest",
+    # The real document's system parameters include fields, like every discovery API
+    "parameters": {"fields": {"type": "string", "location": "query"}},
+    "schemas": {"Object": {"id": "Object", "type": "object", "additionalProperties": {"type": "any"}}},
+    "resources": {
+        "albums": {"methods": {
+            "list": _method("photoslibrary.albums.list", "v1/albums", "GET", query_params=("pageSize", "pageToken")),
+            "get": _method("photoslibrary.albums.get", "v1/albums/{+albumId}", "GET", path_params=("albumId",)),
+            "create": _method("photoslibrary.albums.create", "v1/albums", "POST", body=True),
+        }},
+        "mediaItems": {"methods": {
+            "list": _method("photoslibrary.mediaItems.list", "v1/mediaItems", "GET", query_params=("pageSize", "pageToken")),
+            "get": _method("photoslibrary.mediaItems.get", "v1/mediaItems/{+mediaItemId}", "GET", path_params=("mediaItemId",)),
+            "search": _method("photoslibrary.mediaItems.search", "v1/mediaItems:search", "POST", body=True),
+        }},
+        "sharedAlbums": {"methods": {
+            "list": _method("photoslibrary.sharedAlbums.list", "v1/sharedAlbums", "GET", query_params=("pageSize", "pageToken")),
+        }},
+    },
+}
+
+
+def photos_discovery(request: Request, options: FakeOptions, match) -> Dict[str, Any]:
+    return PHOTOS_DISCOVERY
+
+
+# ============== ROUTING ==============
+
+# (HTTP method, path regex under the fake root, handler)
+ROUTES: List[Tuple[str, str, Callable]] = [
+    ("GET", r"/discovery/v1/apis/photoslibrary/v1/rest", photos_discovery),
+    ("GET", r"/gmail/gmail/v1/users/[^/]+/messages", gmail_messages),
+    ("GET", r"/gmail/gmail/v1/users/[^/]+/messages/([^/]+)", gmail_message),
+    ("GET", r"/gmail/gmail/v1/users/[^/]+/labels", gmail_labels),
+    ("GET", r"/calendar/calendar/v3/calendars/[^/]+/events", calendar_events),
+    ("GET", r"/tasks/tasks/v1/users/@me/lists", tasks_lists),
+    ("GET", r"/tasks/tasks/v1/lists/[^/]+/tasks", tasks_items),
+    ("GET", r"/drive/drive/v3/files", drive_files),
+    ("GET", r"/drive/drive/v3/files/([^/]+)", drive_file),
+    ("GET", r"/drive/drive/v3/about", drive_about),
+    ("GET", r"/people/v1/people/me/connections", people_connections),
+    ("GET", r"/people/v1/people:searchContacts", people_search),
+    ("GET", r"/people/v1/otherContacts", people_other),
+    ("GET", r"/sheets/v4/spreadsheets/([^/]+)", sheets_spreadsheet),
+    ("GET", r"/sheets/v4/spreadsheets/([^/]+)/values/([^/]+)", sheets_values),
+    ("GET", r"/youtube/youtube/v3/search", youtube_resource("searchResult")),
+    ("GET", r"/youtube/youtube/v3/videos", youtube_resource("video")),
+    ("GET", r"/youtube/youtube/v3/channels", youtube_resource("channel")),
+    ("GET", r"/youtube/youtube/v3/playlists", youtube_resource("playlist")),
+    ("GET", r"/youtube/youtube/v3/playlistItems", youtube_resource("playlistItem")),
+    ("GET", r"/youtube/youtube/v3/subscriptions", youtube_resource("subscription")),
+    ("GET", r"/photoslibrary/v1/albums", photos_albums),
+    ("GET", r"/photoslibrary/v1/albums/([^/]+)", photos_album),
+    ("GET", r"/photoslibrary/v1/sharedAlbums", photos_shared_albums),
+    ("GET", r"/photoslibrary/v1/mediaItems", photos_media_items),
+    ("POST", r"/photoslibrary/v1/mediaItems:search", photos_media_items),
+    ("GET", r"/photoslibrary/v1/mediaItems/([^/]+)", photos_media_item),
+    ("GET", r"/keep/v1/notes", keep_notes),
+    ("GET", r"/keep/v1/notes/([^/]+)", keep_note),
+    ("GET", r"/oauth2/oauth2/v2/userinfo", userinfo),
+]
+
+_COMPILED = [(method, re.compile(pattern + r"$"), handler) for method, pattern, handler in ROUTES]
+
+
+def create_app(options: Optional[FakeOptions] = None) -> Starlette:
+    """Build the fake API as an ASGI app"""
+    options = options or FakeOptions()
+
+    async def dispatch(request: Request) -> Response:
+        if options.latency_ms or options.jitter_ms:
+            delay = options.latency_ms + random.uniform(-options.jitter_ms, options.jitter_ms)
+            await asyncio.sleep(max(delay, 0) / 1000)
+
+        path = request.url.path
+        for method, pattern, handler in _COMPILED:
+            match = pattern.match(path)
+            if match and method == request.method:
+                return JSONResponse(handler(request, options, match))
+
+        # Writes succeed generically: echo the body back with an id
+        if request.method in ("POST", "PUT", "PATCH"):
+            body = await request.body()
+            payload = json.loads(body) if body else {}
+            return JSONResponse({"id": f"fake{int(time.time() * 1000)}", **(payload if isinstance(payload, dict) else {})})
+        if request.method == "DELETE":
+            return Response(status_code=204)
+        return JSONResponse({"error": {"code": 404, "message": f"No fake for {request.method} {path}"}}, status_code=404)
+
+    return Starlette(routes=[Route("/{path:path}", dispatch, methods=["GET", "POST", "PUT", "PATCH", "DELETE"])])
+
+
+def run_in_thread(options: Optional[FakeOptions] = None, port: int = 0) -> Tuple[uvicorn.Server, str]:
+    """Start the fake server on a background thread; returns (server, base URL)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+    config = uvicorn.Config(create_app(options), log_level="warning", access_log=False, lifespan="off")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--text-bytes", type=int, default=200)
+    args = parser.parse_args()
+    fake_options = FakeOptions(args.latency_ms, args.jitter_ms, args.items, args.text_bytes)
+    print(f"Fake Google APIs on http://127.0.0.1:{args.port} (set GOOGLE_API_ROOT_URL to this)")
+    uvicorn.run(create_app(fake_options), host="127.0.0.1", port=args.port, log_level="warning")
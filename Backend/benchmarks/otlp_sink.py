@@ -0,0 +1,162 @@
+"""
+OTLP Trace Sink
+Local stand-in for an OpenTelemetry collector that prints per-stage trace breakdowns
+
+Accepts OTLP/HTTP trace exports with JSON encoding at POST /v1/traces (what
+tracing.py sends with TRACING_EXPORTER=otlp) and prints each trace as a tree
+of spans with their offsets and durations once its root span arrives, e.g.
+where a slow /smart-summary spent its time. It can also print the traces in a
+file written with TRACING_EXPORTER=file.
+
+Run from the Backend directory:
+    python -m benchmarks.otlp_sink [--port 4318] [--min-ms 0]
+    python -m benchmarks.otlp_sink --file traces.jsonl
+
+or start it in-process with run_in_thread() and read TraceStore.traces.
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Attributes worth showing next to a span in the breakdown
+_SHOWN_ATTRIBUTES = (
+    "credentials.source", "google.discovery_cached", "http.response.status_code", "google.hedge",
+    "db.namespace", "response.bytes", "response.encoding",
+)
+
+
+def _attribute_value(value: Dict[str, Any]) -> Any:
+    for kind in ("stringValue", "boolValue", "doubleValue"):
+        if kind in value:
+            return value[kind]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return None
+
+
+def flatten(export_request: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Spans of an OTLP/JSON export request, with plain attribute dicts"""
+    spans = []
+    for resource_spans in export_request.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for item in scope_spans.get("spans", []):
+                spans.append({
+                    "trace_id": item["traceId"],
+                    "span_id": item["spanId"],
+                    "parent_id": item.get("parentSpanId", ""),
+                    "name": item["name"],
+                    "kind": item.get("kind", 0),
+                    "start_ns": int(item["startTimeUnixNano"]),
+                    "end_ns": int(item["endTimeUnixNano"]),
+                    "attributes": {attr["key"]: _attribute_value(attr["value"]) for attr in item.get("attributes", [])},
+                    "status": item.get("status", {}),
+                })
+    return spans
+
+
+def render(spans: List[Dict[str, Any]]) -> str:
+    """Indented span tree of one trace: offset from the root's start, duration, name, key attributes"""
+    by_id = {item["span_id"]: item for item in spans}
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    roots = []
+    for item in spans:
+        if item["parent_id"] in by_id:
+            children.setdefault(item["parent_id"], []).append(item)
+        else:
+            roots.append(item)
+    origin = min(item["start_ns"] for item in spans)
+    lines = []
+
+    def walk(item: Dict[str, Any], depth: int):
+        offset_ms = (item["start_ns"] - origin) / 1e6
+        duration_ms = (item["end_ns"] - item["start_ns"]) / 1e6
+        shown = " ".join(
+            f"{key}={item['attributes'][key]}" for key in _SHOWN_ATTRIBUTES if key in item["attributes"]
+        )
+        error = f" ERROR {item['status'].get('message', '')}" if item["status"].get("code") == 2 else ""
+        lines.append(f"{offset_ms:9.1f} {duration_ms:9.1f}  {'  ' * depth}{item['name']}  {shown}{error}".rstrip())
+        for child in sorted(children.get(item["span_id"], []), key=lambda span: span["start_ns"]):
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda span: span["start_ns"]):
+        walk(root, 0)
+    header = f"trace {spans[0]['trace_id']}\n{'start ms':>9} {'dur ms':>9}  span"
+    return header + "\n" + "\n".join(lines)
+
+
+class TraceStore:
+    """Spans grouped by trace; a trace is complete once its root (server) span arrived"""
+
+    def __init__(self, min_ms: float = 0, echo: bool = True):
+        self.min_ms = min_ms
+        self.echo = echo
+        self.pending: Dict[str, List[Dict[str, Any]]] = {}
+        self.traces: List[List[Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def add(self, spans: List[Dict[str, Any]]):
+        finished = []
+        with self._lock:
+            for item in spans:
+                self.pending.setdefault(item["trace_id"], []).append(item)
+                # The server span, even when it continues a caller's trace
+                if not item["parent_id"] or item["kind"] == 2:
+                    finished.append(item)
+            for root in finished:
+                trace = self.pending.pop(root["trace_id"], [])
+                self.traces.append(trace)
+                if self.echo and (root["end_ns"] - root["start_ns"]) / 1e6 >= self.min_ms:
+                    print(render(trace) + "\n", flush=True)
+
+
+def create_app(store: TraceStore) -> Starlette:
+    """Build the sink as an ASGI app"""
+
+    async def traces(request: Request) -> Response:
+        if not request.headers.get("content-type", "").startswith("application/json"):
+            return JSONResponse({"error": "Only OTLP/JSON is supported"}, status_code=415)
+        store.add(flatten(json.loads(await request.body())))
+        return JSONResponse({"partialSuccess": {}})
+
+    return Starlette(routes=[Route("/v1/traces", traces, methods=["POST"])])
+
+
+def run_in_thread(store: Optional[TraceStore] = None, port: int = 0) -> Tuple[uvicorn.Server, str, TraceStore]:
+    """Start the sink on a background thread; returns (server, traces endpoint URL, store)"""
+    store = store or TraceStore(echo=False)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+    config = uvicorn.Config(create_app(store), log_level="warning", access_log=False, lifespan="off")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{sock.getsockname()[1]}/v1/traces", store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--min-ms", type=float, default=0, help="Only print traces at least this slow")
+    parser.add_argument("--file", help="Print the traces in a TRACING_EXPORTER=file output instead of listening")
+    args = parser.parse_args()
+    sink = TraceStore(min_ms=args.min_ms)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    sink.add(flatten(json.loads(line)))
+    else:
+        print(f"OTLP/JSON trace sink on http://127.0.0.1:{args.port}/v1/traces (set TRACING_OTLP_ENDPOINT to this)")
+        uvicorn.run(create_app(sink), host="127.0.0.1", port=args.port, log_level="warning")
@@ -18,6 +18,115 @@ FRONTEND_URL = os.getenv("FRONTEND_URL", "https://eventx-frontend-murex.vercel.a
 
 GOOGLE_REDIRECT_URI = f"{BACKEND_URL}/auth/callback"
 
+# Refresh access tokens in the background once they are this close to expiry.
+# google-auth treats tokens as expired 225s early, so keep this above that.
+TOKEN_REFRESH_SKEW_SECONDS = int(os.getenv("TOKEN_REFRESH_SKEW_SECONDS", "300"))
+
+# In-process credentials cache (sessions beyond this fall back to MongoDB)
+CREDENTIALS_CACHE_MAX_ENTRIES = int(os.getenv("CREDENTIALS_CACHE_MAX_ENTRIES", "10000"))
+CREDENTIALS_CACHE_IDLE_TTL_SECONDS = int(os.getenv("CREDENTIALS_CACHE_IDLE_TTL_SECONDS", "3600"))
+
+# Upstream Google API HTTP client
+GOOGLE_HTTP_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_HTTP_TIMEOUT_SECONDS", "60"))
+GOOGLE_HTTP_MAX_CONNECTIONS = int(os.getenv("GOOGLE_HTTP_MAX_CONNECTIONS", "200"))
+# Retry policy and per-user pacing for Google API calls (google_services/retry.py)
+GOOGLE_RETRY_MAX_ATTEMPTS = int(os.getenv("GOOGLE_RETRY_MAX_ATTEMPTS", "4"))
+GOOGLE_RETRY_BASE_DELAY = float(os.getenv("GOOGLE_RETRY_BASE_DELAY", "0.5"))
+GOOGLE_RETRY_MAX_DELAY = float(os.getenv("GOOGLE_RETRY_MAX_DELAY", "16"))
+GOOGLE_RATE_LIMIT_PER_SECOND = float(os.getenv("GOOGLE_RATE_LIMIT_PER_SECOND", "25"))
+GOOGLE_RATE_LIMIT_BURST = float(os.getenv("GOOGLE_RATE_LIMIT_BURST", "50"))
+# Longest a call may wait for its user's bucket; beyond that it fails with 429
+GOOGLE_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("GOOGLE_RATE_LIMIT_MAX_WAIT_SECONDS", "10"))
+# Send all Google API traffic to another host, e.g. benchmarks/fake_google.py
+GOOGLE_API_ROOT_URL = os.getenv("GOOGLE_API_ROOT_URL", "").rstrip("/")
+
+# Upstream scheduler (google_services/scheduler.py): concurrent attempts per
+# user and per process; the excess queues with round-robin across users
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "200"))
+UPSTREAM_PER_USER_CONCURRENCY = int(os.getenv("UPSTREAM_PER_USER_CONCURRENCY", "10"))
+
+# Hedged reads (google_services/hedging.py): second attempt after the recent
+# HEDGE_PERCENTILE latency, at most HEDGE_BUDGET_RATIO extra calls
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.05"))
+HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.05"))
+HEDGE_BUDGET_BURST = float(os.getenv("HEDGE_BUDGET_BURST", "10"))
+
+# Per-API circuit breakers (google_services/breaker.py)
+BREAKER_ENABLED = os.getenv("BREAKER_ENABLED", "true").lower() == "true"
+BREAKER_WINDOW_SECONDS = int(os.getenv("BREAKER_WINDOW_SECONDS", "30"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "20"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "10"))
+BREAKER_SLOW_CALL_RATE = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "3"))
+
+# POST /batch limits: sub-requests per batch, and how many run at once
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "20"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "6"))
+
+# GET /dashboard: how long each section may take before it is reported as timed out
+DASHBOARD_SECTION_TIMEOUT_SECONDS = float(os.getenv("DASHBOARD_SECTION_TIMEOUT_SECONDS", "5"))
+
+# GET /search: sources that haven't answered by then are reported as timed out
+SEARCH_DEADLINE_SECONDS = float(os.getenv("SEARCH_DEADLINE_SECONDS", "5"))
+
+# Background jobs (jobs/): store is MongoDB when MONGODB_URI is set, else memory
+JOB_STORE = os.getenv("JOB_STORE", "mongo" if os.getenv("MONGODB_URI") else "memory")
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "0.5"))
+JOB_STREAM_MAX_SECONDS = float(os.getenv("JOB_STREAM_MAX_SECONDS", "25"))
+# Jobs run as asyncio tasks in the instance that accepted them. Serverless hosts
+# (Vercel) freeze an instance between requests and may never resume it, so each
+# job holds a lease its instance renews while it runs; a job whose lease lapsed
+# is marked failed rather than staying "running" (and uncancellable) forever.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# Largest job result stored (JSON bytes); MongoDB documents are capped at 16 MB
+JOB_MAX_RESULT_BYTES = int(os.getenv("JOB_MAX_RESULT_BYTES", str(8 * 1024 * 1024)))
+
+# Key required by the /admin and /debug stats endpoints (unset disables them)
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+# Request profiling (profiling.py): share of requests profiled automatically, plus
+# any request sent with X-Profile: 1 and the admin key
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", "30"))
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+
+# Request tracing (tracing.py): "file" appends OTLP/JSON lines to TRACING_FILE,
+# "otlp" POSTs them to an OTLP/HTTP collector, "none" disables tracing
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "google-workspace-backend")
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1"))
+TRACING_BATCH_SIZE = int(os.getenv("TRACING_BATCH_SIZE", "512"))
+TRACING_EXPORT_INTERVAL_SECONDS = float(os.getenv("TRACING_EXPORT_INTERVAL_SECONDS", "2"))
+TRACING_MAX_QUEUE = int(os.getenv("TRACING_MAX_QUEUE", "20000"))
+
+# List endpoints (google_services/pagination.py): most items returned per page
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", "250"))
+
+# Per-user response cache for read endpoints
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Shared second cache tier behind the in-process one: "mongo" or "none"
+RESPONSE_CACHE_L2 = os.getenv("RESPONSE_CACHE_L2", "none").lower()
+RESPONSE_CACHE_L2_MAX_VALUE_BYTES = int(os.getenv("RESPONSE_CACHE_L2_MAX_VALUE_BYTES", str(512 * 1024)))
+RESPONSE_CACHE_L2_RETRY_SECONDS = float(os.getenv("RESPONSE_CACHE_L2_RETRY_SECONDS", "30"))
+
+# Response compression (responses.py); brotli is used when the package is installed
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
 # Google API Scopes - All products
 SCOPES = [
     # Calendar & Meet
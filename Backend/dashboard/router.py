@@ -0,0 +1,95 @@
+"""
+Dashboard API Route
+Everything the home view needs, fetched concurrently in one request
+
+Each section is an existing async service call run side by side with the
+others under its own timeout, so the endpoint takes as long as the slowest
+section rather than the sum of all of them. A section that fails or times out
+is reported under "errors" while the rest are still returned.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from googleapiclient.errors import HttpError
+from auth.router import get_credentials_async
+from auth.dependencies import require_session
+from responses import FastJSONRoute
+from config import DASHBOARD_SECTION_TIMEOUT_SECONDS
+from google_services.breaker import CircuitOpenError
+from google_services.user_service import get_user_info_async
+from google_services.calendar_service import list_events_async
+from google_services.tasks_service import list_task_lists_async, list_tasks_async
+from google_services.gmail_service import list_messages_async
+from google_services.drive_service import get_storage_quota_async
+from google_services.photos_service import list_albums_async
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], route_class=FastJSONRoute)
+
+# Section name -> async call taking the user's credentials
+SECTIONS: Dict[str, Callable[[Any], Awaitable[Any]]] = {
+    "profile": get_user_info_async,
+    "events": list_events_async,
+    "task_lists": list_task_lists_async,
+    "tasks": list_tasks_async,
+    "emails": lambda credentials: list_messages_async(credentials, max_results=5),
+    "storage": get_storage_quota_async,
+    "albums": lambda credentials: list_albums_async(credentials, page_size=10),
+}
+
+
+def _section_error(e: BaseException, timeout: float) -> Dict[str, Any]:
+    """Status/detail for a failed section, mirroring the app's error handlers"""
+    if isinstance(e, asyncio.TimeoutError):
+        return {"status": 504, "detail": f"Timed out after {timeout:g}s"}
+    if isinstance(e, CircuitOpenError):
+        return {"status": 503, "detail": str(e)}
+    if isinstance(e, HttpError):
+        status = e.resp.status
+        return {"status": status if 400 <= status < 500 else 502, "detail": e.reason or str(e)}
+    return {"status": 500, "detail": str(e)}
+
+
+async def _run_section(name: str, credentials: Any, timeout: float):
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(SECTIONS[name](credentials), timeout)
+        error = None
+    except Exception as e:
+        result, error = None, _section_error(e, timeout)
+    return name, result, error, (time.perf_counter() - started) * 1000
+
+
+@router.get("")
+async def get_dashboard(
+    sections: Optional[str] = Query(None, description="Comma-separated subset of sections (default: all)"),
+    timeout: float = Query(DASHBOARD_SECTION_TIMEOUT_SECONDS, gt=0, le=30, description="Per-section timeout in seconds"),
+    session_id: str = Depends(require_session),
+):
+    """
+    Home view data: profile, events, task lists, tasks, recent emails,
+    storage quota and photo albums, fetched concurrently.
+
+    Always 200 once authenticated; sections that failed are omitted from
+    `sections` and described in `errors`.
+    """
+    names = list(SECTIONS) if not sections else [name.strip() for name in sections.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+
+    credentials = await get_credentials_async(session_id)
+    if not credentials:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+
+    outcomes = await asyncio.gather(*[_run_section(name, credentials, timeout) for name in names])
+
+    data, errors, timings = {}, {}, {}
+    for name, result, error, elapsed_ms in outcomes:
+        timings[name] = round(elapsed_ms, 1)
+        if error is None:
+            data[name] = result
+        else:
+            errors[name] = error
+    return {"sections": data, "errors": errors, "timings_ms": timings}
@@ -7,8 +7,7 @@ import os
 import json
 from datetime import datetime
 from typing import Any
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from metrics import mongo_command_listener
 
 # MongoDB Atlas connection
 MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
@@ -26,12 +25,17 @@ def get_database():
     if _db is not None:
         return _db
     
+    # Imported on first use to keep pymongo off the cold-start path
+    from pymongo import MongoClient
+    from pymongo.errors import ConnectionFailure
+    
     try:
         _client = MongoClient(
             MONGODB_URI,
             serverSelectionTimeoutMS=5000,
             maxPoolSize=10,
-            minPoolSize=1
+            minPoolSize=1,
+            event_listeners=[mongo_command_listener()],
         )
         # Test connection
         _client.admin.command('ping')
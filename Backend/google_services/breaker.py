@@ -0,0 +1,210 @@
+"""
+Circuit Breakers
+One breaker per Google API so a degraded product fails fast instead of
+tying up workers for the full upstream timeout
+
+Every upstream attempt is recorded against its API's breaker (the first part
+of the method id, e.g. "photoslibrary" for photoslibrary.albums.list). Over a
+rolling window, once enough calls have been seen, the breaker opens when the
+share of failed calls (5xx, 429 excluded, or no response) or of slow calls
+reaches its threshold. While open, calls raise CircuitOpenError immediately.
+After BREAKER_OPEN_SECONDS a few half-open trial calls are let through: if
+they all succeed the breaker closes, otherwise it opens again.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import (
+    BREAKER_ENABLED,
+    BREAKER_FAILURE_RATE,
+    BREAKER_HALF_OPEN_CALLS,
+    BREAKER_MIN_CALLS,
+    BREAKER_OPEN_SECONDS,
+    BREAKER_SLOW_CALL_RATE,
+    BREAKER_SLOW_CALL_SECONDS,
+    BREAKER_WINDOW_SECONDS,
+)
+from metrics import Counter, Gauge
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Products used by this backend (discovery API names); others are added on first use
+KNOWN_APIS = ("gmail", "drive", "calendar", "people", "sheets", "youtube", "photoslibrary", "keep", "tasks", "oauth2")
+
+google_api_circuit_state = Gauge(
+    "google_api_circuit_state", "Breaker state per API (0 closed, 1 half-open, 2 open)", ("api",))
+google_api_circuit_rejected = Counter(
+    "google_api_circuit_rejected_total", "Calls failed fast by an open breaker", ("api",))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an API whose breaker is open"""
+
+    def __init__(self, api: str, retry_after: float):
+        super().__init__(f"{api} is temporarily unavailable (circuit open)")
+        self.api = api
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Rolling-window error/latency breaker for one API"""
+
+    def __init__(self, api: str):
+        self.api = api
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trials_in_flight = 0
+        self.trial_successes = 0
+        # second -> [calls, failures, slow calls]
+        self._window: Dict[int, list] = {}
+        self._lock = threading.Lock()
+        self.total_calls = 0
+        self.total_failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+        google_api_circuit_state.set(_STATE_VALUES[CLOSED], api)
+
+    def acquire(self) -> bool:
+        """
+        Admit one call or raise CircuitOpenError.
+
+        Returns True when the call is a half-open trial.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                remaining = self.opened_at + BREAKER_OPEN_SECONDS - now
+                if remaining > 0:
+                    self._reject()
+                    raise CircuitOpenError(self.api, remaining)
+                self._transition(HALF_OPEN)
+                self.trials_in_flight = 0
+                self.trial_successes = 0
+            if self.state == HALF_OPEN:
+                if self.trials_in_flight >= BREAKER_HALF_OPEN_CALLS:
+                    self._reject()
+                    raise CircuitOpenError(self.api, BREAKER_OPEN_SECONDS)
+                self.trials_in_flight += 1
+                return True
+            return False
+
+    def record(self, trial: bool, failed: Optional[bool], seconds: float):
+        """Record a call's outcome; failed=None releases the slot without judging the API"""
+        with self._lock:
+            now = time.monotonic()
+            if trial:
+                self.trials_in_flight = max(self.trials_in_flight - 1, 0)
+            if failed is None:
+                return
+            slow = seconds >= BREAKER_SLOW_CALL_SECONDS
+            self.total_calls += 1
+            self.total_failures += int(failed)
+
+            if trial and self.state == HALF_OPEN:
+                if failed or slow:
+                    self._open(now)
+                else:
+                    self.trial_successes += 1
+                    if self.trial_successes >= BREAKER_HALF_OPEN_CALLS:
+                        self._window.clear()
+                        self._transition(CLOSED)
+                return
+            if self.state != CLOSED:
+                return
+
+            second = int(now)
+            bucket = self._window.get(second)
+            if bucket is None:
+                bucket = self._window[second] = [0, 0, 0]
+                oldest = second - BREAKER_WINDOW_SECONDS
+                for key in [key for key in self._window if key <= oldest]:
+                    del self._window[key]
+            bucket[0] += 1
+            bucket[1] += int(failed)
+            bucket[2] += int(slow)
+
+            calls, failures, slow_calls = self._totals()
+            if calls >= BREAKER_MIN_CALLS and (
+                failures / calls >= BREAKER_FAILURE_RATE or slow_calls / calls >= BREAKER_SLOW_CALL_RATE
+            ):
+                self._open(now)
+
+    def reset(self):
+        """Force the breaker closed (admin action)"""
+        with self._lock:
+            self._window.clear()
+            self.trials_in_flight = 0
+            self._transition(CLOSED)
+
+    def _totals(self):
+        calls = failures = slow_calls = 0
+        for bucket_calls, bucket_failures, bucket_slow in self._window.values():
+            calls += bucket_calls
+            failures += bucket_failures
+            slow_calls += bucket_slow
+        return calls, failures, slow_calls
+
+    def _open(self, now: float):
+        self.opened_at = now
+        self.times_opened += 1
+        self._window.clear()
+        self._transition(OPEN)
+        print(f"⚠️ Circuit opened for {self.api}")
+
+    def _reject(self):
+        self.rejected += 1
+        google_api_circuit_rejected.inc(self.api)
+
+    def _transition(self, state: str):
+        self.state = state
+        google_api_circuit_state.set(_STATE_VALUES[state], self.api)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls, failures, slow_calls = self._totals()
+            snapshot = {
+                "state": self.state,
+                "window_calls": calls,
+                "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "window_slow_rate": round(slow_calls / calls, 4) if calls else 0.0,
+                "total_calls": self.total_calls,
+                "total_failures": self.total_failures,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+            }
+            if self.state == OPEN:
+                snapshot["retry_after_seconds"] = round(
+                    max(self.opened_at + BREAKER_OPEN_SECONDS - time.monotonic(), 0.0), 1)
+            return snapshot
+
+
+_breakers: Dict[str, CircuitBreaker] = {api: CircuitBreaker(api) for api in KNOWN_APIS}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(method_id: Optional[str]) -> Optional[CircuitBreaker]:
+    """Breaker for the API a discovery method id belongs to (None when disabled)"""
+    if not BREAKER_ENABLED or not method_id:
+        return None
+    api = method_id.split(".", 1)[0]
+    breaker = _breakers.get(api)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(api)
+            if breaker is None:
+                breaker = _breakers[api] = CircuitBreaker(api)
+    return breaker
+
+
+def get_breaker(api: str) -> Optional[CircuitBreaker]:
+    return _breakers.get(api)
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every breaker, keyed by API name"""
+    return {api: breaker.snapshot() for api, breaker in sorted(_breakers.items())}
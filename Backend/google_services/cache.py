@@ -0,0 +1,506 @@
+"""
+Response Cache
+Per-user TTL cache for read-only Google service calls
+
+Service functions opt in with @cached(op, ttl). Entries are keyed by user,
+operation and call arguments, stored as JSON (callers always get a fresh copy)
+and evicted least-recently-used once the memory cap is reached. If the
+upstream response carried an ETag, an expired entry is kept and revalidated
+with If-None-Match; a 304 renews it without re-downloading or re-shaping.
+Writes decorated with @invalidates(*ops) drop the user's matching entries.
+
+With RESPONSE_CACHE_L2=mongo a shared tier sits behind the in-process one, so
+workers and instances reuse each other's responses: reads check L1, then L2,
+then Google, and L2 hits are copied into L1 for the rest of their lifetime.
+Other workers' L1 copies are not invalidated by a write and live out their TTL.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from googleapiclient.errors import HttpError
+
+from config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_L2,
+    RESPONSE_CACHE_L2_MAX_VALUE_BYTES,
+    RESPONSE_CACHE_L2_RETRY_SECONDS,
+    RESPONSE_CACHE_MAX_BYTES,
+)
+from metrics import Counter
+
+CacheKey = Tuple[str, str, str]
+
+cache_requests = Counter(
+    "response_cache_requests_total", "Response cache lookups by tier (l1, l2) and result", ("tier", "result"))
+
+
+def _hit_ratio(hits: int, misses: int) -> Optional[float]:
+    return round(hits / (hits + misses), 4) if hits + misses else None
+
+
+def user_key(credentials: Any) -> str:
+    """Stable, non-reversible identifier for the user behind a set of credentials"""
+    secret = getattr(credentials, "refresh_token", None) or getattr(credentials, "token", None) or ""
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+
+
+class _Entry:
+    __slots__ = ("value", "etag", "expires_at", "size")
+
+    def __init__(self, value: str, etag: Optional[str], expires_at: float):
+        self.value = value
+        self.etag = etag
+        self.expires_at = expires_at
+        self.size = len(value)
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses capped by total size in bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._index: Dict[Tuple[str, str], Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    def lookup(self, key: CacheKey) -> Tuple[Optional[_Entry], bool]:
+        """Return (entry, is_fresh); stale entries are only kept if they have an ETag"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if entry.expires_at > time.monotonic():
+                self.hits += 1
+                return entry, True
+            self.misses += 1
+            if entry.etag is None:
+                self._remove(key)
+                return None, False
+            return entry, False
+
+    def store(self, key: CacheKey, value: str, etag: Optional[str], ttl: float):
+        entry = _Entry(value, etag, time.monotonic() + ttl)
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._index.setdefault(key[:2], set()).add(key)
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def renew(self, key: CacheKey, ttl: float):
+        """Extend a revalidated (304) entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + ttl
+                self.revalidated += 1
+
+    def invalidate(self, user: str, ops) -> int:
+        with self._lock:
+            keys = set()
+            for op in ops:
+                keys |= self._index.get((user, op), set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self.bytes = 0
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        keys = self._index.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._index[key[:2]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": _hit_ratio(self.hits, self.misses),
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+            }
+
+
+_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+
+
+def get_cache() -> ResponseCache:
+    """Return the process-wide response cache"""
+    return _cache
+
+
+# ============== SHARED TIER ==============
+
+class NullSharedCache:
+    """No shared tier: every in-process miss goes to Google"""
+    enabled = False
+
+    def get(self, key: CacheKey) -> Optional[Tuple[str, Optional[str], float]]:
+        return None
+
+    def set(self, key: CacheKey, value: str, etag: Optional[str], ttl: float):
+        pass
+
+    def invalidate(self, user: str, ops):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "none"}
+
+
+class MongoSharedCache:
+    """
+    Shared tier in the app's MongoDB database (response_cache collection).
+
+    Documents expire through a TTL index on expires_at, and values larger than
+    max_value_bytes are not shared. After a MongoDB error the tier is bypassed
+    for retry_seconds rather than stalling every request on it.
+    """
+    enabled = True
+
+    def __init__(self, max_value_bytes: int, retry_seconds: float):
+        self.max_value_bytes = max_value_bytes
+        self.retry_seconds = retry_seconds
+        self._indexed = False
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.oversized = 0
+        self.errors = 0
+
+    def _collection(self):
+        from database import get_database
+        collection = get_database().response_cache
+        if not self._indexed:
+            collection.create_index([("user", 1), ("op", 1)])
+            collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+        return collection
+
+    @staticmethod
+    def _doc_id(key: CacheKey) -> str:
+        return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+
+    def _count(self, counter: str, result: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        cache_requests.inc("l2", result)
+
+    def _failed(self, action: str, e: Exception):
+        with self._lock:
+            self.errors += 1
+            self._down_until = time.monotonic() + self.retry_seconds
+        print(f"⚠️ Shared response cache {action} failed, bypassing it for {self.retry_seconds:g}s: {e}")
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def get(self, key: CacheKey) -> Optional[Tuple[str, Optional[str], float]]:
+        """(value, etag, seconds left) of a fresh shared entry"""
+        if not self._available():
+            cache_requests.inc("l2", "bypassed")
+            return None
+        now = datetime.now(timezone.utc)
+        try:
+            doc = self._collection().find_one({"_id": self._doc_id(key), "expires_at": {"$gt": now}})
+        except Exception as e:
+            self._failed("read", e)
+            cache_requests.inc("l2", "error")
+            return None
+        if doc is None:
+            self._count("misses", "miss")
+            return None
+        # pymongo returns naive UTC datetimes
+        expires = doc["expires_at"].replace(tzinfo=timezone.utc)
+        self._count("hits", "hit")
+        return doc["value"], doc.get("etag"), (expires - now).total_seconds()
+
+    def set(self, key: CacheKey, value: str, etag: Optional[str], ttl: float):
+        if len(value) > self.max_value_bytes:
+            with self._lock:
+                self.oversized += 1
+            return
+        if not self._available():
+            return
+        doc = {
+            "user": key[0],
+            "op": key[1],
+            "value": value,
+            "etag": etag,
+            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl),
+        }
+        try:
+            self._collection().replace_one({"_id": self._doc_id(key)}, doc, upsert=True)
+        except Exception as e:
+            self._failed("write", e)
+            return
+        with self._lock:
+            self.writes += 1
+
+    def invalidate(self, user: str, ops):
+        try:
+            self._collection().delete_many({"user": user, "op": {"$in": list(ops)}})
+        except Exception as e:
+            self._failed("invalidation", e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "mongo",
+                "available": self._available(),
+                "max_value_bytes": self.max_value_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": _hit_ratio(self.hits, self.misses),
+                "writes": self.writes,
+                "oversized": self.oversized,
+                "errors": self.errors,
+            }
+
+
+def _make_shared_cache():
+    if RESPONSE_CACHE_L2 == "mongo":
+        return MongoSharedCache(RESPONSE_CACHE_L2_MAX_VALUE_BYTES, RESPONSE_CACHE_L2_RETRY_SECONDS)
+    if RESPONSE_CACHE_L2 != "none":
+        print(f"⚠️ Unknown RESPONSE_CACHE_L2={RESPONSE_CACHE_L2!r}, running without a shared cache tier")
+    return NullSharedCache()
+
+
+_shared = _make_shared_cache()
+
+
+def get_shared_cache():
+    """Return the configured shared (L2) cache tier"""
+    return _shared
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Statistics for both cache tiers"""
+    return {"l1": _cache.stats(), "l2": _shared.stats()}
+
+
+# ============== ETAG REVALIDATION ==============
+
+class _Revalidation:
+    """Tracks the upstream requests made by one cached call"""
+    __slots__ = ("etag", "requests", "response_etag")
+
+    def __init__(self, etag: Optional[str]):
+        self.etag = etag
+        self.requests = 0
+        self.response_etag: Optional[str] = None
+
+    def observe(self, resp):
+        self.requests += 1
+        self.response_etag = resp.get("etag")
+
+    def etag_to_store(self) -> Optional[str]:
+        # A call that fans out to several requests has no single ETag
+        return self.response_etag if self.requests == 1 else None
+
+
+_revalidation: ContextVar[Optional[_Revalidation]] = ContextVar("google_revalidation", default=None)
+
+
+def current_revalidation() -> Optional[_Revalidation]:
+    """Revalidation state of the cached call running in this context, if any"""
+    return _revalidation.get()
+
+
+def adopt_revalidation(leader: Optional[_Revalidation]):
+    """Record the upstream response of the call this one was collapsed into (see single_flight)"""
+    state = _revalidation.get()
+    if state is not None and leader is not None and state is not leader:
+        state.requests, state.response_etag = leader.requests, leader.response_etag
+
+
+def prepare_request(request: Any):
+    """
+    Hook for every HttpRequest created inside a cached call.
+
+    Adds If-None-Match for a stale entry's ETag and records the response ETag.
+    """
+    state = _revalidation.get()
+    if state is None or request.method != "GET":
+        return
+    if state.etag:
+        request.headers["If-None-Match"] = state.etag
+    request.add_response_callback(state.observe)
+
+
+# ============== DECORATORS ==============
+
+def call_key(signature: inspect.Signature, op: str, args, kwargs) -> CacheKey:
+    """(user, op, arguments) key for a service call whose first argument is credentials"""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    credentials, *params = bound.arguments.values()
+    return user_key(credentials), op, json.dumps(params, sort_keys=True, default=str)
+
+
+def _store(key: CacheKey, result: Any, state: _Revalidation, ttl: float) -> Optional[Tuple[str, Optional[str]]]:
+    """Store in the in-process tier; returns (value, etag) for the shared tier"""
+    try:
+        value = json.dumps(result)
+    except (TypeError, ValueError):
+        return None
+    etag = state.etag_to_store()
+    _cache.store(key, value, etag, ttl)
+    return value, etag
+
+
+def _promote(key: CacheKey, shared: Tuple[str, Optional[str], float]) -> Any:
+    """Copy a shared-tier hit into the in-process tier for its remaining lifetime"""
+    value, etag, ttl_left = shared
+    _cache.store(key, value, etag, ttl_left)
+    return json.loads(value)
+
+
+def cached(op: str, ttl: float) -> Callable:
+    """
+    Cache a read-only service function for `ttl` seconds per user and arguments.
+
+    The function's first argument must be the user's credentials. Sync and
+    async variants decorated with the same op share entries.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def begin(args, kwargs):
+            key = call_key(signature, op, args, kwargs)
+            entry, fresh = _cache.lookup(key)
+            cache_requests.inc("l1", "hit" if fresh else "miss")
+            return key, entry, fresh
+
+        def not_modified(e: HttpError, key: CacheKey, entry: Optional[_Entry]) -> Optional[_Entry]:
+            if entry is None or e.resp.status != 304:
+                return None
+            _cache.renew(key, ttl)
+            return entry
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not RESPONSE_CACHE_ENABLED:
+                    return await func(*args, **kwargs)
+                key, entry, fresh = begin(args, kwargs)
+                if fresh:
+                    return json.loads(entry.value)
+                if _shared.enabled:
+                    shared = await asyncio.to_thread(_shared.get, key)
+                    if shared is not None:
+                        return _promote(key, shared)
+                state = _Revalidation(entry.etag if entry else None)
+                token = _revalidation.set(state)
+                try:
+                    result = await func(*args, **kwargs)
+                except HttpError as e:
+                    renewed = not_modified(e, key, entry)
+                    if renewed is None:
+                        raise
+                    stored, result = (renewed.value, renewed.etag), json.loads(renewed.value)
+                else:
+                    stored = _store(key, result, state, ttl)
+                finally:
+                    _revalidation.reset(token)
+                if stored is not None and _shared.enabled:
+                    await asyncio.to_thread(_shared.set, key, *stored, ttl)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not RESPONSE_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            key, entry, fresh = begin(args, kwargs)
+            if fresh:
+                return json.loads(entry.value)
+            if _shared.enabled:
+                shared = _shared.get(key)
+                if shared is not None:
+                    return _promote(key, shared)
+            state = _Revalidation(entry.etag if entry else None)
+            token = _revalidation.set(state)
+            try:
+                result = func(*args, **kwargs)
+            except HttpError as e:
+                renewed = not_modified(e, key, entry)
+                if renewed is None:
+                    raise
+                stored, result = (renewed.value, renewed.etag), json.loads(renewed.value)
+            else:
+                stored = _store(key, result, state, ttl)
+            finally:
+                _revalidation.reset(token)
+            if stored is not None and _shared.enabled:
+                _shared.set(key, *stored, ttl)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*ops: str) -> Callable:
+    """Drop the user's cached entries for `ops` after the write succeeds"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(credentials, *args, **kwargs):
+                result = await func(credentials, *args, **kwargs)
+                user = user_key(credentials)
+                _cache.invalidate(user, ops)
+                if _shared.enabled:
+                    await asyncio.to_thread(_shared.invalidate, user, ops)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(credentials, *args, **kwargs):
+            result = func(credentials, *args, **kwargs)
+            user = user_key(credentials)
+            _cache.invalidate(user, ops)
+            _shared.invalidate(user, ops)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, List
-from auth.router import get_credentials
+from googleapiclient.errors import HttpError
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
-from google_services.calendar_service import list_events, create_meet_event, create_event, delete_event
+from responses import FastJSONRoute
+from google_services.breaker import CircuitOpenError
+from google_services.pagination import cursor_scope, decode_cursor, page_size, paginated
+from google_services.fields import EVENT, Selection, field_selection
+from google_services.calendar_service import list_events_page_async, create_meet_event_async, create_event_async, delete_event_async
 
-router = APIRouter(prefix="/calendar", tags=["Calendar"])
+router = APIRouter(prefix="/calendar", tags=["Calendar"], route_class=FastJSONRoute)
 
 
 class CreateEventRequest(BaseModel):
@@ -24,21 +29,34 @@ class CreateMeetRequest(BaseModel):
 
 
 @router.get("/events")
-def get_events(session_id: str = Depends(require_session)):
-    credentials = get_credentials(session_id)
+async def get_events(
+    max_results: int = 250,
+    fields: Selection = Depends(field_selection(EVENT)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """
+    Upcoming events, a page at a time (next page: `cursor` from X-Next-Cursor).
+    `fields` limits each event to e.g. id,summary,start,end
+    """
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_events(credentials)
+    scope = cursor_scope("calendar.events", fields=fields)
+    page = await list_events_page_async(
+        credentials, fields, page_size(max_results, "calendar.events"), decode_cursor(cursor, scope)
+    )
+    return paginated(page["items"], page["nextPageToken"], scope)
 
 
 @router.post("/events")
-def create_calendar_event(request: CreateEventRequest, session_id: str = Depends(require_session)):
+async def create_calendar_event(request: CreateEventRequest, session_id: str = Depends(require_session)):
     """Create a new calendar event"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     
-    return create_event(
+    return await create_event_async(
         credentials=credentials,
         summary=request.summary,
         start_datetime=request.start_datetime,
@@ -51,22 +69,24 @@ def create_calendar_event(request: CreateEventRequest, session_id: str = Depends
 
 
 @router.post("/meet")
-def create_meet(request: CreateMeetRequest, session_id: str = Depends(require_session)):
+async def create_meet(request: CreateMeetRequest, session_id: str = Depends(require_session)):
     """Create a Google Meet event with a custom name"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return {"meet_link": create_meet_event(credentials, summary=request.summary, duration_minutes=request.duration_minutes or 60)}
+    return {"meet_link": await create_meet_event_async(credentials, summary=request.summary, duration_minutes=request.duration_minutes or 60)}
 
 
 @router.delete("/events/{event_id}")
-def delete_calendar_event(event_id: str, session_id: str = Depends(require_session)):
+async def delete_calendar_event(event_id: str, session_id: str = Depends(require_session)):
     """Delete a calendar event by ID"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     
     try:
-        return delete_event(credentials, event_id)
+        return await delete_event_async(credentials, event_id)
+    except (HttpError, CircuitOpenError):
+        raise  # main.py's handlers keep the status and Retry-After
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Event not found or could not be deleted: {str(e)}")
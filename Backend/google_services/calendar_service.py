@@ -1,4 +1,7 @@
-from googleapiclient.discovery import build
+from google_services.client import build_service
+from google_services.cache import cached, invalidates
+from google_services.singleflight import single_flight
+from google_services.fields import EVENT, Selection
 from google.oauth2.credentials import Credentials
 from datetime import datetime, timedelta
 from typing import Optional, List
@@ -7,13 +10,11 @@ import uuid
 
 def get_calendar_service(credentials: Credentials):
     """Create Google Calendar service instance"""
-    return build("calendar", "v3", credentials=credentials)
+    return build_service("calendar", "v3", credentials)
 
 
-def list_events(credentials: Credentials):
-    """List upcoming calendar events for the current month"""
-    service = get_calendar_service(credentials)
-    
+def _list_events_request(service, fields: Selection = None, max_results: int = 250, page_token: Optional[str] = None):
+    """Build the events.list request for the current month (only the selected event fields, if any)"""
     # Get events starting from now
     now = datetime.utcnow()
     now_iso = now.isoformat() + "Z"
@@ -22,18 +23,35 @@ def list_events(credentials: Credentials):
     end_date = now + timedelta(days=60)
     end_iso = end_date.isoformat() + "Z"
 
-    events = service.events().list(
+    return service.events().list(
         calendarId="primary",
         timeMin=now_iso,
         timeMax=end_iso,
-        maxResults=250,  # Increased to get all month events
+        maxResults=max_results,
+        pageToken=page_token,
         singleEvents=True,
         orderBy="startTime",
-    ).execute()
+        **EVENT.items_param(fields)
+    )
+
 
-    return events.get("items", [])
+def list_events(credentials: Credentials, fields: Selection = None):
+    """List upcoming calendar events for the next 60 days"""
+    return list_events_page(credentials, fields)["items"]
 
 
+@cached("calendar.events", ttl=30)
+@single_flight("calendar.events")
+def list_events_page(
+    credentials: Credentials, fields: Selection = None, max_results: int = 250, page_token: Optional[str] = None
+):
+    """One page of list_events: {"items": [...], "nextPageToken": ...}"""
+    service = get_calendar_service(credentials)
+    events = _list_events_request(service, fields, max_results, page_token).execute()
+    return {"items": events.get("items", []), "nextPageToken": events.get("nextPageToken")}
+
+
+@invalidates("calendar.events")
 def create_event(
     credentials: Credentials,
     summary: str,
@@ -60,7 +78,23 @@ def create_event(
         Created event details
     """
     service = get_calendar_service(credentials)
+    created_event = _create_event_request(
+        service, summary, start_datetime, end_datetime, description, location, attendees, timezone
+    ).execute()
+    return _format_created_event(created_event)
+
 
+def _create_event_request(
+    service,
+    summary: str,
+    start_datetime: str,
+    end_datetime: str,
+    description: Optional[str],
+    location: Optional[str],
+    attendees: Optional[List[str]],
+    timezone: str,
+):
+    """Build the events.insert request for create_event"""
     event = {
         "summary": summary,
         "start": {"dateTime": start_datetime, "timeZone": timezone},
@@ -76,12 +110,15 @@ def create_event(
     if attendees:
         event["attendees"] = [{"email": email} for email in attendees]
 
-    created_event = service.events().insert(
+    return service.events().insert(
         calendarId="primary",
         body=event,
         sendUpdates="all" if attendees else "none",
-    ).execute()
+    )
 
+
+def _format_created_event(created_event: dict):
+    """Shape an inserted event for the API response"""
     return {
         "id": created_event.get("id"),
         "summary": created_event.get("summary"),
@@ -94,6 +131,7 @@ def create_event(
     }
 
 
+@invalidates("calendar.events")
 def create_meet_event(credentials: Credentials, summary: str, duration_minutes: int = 60):
     """Create a calendar event with Google Meet link
     
@@ -103,7 +141,12 @@ def create_meet_event(credentials: Credentials, summary: str, duration_minutes:
         duration_minutes: Duration of the meeting in minutes (default: 60)
     """
     service = get_calendar_service(credentials)
+    event = _create_meet_event_request(service, summary, duration_minutes).execute()
+    return event.get("hangoutLink", "No Meet link generated")
 
+
+def _create_meet_event_request(service, summary: str, duration_minutes: int):
+    """Build the events.insert request for create_meet_event"""
     # Create event starting 1 hour from now
     start_time = datetime.utcnow() + timedelta(hours=1)
     end_time = start_time + timedelta(minutes=duration_minutes)
@@ -117,15 +160,14 @@ def create_meet_event(credentials: Credentials, summary: str, duration_minutes:
         },
     }
 
-    event = service.events().insert(
+    return service.events().insert(
         calendarId="primary",
         body=event,
         conferenceDataVersion=1,
-    ).execute()
-
-    return event.get("hangoutLink", "No Meet link generated")
+    )
 
 
+@invalidates("calendar.events")
 def delete_event(credentials: Credentials, event_id: str):
     """Delete a calendar event
     
@@ -145,3 +187,60 @@ def delete_event(credentials: Credentials, event_id: str):
     ).execute()
     
     return {"message": "Event deleted successfully", "event_id": event_id}
+
+
+# ============== ASYNC ==============
+
+async def list_events_async(credentials: Credentials, fields: Selection = None):
+    """Async variant of list_events"""
+    return (await list_events_page_async(credentials, fields))["items"]
+
+
+@cached("calendar.events", ttl=30)
+@single_flight("calendar.events")
+async def list_events_page_async(
+    credentials: Credentials, fields: Selection = None, max_results: int = 250, page_token: Optional[str] = None
+):
+    """Async variant of list_events_page"""
+    service = get_calendar_service(credentials)
+    events = await _list_events_request(service, fields, max_results, page_token).execute_async()
+    return {"items": events.get("items", []), "nextPageToken": events.get("nextPageToken")}
+
+
+@invalidates("calendar.events")
+async def create_event_async(
+    credentials: Credentials,
+    summary: str,
+    start_datetime: str,
+    end_datetime: str,
+    description: Optional[str] = None,
+    location: Optional[str] = None,
+    attendees: Optional[List[str]] = None,
+    timezone: str = "IST"
+):
+    """Async variant of create_event"""
+    service = get_calendar_service(credentials)
+    created_event = await _create_event_request(
+        service, summary, start_datetime, end_datetime, description, location, attendees, timezone
+    ).execute_async()
+    return _format_created_event(created_event)
+
+
+@invalidates("calendar.events")
+async def create_meet_event_async(credentials: Credentials, summary: str, duration_minutes: int = 60):
+    """Async variant of create_meet_event"""
+    service = get_calendar_service(credentials)
+    event = await _create_meet_event_request(service, summary, duration_minutes).execute_async()
+    return event.get("hangoutLink", "No Meet link generated")
+
+
+@invalidates("calendar.events")
+async def delete_event_async(credentials: Credentials, event_id: str):
+    """Async variant of delete_event"""
+    service = get_calendar_service(credentials)
+    await service.events().delete(
+        calendarId="primary",
+        eventId=event_id,
+        sendUpdates="all"
+    ).execute_async()
+    return {"message": "Event deleted successfully", "event_id": event_id}
@@ -0,0 +1,338 @@
+"""
+Google API Client Factory
+Builds discovery-based service clients from a process-wide resource cache
+and executes their requests synchronously (httplib2) or natively on asyncio (httpx)
+
+Every service module used to call build() per request. That re-read and
+re-parsed the discovery document (Photos even downloaded it) and regenerated
+the method tables of each nested resource touched by the call. Now each
+(api, version) document is parsed once per process and its resource tree is
+built lazily, once, and shared. A user's service client is a thin view over
+that tree which attaches the user's authorized http to each request it creates.
+
+Requests keep the googleapiclient interface: `.execute()` blocks as before,
+while `await .execute_async()` sends the same request through a shared
+httpx.AsyncClient so async routes never hold a threadpool worker. Both paths
+use the keep-alive pools in google_services.transport.
+"""
+import asyncio
+import contextvars
+import json
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import google_auth_httplib2
+import httplib2
+from googleapiclient.discovery import (
+    DISCOVERY_URI,
+    V2_DISCOVERY_URI,
+    build_from_document,
+    fix_method_name,
+)
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError, UnknownApiNameOrVersion
+from googleapiclient.http import MAX_URI_LENGTH, HttpRequest
+
+from config import GOOGLE_API_ROOT_URL
+from metrics import google_api_requests_in_flight, observe_google_api
+from tracing import KIND_CLIENT, span
+from google_services.breaker import breaker_for
+from google_services.cache import prepare_request
+from google_services.hedging import hedged
+from google_services.retry import call_with_retry, call_with_retry_async
+from google_services.scheduler import get_scheduler, scheduler_key
+from google_services.transport import get_http, send_async
+
+# Set by auth.router: refreshes through the owning session (its lock, then MongoDB)
+_refresh_hook: Optional[Callable[[Any, Optional[str]], Any]] = None
+
+
+def set_refresh_hook(hook: Callable[[Any, Optional[str]], Any]):
+    """Route async token refreshes through hook(credentials, rejected_token) -> credentials"""
+    global _refresh_hook
+    _refresh_hook = hook
+
+
+async def _refresh_credentials(credentials: Any, rejected_token: Optional[str] = None) -> Any:
+    """Refresh an access token without blocking the event loop; returns the credentials to sign with"""
+    if _refresh_hook is not None:
+        return await asyncio.to_thread(_refresh_hook, credentials, rejected_token)
+    from google.auth.transport.requests import Request
+    await asyncio.to_thread(credentials.refresh, Request())
+    return credentials
+
+
+# Status of the attempt running in the current context (set by GoogleHttpRequest._observed)
+_attempt_status: contextvars.ContextVar = contextvars.ContextVar("google_attempt_status", default=None)
+
+
+def _record_status(resp):
+    status = _attempt_status.get()
+    if status is not None:
+        status[0] = resp.status
+
+
+class GoogleHttpRequest(HttpRequest):
+    """
+    HttpRequest that can also be awaited via execute_async().
+
+    Both paths run under the retry policy and per-user pacing in
+    google_services.retry and the API's circuit breaker; each attempt waits
+    for a google_services.scheduler slot and is recorded in the metrics
+    and the request's trace.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.add_response_callback(_record_status)
+
+    @contextmanager
+    def _observed(self):
+        """
+        Time one execution by API method (e.g. gmail.users.messages.get).
+
+        The attempt is also admitted by, and reported to, its API's circuit
+        breaker, which raises CircuitOpenError instead of calling a failing API,
+        and traced as a client span.
+        """
+        breaker = breaker_for(self.methodId)
+        trial = breaker.acquire() if breaker is not None else False
+        # Per attempt, so concurrent (hedged) attempts of one request don't mix
+        status = [0]
+        token = _attempt_status.set(status)
+        cancelled = False
+        started = time.perf_counter()
+        google_api_requests_in_flight.inc()
+        try:
+            with span(f"HTTP {self.method}", {
+                "google.method": self.methodId,
+                "http.request.method": self.method,
+                "server.address": urllib.parse.urlsplit(self.uri).netloc,
+                "google.breaker_trial": trial,
+            }, kind=KIND_CLIENT) as attempt:
+                try:
+                    yield
+                finally:
+                    attempt.set("http.response.status_code", status[0])
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            _attempt_status.reset(token)
+            seconds = time.perf_counter() - started
+            google_api_requests_in_flight.dec()
+            observe_google_api(self.methodId or "unknown", status[0], seconds)
+            if breaker is not None:
+                # Client errors and 429s say nothing about the API's health
+                failed = None if cancelled else (status[0] == 0 or status[0] >= 500)
+                breaker.record(trial, failed, seconds)
+
+    def _credentials(self, http=None):
+        return getattr(http or self.http, "credentials", None)
+
+    def execute(self, http=None, num_retries=0):
+        with span(self.methodId or "google.request"):
+            return call_with_retry(self, self._credentials(http), lambda: self._execute_once(http, num_retries))
+
+    def _execute_once(self, http, num_retries):
+        with get_scheduler().slot(scheduler_key(self._credentials(http))):
+            with self._observed():
+                return super().execute(http=http, num_retries=num_retries)
+
+    async def execute_async(self, hedge: bool = False):
+        """Await the request; hedge=True opts an idempotent read into google_services.hedging"""
+        send = self._execute_once_async
+        if hedge:
+            send = lambda: hedged(self, self._execute_once_async)
+        with span(self.methodId or "google.request", {"google.hedge": hedge}):
+            return await call_with_retry_async(self, self._credentials(), send)
+
+    async def _execute_once_async(self):
+        async with get_scheduler().slot_async(scheduler_key(self._credentials())):
+            with self._observed():
+                return await self._execute_async()
+
+    async def _execute_async(self):
+        """
+        Execute the request on the shared async client.
+
+        Mirrors HttpRequest.execute(): long GET URIs become POST with a method
+        override, the user's credentials sign the request (refreshing once on
+        401) and the response is parsed by the same model postproc.
+        """
+        method, uri, body = self.method, self.uri, self.body
+        headers = dict(self.headers)
+        if len(uri) > MAX_URI_LENGTH and method == "GET":
+            parsed = urllib.parse.urlparse(uri)
+            method = "POST"
+            headers["x-http-method-override"] = "GET"
+            headers["content-type"] = "application/x-www-form-urlencoded"
+            uri = urllib.parse.urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, None, None))
+            body = parsed.query
+
+        credentials = getattr(self.http, "credentials", None)
+        if credentials is not None and not credentials.valid:
+            credentials = await _refresh_credentials(credentials)
+
+        for attempt in range(2):
+            request_headers = dict(headers)
+            if credentials is not None:
+                credentials.apply(request_headers)
+            response = await send_async(method, uri, content=body, headers=request_headers)
+            if response.status_code != 401 or credentials is None or attempt:
+                break
+            credentials = await _refresh_credentials(credentials, credentials.token)
+
+        resp = httplib2.Response({**response.headers, "status": str(response.status_code)})
+        resp.reason = response.reason_phrase
+        content = response.content
+        for callback in self.response_callbacks:
+            callback(resp)
+        if resp.status >= 300:
+            raise HttpError(resp, content, uri=uri)
+        return self.postproc(resp, content)
+
+
+class _ResourceNode:
+    """A shared Resource plus lazily-built, cached nested resources"""
+    __slots__ = ("resource", "nested", "children", "lock")
+
+    def __init__(self, resource: Any, resource_desc: Dict[str, Any]):
+        self.resource = resource
+        self.nested = {
+            fix_method_name(name): desc
+            for name, desc in resource_desc.get("resources", {}).items()
+        }
+        self.children: Dict[str, "_ResourceNode"] = {}
+        self.lock = threading.Lock()
+
+    def child(self, name: str) -> "_ResourceNode":
+        node = self.children.get(name)
+        if node is None:
+            with self.lock:
+                node = self.children.get(name)
+                if node is None:
+                    node = _ResourceNode(getattr(self.resource, name)(), self.nested[name])
+                    self.children[name] = node
+        return node
+
+
+class ServiceClient:
+    """
+    Per-user view of a shared resource tree.
+
+    Behaves like the Resource returned by build(): nested resources and API
+    methods are reached the same way, and every HttpRequest it returns
+    executes through this user's http.
+    """
+    __slots__ = ("_node", "_http")
+
+    def __init__(self, node: _ResourceNode, http: Any):
+        self._node = node
+        self._http = http
+
+    def __getattr__(self, name: str):
+        node = self._node
+        if name in node.nested:
+            return lambda: ServiceClient(node.child(name), self._http)
+
+        attr = getattr(node.resource, name)
+        if not callable(attr):
+            return attr
+
+        def bound(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if isinstance(result, HttpRequest):
+                result.http = self._http
+                prepare_request(result)
+            return result
+
+        return bound
+
+
+# Shared resource trees keyed by (api, version)
+_services: Dict[Tuple[str, str], _ResourceNode] = {}
+_services_lock = threading.Lock()
+
+
+def _fetch_discovery_document(api: str, version: str) -> str:
+    """Download a discovery document (same URL order as googleapiclient.build)"""
+    templates = (DISCOVERY_URI, V2_DISCOVERY_URI)
+    if GOOGLE_API_ROOT_URL:
+        templates = (GOOGLE_API_ROOT_URL + "/discovery/v1/apis/{api}/{apiVersion}/rest",)
+    for template in templates:
+        url = template.format(api=api, apiVersion=version)
+        try:
+            _, content = HttpRequest(get_http(), HttpRequest.null_postproc, url).execute(num_retries=1)
+        except HttpError as e:
+            if e.resp.status == 404:
+                continue
+            raise
+        return content.decode("utf-8") if isinstance(content, bytes) else content
+    raise UnknownApiNameOrVersion(f"name: {api}  version: {version}")
+
+
+def load_discovery_document(api: str, version: str, static_discovery: bool = True) -> Dict[str, Any]:
+    """Read and parse a discovery document from the bundled copies or the network"""
+    content = get_static_doc(api, version) if static_discovery else None
+    if content is None:
+        if static_discovery:
+            raise UnknownApiNameOrVersion(f"name: {api}  version: {version}")
+        content = _fetch_discovery_document(api, version)
+    document = json.loads(content)
+    if GOOGLE_API_ROOT_URL:
+        # One root for every API, namespaced by API name: {root}/{api}/{servicePath}
+        root = f"{GOOGLE_API_ROOT_URL}/{api}/"
+        document["rootUrl"] = document["mtlsRootUrl"] = root
+        document["baseUrl"] = root + document.get("servicePath", "")
+    return document
+
+
+def _get_root(api: str, version: str, static_discovery: bool) -> _ResourceNode:
+    key = (api, version)
+    root = _services.get(key)
+    if root is not None:
+        return root
+
+    with _services_lock:
+        root = _services.get(key)
+        if root is None:
+            document = load_discovery_document(api, version, static_discovery)
+            # The shared tree never sends requests itself; ServiceClient
+            # rebinds every request to the caller's authorized http.
+            resource = build_from_document(
+                document, http=get_http(), requestBuilder=GoogleHttpRequest
+            )
+            root = _ResourceNode(resource, document)
+            _services[key] = root
+        return root
+
+
+def authorized_http(credentials: Any):
+    """Wrap credentials around the shared connection pool so every request is signed"""
+    return google_auth_httplib2.AuthorizedHttp(credentials, http=get_http())
+
+
+def build_service(api: str, version: str, credentials: Any, static_discovery: bool = True) -> ServiceClient:
+    """
+    Create a service client bound to the given user credentials.
+
+    Drop-in replacement for googleapiclient.discovery.build(api, version,
+    credentials=credentials) that reuses the cached resource tree.
+    """
+    with span("google.build", {"google.api": f"{api}.{version}", "google.discovery_cached": (api, version) in _services}):
+        return ServiceClient(_get_root(api, version, static_discovery), authorized_http(credentials))
+
+
+def clear_service_cache():
+    """Drop all cached discovery documents and resource trees"""
+    with _services_lock:
+        _services.clear()
+
+
+def cached_apis() -> list:
+    """List the APIs whose resource trees are currently cached"""
+    return [f"{api}.{version}" for api, version in _services]
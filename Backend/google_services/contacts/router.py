@@ -4,18 +4,21 @@ Google Contacts API Routes (People API)
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional
-from auth.router import get_credentials
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
+from responses import FastJSONRoute
+from google_services.pagination import cursor_scope, decode_cursor, page_size, paginated
+from google_services.fields import CONTACT, OTHER_CONTACT, PERSON, Selection, field_selection
 from google_services.contacts_service import (
-    list_contacts,
-    get_contact,
-    create_contact,
-    delete_contact,
-    search_contacts,
-    get_other_contacts,
+    list_contacts_page_async,
+    get_contact_async,
+    create_contact_async,
+    delete_contact_async,
+    search_contacts_async,
+    get_other_contacts_page_async,
 )
 
-router = APIRouter(prefix="/contacts", tags=["Google Contacts"])
+router = APIRouter(prefix="/contacts", tags=["Google Contacts"], route_class=FastJSONRoute)
 
 
 class ContactCreate(BaseModel):
@@ -26,48 +29,84 @@ class ContactCreate(BaseModel):
 
 
 @router.get("/")
-def get_contacts(max_results: int = 100, session_id: str = Depends(require_session)):
-    """List all contacts"""
-    credentials = get_credentials(session_id)
+async def get_contacts(
+    max_results: int = 100,
+    fields: Selection = Depends(field_selection(CONTACT)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """
+    List contacts, a page at a time (next page: `cursor` from X-Next-Cursor).
+    `fields` limits each contact to e.g. name,emails
+    """
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_contacts(credentials, max_results)
+    scope = cursor_scope("contacts.list", fields=fields)
+    page = await list_contacts_page_async(
+        credentials, page_size(max_results, "contacts.list"), fields, decode_cursor(cursor, scope)
+    )
+    return paginated(page["items"], page["nextPageToken"], scope)
 
 
 @router.get("/search")
-def search(query: str, max_results: int = 10, session_id: str = Depends(require_session)):
-    """Search contacts by name or email"""
-    credentials = get_credentials(session_id)
+async def search(
+    query: str,
+    max_results: int = 10,
+    fields: Selection = Depends(field_selection(PERSON)),
+    session_id: str = Depends(require_session),
+):
+    """
+    Search contacts by name or email (default fields: names,emailAddresses,phoneNumbers).
+    Not paged: people.searchContacts has no page token, so this returns at most 30 best matches.
+    """
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return search_contacts(credentials, query, max_results)
+    return await search_contacts_async(credentials, query, page_size(max_results, "contacts.search"), fields)
 
 
 @router.get("/other")
-def other_contacts(max_results: int = 100, session_id: str = Depends(require_session)):
-    """Get 'Other contacts' (auto-saved from emails)"""
-    credentials = get_credentials(session_id)
+async def other_contacts(
+    max_results: int = 100,
+    fields: Selection = Depends(field_selection(OTHER_CONTACT)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """
+    Get 'Other contacts' (auto-saved from emails; default fields: names,emailAddresses),
+    a page at a time (next page: `cursor` from X-Next-Cursor)
+    """
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_other_contacts(credentials, max_results)
+    scope = cursor_scope("contacts.other", fields=fields)
+    page = await get_other_contacts_page_async(
+        credentials, page_size(max_results, "contacts.other"), fields, decode_cursor(cursor, scope)
+    )
+    return paginated(page["items"], page["nextPageToken"], scope)
 
 
 @router.get("/{resource_name:path}")
-def get_contact_detail(resource_name: str, session_id: str = Depends(require_session)):
+async def get_contact_detail(
+    resource_name: str,
+    fields: Selection = Depends(field_selection(PERSON)),
+    session_id: str = Depends(require_session),
+):
     """Get a specific contact by resource name (e.g., people/c123456)"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_contact(credentials, resource_name)
+    return await get_contact_async(credentials, resource_name, fields)
 
 
 @router.post("/")
-def add_contact(contact: ContactCreate, session_id: str = Depends(require_session)):
+async def add_contact(contact: ContactCreate, session_id: str = Depends(require_session)):
     """Create a new contact"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return create_contact(
+    return await create_contact_async(
         credentials,
         contact.name,
         contact.email,
@@ -77,9 +116,9 @@ def add_contact(contact: ContactCreate, session_id: str = Depends(require_sessio
 
 
 @router.delete("/{resource_name:path}")
-def remove_contact(resource_name: str, session_id: str = Depends(require_session)):
+async def remove_contact(resource_name: str, session_id: str = Depends(require_session)):
     """Delete a contact by resource name"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return delete_contact(credentials, resource_name)
+    return await delete_contact_async(credentials, resource_name)
@@ -2,77 +2,112 @@
 Google Contacts Service (People API)
 Integrates with People API for contact management
 """
-from googleapiclient.discovery import build
+from google_services.client import build_service
+from google_services.cache import cached, invalidates
+from google_services.singleflight import single_flight
+from google_services.fields import CONTACT, OTHER_CONTACT, PERSON, Selection
 from typing import Any, Optional
 
+# Person fields returned by search and other-contacts when no `fields` are selected
+SEARCH_DEFAULT_FIELDS = ("names", "emailAddresses", "phoneNumbers")
+OTHER_DEFAULT_FIELDS = ("names", "emailAddresses")
+
 
 def get_people_service(credentials: Any):
     """Create People API service instance"""
-    return build("people", "v1", credentials=credentials)
+    return build_service("people", "v1", credentials)
+
+
+def list_contacts(credentials: Any, max_results: int = 100, fields: Selection = None):
+    """List all contacts (only the selected contact fields, if any)"""
+    return list_contacts_page(credentials, max_results, fields)["items"]
 
 
-def list_contacts(credentials: Any, max_results: int = 100):
-    """List all contacts"""
+@cached("contacts.list", ttl=120)
+@single_flight("contacts.list")
+def list_contacts_page(credentials: Any, max_results: int = 100, fields: Selection = None, page_token: Optional[str] = None):
+    """One page of list_contacts: {"items": [...], "nextPageToken": ...}"""
     service = get_people_service(credentials)
     
     results = service.people().connections().list(
         resourceName="people/me",
         pageSize=max_results,
-        personFields="names,emailAddresses,phoneNumbers,organizations,photos,birthdays,addresses"
+        personFields=CONTACT.mask(fields),
+        pageToken=page_token
     ).execute()
     
     connections = results.get("connections", [])
     
-    contacts = []
-    for person in connections:
-        contact = {
-            "resourceName": person.get("resourceName"),
-            "name": None,
-            "emails": [],
-            "phones": [],
-            "organization": None,
-            "photo": None,
-        }
-        
-        names = person.get("names", [])
-        if names:
-            contact["name"] = names[0].get("displayName")
-        
-        emails = person.get("emailAddresses", [])
-        contact["emails"] = [e.get("value") for e in emails]
-        
-        phones = person.get("phoneNumbers", [])
-        contact["phones"] = [p.get("value") for p in phones]
-        
-        orgs = person.get("organizations", [])
-        if orgs:
-            contact["organization"] = orgs[0].get("name")
-        
-        photos = person.get("photos", [])
-        if photos:
-            contact["photo"] = photos[0].get("url")
-        
-        contacts.append(contact)
-    
-    return contacts
-
-
-def get_contact(credentials: Any, resource_name: str):
+    return {
+        "items": [CONTACT.project(_format_contact(person), fields) for person in connections],
+        "nextPageToken": results.get("nextPageToken"),
+    }
+
+
+def _format_contact(person: dict):
+    """Flatten a People API person into the contact shape"""
+    contact = {
+        "resourceName": person.get("resourceName"),
+        "name": None,
+        "emails": [],
+        "phones": [],
+        "organization": None,
+        "photo": None,
+    }
+    
+    names = person.get("names", [])
+    if names:
+        contact["name"] = names[0].get("displayName")
+    
+    emails = person.get("emailAddresses", [])
+    contact["emails"] = [e.get("value") for e in emails]
+    
+    phones = person.get("phoneNumbers", [])
+    contact["phones"] = [p.get("value") for p in phones]
+    
+    orgs = person.get("organizations", [])
+    if orgs:
+        contact["organization"] = orgs[0].get("name")
+    
+    photos = person.get("photos", [])
+    if photos:
+        contact["photo"] = photos[0].get("url")
+    
+    return contact
+
+
+def get_contact(credentials: Any, resource_name: str, fields: Selection = None):
     """Get a specific contact by resource name"""
     service = get_people_service(credentials)
     
     person = service.people().get(
         resourceName=resource_name,
-        personFields="names,emailAddresses,phoneNumbers,organizations,photos,birthdays,addresses,biographies"
+        personFields=PERSON.mask(fields)
     ).execute()
     
     return person
 
 
+@invalidates("contacts.list")
 def create_contact(credentials: Any, name: str, email: Optional[str] = None, phone: Optional[str] = None, organization: Optional[str] = None):
     """Create a new contact"""
     service = get_people_service(credentials)
     
+    result = service.people().createContact(
+        body=_contact_body(name, email, phone, organization)
+    ).execute()
+    
+    return {
+        "resourceName": result.get("resourceName"),
+        "name": name,
+        "email": email,
+        "phone": phone,
+        "status": "created"
+    }
+
+
+def _contact_body(name: str, email: Optional[str], phone: Optional[str], organization: Optional[str]):
+    """Build the person body for people.createContact"""
     person = {
         "names": [{"givenName": name}]
     }
@@ -86,17 +121,10 @@ def create_contact(credentials: Any, name: str, email: Optional[str] = None, pho
     if organization:
         person["organizations"] = [{"name": organization}]
     
-    result = service.people().createContact(body=person).execute()
-    
-    return {
-        "resourceName": result.get("resourceName"),
-        "name": name,
-        "email": email,
-        "phone": phone,
-        "status": "created"
-    }
+    return person
 
 
+@invalidates("contacts.list")
 def delete_contact(credentials: Any, resource_name: str):
     """Delete a contact"""
     service = get_people_service(credentials)
@@ -104,26 +132,143 @@ def delete_contact(credentials: Any, resource_name: str):
     return {"message": "Contact deleted successfully"}
 
 
-def search_contacts(credentials: Any, query: str, max_results: int = 10):
+def search_contacts(credentials: Any, query: str, max_results: int = 10, fields: Selection = None):
     """Search contacts by name or email"""
     service = get_people_service(credentials)
     
     results = service.people().searchContacts(
         query=query,
         pageSize=max_results,
-        readMask="names,emailAddresses,phoneNumbers"
+        readMask=PERSON.mask(fields, SEARCH_DEFAULT_FIELDS)
     ).execute()
     
     return results.get("results", [])
 
 
-def get_other_contacts(credentials: Any, max_results: int = 100):
+def get_other_contacts(credentials: Any, max_results: int = 100, fields: Selection = None):
     """Get 'Other contacts' (auto-saved from emails)"""
+    return get_other_contacts_page(credentials, max_results, fields)["items"]
+
+
+def get_other_contacts_page(credentials: Any, max_results: int = 100, fields: Selection = None, page_token: Optional[str] = None):
+    """One page of get_other_contacts: {"items": [...], "nextPageToken": ...}"""
+    service = get_people_service(credentials)
+    results = _other_contacts_request(service, max_results, fields, page_token).execute()
+    return {"items": results.get("otherContacts", []), "nextPageToken": results.get("nextPageToken")}
+
+
+def _other_contacts_request(service, max_results: int, fields: Selection = None, page_token: Optional[str] = None):
+    """Build the otherContacts.list request"""
+    return service.otherContacts().list(
+        pageSize=max_results,
+        readMask=OTHER_CONTACT.mask(fields, OTHER_DEFAULT_FIELDS),
+        pageToken=page_token
+    )
+
+
+# ============== ASYNC ==============
+
+async def list_contacts_async(credentials: Any, max_results: int = 100, fields: Selection = None):
+    """Async variant of list_contacts"""
+    return (await list_contacts_page_async(credentials, max_results, fields))["items"]
+
+
+@cached("contacts.list", ttl=120)
+@single_flight("contacts.list")
+async def list_contacts_page_async(credentials: Any, max_results: int = 100, fields: Selection = None, page_token: Optional[str] = None):
+    """Async variant of list_contacts_page"""
     service = get_people_service(credentials)
     
-    results = service.otherContacts().list(
+    results = await service.people().connections().list(
+        resourceName="people/me",
         pageSize=max_results,
-        readMask="names,emailAddresses"
-    ).execute()
+        personFields=CONTACT.mask(fields),
+        pageToken=page_token
+    ).execute_async()
+    
+    return {
+        "items": [CONTACT.project(_format_contact(person), fields) for person in results.get("connections", [])],
+        "nextPageToken": results.get("nextPageToken"),
+    }
+
+
+async def fetch_contacts_page_async(credentials: Any, page_size: int = 1000, page_token: Optional[str] = None):
+    """One uncached page of full contacts plus the next page token and total (used by background jobs)"""
+    service = get_people_service(credentials)
+    
+    params = {"pageToken": page_token} if page_token else {}
+    results = await service.people().connections().list(
+        resourceName="people/me",
+        pageSize=page_size,
+        personFields=CONTACT.mask(None),
+        **params
+    ).execute_async()
+    
+    return {
+        "contacts": [_format_contact(person) for person in results.get("connections", [])],
+        "nextPageToken": results.get("nextPageToken"),
+        "totalItems": results.get("totalItems"),
+    }
+
+
+async def get_contact_async(credentials: Any, resource_name: str, fields: Selection = None):
+    """Async variant of get_contact"""
+    service = get_people_service(credentials)
+    
+    return await service.people().get(
+        resourceName=resource_name,
+        personFields=PERSON.mask(fields)
+    ).execute_async()
+
+
+@invalidates("contacts.list")
+async def create_contact_async(credentials: Any, name: str, email: Optional[str] = None, phone: Optional[str] = None, organization: Optional[str] = None):
+    """Async variant of create_contact"""
+    service = get_people_service(credentials)
+    
+    result = await service.people().createContact(
+        body=_contact_body(name, email, phone, organization)
+    ).execute_async()
+    
+    return {
+        "resourceName": result.get("resourceName"),
+        "name": name,
+        "email": email,
+        "phone": phone,
+        "status": "created"
+    }
+
+
+@invalidates("contacts.list")
+async def delete_contact_async(credentials: Any, resource_name: str):
+    """Async variant of delete_contact"""
+    service = get_people_service(credentials)
+    await service.people().deleteContact(resourceName=resource_name).execute_async()
+    return {"message": "Contact deleted successfully"}
+
+
+async def search_contacts_async(credentials: Any, query: str, max_results: int = 10, fields: Selection = None):
+    """Async variant of search_contacts"""
+    service = get_people_service(credentials)
+    
+    results = await service.people().searchContacts(
+        query=query,
+        pageSize=max_results,
+        readMask=PERSON.mask(fields, SEARCH_DEFAULT_FIELDS)
+    ).execute_async()
     
-    return results.get("otherContacts", [])
+    return results.get("results", [])
+
+
+async def get_other_contacts_async(credentials: Any, max_results: int = 100, fields: Selection = None):
+    """Async variant of get_other_contacts"""
+    return (await get_other_contacts_page_async(credentials, max_results, fields))["items"]
+
+
+async def get_other_contacts_page_async(
+    credentials: Any, max_results: int = 100, fields: Selection = None, page_token: Optional[str] = None
+):
+    """Async variant of get_other_contacts_page"""
+    service = get_people_service(credentials)
+    results = await _other_contacts_request(service, max_results, fields, page_token).execute_async()
+    return {"items": results.get("otherContacts", []), "nextPageToken": results.get("nextPageToken")}
@@ -4,19 +4,22 @@ Google Drive API Routes
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional
-from auth.router import get_credentials
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
+from responses import FastJSONRoute
+from google_services.pagination import cursor_scope, decode_cursor, page_size, paginated
+from google_services.fields import DRIVE_FILE, Selection, field_selection
 from google_services.drive_service import (
-    list_files,
-    get_file,
-    create_folder,
-    delete_file,
-    share_file,
-    search_files,
-    get_storage_quota,
+    list_files_page_async,
+    get_file_async,
+    create_folder_async,
+    delete_file_async,
+    share_file_async,
+    search_files_page_async,
+    get_storage_quota_async,
 )
 
-router = APIRouter(prefix="/drive", tags=["Google Drive"])
+router = APIRouter(prefix="/drive", tags=["Google Drive"], route_class=FastJSONRoute)
 
 
 class FolderCreate(BaseModel):
@@ -30,66 +33,92 @@ class FileShare(BaseModel):
 
 
 @router.get("/files")
-def get_files(max_results: int = 10, query: str = "", folder_id: Optional[str] = None, session_id: str = Depends(require_session)):
+async def get_files(
+    max_results: int = 10,
+    query: str = "",
+    folder_id: Optional[str] = None,
+    fields: Selection = Depends(field_selection(DRIVE_FILE)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
     """
-    List files from Google Drive.
+    List files from Google Drive, a page at a time (next page: `cursor` from X-Next-Cursor).
     Query examples: "mimeType='application/pdf'", "name contains 'report'"
+    `fields` limits each file to e.g. id,name,mimeType
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_files(credentials, max_results, query, folder_id)
+    scope = cursor_scope("drive.files", query=query, folder_id=folder_id, fields=fields)
+    page = await list_files_page_async(
+        credentials, page_size(max_results, "drive.files"), query, folder_id, fields, decode_cursor(cursor, scope)
+    )
+    return paginated(page["items"], page["nextPageToken"], scope)
 
 
 @router.get("/files/{file_id}")
-def get_file_info(file_id: str, session_id: str = Depends(require_session)):
+async def get_file_info(
+    file_id: str,
+    fields: Selection = Depends(field_selection(DRIVE_FILE)),
+    session_id: str = Depends(require_session),
+):
     """Get file metadata by ID"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_file(credentials, file_id)
+    return await get_file_async(credentials, file_id, fields)
 
 
 @router.post("/folders")
-def create_new_folder(folder: FolderCreate, session_id: str = Depends(require_session)):
+async def create_new_folder(folder: FolderCreate, session_id: str = Depends(require_session)):
     """Create a new folder"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return create_folder(credentials, folder.name, folder.parent_id)
+    return await create_folder_async(credentials, folder.name, folder.parent_id)
 
 
 @router.delete("/files/{file_id}")
-def remove_file(file_id: str, session_id: str = Depends(require_session)):
+async def remove_file(file_id: str, session_id: str = Depends(require_session)):
     """Delete a file or folder"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return delete_file(credentials, file_id)
+    return await delete_file_async(credentials, file_id)
 
 
 @router.post("/files/{file_id}/share")
-def share(file_id: str, share_info: FileShare, session_id: str = Depends(require_session)):
+async def share(file_id: str, share_info: FileShare, session_id: str = Depends(require_session)):
     """Share a file with someone"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return share_file(credentials, file_id, share_info.email, share_info.role)
+    return await share_file_async(credentials, file_id, share_info.email, share_info.role)
 
 
 @router.get("/search")
-def search(query: str, max_results: int = 10, session_id: str = Depends(require_session)):
-    """Search files by name or content"""
-    credentials = get_credentials(session_id)
+async def search(
+    query: str,
+    max_results: int = 10,
+    fields: Selection = Depends(field_selection(DRIVE_FILE)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """Search files by name or content, a page at a time (next page: `cursor` from X-Next-Cursor)"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return search_files(credentials, query, max_results)
+    scope = cursor_scope("drive.search", query=query, fields=fields)
+    page = await search_files_page_async(
+        credentials, query, page_size(max_results, "drive.search"), fields, decode_cursor(cursor, scope)
+    )
+    return paginated(page["items"], page["nextPageToken"], scope)
 
 
 @router.get("/quota")
-def storage_quota(session_id: str = Depends(require_session)):
+async def storage_quota(session_id: str = Depends(require_session)):
     """Get storage usage information"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_storage_quota(credentials)
+    return await get_storage_quota_async(credentials)
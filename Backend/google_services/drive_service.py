@@ -2,7 +2,10 @@
 Google Drive Service
 Integrates with Drive API for file management
 """
-from googleapiclient.discovery import build
+from google_services.client import build_service
+from google_services.cache import cached, invalidates
+from google_services.singleflight import single_flight
+from google_services.fields import DRIVE_FILE, Selection
 from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
 from typing import Any, Optional, Dict, List
 import io
@@ -10,41 +13,67 @@ import io
 
 def get_drive_service(credentials: Any):
     """Create Google Drive service instance"""
-    return build("drive", "v3", credentials=credentials)
+    return build_service("drive", "v3", credentials)
 
 
-def list_files(credentials: Any, max_results: int = 10, query: str = "", folder_id: Optional[str] = None):
+# File fields returned by each read when no `fields` are selected
+LIST_DEFAULT_FIELDS = ("id", "name", "mimeType", "size", "createdTime", "modifiedTime", "webViewLink", "parents")
+GET_DEFAULT_FIELDS = LIST_DEFAULT_FIELDS + ("webContentLink", "description")
+SEARCH_DEFAULT_FIELDS = ("id", "name", "mimeType", "modifiedTime", "webViewLink")
+
+
+def list_files(credentials: Any, max_results: int = 10, query: str = "", folder_id: Optional[str] = None, fields: Selection = None):
     """
     List files from Google Drive
     query examples: "mimeType='application/pdf'", "name contains 'report'"
     """
+    return list_files_page(credentials, max_results, query, folder_id, fields)["items"]
+
+
+@single_flight("drive.files")
+def list_files_page(
+    credentials: Any,
+    max_results: int = 10,
+    query: str = "",
+    folder_id: Optional[str] = None,
+    fields: Selection = None,
+    page_token: Optional[str] = None,
+):
+    """One page of list_files: {"items": [...], "nextPageToken": ...}"""
     service = get_drive_service(credentials)
-    
+    results = _list_files_request(service, max_results, query, folder_id, fields, page_token).execute()
+    return {"items": results.get("files", []), "nextPageToken": results.get("nextPageToken")}
+
+
+def _list_files_request(
+    service, max_results: int, query: str, folder_id: Optional[str], fields: Selection = None, page_token: Optional[str] = None
+):
+    """Build the files.list request for list_files_page"""
     q = query
     if folder_id:
         q = f"'{folder_id}' in parents" + (f" and {query}" if query else "")
     
-    results = service.files().list(
+    return service.files().list(
         pageSize=max_results,
         q=q if q else None,
-        fields="nextPageToken, files(id, name, mimeType, size, createdTime, modifiedTime, webViewLink, parents)"
-    ).execute()
-    
-    return results.get("files", [])
+        pageToken=page_token,
+        fields=f"nextPageToken,files({DRIVE_FILE.mask(fields, LIST_DEFAULT_FIELDS)})"
+    )
 
 
-def get_file(credentials: Any, file_id: str):
+def get_file(credentials: Any, file_id: str, fields: Selection = None):
     """Get file metadata by ID"""
     service = get_drive_service(credentials)
     
     file = service.files().get(
         fileId=file_id,
-        fields="id, name, mimeType, size, createdTime, modifiedTime, webViewLink, webContentLink, parents, description"
+        fields=DRIVE_FILE.mask(fields, GET_DEFAULT_FIELDS)
     ).execute()
     
     return file
 
 
+@invalidates("drive.quota")
 def create_folder(credentials: Any, name: str, parent_id: Optional[str] = None):
     """Create a new folder"""
     service = get_drive_service(credentials)
@@ -65,6 +94,7 @@ def create_folder(credentials: Any, name: str, parent_id: Optional[str] = None):
     return folder
 
 
+@invalidates("drive.quota")
 def upload_file(credentials: Any, file_path: str, name: Optional[str] = None, folder_id: Optional[str] = None, mime_type: Optional[str] = None):
     """Upload a file to Google Drive"""
     service = get_drive_service(credentials)
@@ -85,6 +115,7 @@ def upload_file(credentials: Any, file_path: str, name: Optional[str] = None, fo
     return file
 
 
+@invalidates("drive.quota")
 def delete_file(credentials: Any, file_id: str):
     """Delete a file or folder"""
     service = get_drive_service(credentials)
@@ -114,25 +145,49 @@ def share_file(credentials: Any, file_id: str, email: str, role: str = "reader")
     return {"permission_id": result["id"], "status": "shared"}
 
 
-def search_files(credentials: Any, query: str, max_results: int = 10):
+def _search_query(query: str) -> str:
+    """Drive `q` matching names or content, with the user's text escaped"""
+    escaped = query.replace("\\", "\\\\").replace("'", "\\'")
+    return f"name contains '{escaped}' or fullText contains '{escaped}'"
+
+
+def search_files(credentials: Any, query: str, max_results: int = 10, fields: Selection = None):
     """Search files by name or content"""
+    return search_files_page(credentials, query, max_results, fields)["items"]
+
+
+def search_files_page(
+    credentials: Any, query: str, max_results: int = 10, fields: Selection = None, page_token: Optional[str] = None
+):
+    """One page of search_files: {"items": [...], "nextPageToken": ...}"""
     service = get_drive_service(credentials)
-    
-    results = service.files().list(
+    results = _search_files_request(service, query, max_results, fields, page_token).execute()
+    return {"items": results.get("files", []), "nextPageToken": results.get("nextPageToken")}
+
+
+def _search_files_request(service, query: str, max_results: int, fields: Selection = None, page_token: Optional[str] = None):
+    """Build the files.list request for a name/content search"""
+    return service.files().list(
         pageSize=max_results,
-        q=f"name contains '{query}' or fullText contains '{query}'",
-        fields="files(id, name, mimeType, webViewLink)"
-    ).execute()
-    
-    return results.get("files", [])
+        q=_search_query(query),
+        pageToken=page_token,
+        fields=f"nextPageToken,files({DRIVE_FILE.mask(fields, SEARCH_DEFAULT_FIELDS)})"
+    )
 
 
+@cached("drive.quota", ttl=300)
+@single_flight("drive.quota")
 def get_storage_quota(credentials: Any):
     """Get storage usage information"""
     service = get_drive_service(credentials)
     
     about = service.about().get(fields="storageQuota, user").execute()
     
+    return _format_storage_quota(about)
+
+
+def _format_storage_quota(about: dict):
+    """Shape about.get storage fields for the API response"""
     quota = about.get("storageQuota", {})
     return {
         "limit": quota.get("limit"),
@@ -141,3 +196,105 @@ def get_storage_quota(credentials: Any):
         "usage_in_trash": quota.get("usageInDriveTrash"),
         "user": about.get("user", {}).get("emailAddress")
     }
+
+
+# ============== ASYNC ==============
+# upload_file stays synchronous: resumable media uploads go through httplib2.
+
+async def list_files_async(credentials: Any, max_results: int = 10, query: str = "", folder_id: Optional[str] = None, fields: Selection = None):
+    """Async variant of list_files"""
+    return (await list_files_page_async(credentials, max_results, query, folder_id, fields))["items"]
+
+
+@single_flight("drive.files")
+async def list_files_page_async(
+    credentials: Any,
+    max_results: int = 10,
+    query: str = "",
+    folder_id: Optional[str] = None,
+    fields: Selection = None,
+    page_token: Optional[str] = None,
+):
+    """Async variant of list_files_page"""
+    service = get_drive_service(credentials)
+    results = await _list_files_request(service, max_results, query, folder_id, fields, page_token).execute_async()
+    return {"items": results.get("files", []), "nextPageToken": results.get("nextPageToken")}
+
+
+async def get_file_async(credentials: Any, file_id: str, fields: Selection = None):
+    """Async variant of get_file"""
+    service = get_drive_service(credentials)
+    
+    return await service.files().get(
+        fileId=file_id,
+        fields=DRIVE_FILE.mask(fields, GET_DEFAULT_FIELDS)
+    ).execute_async(hedge=True)
+
+
+@invalidates("drive.quota")
+async def create_folder_async(credentials: Any, name: str, parent_id: Optional[str] = None):
+    """Async variant of create_folder"""
+    service = get_drive_service(credentials)
+    
+    file_metadata: Dict[str, Any] = {
+        "name": name,
+        "mimeType": "application/vnd.google-apps.folder"
+    }
+    
+    if parent_id:
+        file_metadata["parents"] = [parent_id]
+    
+    return await service.files().create(
+        body=file_metadata,
+        fields="id, name, webViewLink"
+    ).execute_async()
+
+
+@invalidates("drive.quota")
+async def delete_file_async(credentials: Any, file_id: str):
+    """Async variant of delete_file"""
+    service = get_drive_service(credentials)
+    await service.files().delete(fileId=file_id).execute_async()
+    return {"message": "File deleted successfully"}
+
+
+async def share_file_async(credentials: Any, file_id: str, email: str, role: str = "reader"):
+    """Async variant of share_file"""
+    service = get_drive_service(credentials)
+    
+    permission = {
+        "type": "user",
+        "role": role,
+        "emailAddress": email
+    }
+    
+    result = await service.permissions().create(
+        fileId=file_id,
+        body=permission,
+        sendNotificationEmail=True
+    ).execute_async()
+    
+    return {"permission_id": result["id"], "status": "shared"}
+
+
+async def search_files_async(credentials: Any, query: str, max_results: int = 10, fields: Selection = None):
+    """Async variant of search_files"""
+    return (await search_files_page_async(credentials, query, max_results, fields))["items"]
+
+
+async def search_files_page_async(
+    credentials: Any, query: str, max_results: int = 10, fields: Selection = None, page_token: Optional[str] = None
+):
+    """Async variant of search_files_page"""
+    service = get_drive_service(credentials)
+    results = await _search_files_request(service, query, max_results, fields, page_token).execute_async()
+    return {"items": results.get("files", []), "nextPageToken": results.get("nextPageToken")}
+
+
+@cached("drive.quota", ttl=300)
+@single_flight("drive.quota")
+async def get_storage_quota_async(credentials: Any):
+    """Async variant of get_storage_quota"""
+    service = get_drive_service(credentials)
+    about = await service.about().get(fields="storageQuota, user").execute_async()
+    return _format_storage_quota(about)
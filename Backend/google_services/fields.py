@@ -0,0 +1,314 @@
+"""
+Partial Responses
+Client-selectable response fields mapped to Google field masks
+
+Read endpoints accept `?fields=a,b,c`. Each resource below lists the fields a
+client may select and the part of the upstream mask (`fields`, `personFields`
+or `readMask`) that supplies each one, so Google only sends - and we only
+parse, cache and serialize - what the client renders. Where Google also
+selects by `part` (YouTube) or `metadataHeaders` (Gmail), the service narrows
+those from the same selection. Unknown field names are
+rejected with 400; without `fields` an endpoint returns what it always has.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+Selection = Optional[Tuple[str, ...]]
+
+
+class InvalidFields(ValueError):
+    """Raised for a `fields` selection naming fields the resource doesn't have"""
+
+
+class Resource:
+    """
+    The selectable fields of one kind of object.
+
+    `fields` maps each client field to the upstream mask fragment supplying it
+    ("" when Google always returns it). `always` fields are part of every
+    selection, and `minimal` is sent when a selection needs no fragment at all
+    (People API masks may not be empty).
+    """
+
+    def __init__(self, name: str, fields: Dict[str, str], always: Tuple[str, ...] = (), minimal: str = ""):
+        self.name = name
+        self.fields = fields
+        self.always = always
+        self.minimal = minimal
+
+    def parse(self, fields: Optional[str]) -> Selection:
+        """Validated selection in declaration order; None selects the endpoint's default"""
+        if fields is None or not fields.strip():
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - self.fields.keys()
+        if unknown:
+            raise InvalidFields(
+                f"Unknown {self.name} fields: {', '.join(sorted(unknown))}. Available: {', '.join(self.fields)}"
+            )
+        return tuple(name for name in self.fields if name in requested or name in self.always)
+
+    def mask(self, selected: Selection, default: Selection = None) -> str:
+        """Upstream mask for a selection (or `default`, or every field)"""
+        names = selected if selected is not None else (default if default is not None else tuple(self.fields))
+        parts = []
+        for name in names:
+            part = self.fields[name]
+            if part and part not in parts:
+                parts.append(part)
+        return ",".join(parts) or self.minimal
+
+    def subset(self, *names: str) -> "Resource":
+        """The same resource limited to `names`, for an endpoint rendering fewer fields"""
+        return Resource(
+            self.name, {name: self.fields[name] for name in names},
+            tuple(name for name in self.always if name in names), self.minimal,
+        )
+
+    def items_param(self, selected: Selection) -> Dict[str, str]:
+        """`fields` keyword for a list call returning `items` (empty: full items); keeps nextPageToken"""
+        return {"fields": f"nextPageToken,items({self.mask(selected)})"} if selected is not None else {}
+
+    def project(self, item: Dict[str, Any], selected: Selection) -> Dict[str, Any]:
+        """Keep only the selected keys of an object we shaped ourselves"""
+        if selected is None:
+            return item
+        return {name: item[name] for name in selected if name in item}
+
+
+def field_selection(resource: Resource) -> Callable[..., Selection]:
+    """FastAPI dependency reading `?fields=` for `resource` (400 on unknown fields)"""
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated {resource.name} fields: {', '.join(resource.fields)}"),
+    ) -> Selection:
+        try:
+            return resource.parse(fields)
+        except InvalidFields as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return dependency
+
+
+def _identity(*names: str) -> Dict[str, str]:
+    return {name: name for name in names}
+
+
+# ============== RESOURCES ==============
+
+# GET /contacts/ (our flattened contact shape)
+CONTACT = Resource("contact", {
+    "resourceName": "",
+    "name": "names",
+    "emails": "emailAddresses",
+    "phones": "phoneNumbers",
+    "organization": "organizations",
+    "photo": "photos",
+}, always=("resourceName",), minimal="metadata")
+
+# GET /contacts/{resource_name} and /contacts/search (People API person)
+PERSON = Resource("person", _identity(
+    "names", "emailAddresses", "phoneNumbers", "organizations", "photos", "birthdays", "addresses", "biographies",
+), minimal="metadata")
+
+# GET /contacts/other (otherContacts only support these)
+OTHER_CONTACT = Resource("other contact", _identity(
+    "names", "emailAddresses", "phoneNumbers", "photos",
+), minimal="metadata")
+
+# GET /calendar/events (Calendar event)
+EVENT = Resource("event", _identity(
+    "id", "status", "htmlLink", "created", "updated", "summary", "description", "location", "colorId",
+    "creator", "organizer", "start", "end", "endTimeUnspecified", "recurrence", "recurringEventId",
+    "originalStartTime", "transparency", "visibility", "iCalUID", "sequence", "attendees", "hangoutLink",
+    "conferenceData", "reminders", "eventType", "attachments",
+))
+
+# GET /sheets/{spreadsheet_id} (our spreadsheet metadata shape)
+SPREADSHEET = Resource("spreadsheet", {
+    "id": "spreadsheetId",
+    "title": "properties/title",
+    "locale": "properties/locale",
+    "sheets": "sheets/properties(sheetId,title,index,gridProperties(rowCount,columnCount))",
+    "url": "spreadsheetUrl",
+})
+
+# GET /drive/files, /drive/files/{file_id}, /drive/search (Drive file)
+DRIVE_FILE = Resource("file", _identity(
+    "id", "name", "mimeType", "size", "createdTime", "modifiedTime", "webViewLink", "webContentLink",
+    "parents", "description", "iconLink", "thumbnailLink", "owners", "shared", "starred", "trashed",
+))
+
+# GET /tasks/lists (Tasks task list)
+TASK_LIST = Resource("task list", _identity("id", "title", "updated", "etag", "selfLink", "kind"))
+
+# GET /tasks/ (Tasks task)
+TASK = Resource("task", _identity(
+    "id", "title", "notes", "status", "due", "completed", "updated", "parent", "position",
+    "links", "webViewLink", "hidden", "deleted", "etag", "selfLink", "kind",
+))
+
+# GET /gmail/messages (our summary shape; id and threadId come from messages.list,
+# the rest from one metadata call per message, skipped when nothing else is selected)
+GMAIL_MESSAGE_SUMMARY = Resource("message", {
+    "id": "",
+    "threadId": "",
+    "snippet": "snippet",
+    "from": "payload/headers",
+    "to": "payload/headers",
+    "subject": "payload/headers",
+    "date": "payload/headers",
+}, always=("id",))
+
+# GET /gmail/messages/{message_id} (our full message shape)
+GMAIL_MESSAGE = Resource("message", {
+    "id": "id",
+    "threadId": "threadId",
+    "from": "payload/headers",
+    "to": "payload/headers",
+    "subject": "payload/headers",
+    "date": "payload/headers",
+    "body": "payload/body/data,payload/parts(mimeType,body/data)",
+    "snippet": "snippet",
+}, always=("id", "threadId"))
+
+# GET /youtube/search (our search result shape)
+YOUTUBE_SEARCH_RESULT = Resource("video", {
+    "id": "id/videoId",
+    "title": "snippet/title",
+    "description": "snippet/description",
+    "thumbnail": "snippet/thumbnails/default/url",
+    "channel_title": "snippet/channelTitle",
+    "published_at": "snippet/publishedAt",
+    "url": "id/videoId",
+})
+
+# GET /youtube/videos/{video_id} (our video shape)
+YOUTUBE_VIDEO = Resource("video", {
+    "id": "id",
+    "title": "snippet/title",
+    "description": "snippet/description",
+    "channel_id": "snippet/channelId",
+    "channel_title": "snippet/channelTitle",
+    "published_at": "snippet/publishedAt",
+    "thumbnail": "snippet/thumbnails/high/url",
+    "duration": "contentDetails/duration",
+    "view_count": "statistics/viewCount",
+    "like_count": "statistics/likeCount",
+    "comment_count": "statistics/commentCount",
+    "tags": "snippet/tags",
+    "url": "id",
+})
+
+# GET /youtube/liked (our liked video shape)
+YOUTUBE_LIKED_VIDEO = Resource("video", {
+    "id": "id",
+    "title": "snippet/title",
+    "channel_title": "snippet/channelTitle",
+    "thumbnail": "snippet/thumbnails/default/url",
+    "view_count": "statistics/viewCount",
+    "url": "id",
+})
+
+# GET /youtube/channel, /youtube/channel/{channel_id} (our channel shape)
+YOUTUBE_CHANNEL = Resource("channel", {
+    "id": "id",
+    "title": "snippet/title",
+    "description": "snippet/description",
+    "custom_url": "snippet/customUrl",
+    "thumbnail": "snippet/thumbnails/default/url",
+    "subscriber_count": "statistics/subscriberCount",
+    "video_count": "statistics/videoCount",
+    "view_count": "statistics/viewCount",
+    "uploads_playlist": "contentDetails/relatedPlaylists/uploads",
+})
+
+# GET /youtube/playlists (our playlist shape)
+YOUTUBE_PLAYLIST = Resource("playlist", {
+    "id": "id",
+    "title": "snippet/title",
+    "description": "snippet/description",
+    "thumbnail": "snippet/thumbnails/default/url",
+    "video_count": "contentDetails/itemCount",
+    "published_at": "snippet/publishedAt",
+})
+
+# GET /youtube/playlists/{playlist_id}/items (our playlist item shape)
+YOUTUBE_PLAYLIST_ITEM = Resource("playlist item", {
+    "video_id": "contentDetails/videoId",
+    "title": "snippet/title",
+    "description": "snippet/description",
+    "thumbnail": "snippet/thumbnails/default/url",
+    "position": "snippet/position",
+    "added_at": "contentDetails/videoPublishedAt",
+    "url": "contentDetails/videoId",
+})
+
+# GET /youtube/subscriptions (our subscription shape)
+YOUTUBE_SUBSCRIPTION = Resource("subscription", {
+    "channel_id": "snippet/resourceId/channelId",
+    "title": "snippet/title",
+    "description": "snippet/description",
+    "thumbnail": "snippet/thumbnails/default/url",
+})
+
+# GET /photos/media/{media_item_id} (our media item shape; listings render subsets)
+PHOTOS_MEDIA_ITEM = Resource("media item", {
+    "id": "id",
+    "filename": "filename",
+    "description": "description",
+    "mime_type": "mimeType",
+    "base_url": "baseUrl",
+    "product_url": "productUrl",
+    "creation_time": "mediaMetadata/creationTime",
+    "width": "mediaMetadata/width",
+    "height": "mediaMetadata/height",
+    "is_video": "mediaMetadata/video",
+    "camera_info": "mediaMetadata/photo",
+})
+
+# GET /photos/media
+PHOTOS_MEDIA_LIST_ITEM = PHOTOS_MEDIA_ITEM.subset(
+    "id", "filename", "description", "mime_type", "base_url", "product_url", "creation_time", "width", "height",
+    "is_video",
+)
+
+# GET /photos/albums/{album_id}/items and POST /photos/media/search
+PHOTOS_MEDIA_SEARCH_ITEM = PHOTOS_MEDIA_ITEM.subset(
+    "id", "filename", "mime_type", "base_url", "product_url", "creation_time", "width", "height",
+)
+
+# GET /photos/albums, /photos/albums/{album_id} (our album shape)
+PHOTOS_ALBUM = Resource("album", {
+    "id": "id",
+    "title": "title",
+    "product_url": "productUrl",
+    "cover_photo_url": "coverPhotoBaseUrl",
+    "media_items_count": "mediaItemsCount",
+    "is_writeable": "isWriteable",
+})
+
+# GET /photos/albums/shared (our shared album shape)
+PHOTOS_SHARED_ALBUM = Resource("shared album", {
+    "id": "id",
+    "title": "title",
+    "product_url": "productUrl",
+    "cover_photo_url": "coverPhotoBaseUrl",
+    "media_items_count": "mediaItemsCount",
+    "share_info": "shareInfo",
+})
+
+# GET /keep/notes, /keep/notes/{note_id} (format_note_for_display shape)
+KEEP_NOTE = Resource("note", {
+    "id": "name",
+    "name": "name",
+    "title": "title",
+    "createTime": "createTime",
+    "updateTime": "updateTime",
+    "trashed": "trashed",
+    "type": "body",
+    "content": "body",
+    "items": "body",
+    "permissions": "permissions",
+    "attachments": "attachments",
+}, always=("id",))
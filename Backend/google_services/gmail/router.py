@@ -4,16 +4,19 @@ Gmail API Routes
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional
-from auth.router import get_credentials
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
+from responses import FastJSONRoute
+from google_services.fields import GMAIL_MESSAGE, GMAIL_MESSAGE_SUMMARY, Selection, field_selection
+from google_services.pagination import cursor_scope, decode_cursor, page_size, paginated
 from google_services.gmail_service import (
-    list_messages,
-    get_message,
-    send_email,
-    get_labels,
+    list_messages_page_async,
+    get_message_async,
+    send_email_async,
+    get_labels_async,
 )
 
-router = APIRouter(prefix="/gmail", tags=["Gmail"])
+router = APIRouter(prefix="/gmail", tags=["Gmail"], route_class=FastJSONRoute)
 
 
 class EmailSend(BaseModel):
@@ -24,39 +27,54 @@ class EmailSend(BaseModel):
 
 
 @router.get("/messages")
-def get_messages(max_results: int = 10, query: str = "", session_id: str = Depends(require_session)):
+async def get_messages(
+    max_results: int = 10,
+    query: str = "",
+    fields: Selection = Depends(field_selection(GMAIL_MESSAGE_SUMMARY)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
     """
-    List emails from inbox.
+    List emails from inbox, a page at a time (next page: `cursor` from X-Next-Cursor).
     Query examples: "is:unread", "from:someone@gmail.com", "subject:hello"
+    `fields` limits each message to e.g. id,subject,from; id,threadId alone skips the per-message lookups
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_messages(credentials, max_results, query)
+    scope = cursor_scope("gmail.messages", query=query, fields=fields)
+    page = await list_messages_page_async(
+        credentials, page_size(max_results, "gmail.messages"), query, fields, decode_cursor(cursor, scope)
+    )
+    return paginated(page["items"], page["nextPageToken"], scope)
 
 
 @router.get("/messages/{message_id}")
-def get_email(message_id: str, session_id: str = Depends(require_session)):
+async def get_email(
+    message_id: str,
+    fields: Selection = Depends(field_selection(GMAIL_MESSAGE)),
+    session_id: str = Depends(require_session),
+):
     """Get full email content by ID"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_message(credentials, message_id)
+    return await get_message_async(credentials, message_id, fields)
 
 
 @router.post("/send")
-def send(email: EmailSend, session_id: str = Depends(require_session)):
+async def send(email: EmailSend, session_id: str = Depends(require_session)):
     """Send an email"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return send_email(credentials, email.to, email.subject, email.body, email.html)
+    return await send_email_async(credentials, email.to, email.subject, email.body, email.html)
 
 
 @router.get("/labels")
-def labels(session_id: str = Depends(require_session)):
+async def labels(session_id: str = Depends(require_session)):
     """Get all Gmail labels"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_labels(credentials)
+    return await get_labels_async(credentials)
@@ -2,67 +2,126 @@
 Gmail Service
 Integrates with Gmail API for reading and sending emails
 """
-from googleapiclient.discovery import build
-from typing import Any
+from google_services.client import build_service
+from google_services.cache import cached
+from google_services.singleflight import single_flight
+from google_services.fields import GMAIL_MESSAGE, GMAIL_MESSAGE_SUMMARY, Selection
+from typing import Any, Optional
+import asyncio
 import base64
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 
+# Header each selectable summary field is read from
+SUMMARY_HEADERS = {"from": "From", "to": "To", "subject": "Subject", "date": "Date"}
+
+
 def get_gmail_service(credentials: Any):
     """Create Gmail service instance"""
-    return build("gmail", "v1", credentials=credentials)
+    return build_service("gmail", "v1", credentials)
 
 
-def list_messages(credentials: Any, max_results: int = 10, query: str = ""):
+def list_messages(credentials: Any, max_results: int = 10, query: str = "", fields: Selection = None):
     """
     List emails from inbox
     query examples: "is:unread", "from:example@gmail.com", "subject:hello"
     """
+    return list_messages_page(credentials, max_results, query, fields)["items"]
+
+
+@single_flight("gmail.messages")
+def list_messages_page(
+    credentials: Any,
+    max_results: int = 10,
+    query: str = "",
+    fields: Selection = None,
+    page_token: Optional[str] = None,
+):
+    """One page of list_messages: {"items": [...], "nextPageToken": ...}"""
     service = get_gmail_service(credentials)
     
-    results = service.users().messages().list(
-        userId="me",
-        maxResults=max_results,
-        q=query
-    ).execute()
+    results = _list_messages_request(service, max_results, query, fields, page_token).execute()
     
     messages = results.get("messages", [])
     
-    # Get details for each message
+    # Get details for each message, unless only ids were selected
     detailed_messages = []
     for msg in messages:
-        msg_detail = service.users().messages().get(
+        msg_detail = _message_metadata_request(service, msg["id"], fields)
+        msg_detail = msg_detail.execute() if msg_detail is not None else {}
+        detailed_messages.append(_format_message_summary(msg, msg_detail, fields))
+    
+    return {"items": detailed_messages, "nextPageToken": results.get("nextPageToken")}
+
+
+def _list_messages_request(service, max_results: int, query: str, fields: Selection = None, page_token: Optional[str] = None):
+    """Build the messages.list request (ids only; details come from _message_metadata_request)"""
+    return service.users().messages().list(
+        userId="me",
+        maxResults=max_results,
+        q=query,
+        pageToken=page_token,
+        **({"fields": "nextPageToken,messages(id,threadId)"} if fields is not None else {})
+    )
+
+
+def _message_metadata_request(service, message_id: str, fields: Selection = None):
+    """Build the messages.get request for a message's summary headers (None when none are selected)"""
+    if fields is None:
+        return service.users().messages().get(
             userId="me",
-            id=msg["id"],
+            id=message_id,
             format="metadata",
-            metadataHeaders=["From", "To", "Subject", "Date"]
-        ).execute()
-        
-        headers = {h["name"]: h["value"] for h in msg_detail.get("payload", {}).get("headers", [])}
-        detailed_messages.append({
-            "id": msg["id"],
-            "threadId": msg["threadId"],
-            "snippet": msg_detail.get("snippet", ""),
-            "from": headers.get("From", ""),
-            "to": headers.get("To", ""),
-            "subject": headers.get("Subject", ""),
-            "date": headers.get("Date", ""),
-        })
-    
-    return detailed_messages
-
-
-def get_message(credentials: Any, message_id: str):
+            metadataHeaders=list(SUMMARY_HEADERS.values())
+        )
+    mask = GMAIL_MESSAGE_SUMMARY.mask(fields)
+    if not mask:
+        return None
+    return service.users().messages().get(
+        userId="me",
+        id=message_id,
+        format="metadata",
+        metadataHeaders=[header for name, header in SUMMARY_HEADERS.items() if name in fields],
+        fields=mask
+    )
+
+
+def _format_message_summary(msg: dict, msg_detail: dict, fields: Selection = None):
+    """Shape a listed message and its metadata for the API response"""
+    headers = {h["name"]: h["value"] for h in msg_detail.get("payload", {}).get("headers", [])}
+    return GMAIL_MESSAGE_SUMMARY.project({
+        "id": msg["id"],
+        "threadId": msg.get("threadId", ""),
+        "snippet": msg_detail.get("snippet", ""),
+        "from": headers.get("From", ""),
+        "to": headers.get("To", ""),
+        "subject": headers.get("Subject", ""),
+        "date": headers.get("Date", ""),
+    }, fields)
+
+
+def get_message(credentials: Any, message_id: str, fields: Selection = None):
     """Get full email content by ID"""
     service = get_gmail_service(credentials)
     
-    message = service.users().messages().get(
+    message = _get_message_request(service, message_id, fields).execute()
+    
+    return _format_message(message, fields)
+
+
+def _get_message_request(service, message_id: str, fields: Selection = None):
+    """Build the messages.get request for a full message"""
+    return service.users().messages().get(
         userId="me",
         id=message_id,
-        format="full"
-    ).execute()
-    
+        format="full",
+        **({"fields": GMAIL_MESSAGE.mask(fields)} if fields is not None else {})
+    )
+
+
+def _format_message(message: dict, fields: Selection = None):
+    """Extract headers and the plain-text body of a full message"""
     headers = {h["name"]: h["value"] for h in message.get("payload", {}).get("headers", [])}
     
     # Extract body
@@ -71,14 +130,14 @@ def get_message(credentials: Any, message_id: str):
     
     if "parts" in payload:
         for part in payload["parts"]:
-            if part["mimeType"] == "text/plain":
-                data = part["body"].get("data", "")
+            if part.get("mimeType") == "text/plain":
+                data = part.get("body", {}).get("data", "")
                 body = base64.urlsafe_b64decode(data).decode("utf-8")
                 break
     elif "body" in payload and "data" in payload["body"]:
         body = base64.urlsafe_b64decode(payload["body"]["data"]).decode("utf-8")
     
-    return {
+    return GMAIL_MESSAGE.project({
         "id": message["id"],
         "threadId": message["threadId"],
         "from": headers.get("From", ""),
@@ -87,13 +146,23 @@ def get_message(credentials: Any, message_id: str):
         "date": headers.get("Date", ""),
         "body": body,
         "snippet": message.get("snippet", ""),
-    }
+    }, fields)
 
 
 def send_email(credentials: Any, to: str, subject: str, body: str, html: bool = False):
     """Send an email"""
     service = get_gmail_service(credentials)
     
+    result = service.users().messages().send(
+        userId="me",
+        body={"raw": _encode_message(to, subject, body, html)}
+    ).execute()
+    
+    return {"message_id": result["id"], "status": "sent"}
+
+
+def _encode_message(to: str, subject: str, body: str, html: bool):
+    """Build a MIME message and encode it for messages.send"""
     if html:
         message = MIMEMultipart("alternative")
         message.attach(MIMEText(body, "html"))
@@ -103,18 +172,75 @@ def send_email(credentials: Any, to: str, subject: str, body: str, html: bool =
     message["to"] = to
     message["subject"] = subject
     
-    raw = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
+    return base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
+
+
+@cached("gmail.labels", ttl=300)
+@single_flight("gmail.labels")
+def get_labels(credentials: Any):
+    """Get all Gmail labels"""
+    service = get_gmail_service(credentials)
+    results = service.users().labels().list(userId="me").execute()
+    return results.get("labels", [])
+
+
+# ============== ASYNC ==============
+
+async def list_messages_async(credentials: Any, max_results: int = 10, query: str = "", fields: Selection = None):
+    """Async variant of list_messages"""
+    return (await list_messages_page_async(credentials, max_results, query, fields))["items"]
+
+
+@single_flight("gmail.messages")
+async def list_messages_page_async(
+    credentials: Any,
+    max_results: int = 10,
+    query: str = "",
+    fields: Selection = None,
+    page_token: Optional[str] = None,
+):
+    """Async variant of list_messages_page; message details are fetched concurrently"""
+    service = get_gmail_service(credentials)
     
-    result = service.users().messages().send(
+    results = await _list_messages_request(service, max_results, query, fields, page_token).execute_async()
+    
+    messages = results.get("messages", [])
+    requests = [_message_metadata_request(service, msg["id"], fields) for msg in messages]
+    details = await asyncio.gather(*(
+        request.execute_async() for request in requests if request is not None
+    )) or [{}] * len(messages)
+    
+    return {
+        "items": [_format_message_summary(msg, detail, fields) for msg, detail in zip(messages, details)],
+        "nextPageToken": results.get("nextPageToken"),
+    }
+
+
+async def get_message_async(credentials: Any, message_id: str, fields: Selection = None):
+    """Async variant of get_message"""
+    service = get_gmail_service(credentials)
+    
+    message = await _get_message_request(service, message_id, fields).execute_async(hedge=True)
+    
+    return _format_message(message, fields)
+
+
+async def send_email_async(credentials: Any, to: str, subject: str, body: str, html: bool = False):
+    """Async variant of send_email"""
+    service = get_gmail_service(credentials)
+    
+    result = await service.users().messages().send(
         userId="me",
-        body={"raw": raw}
-    ).execute()
+        body={"raw": _encode_message(to, subject, body, html)}
+    ).execute_async()
     
     return {"message_id": result["id"], "status": "sent"}
 
 
-def get_labels(credentials: Any):
-    """Get all Gmail labels"""
+@cached("gmail.labels", ttl=300)
+@single_flight("gmail.labels")
+async def get_labels_async(credentials: Any):
+    """Async variant of get_labels"""
     service = get_gmail_service(credentials)
-    results = service.users().labels().list(userId="me").execute()
+    results = await service.users().labels().list(userId="me").execute_async()
     return results.get("labels", [])
@@ -0,0 +1,141 @@
+"""
+Request Hedging
+Opt-in duplicate attempts for slow idempotent reads on the async path
+
+A request executed with `execute_async(hedge=True)` starts one attempt. If it
+has not answered within the HEDGE_PERCENTILE latency of recent calls to the same
+API method, an identical second attempt is sent. The first successful response
+wins and the other attempt is cancelled. Hedges are paid for from a budget that
+earns HEDGE_BUDGET_RATIO of a hedge per hedgeable call, so extra quota use stays
+bounded even when an API is uniformly slow. Only idempotent requests are hedged.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from config import (
+    HEDGE_BUDGET_BURST,
+    HEDGE_BUDGET_RATIO,
+    HEDGE_ENABLED,
+    HEDGE_MIN_DELAY_SECONDS,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+)
+from metrics import Counter
+from google_services.retry import is_idempotent
+
+_SAMPLES_PER_METHOD = 200
+# Recompute a method's hedge delay every this many new samples
+_RECOMPUTE_EVERY = 10
+
+google_api_hedges = Counter(
+    "google_api_hedges_total", "Hedged request outcomes by API method", ("method", "outcome"))
+
+
+class LatencyTracker:
+    """Recent successful latencies of one API method and the derived hedge delay"""
+    __slots__ = ("samples", "delay", "pending")
+
+    def __init__(self):
+        self.samples: Deque[float] = deque(maxlen=_SAMPLES_PER_METHOD)
+        self.delay: Optional[float] = None
+        self.pending = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self.pending += 1
+        if self.pending >= _RECOMPUTE_EVERY and len(self.samples) >= HEDGE_MIN_SAMPLES:
+            self.pending = 0
+            ordered = sorted(self.samples)
+            index = min(int(len(ordered) * HEDGE_PERCENTILE / 100), len(ordered) - 1)
+            self.delay = max(ordered[index], HEDGE_MIN_DELAY_SECONDS)
+
+
+class HedgeBudget:
+    """Token budget: each hedgeable call earns `ratio` tokens, a hedge spends one"""
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self.lock = threading.Lock()
+
+    def earn(self):
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def spend(self) -> bool:
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_budget = HedgeBudget(HEDGE_BUDGET_RATIO, HEDGE_BUDGET_BURST)
+
+
+def _tracker(method: str) -> LatencyTracker:
+    tracker = _trackers.get(method)
+    if tracker is None:
+        tracker = _trackers.setdefault(method, LatencyTracker())
+    return tracker
+
+
+async def _timed(tracker: LatencyTracker, send: Callable[[], Awaitable[Any]]) -> Any:
+    started = time.perf_counter()
+    result = await send()
+    tracker.record(time.perf_counter() - started)
+    return result
+
+
+async def hedged(request: Any, send: Callable[[], Awaitable[Any]]) -> Any:
+    """Run send() for request, racing a second attempt if the first is slow"""
+    method = request.methodId or "unknown"
+    tracker = _tracker(method)
+    if not HEDGE_ENABLED or not is_idempotent(request) or request.resumable is not None:
+        return await _timed(tracker, send)
+
+    _budget.earn()
+    delay = tracker.delay
+    primary = asyncio.ensure_future(_timed(tracker, send))
+    if delay is None:
+        return await primary
+
+    attempts = {primary}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=delay)
+        if done:
+            return primary.result()
+        if not _budget.spend():
+            google_api_hedges.inc(method, "budget_exhausted")
+            return await primary
+
+        hedge = asyncio.ensure_future(_timed(tracker, send))
+        attempts.add(hedge)
+        while True:
+            done, pending = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                attempts.discard(attempt)
+                if attempt.exception() is None or not attempts:
+                    google_api_hedges.inc(method, "hedge_won" if attempt is hedge else "primary_won")
+                    return attempt.result()
+    finally:
+        for attempt in attempts:
+            attempt.cancel()
+
+
+def hedging_stats() -> Dict[str, Any]:
+    """Current hedge delay per method and the remaining hedge budget"""
+    return {
+        "enabled": HEDGE_ENABLED,
+        "budget_tokens": round(_budget.tokens, 2),
+        "delays_ms": {
+            method: round(tracker.delay * 1000, 1)
+            for method, tracker in sorted(_trackers.items())
+            if tracker.delay is not None
+        },
+    }
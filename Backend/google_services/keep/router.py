@@ -11,23 +11,28 @@ Available endpoints:
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, List
+from googleapiclient.errors import HttpError
 
-from auth.router import get_credentials
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
+from responses import FastJSONRoute
+from google_services.breaker import CircuitOpenError
+from google_services.fields import KEEP_NOTE, Selection, field_selection
+from google_services.pagination import cursor_scope, decode_cursor, page_size, paginated
 from google_services.keep_service import (
-    list_notes,
-    get_note,
-    create_note,
-    create_text_note,
-    create_list_note,
-    delete_note,
-    add_permissions,
-    remove_permissions,
-    get_all_notes,
+    list_notes_async,
+    get_note_async,
+    create_note_async,
+    create_text_note_async,
+    create_list_note_async,
+    delete_note_async,
+    add_permissions_async,
+    remove_permissions_async,
+    get_all_notes_async,
     format_note_for_display,
 )
 
-router = APIRouter(prefix="/keep", tags=["Keep"])
+router = APIRouter(prefix="/keep", tags=["Keep"], route_class=FastJSONRoute)
 
 
 # ============== Pydantic Models ==============
@@ -91,89 +96,105 @@ class RemovePermissionsRequest(BaseModel):
 # ============== Notes Endpoints ==============
 
 @router.get("/notes")
-def get_notes(
-    page_size: int = 100,
-    page_token: str = None,
+async def get_notes(
+    max_results: int = 100,
     filter: str = None,
+    fields: Selection = Depends(field_selection(KEEP_NOTE)),
+    cursor: Optional[str] = None,
     session_id: str = Depends(require_session)
 ):
     """
     List notes from Google Keep
     
-    - **page_size**: Maximum number of notes to return (default 100)
-    - **page_token**: Token for pagination (from previous response)
+    - **max_results**: Maximum number of notes to return (default 100)
     - **filter**: Filter string (e.g., "trashed=false")
+    - **fields**: Note fields to return (e.g., "id,title,updateTime")
+    - **cursor**: Next page, from the X-Next-Cursor header (or `nextPageToken`) of the previous response
     
-    Returns notes with pagination token if more results exist.
+    Returns notes with a cursor if more results exist.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
+    scope = cursor_scope("keep.notes", filter=filter, fields=fields)
+    page_token = decode_cursor(cursor, scope)
     try:
-        result = list_notes(
+        result = await list_notes_async(
             credentials,
-            page_size=page_size,
+            page_size=page_size(max_results, "keep.notes"),
             page_token=page_token,
-            filter_str=filter
+            filter_str=filter,
+            fields=fields
         )
         
         # Format notes for display
-        formatted_notes = [format_note_for_display(note) for note in result.get("notes", [])]
+        formatted_notes = [format_note_for_display(note, fields) for note in result.get("notes", [])]
         
-        return {
+        body = {
             "notes": formatted_notes,
             "nextPageToken": result.get("nextPageToken"),
             "count": len(formatted_notes)
         }
+    except (HttpError, CircuitOpenError):
+        raise  # main.py's handlers keep the status and Retry-After
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return paginated(body, body["nextPageToken"], scope, "nextPageToken")
 
 
 @router.get("/notes/all")
-def get_all_notes_endpoint(
+async def get_all_notes_endpoint(
     include_trashed: bool = False,
+    fields: Selection = Depends(field_selection(KEEP_NOTE)),
     session_id: str = Depends(require_session)
 ):
     """
     Get all notes (handles pagination automatically)
     
     - **include_trashed**: Include trashed notes (default False)
+    - **fields**: Note fields to return (e.g., "id,title,updateTime")
     
     Warning: May take time for accounts with many notes.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     try:
-        notes = get_all_notes(credentials, include_trashed=include_trashed)
-        formatted_notes = [format_note_for_display(note) for note in notes]
+        notes = await get_all_notes_async(credentials, include_trashed=include_trashed, fields=fields)
+        formatted_notes = [format_note_for_display(note, fields) for note in notes]
         
         return {
             "notes": formatted_notes,
             "total": len(formatted_notes)
         }
+    except (HttpError, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/notes/{note_id}")
-def get_single_note(
+async def get_single_note(
     note_id: str,
+    fields: Selection = Depends(field_selection(KEEP_NOTE)),
     session_id: str = Depends(require_session)
 ):
     """
     Get a specific note by ID
     
     - **note_id**: The note ID (with or without 'notes/' prefix)
+    - **fields**: Note fields to return (e.g., "id,title,content")
     
     Returns full note details including content, permissions, and attachments.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     try:
-        note = get_note(credentials, note_id)
-        return format_note_for_display(note)
+        note = await get_note_async(credentials, note_id, fields)
+        return format_note_for_display(note, fields)
+    except (HttpError, CircuitOpenError):
+        raise
     except Exception as e:
         if "404" in str(e) or "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail=f"Note {note_id} not found")
@@ -181,7 +202,7 @@ def get_single_note(
 
 
 @router.post("/notes/text")
-def create_text_note_endpoint(
+async def create_text_note_endpoint(
     note: TextNoteCreate,
     session_id: str = Depends(require_session)
 ):
@@ -193,18 +214,20 @@ def create_text_note_endpoint(
     
     Returns the created note.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     try:
-        created = create_text_note(credentials, title=note.title, text=note.text)
+        created = await create_text_note_async(credentials, title=note.title, text=note.text)
         return format_note_for_display(created)
+    except (HttpError, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/notes/list")
-def create_list_note_endpoint(
+async def create_list_note_endpoint(
     note: ListNoteCreate,
     session_id: str = Depends(require_session)
 ):
@@ -216,19 +239,21 @@ def create_list_note_endpoint(
     
     Returns the created note.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     try:
         items = [{"text": item.text, "checked": item.checked} for item in note.items]
-        created = create_list_note(credentials, title=note.title, items=items)
+        created = await create_list_note_async(credentials, title=note.title, items=items)
         return format_note_for_display(created)
+    except (HttpError, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/notes")
-def create_note_endpoint(
+async def create_note_endpoint(
     title: str,
     text: str = None,
     items: List[ListItem] = None,
@@ -243,7 +268,7 @@ def create_note_endpoint(
     
     Provide either text OR items, not both.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     try:
@@ -251,19 +276,21 @@ def create_note_endpoint(
         if items:
             list_items = [{"text": item.text, "checked": item.checked} for item in items]
         
-        created = create_note(
+        created = await create_note_async(
             credentials,
             title=title,
             text_content=text,
             list_items=list_items
         )
         return format_note_for_display(created)
+    except (HttpError, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/notes/{note_id}")
-def delete_note_endpoint(
+async def delete_note_endpoint(
     note_id: str,
     session_id: str = Depends(require_session)
 ):
@@ -274,12 +301,14 @@ def delete_note_endpoint(
     
     Returns confirmation of deletion.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     try:
-        result = delete_note(credentials, note_id)
+        result = await delete_note_async(credentials, note_id)
         return result
+    except (HttpError, CircuitOpenError):
+        raise
     except Exception as e:
         if "404" in str(e) or "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail=f"Note {note_id} not found")
@@ -289,7 +318,7 @@ def delete_note_endpoint(
 # ============== Permissions Endpoints ==============
 
 @router.post("/notes/{note_id}/share")
-def share_note(
+async def share_note(
     note_id: str,
     request: ShareNoteRequest,
     session_id: str = Depends(require_session)
@@ -302,19 +331,21 @@ def share_note(
     
     Returns created permissions.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     try:
         members = [{"email": m.email, "role": m.role} for m in request.members]
-        result = add_permissions(credentials, note_id, members)
+        result = await add_permissions_async(credentials, note_id, members)
         return result
+    except (HttpError, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/notes/{note_id}/unshare")
-def unshare_note(
+async def unshare_note(
     note_id: str,
     request: RemovePermissionsRequest,
     session_id: str = Depends(require_session)
@@ -327,12 +358,14 @@ def unshare_note(
     
     Returns confirmation.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     try:
-        result = remove_permissions(credentials, note_id, request.permission_names)
+        result = await remove_permissions_async(credentials, note_id, request.permission_names)
         return result
+    except (HttpError, CircuitOpenError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -340,7 +373,7 @@ def unshare_note(
 # ============== Info Endpoint ==============
 
 @router.get("/info")
-def keep_info():
+async def keep_info():
     """
     Get Google Keep API information
     
@@ -352,7 +385,7 @@ def keep_info():
         "documentation": "https://developers.google.com/keep/api/reference/rest",
         "note": "Google Keep API is primarily designed for enterprise (Google Workspace) use",
         "endpoints": {
-            "GET /keep/notes": "List notes with pagination",
+            "GET /keep/notes": "List notes a page at a time (cursor from X-Next-Cursor)",
             "GET /keep/notes/all": "Get all notes (auto-pagination)",
             "GET /keep/notes/{note_id}": "Get specific note",
             "POST /keep/notes/text": "Create text note",
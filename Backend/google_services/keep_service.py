@@ -10,18 +10,21 @@ API Endpoints:
 
 Note: Google Keep API is primarily for enterprise use (Google Workspace)
 """
-from googleapiclient.discovery import build
+from google_services.client import build_service
+from google_services.fields import KEEP_NOTE, Selection
 from typing import Any, Optional, List
 
 
 def get_keep_service(credentials: Any):
     """Create Google Keep service instance"""
-    return build("keep", "v1", credentials=credentials)
+    return build_service("keep", "v1", credentials)
 
 
 # ============== NOTES ==============
 
-def list_notes(credentials: Any, page_size: int = 100, page_token: str = None, filter_str: str = None) -> dict:
+def list_notes(
+    credentials: Any, page_size: int = 100, page_token: str = None, filter_str: str = None, fields: Selection = None
+) -> dict:
     """
     List all notes from Google Keep
     
@@ -30,19 +33,14 @@ def list_notes(credentials: Any, page_size: int = 100, page_token: str = None, f
         page_size: Maximum number of notes to return (default 100)
         page_token: Token for pagination
         filter_str: Filter string (e.g., "trashed=false" or "create_time > 2024-01-01")
+        fields: Note fields to fetch (see KEEP_NOTE), None for whole notes
     
     Returns:
         dict with notes list and nextPageToken
     """
     service = get_keep_service(credentials)
     
-    params = {"pageSize": page_size}
-    if page_token:
-        params["pageToken"] = page_token
-    if filter_str:
-        params["filter"] = filter_str
-    
-    result = service.notes().list(**params).execute()
+    result = service.notes().list(**_list_notes_params(page_size, page_token, filter_str, fields)).execute()
     
     return {
         "notes": result.get("notes", []),
@@ -50,23 +48,46 @@ def list_notes(credentials: Any, page_size: int = 100, page_token: str = None, f
     }
 
 
-def get_note(credentials: Any, note_id: str) -> dict:
+def _list_notes_params(page_size: int, page_token: str, filter_str: str, fields: Selection = None) -> dict:
+    """Build notes.list parameters"""
+    params = {"pageSize": page_size}
+    if page_token:
+        params["pageToken"] = page_token
+    if filter_str:
+        params["filter"] = filter_str
+    if fields is not None:
+        params["fields"] = f"nextPageToken,notes({KEEP_NOTE.mask(fields)})"
+    return params
+
+
+def _get_note_params(note_id: str, fields: Selection = None) -> dict:
+    """Build notes.get parameters"""
+    params = {"name": _note_name(note_id)}
+    if fields is not None:
+        params["fields"] = KEEP_NOTE.mask(fields)
+    return params
+
+
+def _note_name(note_id: str) -> str:
+    """Ensure proper name format (notes/{note_id})"""
+    return note_id if note_id.startswith("notes/") else f"notes/{note_id}"
+
+
+def get_note(credentials: Any, note_id: str, fields: Selection = None) -> dict:
     """
     Get a specific note by ID
     
     Args:
         credentials: Google OAuth credentials
         note_id: The note ID (format: notes/{note_id})
+        fields: Note fields to fetch (see KEEP_NOTE), None for all of them
     
     Returns:
         Note object with all details
     """
     service = get_keep_service(credentials)
     
-    # Ensure proper name format
-    name = note_id if note_id.startswith("notes/") else f"notes/{note_id}"
-    
-    return service.notes().get(name=name).execute()
+    return service.notes().get(**_get_note_params(note_id, fields)).execute()
 
 
 def create_note(
@@ -94,6 +115,11 @@ def create_note(
     """
     service = get_keep_service(credentials)
     
+    return service.notes().create(body=_note_body(title, text_content, list_items)).execute()
+
+
+def _note_body(title: str, text_content: str, list_items: List[dict]) -> dict:
+    """Build a text or list note body for notes.create"""
     note_body = {"title": title}
     
     if list_items:
@@ -117,7 +143,7 @@ def create_note(
             }
         }
     
-    return service.notes().create(body=note_body).execute()
+    return note_body
 
 
 def create_text_note(credentials: Any, title: str, text: str) -> dict:
@@ -163,9 +189,7 @@ def delete_note(credentials: Any, note_id: str) -> dict:
     """
     service = get_keep_service(credentials)
     
-    name = note_id if note_id.startswith("notes/") else f"notes/{note_id}"
-    
-    service.notes().delete(name=name).execute()
+    service.notes().delete(name=_note_name(note_id)).execute()
     return {"status": "deleted", "note_id": note_id}
 
 
@@ -191,8 +215,16 @@ def add_permissions(
     """
     service = get_keep_service(credentials)
     
-    name = note_id if note_id.startswith("notes/") else f"notes/{note_id}"
+    result = service.notes().permissions().batchCreate(
+        parent=_note_name(note_id),
+        body={"requests": _permission_requests(members)}
+    ).execute()
     
+    return result
+
+
+def _permission_requests(members: List[dict]) -> List[dict]:
+    """Build permissions.batchCreate requests for the given members"""
     requests = []
     for member in members:
         requests.append({
@@ -201,13 +233,7 @@ def add_permissions(
                 "role": member.get("role", "WRITER")
             }
         })
-    
-    result = service.notes().permissions().batchCreate(
-        parent=name,
-        body={"requests": requests}
-    ).execute()
-    
-    return result
+    return requests
 
 
 def remove_permissions(
@@ -228,10 +254,8 @@ def remove_permissions(
     """
     service = get_keep_service(credentials)
     
-    name = note_id if note_id.startswith("notes/") else f"notes/{note_id}"
-    
     service.notes().permissions().batchDelete(
-        parent=name,
+        parent=_note_name(note_id),
         body={"names": permission_names}
     ).execute()
     
@@ -259,13 +283,14 @@ def download_attachment(credentials: Any, attachment_name: str) -> bytes:
 
 # ============== HELPER FUNCTIONS ==============
 
-def get_all_notes(credentials: Any, include_trashed: bool = False) -> List[dict]:
+def get_all_notes(credentials: Any, include_trashed: bool = False, fields: Selection = None) -> List[dict]:
     """
     Get all notes (handles pagination automatically)
     
     Args:
         credentials: Google OAuth credentials
         include_trashed: Whether to include trashed notes
+        fields: Note fields to fetch (see KEEP_NOTE), None for whole notes
     
     Returns:
         List of all notes
@@ -280,7 +305,8 @@ def get_all_notes(credentials: Any, include_trashed: bool = False) -> List[dict]
             credentials, 
             page_size=100, 
             page_token=page_token,
-            filter_str=filter_str
+            filter_str=filter_str,
+            fields=fields
         )
         all_notes.extend(result.get("notes", []))
         
@@ -291,12 +317,13 @@ def get_all_notes(credentials: Any, include_trashed: bool = False) -> List[dict]
     return all_notes
 
 
-def format_note_for_display(note: dict) -> dict:
+def format_note_for_display(note: dict, fields: Selection = None) -> dict:
     """
     Format a note for easier display
     
     Args:
         note: Raw note object from API
+        fields: Keys of the simplified note to keep (see KEEP_NOTE), None for all
     
     Returns:
         Simplified note dict
@@ -340,4 +367,101 @@ def format_note_for_display(note: dict) -> dict:
             for att in note["attachments"]
         ]
     
-    return formatted
+    return KEEP_NOTE.project(formatted, fields)
+
+
+# ============== ASYNC ==============
+# download_attachment stays synchronous: media downloads go through httplib2.
+
+async def list_notes_async(
+    credentials: Any, page_size: int = 100, page_token: str = None, filter_str: str = None, fields: Selection = None
+) -> dict:
+    """Async variant of list_notes"""
+    service = get_keep_service(credentials)
+    
+    result = await service.notes().list(**_list_notes_params(page_size, page_token, filter_str, fields)).execute_async()
+    
+    return {
+        "notes": result.get("notes", []),
+        "nextPageToken": result.get("nextPageToken")
+    }
+
+
+async def get_note_async(credentials: Any, note_id: str, fields: Selection = None) -> dict:
+    """Async variant of get_note"""
+    service = get_keep_service(credentials)
+    return await service.notes().get(**_get_note_params(note_id, fields)).execute_async()
+
+
+async def create_note_async(
+    credentials: Any,
+    title: str = "",
+    text_content: str = None,
+    list_items: List[dict] = None
+) -> dict:
+    """Async variant of create_note"""
+    service = get_keep_service(credentials)
+    return await service.notes().create(body=_note_body(title, text_content, list_items)).execute_async()
+
+
+async def create_text_note_async(credentials: Any, title: str, text: str) -> dict:
+    """Async variant of create_text_note"""
+    return await create_note_async(credentials, title=title, text_content=text)
+
+
+async def create_list_note_async(credentials: Any, title: str, items: List[dict]) -> dict:
+    """Async variant of create_list_note"""
+    return await create_note_async(credentials, title=title, list_items=items)
+
+
+async def delete_note_async(credentials: Any, note_id: str) -> dict:
+    """Async variant of delete_note"""
+    service = get_keep_service(credentials)
+    await service.notes().delete(name=_note_name(note_id)).execute_async()
+    return {"status": "deleted", "note_id": note_id}
+
+
+async def add_permissions_async(credentials: Any, note_id: str, members: List[dict]) -> dict:
+    """Async variant of add_permissions"""
+    service = get_keep_service(credentials)
+    
+    return await service.notes().permissions().batchCreate(
+        parent=_note_name(note_id),
+        body={"requests": _permission_requests(members)}
+    ).execute_async()
+
+
+async def remove_permissions_async(credentials: Any, note_id: str, permission_names: List[str]) -> dict:
+    """Async variant of remove_permissions"""
+    service = get_keep_service(credentials)
+    
+    await service.notes().permissions().batchDelete(
+        parent=_note_name(note_id),
+        body={"names": permission_names}
+    ).execute_async()
+    
+    return {"status": "permissions_removed"}
+
+
+async def get_all_notes_async(credentials: Any, include_trashed: bool = False, fields: Selection = None) -> List[dict]:
+    """Async variant of get_all_notes"""
+    all_notes = []
+    page_token = None
+    
+    filter_str = None if include_trashed else "trashed=false"
+    
+    while True:
+        result = await list_notes_async(
+            credentials,
+            page_size=100,
+            page_token=page_token,
+            filter_str=filter_str,
+            fields=fields
+        )
+        all_notes.extend(result.get("notes", []))
+        
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            break
+    
+    return all_notes
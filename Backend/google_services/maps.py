@@ -1,5 +1,13 @@
-import requests
 from config import GOOGLE_MAPS_API_KEY
+from google_services.transport import send_async
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+MISSING_KEY_ERROR = {
+    "error": "GOOGLE_MAPS_API_KEY not configured",
+    "status": "CONFIG_ERROR",
+    "help": "Add GOOGLE_MAPS_API_KEY to your .env file. Get a key from https://console.cloud.google.com/apis/credentials"
+}
 
 
 def geocode_address(address: str):
@@ -13,13 +21,20 @@ def geocode_address(address: str):
         Geocoding results with lat/lng coordinates
     """
     if not GOOGLE_MAPS_API_KEY:
-        return {
-            "error": "GOOGLE_MAPS_API_KEY not configured",
-            "status": "CONFIG_ERROR",
-            "help": "Add GOOGLE_MAPS_API_KEY to your .env file. Get a key from https://console.cloud.google.com/apis/credentials"
-        }
+        return dict(MISSING_KEY_ERROR)
+    
+    import requests
+    
+    params = {"address": address, "key": GOOGLE_MAPS_API_KEY}
+    response = requests.get(GEOCODE_URL, params=params)
+    return response.json()
+
+
+async def geocode_address_async(address: str):
+    """Async variant of geocode_address"""
+    if not GOOGLE_MAPS_API_KEY:
+        return dict(MISSING_KEY_ERROR)
     
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
     params = {"address": address, "key": GOOGLE_MAPS_API_KEY}
-    response = requests.get(url, params=params)
+    response = await send_async("GET", GEOCODE_URL, params=params)
     return response.json()
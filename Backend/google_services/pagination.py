@@ -0,0 +1,100 @@
+"""
+Cursor Pagination
+Opaque cursors and page-size limits shared by the list endpoints
+
+A list endpoint returns one page of at most `max_results` items, capped at
+PAGINATION_MAX_PAGE_SIZE and at the upstream API's own maximum. If there is
+more, the response carries an opaque cursor in the X-Next-Cursor header; pass
+it back as `?cursor=` (with the same query parameters) for the next page. The
+header is absent on the last page, and response bodies keep their shape;
+bodies that used to carry Google's page token (YouTube's and Photos'
+`next_page_token`, Keep's `nextPageToken`) carry the cursor in that key instead.
+
+/contacts/search is the one capped but unpaged listing: people.searchContacts
+has no page token and returns at most 30 results.
+
+A cursor wraps Google's page token together with the endpoint and the query
+it was issued for, so replaying it against another listing is a 400 rather
+than a silently wrong page.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+from config import PAGINATION_MAX_PAGE_SIZE
+from responses import FastJSONResponse
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Listing -> largest page the upstream API returns
+UPSTREAM_MAX_PAGE_SIZE = {
+    "gmail.messages": 500,
+    "drive.files": 1000,
+    "drive.search": 1000,
+    "contacts.list": 1000,
+    "contacts.other": 1000,
+    "contacts.search": 30,
+    "calendar.events": 2500,
+    "tasks.items": 100,
+    "youtube.playlists": 50,
+    "youtube.playlist_items": 50,
+    "youtube.subscriptions": 50,
+    "youtube.liked": 50,
+    "youtube.search": 50,
+    "photos.albums": 50,
+    "photos.shared_albums": 50,
+    "photos.media": 100,
+    "photos.album_items": 100,
+    "photos.search": 100,
+    "keep.notes": 1000,
+}
+
+
+def page_size(requested: int, listing: str) -> int:
+    """Clamp a requested page size to 1..min(PAGINATION_MAX_PAGE_SIZE, the upstream maximum)"""
+    return max(1, min(requested, PAGINATION_MAX_PAGE_SIZE, UPSTREAM_MAX_PAGE_SIZE[listing]))
+
+
+def cursor_scope(listing: str, **params: Any) -> str:
+    """Identifies one listing: its name plus the parameters that shape its results"""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    return f"{listing}:{digest}"
+
+
+def encode_cursor(scope: str, page_token: Optional[str]) -> Optional[str]:
+    if not page_token:
+        return None
+    raw = json.dumps([scope, page_token], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], scope: str) -> Optional[str]:
+    """Google page token inside `cursor` (None for the first page); 400 if it isn't for this listing"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_scope_, page_token = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_scope_ != scope or not isinstance(page_token, str):
+        raise HTTPException(status_code=400, detail="Cursor does not belong to this listing; keep the query parameters unchanged")
+    return page_token
+
+
+def paginated(body: Any, next_page_token: Optional[str], scope: str, token_key: Optional[str] = None) -> FastJSONResponse:
+    """
+    JSON response for one page, with X-Next-Cursor when there is another.
+
+    `token_key` names the key of a dict body that holds Google's page token;
+    its value becomes the cursor, so the body never offers a token that
+    `?cursor=` would reject.
+    """
+    cursor = encode_cursor(scope, next_page_token)
+    if token_key is not None:
+        body = {**body, token_key: cursor}
+    return FastJSONResponse(body, headers={NEXT_CURSOR_HEADER: cursor} if cursor else None)
@@ -4,20 +4,31 @@ Google Photos API Routes
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, List
-from auth.router import get_credentials
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
+from responses import FastJSONRoute
+from google_services.fields import (
+    PHOTOS_ALBUM,
+    PHOTOS_MEDIA_ITEM,
+    PHOTOS_MEDIA_LIST_ITEM,
+    PHOTOS_MEDIA_SEARCH_ITEM,
+    PHOTOS_SHARED_ALBUM,
+    Selection,
+    field_selection,
+)
+from google_services.pagination import cursor_scope, decode_cursor, page_size, paginated
 from google_services.photos_service import (
-    list_albums,
-    get_album,
-    create_album,
-    list_media_items,
-    get_media_item,
-    search_media_items,
-    list_album_media_items,
-    list_shared_albums,
+    list_albums_async,
+    get_album_async,
+    create_album_async,
+    list_media_items_async,
+    get_media_item_async,
+    search_media_items_async,
+    list_album_media_items_async,
+    list_shared_albums_async,
 )
 
-router = APIRouter(prefix="/photos", tags=["Google Photos"])
+router = APIRouter(prefix="/photos", tags=["Google Photos"], route_class=FastJSONRoute)
 
 
 class AlbumCreate(BaseModel):
@@ -33,75 +44,129 @@ class MediaSearchFilters(BaseModel):
 
 
 @router.get("/albums")
-def get_albums(page_size: int = 20, page_token: Optional[str] = None, session_id: str = Depends(require_session)):
-    """List user's photo albums"""
-    credentials = get_credentials(session_id)
+async def get_albums(
+    max_results: int = 20,
+    fields: Selection = Depends(field_selection(PHOTOS_ALBUM)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """List user's photo albums (next page: `cursor` from X-Next-Cursor)"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_albums(credentials, page_size, page_token)
+    scope = cursor_scope("photos.albums", fields=fields)
+    page = await list_albums_async(
+        credentials, page_size(max_results, "photos.albums"), decode_cursor(cursor, scope), fields
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
 
 
 @router.get("/albums/shared")
-def get_shared_albums(page_size: int = 20, page_token: Optional[str] = None, session_id: str = Depends(require_session)):
-    """List shared albums"""
-    credentials = get_credentials(session_id)
+async def get_shared_albums(
+    max_results: int = 20,
+    fields: Selection = Depends(field_selection(PHOTOS_SHARED_ALBUM)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """List shared albums (next page: `cursor` from X-Next-Cursor)"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_shared_albums(credentials, page_size, page_token)
+    scope = cursor_scope("photos.shared_albums", fields=fields)
+    page = await list_shared_albums_async(
+        credentials, page_size(max_results, "photos.shared_albums"), decode_cursor(cursor, scope), fields
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
 
 
 @router.get("/albums/{album_id}")
-def get_album_details(album_id: str, session_id: str = Depends(require_session)):
+async def get_album_details(
+    album_id: str,
+    fields: Selection = Depends(field_selection(PHOTOS_ALBUM)),
+    session_id: str = Depends(require_session),
+):
     """Get details of a specific album"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_album(credentials, album_id)
+    return await get_album_async(credentials, album_id, fields)
 
 
 @router.post("/albums")
-def create_new_album(album: AlbumCreate, session_id: str = Depends(require_session)):
+async def create_new_album(album: AlbumCreate, session_id: str = Depends(require_session)):
     """Create a new photo album"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return create_album(credentials, album.title)
+    return await create_album_async(credentials, album.title)
 
 
 @router.get("/albums/{album_id}/items")
-def get_album_items(album_id: str, page_size: int = 25, page_token: Optional[str] = None, session_id: str = Depends(require_session)):
-    """Get media items in an album"""
-    credentials = get_credentials(session_id)
+async def get_album_items(
+    album_id: str,
+    max_results: int = 25,
+    fields: Selection = Depends(field_selection(PHOTOS_MEDIA_SEARCH_ITEM)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """Get media items in an album (next page: `cursor` from X-Next-Cursor)"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_album_media_items(credentials, album_id, page_size, page_token)
+    scope = cursor_scope("photos.album_items", album_id=album_id, fields=fields)
+    page = await list_album_media_items_async(
+        credentials, album_id, page_size(max_results, "photos.album_items"), decode_cursor(cursor, scope), fields
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
 
 
 @router.get("/media")
-def get_media_items(page_size: int = 25, page_token: Optional[str] = None, session_id: str = Depends(require_session)):
-    """List all media items in library"""
-    credentials = get_credentials(session_id)
+async def get_media_items(
+    max_results: int = 25,
+    fields: Selection = Depends(field_selection(PHOTOS_MEDIA_LIST_ITEM)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """
+    List all media items in library (next page: `cursor` from X-Next-Cursor).
+    `fields` limits each item to e.g. id,base_url,mime_type
+    """
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_media_items(credentials, page_size, page_token)
+    scope = cursor_scope("photos.media", fields=fields)
+    page = await list_media_items_async(
+        credentials, page_size(max_results, "photos.media"), decode_cursor(cursor, scope), fields
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
 
 
 @router.get("/media/{media_item_id}")
-def get_media_item_details(media_item_id: str, session_id: str = Depends(require_session)):
+async def get_media_item_details(
+    media_item_id: str,
+    fields: Selection = Depends(field_selection(PHOTOS_MEDIA_ITEM)),
+    session_id: str = Depends(require_session),
+):
     """Get details of a specific media item"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_media_item(credentials, media_item_id)
+    return await get_media_item_async(credentials, media_item_id, fields)
 
 
 @router.post("/media/search")
-def search_media(filters: MediaSearchFilters, session_id: str = Depends(require_session)):
+async def search_media(
+    filters: MediaSearchFilters,
+    max_results: int = 25,
+    fields: Selection = Depends(field_selection(PHOTOS_MEDIA_SEARCH_ITEM)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
     """
-    Search media items with filters.
+    Search media items with filters (next page: `cursor` from X-Next-Cursor, same filters).
     Categories: LANDSCAPES, SELFIES, PEOPLE, PETS, WEDDINGS, BIRTHDAYS, DOCUMENTS, TRAVEL, ANIMALS, FOOD, etc.
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     
@@ -123,4 +188,9 @@ def search_media(filters: MediaSearchFilters, session_id: str = Depends(require_
     if filters.categories:
         api_filters["contentFilter"] = {"includedContentCategories": filters.categories}
     
-    return search_media_items(credentials, api_filters if api_filters else None)
+    scope = cursor_scope("photos.search", filters=api_filters, fields=fields)
+    page = await search_media_items_async(
+        credentials, api_filters if api_filters else None, page_size(max_results, "photos.search"),
+        decode_cursor(cursor, scope), fields,
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
@@ -2,35 +2,63 @@
 Google Photos Service
 Integrates with Google Photos Library API
 """
-from googleapiclient.discovery import build
+from google_services.client import build_service
+from google_services.fields import (
+    PHOTOS_ALBUM,
+    PHOTOS_MEDIA_ITEM,
+    PHOTOS_MEDIA_LIST_ITEM,
+    PHOTOS_MEDIA_SEARCH_ITEM,
+    PHOTOS_SHARED_ALBUM,
+    Resource,
+    Selection,
+)
 from typing import Any, Optional, List, Dict
 
 
 def get_photos_service(credentials: Any):
     """Create Google Photos service instance"""
-    return build("photoslibrary", "v1", credentials=credentials, static_discovery=False)
+    return build_service("photoslibrary", "v1", credentials, static_discovery=False)
 
 
-def list_albums(credentials: Any, page_size: int = 20, page_token: Optional[str] = None):
-    """List user's albums"""
-    service = get_photos_service(credentials)
-    
+def _page_params(page_size: int, page_token: Optional[str]) -> Dict[str, Any]:
+    """Build pageSize/pageToken parameters for list calls"""
     params: Dict[str, Any] = {"pageSize": page_size}
     if page_token:
         params["pageToken"] = page_token
+    return params
+
+
+def _fields_param(resource: Resource, fields: Selection, collection: Optional[str] = None) -> Dict[str, str]:
+    """`fields` keyword for a selection (empty: full objects); list calls keep nextPageToken"""
+    if fields is None:
+        return {}
+    mask = resource.mask(fields)
+    return {"fields": f"nextPageToken,{collection}({mask})" if collection else mask}
+
+
+def list_albums(credentials: Any, page_size: int = 20, page_token: Optional[str] = None, fields: Selection = None):
+    """List user's albums"""
+    service = get_photos_service(credentials)
     
-    response = service.albums().list(**params).execute()
+    response = service.albums().list(
+        **_page_params(page_size, page_token), **_fields_param(PHOTOS_ALBUM, fields, "albums")
+    ).execute()
     
+    return _format_albums(response, fields)
+
+
+def _format_albums(response: dict, fields: Selection = None):
+    """Shape an albums.list response for the API"""
     albums = []
     for album in response.get("albums", []):
-        albums.append({
+        albums.append(PHOTOS_ALBUM.project({
             "id": album.get("id"),
             "title": album.get("title"),
             "product_url": album.get("productUrl"),
             "cover_photo_url": album.get("coverPhotoBaseUrl"),
             "media_items_count": album.get("mediaItemsCount", 0),
             "is_writeable": album.get("isWriteable", False)
-        })
+        }, fields))
     
     return {
         "albums": albums,
@@ -38,20 +66,25 @@ def list_albums(credentials: Any, page_size: int = 20, page_token: Optional[str]
     }
 
 
-def get_album(credentials: Any, album_id: str):
+def get_album(credentials: Any, album_id: str, fields: Selection = None):
     """Get album details"""
     service = get_photos_service(credentials)
     
-    album = service.albums().get(albumId=album_id).execute()
+    album = service.albums().get(albumId=album_id, **_fields_param(PHOTOS_ALBUM, fields)).execute()
     
-    return {
+    return _format_album(album, fields)
+
+
+def _format_album(album: dict, fields: Selection = None):
+    """Shape a single album for the API"""
+    return PHOTOS_ALBUM.project({
         "id": album.get("id"),
         "title": album.get("title"),
         "product_url": album.get("productUrl"),
         "cover_photo_url": album.get("coverPhotoBaseUrl"),
         "media_items_count": album.get("mediaItemsCount", 0),
         "is_writeable": album.get("isWriteable", False)
-    }
+    }, fields)
 
 
 def create_album(credentials: Any, title: str):
@@ -64,6 +97,11 @@ def create_album(credentials: Any, title: str):
     
     album = service.albums().create(body=body).execute()
     
+    return _format_created_album(album)
+
+
+def _format_created_album(album: dict):
+    """Shape a newly created album for the API"""
     return {
         "id": album.get("id"),
         "title": album.get("title"),
@@ -72,19 +110,22 @@ def create_album(credentials: Any, title: str):
     }
 
 
-def list_media_items(credentials: Any, page_size: int = 25, page_token: Optional[str] = None):
+def list_media_items(credentials: Any, page_size: int = 25, page_token: Optional[str] = None, fields: Selection = None):
     """List media items in the library"""
     service = get_photos_service(credentials)
     
-    params: Dict[str, Any] = {"pageSize": page_size}
-    if page_token:
-        params["pageToken"] = page_token
-    
-    response = service.mediaItems().list(**params).execute()
+    response = service.mediaItems().list(
+        **_page_params(page_size, page_token), **_fields_param(PHOTOS_MEDIA_LIST_ITEM, fields, "mediaItems")
+    ).execute()
     
+    return _format_media_items(response, fields)
+
+
+def _format_media_items(response: dict, fields: Selection = None):
+    """Shape a mediaItems.list response for the API"""
     items = []
     for item in response.get("mediaItems", []):
-        items.append({
+        items.append(PHOTOS_MEDIA_LIST_ITEM.project({
             "id": item.get("id"),
             "filename": item.get("filename"),
             "description": item.get("description"),
@@ -95,7 +136,7 @@ def list_media_items(credentials: Any, page_size: int = 25, page_token: Optional
             "width": item.get("mediaMetadata", {}).get("width"),
             "height": item.get("mediaMetadata", {}).get("height"),
             "is_video": "video" in item.get("mediaMetadata", {})
-        })
+        }, fields))
     
     return {
         "media_items": items,
@@ -103,13 +144,18 @@ def list_media_items(credentials: Any, page_size: int = 25, page_token: Optional
     }
 
 
-def get_media_item(credentials: Any, media_item_id: str):
+def get_media_item(credentials: Any, media_item_id: str, fields: Selection = None):
     """Get a specific media item"""
     service = get_photos_service(credentials)
     
-    item = service.mediaItems().get(mediaItemId=media_item_id).execute()
+    item = service.mediaItems().get(mediaItemId=media_item_id, **_fields_param(PHOTOS_MEDIA_ITEM, fields)).execute()
     
-    return {
+    return _format_media_item(item, fields)
+
+
+def _format_media_item(item: dict, fields: Selection = None):
+    """Shape a single media item for the API"""
+    return PHOTOS_MEDIA_ITEM.project({
         "id": item.get("id"),
         "filename": item.get("filename"),
         "description": item.get("description"),
@@ -121,10 +167,12 @@ def get_media_item(credentials: Any, media_item_id: str):
         "height": item.get("mediaMetadata", {}).get("height"),
         "is_video": "video" in item.get("mediaMetadata", {}),
         "camera_info": item.get("mediaMetadata", {}).get("photo", {})
-    }
+    }, fields)
 
 
-def search_media_items(credentials: Any, filters: Optional[Dict] = None, page_size: int = 25, page_token: Optional[str] = None):
+def search_media_items(
+    credentials: Any, filters: Optional[Dict] = None, page_size: int = 25, page_token: Optional[str] = None, fields: Selection = None
+):
     """
     Search media items with filters.
     filters can include:
@@ -134,17 +182,22 @@ def search_media_items(credentials: Any, filters: Optional[Dict] = None, page_si
     """
     service = get_photos_service(credentials)
     
-    body: Dict[str, Any] = {"pageSize": page_size}
+    body = _page_params(page_size, page_token)
     if filters:
         body["filters"] = filters
-    if page_token:
-        body["pageToken"] = page_token
     
-    response = service.mediaItems().search(body=body).execute()
+    response = service.mediaItems().search(
+        body=body, **_fields_param(PHOTOS_MEDIA_SEARCH_ITEM, fields, "mediaItems")
+    ).execute()
     
+    return _format_search_results(response, fields)
+
+
+def _format_search_results(response: dict, fields: Selection = None):
+    """Shape a mediaItems.search response for the API"""
     items = []
     for item in response.get("mediaItems", []):
-        items.append({
+        items.append(PHOTOS_MEDIA_SEARCH_ITEM.project({
             "id": item.get("id"),
             "filename": item.get("filename"),
             "mime_type": item.get("mimeType"),
@@ -153,7 +206,7 @@ def search_media_items(credentials: Any, filters: Optional[Dict] = None, page_si
             "creation_time": item.get("mediaMetadata", {}).get("creationTime"),
             "width": item.get("mediaMetadata", {}).get("width"),
             "height": item.get("mediaMetadata", {}).get("height")
-        })
+        }, fields))
     
     return {
         "media_items": items,
@@ -161,60 +214,130 @@ def search_media_items(credentials: Any, filters: Optional[Dict] = None, page_si
     }
 
 
-def list_album_media_items(credentials: Any, album_id: str, page_size: int = 25, page_token: Optional[str] = None):
+def list_album_media_items(
+    credentials: Any, album_id: str, page_size: int = 25, page_token: Optional[str] = None, fields: Selection = None
+):
     """List media items in a specific album"""
     service = get_photos_service(credentials)
     
-    body: Dict[str, Any] = {
-        "albumId": album_id,
-        "pageSize": page_size
-    }
-    if page_token:
-        body["pageToken"] = page_token
+    body = _page_params(page_size, page_token)
+    body["albumId"] = album_id
     
-    response = service.mediaItems().search(body=body).execute()
-    
-    items = []
-    for item in response.get("mediaItems", []):
-        items.append({
-            "id": item.get("id"),
-            "filename": item.get("filename"),
-            "mime_type": item.get("mimeType"),
-            "base_url": item.get("baseUrl"),
-            "product_url": item.get("productUrl"),
-            "creation_time": item.get("mediaMetadata", {}).get("creationTime"),
-            "width": item.get("mediaMetadata", {}).get("width"),
-            "height": item.get("mediaMetadata", {}).get("height")
-        })
+    response = service.mediaItems().search(
+        body=body, **_fields_param(PHOTOS_MEDIA_SEARCH_ITEM, fields, "mediaItems")
+    ).execute()
     
-    return {
-        "media_items": items,
-        "next_page_token": response.get("nextPageToken")
-    }
+    return _format_search_results(response, fields)
 
 
-def list_shared_albums(credentials: Any, page_size: int = 20, page_token: Optional[str] = None):
+def list_shared_albums(credentials: Any, page_size: int = 20, page_token: Optional[str] = None, fields: Selection = None):
     """List shared albums"""
     service = get_photos_service(credentials)
     
-    params: Dict[str, Any] = {"pageSize": page_size}
-    if page_token:
-        params["pageToken"] = page_token
-    
-    response = service.sharedAlbums().list(**params).execute()
+    response = service.sharedAlbums().list(
+        **_page_params(page_size, page_token), **_fields_param(PHOTOS_SHARED_ALBUM, fields, "sharedAlbums")
+    ).execute()
     
+    return _format_shared_albums(response, fields)
+
+
+def _format_shared_albums(response: dict, fields: Selection = None):
+    """Shape a sharedAlbums.list response for the API"""
     albums = []
     for album in response.get("sharedAlbums", []):
-        albums.append({
+        albums.append(PHOTOS_SHARED_ALBUM.project({
             "id": album.get("id"),
             "title": album.get("title"),
             "product_url": album.get("productUrl"),
             "cover_photo_url": album.get("coverPhotoBaseUrl"),
             "media_items_count": album.get("mediaItemsCount", 0),
             "share_info": album.get("shareInfo", {})
-        })
+        }, fields))
     
     return {
         "shared_albums": albums,
         "next_page_token": response.get("nextPageToken")
     }
+
+
+# ============== ASYNC ==============
+
+async def list_albums_async(credentials: Any, page_size: int = 20, page_token: Optional[str] = None, fields: Selection = None):
+    """Async variant of list_albums"""
+    service = get_photos_service(credentials)
+    response = await service.albums().list(
+        **_page_params(page_size, page_token), **_fields_param(PHOTOS_ALBUM, fields, "albums")
+    ).execute_async()
+    return _format_albums(response, fields)
+
+
+async def get_album_async(credentials: Any, album_id: str, fields: Selection = None):
+    """Async variant of get_album"""
+    service = get_photos_service(credentials)
+    album = await service.albums().get(albumId=album_id, **_fields_param(PHOTOS_ALBUM, fields)).execute_async()
+    return _format_album(album, fields)
+
+
+async def create_album_async(credentials: Any, title: str):
+    """Async variant of create_album"""
+    service = get_photos_service(credentials)
+    album = await service.albums().create(body={"album": {"title": title}}).execute_async()
+    return _format_created_album(album)
+
+
+async def list_media_items_async(credentials: Any, page_size: int = 25, page_token: Optional[str] = None, fields: Selection = None):
+    """Async variant of list_media_items"""
+    service = get_photos_service(credentials)
+    response = await service.mediaItems().list(
+        **_page_params(page_size, page_token), **_fields_param(PHOTOS_MEDIA_LIST_ITEM, fields, "mediaItems")
+    ).execute_async()
+    return _format_media_items(response, fields)
+
+
+async def get_media_item_async(credentials: Any, media_item_id: str, fields: Selection = None):
+    """Async variant of get_media_item"""
+    service = get_photos_service(credentials)
+    item = await service.mediaItems().get(
+        mediaItemId=media_item_id, **_fields_param(PHOTOS_MEDIA_ITEM, fields)
+    ).execute_async()
+    return _format_media_item(item, fields)
+
+
+async def search_media_items_async(
+    credentials: Any, filters: Optional[Dict] = None, page_size: int = 25, page_token: Optional[str] = None, fields: Selection = None
+):
+    """Async variant of search_media_items"""
+    service = get_photos_service(credentials)
+    
+    body = _page_params(page_size, page_token)
+    if filters:
+        body["filters"] = filters
+    
+    response = await service.mediaItems().search(
+        body=body, **_fields_param(PHOTOS_MEDIA_SEARCH_ITEM, fields, "mediaItems")
+    ).execute_async()
+    return _format_search_results(response, fields)
+
+
+async def list_album_media_items_async(
+    credentials: Any, album_id: str, page_size: int = 25, page_token: Optional[str] = None, fields: Selection = None
+):
+    """Async variant of list_album_media_items"""
+    service = get_photos_service(credentials)
+    
+    body = _page_params(page_size, page_token)
+    body["albumId"] = album_id
+    
+    response = await service.mediaItems().search(
+        body=body, **_fields_param(PHOTOS_MEDIA_SEARCH_ITEM, fields, "mediaItems")
+    ).execute_async()
+    return _format_search_results(response, fields)
+
+
+async def list_shared_albums_async(credentials: Any, page_size: int = 20, page_token: Optional[str] = None, fields: Selection = None):
+    """Async variant of list_shared_albums"""
+    service = get_photos_service(credentials)
+    response = await service.sharedAlbums().list(
+        **_page_params(page_size, page_token), **_fields_param(PHOTOS_SHARED_ALBUM, fields, "sharedAlbums")
+    ).execute_async()
+    return _format_shared_albums(response, fields)
@@ -0,0 +1,287 @@
+"""
+Retry Policy
+Quota-aware retries, backoff and per-user pacing for Google API calls
+
+Every GoogleHttpRequest execution goes through call_with_retry() (or its async
+twin). Before each attempt the user's token bucket paces the call so bursts
+are smoothed out before Google starts rejecting them. Failed attempts are
+retried with exponential backoff and full jitter when that is safe:
+
+- 429 and rate-limit 403s (rateLimitExceeded / userRateLimitExceeded /
+  RESOURCE_EXHAUSTED) are retried for any method, since Google rejected the
+  request before acting on it.
+- 5xx responses and connection errors are only retried for idempotent
+  requests (GET/HEAD/PUT/DELETE and known read-only POSTs).
+
+Retry-After is honoured and also pauses the user's bucket so concurrent calls
+back off together. A Retry-After longer than GOOGLE_RETRY_MAX_DELAY is not
+waited out; the error is returned to the caller instead. Likewise a call that
+would wait longer than GOOGLE_RATE_LIMIT_MAX_WAIT_SECONDS for its user's
+bucket fails at once with a 429 (ThrottledError) rather than queueing, and a
+call cancelled while waiting hands its token back.
+"""
+import asyncio
+import email.utils
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import httplib2
+import httpx
+from googleapiclient.errors import HttpError
+
+from config import (
+    GOOGLE_RATE_LIMIT_BURST,
+    GOOGLE_RATE_LIMIT_MAX_WAIT_SECONDS,
+    GOOGLE_RATE_LIMIT_PER_SECOND,
+    GOOGLE_RETRY_BASE_DELAY,
+    GOOGLE_RETRY_MAX_ATTEMPTS,
+    GOOGLE_RETRY_MAX_DELAY,
+)
+from metrics import Counter, Histogram
+from google_services.cache import user_key
+
+IDEMPOTENT_HTTP_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+# POST methods that only read
+READ_ONLY_POST_METHODS = {"photoslibrary.mediaItems.search"}
+
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+TRANSIENT_ERRORS = (OSError, httplib2.HttpLib2Error, httpx.TransportError)
+
+google_api_retries = Counter(
+    "google_api_retries_total", "Retried upstream Google API attempts", ("method", "reason"))
+google_api_retry_delay = Histogram(
+    "google_api_retry_delay_seconds", "Backoff slept before a retry", ("method",))
+google_api_throttle_delay = Histogram(
+    "google_api_throttle_delay_seconds", "Time a call waited for its user's token bucket", ("method",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+google_api_throttle_rejected = Counter(
+    "google_api_throttle_rejected_total", "Calls failed with 429 instead of waiting out their user's token bucket",
+    ("method",))
+
+
+# ============== TOKEN BUCKETS ==============
+
+class ThrottledError(HttpError):
+    """
+    A 429 raised locally when a call would wait too long for its user's bucket.
+
+    Handled like a 429 from Google (status and Retry-After pass through), but
+    never retried: it is raised before the attempt.
+    """
+
+    def __init__(self, wait: float):
+        retry_after = str(max(int(wait + 0.999), 1))
+        content = json.dumps({"error": {
+            "code": 429,
+            "message": f"Too many Google API calls for this user; retry in {retry_after}s",
+            "status": "RESOURCE_EXHAUSTED",
+        }}).encode("utf-8")
+        super().__init__(httplib2.Response({"status": 429, "retry-after": retry_after}), content)
+        self.wait = wait
+
+
+class TokenBucket:
+    """Per-user call pacing: `rate` calls per second with bursts up to `burst`"""
+    __slots__ = ("rate", "burst", "tokens", "updated", "paused_until", "lock")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, max_wait: float = float("inf")) -> float:
+        """
+        Take one token; returns how long the caller must wait before using it.
+
+        Raises ThrottledError, leaving the bucket untouched, when that wait
+        would be longer than `max_wait`.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            wait = max(wait, self.paused_until - now)
+            if wait > max_wait:
+                raise ThrottledError(wait)
+            self.tokens -= 1
+            return wait
+
+    def refund(self):
+        """Give back a token reserved by a call that never ran (cancelled while waiting)"""
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+    def pause(self, seconds: float):
+        """Hold every call for this user (after a Retry-After)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def idle(self, now: float) -> bool:
+        return self.tokens >= self.burst - 1 and self.paused_until < now and now - self.updated > 60
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+_MAX_BUCKETS = 10000
+
+
+def bucket_for(credentials: Any) -> Optional[TokenBucket]:
+    if credentials is None or GOOGLE_RATE_LIMIT_PER_SECOND <= 0:
+        return None
+    key = user_key(credentials)
+    bucket = _buckets.get(key)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(key)
+            if bucket is None:
+                if len(_buckets) >= _MAX_BUCKETS:
+                    now = time.monotonic()
+                    for idle_key in [k for k, b in _buckets.items() if b.idle(now)]:
+                        del _buckets[idle_key]
+                bucket = _buckets[key] = TokenBucket(GOOGLE_RATE_LIMIT_PER_SECOND, GOOGLE_RATE_LIMIT_BURST)
+    return bucket
+
+
+# ============== POLICY ==============
+
+def is_idempotent(request: Any) -> bool:
+    return request.method in IDEMPOTENT_HTTP_METHODS or request.methodId in READ_ONLY_POST_METHODS
+
+
+def _rate_limit_reason(e: HttpError) -> Optional[str]:
+    """'rate_limit' if the error is Google asking us to slow down"""
+    if e.resp.status == 429:
+        return "rate_limit"
+    if e.resp.status != 403:
+        return None
+    try:
+        error = json.loads(e.content).get("error", {})
+    except (ValueError, AttributeError, TypeError):
+        return None
+    if error.get("status") == "RESOURCE_EXHAUSTED":
+        return "rate_limit"
+    if any(detail.get("reason") in RATE_LIMIT_REASONS for detail in error.get("errors", [])):
+        return "rate_limit"
+    return None
+
+
+def retry_after_seconds(resp: Any) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date)"""
+    value = resp.get("retry-after") if resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(GOOGLE_RETRY_MAX_DELAY, GOOGLE_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def _retry_delay(request: Any, error: Exception, attempt: int, bucket: Optional[TokenBucket]):
+    """(delay, reason) for the next attempt, or None if the error should be raised"""
+    if attempt + 1 >= GOOGLE_RETRY_MAX_ATTEMPTS or request.resumable is not None:
+        return None
+
+    if isinstance(error, HttpError):
+        reason = _rate_limit_reason(error)
+        if reason is None:
+            if error.resp.status not in RETRYABLE_STATUSES or not is_idempotent(request):
+                return None
+            reason = f"status_{error.resp.status}"
+        retry_after = retry_after_seconds(error.resp)
+        if retry_after is not None:
+            if retry_after > GOOGLE_RETRY_MAX_DELAY:
+                return None
+            if bucket is not None:
+                bucket.pause(retry_after)
+            return max(retry_after, _backoff(attempt)), reason
+        return _backoff(attempt), reason
+
+    if not is_idempotent(request):
+        return None
+    return _backoff(attempt), "transport"
+
+
+def _reserve(request: Any, bucket: TokenBucket) -> float:
+    """Reserve the next attempt's token; ThrottledError if the wait is over the cap"""
+    method = request.methodId or "unknown"
+    try:
+        wait = bucket.reserve(GOOGLE_RATE_LIMIT_MAX_WAIT_SECONDS)
+    except ThrottledError:
+        google_api_throttle_rejected.inc(method)
+        raise
+    google_api_throttle_delay.observe(wait, method)
+    return wait
+
+
+def _record_retry(request: Any, reason: str, delay: float):
+    method = request.methodId or "unknown"
+    google_api_retries.inc(method, reason)
+    google_api_retry_delay.observe(delay, method)
+
+
+def call_with_retry(request: Any, credentials: Any, send: Callable[[], Any]) -> Any:
+    """Run send() for request under the retry policy and the user's token bucket"""
+    bucket = bucket_for(credentials)
+    attempt = 0
+    while True:
+        if bucket is not None:
+            wait = _reserve(request, bucket)
+            if wait > 0:
+                time.sleep(wait)
+        try:
+            return send()
+        except (HttpError,) + TRANSIENT_ERRORS as e:
+            decision = _retry_delay(request, e, attempt, bucket)
+            if decision is None:
+                raise
+        delay, reason = decision
+        _record_retry(request, reason, delay)
+        time.sleep(delay)
+        attempt += 1
+
+
+async def call_with_retry_async(request: Any, credentials: Any, send: Callable[[], Any]) -> Any:
+    """Async variant of call_with_retry; send() returns an awaitable"""
+    bucket = bucket_for(credentials)
+    attempt = 0
+    while True:
+        if bucket is not None:
+            wait = _reserve(request, bucket)
+            if wait > 0:
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    bucket.refund()
+                    raise
+        try:
+            return await send()
+        except (HttpError,) + TRANSIENT_ERRORS as e:
+            decision = _retry_delay(request, e, attempt, bucket)
+            if decision is None:
+                raise
+        delay, reason = decision
+        _record_retry(request, reason, delay)
+        await asyncio.sleep(delay)
+        attempt += 1
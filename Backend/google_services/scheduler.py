@@ -0,0 +1,250 @@
+"""
+Upstream Scheduler
+Caps concurrent upstream Google calls per user and shares the rest fairly
+
+Every upstream attempt takes a slot before it is sent. At most
+UPSTREAM_PER_USER_CONCURRENCY attempts run for one user (keyed like the
+response cache, by a hash of the user's token) and at most
+UPSTREAM_MAX_CONCURRENCY run in the whole process. Attempts beyond either cap
+wait in a per-user queue; freed slots are handed out round-robin across the
+users that are waiting, so one user paging through /keep/notes/all or running
+/smart-summary in a loop cannot push everyone else to the back of the line.
+
+Works for both execution paths: async attempts wait on a future, sync
+attempts (threadpool workers) on an event. Slots are granted under the lock
+but waiters are woken after it is released; a waiter whose event loop has
+closed is skipped and its slot goes to the next one in line.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from config import UPSTREAM_MAX_CONCURRENCY, UPSTREAM_PER_USER_CONCURRENCY
+from metrics import Gauge, Histogram
+from google_services.cache import user_key
+
+upstream_queue_depth = Gauge(
+    "upstream_queue_depth", "Upstream Google attempts waiting for a scheduler slot")
+upstream_active = Gauge(
+    "upstream_active_slots", "Upstream Google attempts holding a scheduler slot")
+upstream_queue_wait = Histogram(
+    "upstream_queue_wait_seconds", "Time an upstream attempt waited for a scheduler slot",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+
+
+class _Waiter:
+    """A queued attempt; woken from whichever thread releases a slot"""
+    __slots__ = ("future", "loop", "event", "granted", "reclaimed")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+        self.granted = False
+        # Its granted slot was given back on its behalf (abandoned, or loop closed)
+        self.reclaimed = False
+
+    def dead(self) -> bool:
+        return self.loop is not None and self.loop.is_closed()
+
+    def wake(self) -> bool:
+        """Tell the attempt it holds a slot; False if its event loop has closed"""
+        if self.event is not None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            # Closed since _dispatch checked it
+            return False
+        return True
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class FairScheduler:
+    """Global + per-user concurrency limits with round-robin hand-off"""
+
+    def __init__(self, capacity: int, per_user: int):
+        self.capacity = capacity
+        self.per_user = per_user
+        self.active = 0
+        self._lock = threading.Lock()
+        self._active_by_user: Dict[str, int] = {}
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        # Users with queued attempts, in round-robin order
+        self._ring: Deque[str] = deque()
+        self.queued = 0
+        self.admitted = 0
+        self.waited = 0
+
+    def _admissible(self, user: str) -> bool:
+        return self.active < self.capacity and self._active_by_user.get(user, 0) < self.per_user
+
+    def _grant(self, user: str):
+        self.active += 1
+        self.admitted += 1
+        self._active_by_user[user] = self._active_by_user.get(user, 0) + 1
+        upstream_active.set(self.active)
+
+    def _try_enter(self, user: str, waiter_factory) -> Optional[_Waiter]:
+        """Take a slot now (returns None) or enqueue and return the waiter"""
+        with self._lock:
+            if user not in self._queues and self._admissible(user):
+                self._grant(user)
+                return None
+            waiter = waiter_factory()
+            queue = self._queues.get(user)
+            if queue is None:
+                queue = self._queues[user] = deque()
+                self._ring.append(user)
+            queue.append(waiter)
+            self.queued += 1
+            self.waited += 1
+            upstream_queue_depth.set(self.queued)
+            return waiter
+
+    def _dispatch(self) -> List[Tuple[str, _Waiter]]:
+        """
+        Grant free slots to queued users, one attempt per user per turn (lock
+        held); returns the waiters to wake once the lock is released
+        """
+        granted = []
+        skipped = 0
+        while self._ring and self.active < self.capacity and skipped < len(self._ring):
+            user = self._ring.popleft()
+            if self._active_by_user.get(user, 0) >= self.per_user:
+                self._ring.append(user)
+                skipped += 1
+                continue
+            skipped = 0
+            queue = self._queues[user]
+            waiter = queue.popleft()
+            self.queued -= 1
+            # Nothing can run on a closed loop; drop the waiter instead of granting it
+            if not waiter.dead():
+                self._grant(user)
+                waiter.granted = True
+                granted.append((user, waiter))
+            if queue:
+                self._ring.append(user)
+            else:
+                del self._queues[user]
+        upstream_queue_depth.set(self.queued)
+        return granted
+
+    def _free(self, user: str) -> List[Tuple[str, _Waiter]]:
+        """Return one of the user's slots and re-dispatch (lock held)"""
+        self.active -= 1
+        remaining = self._active_by_user.get(user, 1) - 1
+        if remaining:
+            self._active_by_user[user] = remaining
+        else:
+            self._active_by_user.pop(user, None)
+        upstream_active.set(self.active)
+        return self._dispatch()
+
+    def _reclaim(self, user: str, waiter: _Waiter) -> List[Tuple[str, _Waiter]]:
+        """Free a granted waiter's slot on its behalf, at most once (lock held)"""
+        if waiter.reclaimed:
+            return []
+        waiter.reclaimed = True
+        return self._free(user)
+
+    def _wake(self, granted: List[Tuple[str, _Waiter]]):
+        """Wake granted waiters (lock not held); a closed loop's slot is passed on"""
+        while granted:
+            user, waiter = granted.pop(0)
+            if not waiter.wake():
+                with self._lock:
+                    granted.extend(self._reclaim(user, waiter))
+
+    def release(self, user: str):
+        with self._lock:
+            granted = self._free(user)
+        self._wake(granted)
+
+    def _abandon(self, user: str, waiter: _Waiter):
+        """A queued attempt gave up (cancelled); free its slot if it was just granted"""
+        granted = []
+        with self._lock:
+            if waiter.granted:
+                granted = self._reclaim(user, waiter)
+            else:
+                queue = self._queues.get(user)
+                if queue is not None and waiter in queue:
+                    queue.remove(waiter)
+                    self.queued -= 1
+                    if not queue:
+                        del self._queues[user]
+                        self._ring.remove(user)
+                upstream_queue_depth.set(self.queued)
+        self._wake(granted)
+
+    @contextmanager
+    def slot(self, user: Optional[str]):
+        """Hold a slot for one blocking upstream attempt"""
+        if user is None or self.capacity <= 0:
+            yield
+            return
+        waiter = self._try_enter(user, _Waiter)
+        if waiter is not None:
+            started = time.perf_counter()
+            waiter.event.wait()
+            upstream_queue_wait.observe(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self.release(user)
+
+    @asynccontextmanager
+    async def slot_async(self, user: Optional[str]):
+        """Hold a slot for one async upstream attempt"""
+        if user is None or self.capacity <= 0:
+            yield
+            return
+        loop = asyncio.get_running_loop()
+        waiter = self._try_enter(user, lambda: _Waiter(loop))
+        if waiter is not None:
+            started = time.perf_counter()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                self._abandon(user, waiter)
+                raise
+            upstream_queue_wait.observe(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self.release(user)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "per_user": self.per_user,
+                "active": self.active,
+                "active_users": len(self._active_by_user),
+                "queued": self.queued,
+                "waiting_users": len(self._queues),
+                "admitted": self.admitted,
+                "queued_total": self.waited,
+                "max_queue_per_user": max((len(q) for q in self._queues.values()), default=0),
+            }
+
+
+_scheduler = FairScheduler(UPSTREAM_MAX_CONCURRENCY, UPSTREAM_PER_USER_CONCURRENCY)
+
+
+def get_scheduler() -> FairScheduler:
+    return _scheduler
+
+
+def scheduler_key(credentials: Any) -> Optional[str]:
+    """Scheduling key for a user's credentials (None skips scheduling)"""
+    return user_key(credentials) if credentials is not None else None
@@ -0,0 +1,57 @@
+"""
+Unified Search API Routes
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from auth.router import get_credentials_async
+from auth.dependencies import require_session
+from responses import FastJSONRoute, dumps
+from config import SEARCH_DEADLINE_SECONDS
+from google_services.search_service import SOURCES, default_sources, search_all, search_stream, source_granted
+
+router = APIRouter(prefix="/search", tags=["Search"], route_class=FastJSONRoute)
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, description="Search text"),
+    sources: Optional[str] = Query(None, description="Comma-separated subset of gmail, drive, contacts, keep (default: all granted)"),
+    limit: int = Query(10, ge=1, le=50, description="Hits per source and in the merged ranking"),
+    stream: bool = Query(True, description="Stream NDJSON events as each source answers"),
+    session_id: str = Depends(require_session),
+):
+    """
+    Search Gmail, Drive, Contacts and Keep at once.
+
+    With stream=true (default) the response is NDJSON: one `results` (or
+    `error`) line per source as soon as it answers, then a `done` line with the
+    merged ranking. With stream=false only the merged ranking is returned.
+    Keep is searched only when the user granted the Keep scope.
+    """
+    names = None if not sources else [name.strip() for name in sources.split(",") if name.strip()]
+    unknown = [name for name in names or () if name not in SOURCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sources: {', '.join(unknown)}")
+
+    credentials = await get_credentials_async(session_id)
+    if not credentials:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+    if names is None:
+        names = default_sources(credentials)
+    ungranted = [name for name in names if not source_granted(credentials, name)]
+    if ungranted:
+        raise HTTPException(status_code=403, detail=f"Scope not granted for sources: {', '.join(ungranted)}")
+
+    if not stream:
+        return await search_all(credentials, q, names, limit, SEARCH_DEADLINE_SECONDS)
+
+    async def lines():
+        async for event in search_stream(credentials, q, names, limit, SEARCH_DEADLINE_SECONDS):
+            yield dumps(event) + b"\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
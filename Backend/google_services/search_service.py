@@ -0,0 +1,253 @@
+"""
+Unified Search Service
+Searches Gmail, Drive, Contacts and Keep at once and ranks the hits together
+
+Every source is queried concurrently under one deadline. Hits are normalized to
+{source, id, title, snippet, url, timestamp, score}, where score combines how
+much of the query appears in the title and snippet with how recent the item is.
+search_stream() yields each source's hits as soon as that source answers,
+followed by the merged ranking once all sources are in (or the deadline passes).
+
+Keep is only searched for users who granted its scope; its scope is not in
+config.SCOPES by default (the Keep API is Workspace-only).
+"""
+import asyncio
+import email.utils
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+from google_services.breaker import CircuitOpenError
+from google_services.gmail_service import list_messages_async
+from google_services.drive_service import search_files_async
+from google_services.contacts_service import search_contacts_async
+from google_services.keep_service import format_note_for_display, list_notes_async
+
+# Score = relevance (0-1) + RECENCY_WEIGHT * exp(-age / RECENCY_DAYS)
+RECENCY_WEIGHT = 0.3
+RECENCY_DAYS = 30.0
+
+TITLE_WEIGHT = 2.0
+SNIPPET_WEIGHT = 1.0
+
+
+# ============== SCORING ==============
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """RFC 3339 (Drive/Keep) or RFC 2822 (Gmail Date header) timestamps"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def score_hit(hit: Dict[str, Any], terms: List[str], now: datetime) -> float:
+    """Relevance of the hit's title/snippet to the query terms plus a recency boost"""
+    title = (hit.get("title") or "").lower()
+    snippet = (hit.get("snippet") or "").lower()
+    relevance = 0.0
+    if terms:
+        matched = sum(TITLE_WEIGHT * (term in title) + SNIPPET_WEIGHT * (term in snippet) for term in terms)
+        relevance = matched / (len(terms) * (TITLE_WEIGHT + SNIPPET_WEIGHT))
+
+    recency = 0.0
+    when = _parse_time(hit.get("timestamp"))
+    if when is not None:
+        age_days = max((now - when).total_seconds() / 86400, 0.0)
+        recency = math.exp(-age_days / RECENCY_DAYS)
+    return round(relevance + RECENCY_WEIGHT * recency, 4)
+
+
+# ============== SOURCES ==============
+
+async def _search_gmail(credentials: Any, query: str, limit: int) -> List[Dict[str, Any]]:
+    messages = await list_messages_async(credentials, max_results=limit, query=query)
+    return [
+        {
+            "id": msg["id"],
+            "title": msg.get("subject", ""),
+            "snippet": msg.get("snippet", ""),
+            "url": f"https://mail.google.com/mail/u/0/#all/{msg['threadId']}",
+            "timestamp": msg.get("date"),
+            "from": msg.get("from"),
+        }
+        for msg in messages
+    ]
+
+
+async def _search_drive(credentials: Any, query: str, limit: int) -> List[Dict[str, Any]]:
+    files = await search_files_async(credentials, query, max_results=limit)
+    return [
+        {
+            "id": f["id"],
+            "title": f.get("name", ""),
+            "snippet": f.get("mimeType", ""),
+            "url": f.get("webViewLink"),
+            "timestamp": f.get("modifiedTime"),
+        }
+        for f in files
+    ]
+
+
+async def _search_contacts(credentials: Any, query: str, limit: int) -> List[Dict[str, Any]]:
+    results = await search_contacts_async(credentials, query, max_results=limit)
+    hits = []
+    for result in results:
+        person = result.get("person", {})
+        names = person.get("names", [])
+        emails = [e.get("value") for e in person.get("emailAddresses", [])]
+        phones = [p.get("value") for p in person.get("phoneNumbers", [])]
+        hits.append({
+            "id": person.get("resourceName"),
+            "title": names[0].get("displayName", "") if names else (emails[0] if emails else ""),
+            "snippet": ", ".join(emails + phones),
+            "url": None,
+            "timestamp": None,
+        })
+    return hits
+
+
+async def _search_keep(credentials: Any, query: str, limit: int) -> List[Dict[str, Any]]:
+    """Keep has no search API: match the first page of notes locally"""
+    result = await list_notes_async(credentials, page_size=100, filter_str="trashed=false")
+    terms = query.lower().split()
+    hits = []
+    for note in result.get("notes", []):
+        formatted = format_note_for_display(note)
+        text = formatted.get("content") or "\n".join(item["text"] for item in formatted.get("items", []))
+        haystack = f"{formatted.get('title', '')}\n{text}".lower()
+        if not all(term in haystack for term in terms):
+            continue
+        hits.append({
+            "id": formatted["id"],
+            "title": formatted.get("title", ""),
+            "snippet": text[:200],
+            "url": f"https://keep.google.com/#NOTE/{formatted['id']}",
+            "timestamp": formatted.get("updateTime"),
+        })
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+# Source name -> search(credentials, query, limit)
+SOURCES: Dict[str, Callable[[Any, str, int], Awaitable[List[Dict[str, Any]]]]] = {
+    "gmail": _search_gmail,
+    "drive": _search_drive,
+    "contacts": _search_contacts,
+    "keep": _search_keep,
+}
+
+# Sources whose scope is optional -> scopes that grant access (any of them)
+SOURCE_SCOPES: Dict[str, Tuple[str, ...]] = {
+    "keep": (
+        "https://www.googleapis.com/auth/keep",
+        "https://www.googleapis.com/auth/keep.readonly",
+    ),
+}
+
+
+def source_granted(credentials: Any, name: str) -> bool:
+    """True if the user's credentials carry the scope `name` needs"""
+    required = SOURCE_SCOPES.get(name)
+    if not required:
+        return True
+    granted = getattr(credentials, "granted_scopes", None) or getattr(credentials, "scopes", None) or ()
+    return any(scope in granted for scope in required)
+
+
+def default_sources(credentials: Any) -> List[str]:
+    """Every source the user has granted access to"""
+    return [name for name in SOURCES if source_granted(credentials, name)]
+
+
+def _source_error(e: BaseException) -> Dict[str, Any]:
+    if isinstance(e, CircuitOpenError):
+        return {"status": 503, "detail": str(e)}
+    if isinstance(e, HttpError):
+        status = e.resp.status
+        return {"status": status if 400 <= status < 500 else 502, "detail": e.reason or str(e)}
+    return {"status": 500, "detail": str(e)}
+
+
+async def _run_source(name: str, credentials: Any, query: str, limit: int, terms: List[str]):
+    """(hits, error, elapsed ms) for one source; hits are normalized and scored"""
+    started = time.perf_counter()
+    try:
+        hits = await SOURCES[name](credentials, query, limit)
+    except Exception as e:
+        return [], _source_error(e), (time.perf_counter() - started) * 1000
+    now = datetime.now(timezone.utc)
+    for hit in hits:
+        hit["source"] = name
+        hit["score"] = score_hit(hit, terms, now)
+    hits.sort(key=lambda hit: hit["score"], reverse=True)
+    return hits, None, (time.perf_counter() - started) * 1000
+
+
+# ============== SEARCH ==============
+
+async def search_stream(
+    credentials: Any, query: str, sources: List[str], limit: int, deadline: float
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield {"type": "results", "source", "hits", "took_ms"} (or "type": "error")
+    per source as it answers, then {"type": "done", "hits", "errors", "timings_ms"}
+    with the merged top `limit` hits. Sources still running at the deadline are
+    cancelled and reported as 504.
+    """
+    terms = query.lower().split()
+    tasks = {
+        asyncio.ensure_future(_run_source(name, credentials, query, limit, terms)): name
+        for name in sources
+    }
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + deadline
+    merged: List[Dict[str, Any]] = []
+    errors: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = ends_at - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                hits, error, elapsed_ms = task.result()
+                timings[name] = round(elapsed_ms, 1)
+                if error is not None:
+                    errors[name] = error
+                    yield {"type": "error", "source": name, "error": error, "took_ms": timings[name]}
+                else:
+                    merged.extend(hits)
+                    yield {"type": "results", "source": name, "hits": hits, "took_ms": timings[name]}
+    finally:
+        for task in pending:
+            task.cancel()
+
+    for task in pending:
+        name = tasks[task]
+        errors[name] = {"status": 504, "detail": f"No answer within {deadline:g}s"}
+        yield {"type": "error", "source": name, "error": errors[name]}
+
+    merged.sort(key=lambda hit: hit["score"], reverse=True)
+    yield {"type": "done", "hits": merged[:limit], "errors": errors, "timings_ms": timings}
+
+
+async def search_all(credentials: Any, query: str, sources: List[str], limit: int, deadline: float) -> Dict[str, Any]:
+    """Non-streaming search: just the final merged result"""
+    final: Dict[str, Any] = {}
+    async for event in search_stream(credentials, query, sources, limit, deadline):
+        final = event
+    final.pop("type", None)
+    return final
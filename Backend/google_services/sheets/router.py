@@ -4,19 +4,21 @@ Google Sheets API Routes
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
-from auth.router import get_credentials
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
+from responses import FastJSONRoute
+from google_services.fields import SPREADSHEET, Selection, field_selection
 from google_services.sheets_service import (
-    get_spreadsheet,
-    read_range,
-    write_range,
-    append_rows,
-    clear_range,
-    create_spreadsheet,
-    add_sheet,
+    get_spreadsheet_async,
+    read_range_async,
+    write_range_async,
+    append_rows_async,
+    clear_range_async,
+    create_spreadsheet_async,
+    add_sheet_async,
 )
 
-router = APIRouter(prefix="/sheets", tags=["Google Sheets"])
+router = APIRouter(prefix="/sheets", tags=["Google Sheets"], route_class=FastJSONRoute)
 
 
 class WriteData(BaseModel):
@@ -39,66 +41,70 @@ class SheetAdd(BaseModel):
 
 
 @router.get("/{spreadsheet_id}")
-def get_sheet_info(spreadsheet_id: str, session_id: str = Depends(require_session)):
-    """Get spreadsheet metadata"""
-    credentials = get_credentials(session_id)
+async def get_sheet_info(
+    spreadsheet_id: str,
+    fields: Selection = Depends(field_selection(SPREADSHEET)),
+    session_id: str = Depends(require_session),
+):
+    """Get spreadsheet metadata; `fields` selects from id,title,locale,sheets,url"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_spreadsheet(credentials, spreadsheet_id)
+    return await get_spreadsheet_async(credentials, spreadsheet_id, fields)
 
 
 @router.get("/{spreadsheet_id}/read")
-def read_data(spreadsheet_id: str, range: str = "Sheet1", session_id: str = Depends(require_session)):
+async def read_data(spreadsheet_id: str, range: str = "Sheet1", session_id: str = Depends(require_session)):
     """
     Read data from a spreadsheet range.
     Range examples: "Sheet1!A1:D10", "Sheet1", "A1:B5"
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return read_range(credentials, spreadsheet_id, range)
+    return await read_range_async(credentials, spreadsheet_id, range)
 
 
 @router.post("/{spreadsheet_id}/write")
-def write_data(spreadsheet_id: str, data: WriteData, session_id: str = Depends(require_session)):
+async def write_data(spreadsheet_id: str, data: WriteData, session_id: str = Depends(require_session)):
     """Write data to a spreadsheet range"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return write_range(credentials, spreadsheet_id, data.range, data.values)
+    return await write_range_async(credentials, spreadsheet_id, data.range, data.values)
 
 
 @router.post("/{spreadsheet_id}/append")
-def append_data(spreadsheet_id: str, data: AppendData, session_id: str = Depends(require_session)):
+async def append_data(spreadsheet_id: str, data: AppendData, session_id: str = Depends(require_session)):
     """Append rows to a spreadsheet"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return append_rows(credentials, spreadsheet_id, data.range, data.values)
+    return await append_rows_async(credentials, spreadsheet_id, data.range, data.values)
 
 
 @router.delete("/{spreadsheet_id}/clear")
-def clear_data(spreadsheet_id: str, range: str, session_id: str = Depends(require_session)):
+async def clear_data(spreadsheet_id: str, range: str, session_id: str = Depends(require_session)):
     """Clear data from a range"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return clear_range(credentials, spreadsheet_id, range)
+    return await clear_range_async(credentials, spreadsheet_id, range)
 
 
 @router.post("/")
-def create_new_spreadsheet(spreadsheet: SpreadsheetCreate, session_id: str = Depends(require_session)):
+async def create_new_spreadsheet(spreadsheet: SpreadsheetCreate, session_id: str = Depends(require_session)):
     """Create a new spreadsheet"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return create_spreadsheet(credentials, spreadsheet.title, spreadsheet.sheets)
+    return await create_spreadsheet_async(credentials, spreadsheet.title, spreadsheet.sheets)
 
 
 @router.post("/{spreadsheet_id}/sheets")
-def add_new_sheet(spreadsheet_id: str, sheet: SheetAdd, session_id: str = Depends(require_session)):
+async def add_new_sheet(spreadsheet_id: str, sheet: SheetAdd, session_id: str = Depends(require_session)):
     """Add a new sheet to an existing spreadsheet"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return add_sheet(credentials, spreadsheet_id, sheet.title)
+    return await add_sheet_async(credentials, spreadsheet_id, sheet.title)
@@ -2,23 +2,34 @@
 Google Sheets Service
 Integrates with Sheets API for spreadsheet operations
 """
-from googleapiclient.discovery import build
+from google_services.client import build_service
+from google_services.cache import cached, invalidates
+from google_services.singleflight import single_flight
+from google_services.fields import SPREADSHEET, Selection
 from typing import Any, List, Optional, Dict
 
 
 def get_sheets_service(credentials: Any):
     """Create Google Sheets service instance"""
-    return build("sheets", "v4", credentials=credentials)
+    return build_service("sheets", "v4", credentials)
 
 
-def get_spreadsheet(credentials: Any, spreadsheet_id: str):
-    """Get spreadsheet metadata"""
+@cached("sheets.spreadsheet", ttl=60)
+@single_flight("sheets.spreadsheet")
+def get_spreadsheet(credentials: Any, spreadsheet_id: str, fields: Selection = None):
+    """Get spreadsheet metadata (only the fields the response uses)"""
     service = get_sheets_service(credentials)
     
     spreadsheet = service.spreadsheets().get(
-        spreadsheetId=spreadsheet_id
+        spreadsheetId=spreadsheet_id,
+        fields=SPREADSHEET.mask(fields)
     ).execute()
     
+    return SPREADSHEET.project(_format_spreadsheet(spreadsheet), fields)
+
+
+def _format_spreadsheet(spreadsheet: dict):
+    """Shape spreadsheet metadata for the API response"""
     return {
         "id": spreadsheet.get("spreadsheetId"),
         "title": spreadsheet.get("properties", {}).get("title"),
@@ -55,6 +66,7 @@ def read_range(credentials: Any, spreadsheet_id: str, range: str):
     }
 
 
+@invalidates("sheets.spreadsheet")
 def write_range(credentials: Any, spreadsheet_id: str, range: str, values: List[List]):
     """
     Write data to a spreadsheet range
@@ -71,6 +83,11 @@ def write_range(credentials: Any, spreadsheet_id: str, range: str, values: List[
         body=body
     ).execute()
     
+    return _format_update(result)
+
+
+def _format_update(result: dict):
+    """Shape a values.update result for the API response"""
     return {
         "updated_range": result.get("updatedRange"),
         "updated_rows": result.get("updatedRows"),
@@ -79,6 +96,7 @@ def write_range(credentials: Any, spreadsheet_id: str, range: str, values: List[
     }
 
 
+@invalidates("sheets.spreadsheet")
 def append_rows(credentials: Any, spreadsheet_id: str, range: str, values: List[List]):
     """Append rows to a spreadsheet"""
     service = get_sheets_service(credentials)
@@ -93,6 +111,11 @@ def append_rows(credentials: Any, spreadsheet_id: str, range: str, values: List[
         body=body
     ).execute()
     
+    return _format_append(result)
+
+
+def _format_append(result: dict):
+    """Shape a values.append result for the API response"""
     return {
         "updated_range": result.get("updates", {}).get("updatedRange"),
         "updated_rows": result.get("updates", {}).get("updatedRows"),
@@ -100,6 +123,7 @@ def append_rows(credentials: Any, spreadsheet_id: str, range: str, values: List[
     }
 
 
+@invalidates("sheets.spreadsheet")
 def clear_range(credentials: Any, spreadsheet_id: str, range: str):
     """Clear data from a range"""
     service = get_sheets_service(credentials)
@@ -116,6 +140,17 @@ def create_spreadsheet(credentials: Any, title: str, sheets: Optional[List[str]]
     """Create a new spreadsheet"""
     service = get_sheets_service(credentials)
     
+    spreadsheet = service.spreadsheets().create(body=_spreadsheet_body(title, sheets)).execute()
+    
+    return {
+        "id": spreadsheet.get("spreadsheetId"),
+        "title": title,
+        "url": spreadsheet.get("spreadsheetUrl")
+    }
+
+
+def _spreadsheet_body(title: str, sheets: Optional[List[str]]):
+    """Build the body for spreadsheets.create"""
     spreadsheet_body: Dict[str, Any] = {
         "properties": {"title": title}
     }
@@ -126,31 +161,133 @@ def create_spreadsheet(credentials: Any, title: str, sheets: Optional[List[str]]
             for sheet_name in sheets
         ]
     
-    spreadsheet = service.spreadsheets().create(body=spreadsheet_body).execute()
-    
-    return {
-        "id": spreadsheet.get("spreadsheetId"),
-        "title": title,
-        "url": spreadsheet.get("spreadsheetUrl")
-    }
+    return spreadsheet_body
 
 
+@invalidates("sheets.spreadsheet")
 def add_sheet(credentials: Any, spreadsheet_id: str, sheet_title: str):
     """Add a new sheet to an existing spreadsheet"""
     service = get_sheets_service(credentials)
     
-    request = {
+    result = service.spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body=_add_sheet_body(sheet_title)
+    ).execute()
+    
+    return {
+        "sheet_id": result.get("replies", [{}])[0].get("addSheet", {}).get("properties", {}).get("sheetId"),
+        "title": sheet_title
+    }
+
+
+def _add_sheet_body(sheet_title: str):
+    """Build the batchUpdate body that adds one sheet"""
+    return {
         "requests": [{
             "addSheet": {
                 "properties": {"title": sheet_title}
             }
         }]
     }
+
+
+# ============== ASYNC ==============
+
+@cached("sheets.spreadsheet", ttl=60)
+@single_flight("sheets.spreadsheet")
+async def get_spreadsheet_async(credentials: Any, spreadsheet_id: str, fields: Selection = None):
+    """Async variant of get_spreadsheet"""
+    service = get_sheets_service(credentials)
     
-    result = service.spreadsheets().batchUpdate(
+    spreadsheet = await service.spreadsheets().get(
         spreadsheetId=spreadsheet_id,
-        body=request
-    ).execute()
+        fields=SPREADSHEET.mask(fields)
+    ).execute_async()
+    
+    return SPREADSHEET.project(_format_spreadsheet(spreadsheet), fields)
+
+
+async def read_range_async(credentials: Any, spreadsheet_id: str, range: str):
+    """Async variant of read_range"""
+    service = get_sheets_service(credentials)
+    
+    result = await service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=range
+    ).execute_async()
+    
+    return {
+        "range": result.get("range"),
+        "values": result.get("values", [])
+    }
+
+
+@invalidates("sheets.spreadsheet")
+async def write_range_async(credentials: Any, spreadsheet_id: str, range: str, values: List[List]):
+    """Async variant of write_range"""
+    service = get_sheets_service(credentials)
+    
+    result = await service.spreadsheets().values().update(
+        spreadsheetId=spreadsheet_id,
+        range=range,
+        valueInputOption="USER_ENTERED",
+        body={"values": values}
+    ).execute_async()
+    
+    return _format_update(result)
+
+
+@invalidates("sheets.spreadsheet")
+async def append_rows_async(credentials: Any, spreadsheet_id: str, range: str, values: List[List]):
+    """Async variant of append_rows"""
+    service = get_sheets_service(credentials)
+    
+    result = await service.spreadsheets().values().append(
+        spreadsheetId=spreadsheet_id,
+        range=range,
+        valueInputOption="USER_ENTERED",
+        insertDataOption="INSERT_ROWS",
+        body={"values": values}
+    ).execute_async()
+    
+    return _format_append(result)
+
+
+@invalidates("sheets.spreadsheet")
+async def clear_range_async(credentials: Any, spreadsheet_id: str, range: str):
+    """Async variant of clear_range"""
+    service = get_sheets_service(credentials)
+    
+    await service.spreadsheets().values().clear(
+        spreadsheetId=spreadsheet_id,
+        range=range
+    ).execute_async()
+    
+    return {"message": f"Range {range} cleared successfully"}
+
+
+async def create_spreadsheet_async(credentials: Any, title: str, sheets: Optional[List[str]] = None):
+    """Async variant of create_spreadsheet"""
+    service = get_sheets_service(credentials)
+    
+    spreadsheet = await service.spreadsheets().create(body=_spreadsheet_body(title, sheets)).execute_async()
+    
+    return {
+        "id": spreadsheet.get("spreadsheetId"),
+        "title": title,
+        "url": spreadsheet.get("spreadsheetUrl")
+    }
+
+
+@invalidates("sheets.spreadsheet")
+async def add_sheet_async(credentials: Any, spreadsheet_id: str, sheet_title: str):
+    """Async variant of add_sheet"""
+    service = get_sheets_service(credentials)
+    
+    result = await service.spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body=_add_sheet_body(sheet_title)
+    ).execute_async()
     
     return {
         "sheet_id": result.get("replies", [{}])[0].get("addSheet", {}).get("properties", {}).get("sheetId"),
@@ -0,0 +1,146 @@
+"""
+Single-flight Reads
+Collapses identical concurrent reads for the same user into one upstream call
+
+Service functions opt in with @single_flight(op). While a call for a given
+(user, op, arguments) key is in flight, further identical calls wait for it
+and receive a copy of its result (or its exception) instead of calling Google
+again. Nothing is kept once the call finishes; see google_services.cache for
+reuse across time.
+
+Under @cached, the ETag a call revalidates with is part of the key, so a 304
+only reaches callers that sent the same If-None-Match (and so hold the entry
+it renews), and collapsed callers record the ETag of the shared response.
+"""
+import asyncio
+import copy
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from google_services.cache import adopt_revalidation, call_key, current_revalidation
+
+FlightKey = Tuple[str, str, str, Optional[str]]
+
+
+class _Flight:
+    """A sync call in progress, shared by its waiters"""
+    __slots__ = ("done", "result", "error", "revalidation")
+
+    def __init__(self, revalidation: Any):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.revalidation = revalidation
+
+
+class _Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.upstream = 0
+        self.collapsed = 0
+
+    def record(self, collapsed: bool):
+        with self.lock:
+            self.calls += 1
+            if collapsed:
+                self.collapsed += 1
+            else:
+                self.upstream += 1
+
+
+_counters = _Counters()
+_flights: Dict[FlightKey, _Flight] = {}
+_flights_lock = threading.Lock()
+_tasks: Dict[FlightKey, Tuple["asyncio.Task", Any]] = {}
+
+
+def _flight_key(signature: inspect.Signature, op: str, args, kwargs, revalidation: Any) -> FlightKey:
+    return (*call_key(signature, op, args, kwargs), revalidation.etag if revalidation else None)
+
+
+def _landed(key: FlightKey, task: "asyncio.Task"):
+    _tasks.pop(key, None)
+    if not task.cancelled():
+        task.exception()  # retrieved here in case every caller was cancelled
+
+
+def single_flight(op: str) -> Callable:
+    """
+    Share one in-flight call among concurrent identical calls.
+
+    The function's first argument must be the user's credentials. Waiters get
+    a deep copy of the result so callers can still mutate what they receive.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                revalidation = current_revalidation()
+                key = _flight_key(signature, op, args, kwargs, revalidation)
+                flight = _tasks.get(key)
+                collapsed = flight is not None
+                _counters.record(collapsed)
+                if collapsed:
+                    task, revalidation = flight
+                else:
+                    # Run in its own task so a cancelled caller cannot cancel
+                    # the call for everyone else waiting on it
+                    task = asyncio.ensure_future(func(*args, **kwargs))
+                    _tasks[key] = task, revalidation
+                    task.add_done_callback(functools.partial(_landed, key))
+                result = await asyncio.shield(task)
+                if not collapsed:
+                    return result
+                adopt_revalidation(revalidation)
+                return copy.deepcopy(result)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            revalidation = current_revalidation()
+            key = _flight_key(signature, op, args, kwargs, revalidation)
+            with _flights_lock:
+                flight = _flights.get(key)
+                collapsed = flight is not None
+                if not collapsed:
+                    flight = _flights[key] = _Flight(revalidation)
+            _counters.record(collapsed)
+
+            if collapsed:
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                adopt_revalidation(flight.revalidation)
+                return copy.deepcopy(flight.result)
+
+            try:
+                flight.result = func(*args, **kwargs)
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with _flights_lock:
+                    _flights.pop(key, None)
+                flight.done.set()
+
+        return wrapper
+
+    return decorator
+
+
+def single_flight_stats() -> Dict[str, Any]:
+    """Counters for calls made, sent upstream and collapsed into another call"""
+    with _counters.lock:
+        return {
+            "calls": _counters.calls,
+            "upstream": _counters.upstream,
+            "collapsed": _counters.collapsed,
+            "in_flight": len(_flights) + len(_tasks),
+        }
@@ -3,18 +3,21 @@ Google Tasks API Routes
 """
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from googleapiclient.errors import HttpError
-from auth.router import get_credentials
+from typing import Optional
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
+from responses import FastJSONRoute
+from google_services.pagination import cursor_scope, decode_cursor, page_size, paginated
+from google_services.fields import TASK, TASK_LIST, Selection, field_selection
 from google_services.tasks_service import (
-    list_task_lists,
-    list_tasks,
-    create_task,
-    complete_task,
-    delete_task,
+    list_task_lists_async,
+    list_tasks_page_async,
+    create_task_async,
+    complete_task_async,
+    delete_task_async,
 )
 
-router = APIRouter(prefix="/tasks", tags=["Tasks"])
+router = APIRouter(prefix="/tasks", tags=["Tasks"], route_class=FastJSONRoute)
 
 
 class TaskCreate(BaseModel):
@@ -24,65 +27,60 @@ class TaskCreate(BaseModel):
 
 
 @router.get("/lists")
-def get_task_lists(session_id: str = Depends(require_session)):
+async def get_task_lists(fields: Selection = Depends(field_selection(TASK_LIST)), session_id: str = Depends(require_session)):
     """Get all task lists"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated. Visit /auth/login first.")
-    try:
-        return list_task_lists(credentials)
-    except HttpError as e:
-        raise HTTPException(status_code=e.resp.status, detail=str(e))
+    return await list_task_lists_async(credentials, fields)
 
 
 @router.get("/")
-def get_tasks(task_list_id: str = "@default", session_id: str = Depends(require_session)):
+async def get_tasks(
+    task_list_id: str = "@default",
+    max_results: int = 100,
+    fields: Selection = Depends(field_selection(TASK)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
     """Get all tasks in a task list"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated. Visit /auth/login first.")
-    try:
-        return list_tasks(credentials, task_list_id)
-    except HttpError as e:
-        raise HTTPException(status_code=e.resp.status, detail=str(e))
+    scope = cursor_scope("tasks.items", task_list_id=task_list_id, fields=fields)
+    page = await list_tasks_page_async(
+        credentials, task_list_id, fields, page_size(max_results, "tasks.items"), decode_cursor(cursor, scope)
+    )
+    return paginated(page["items"], page["nextPageToken"], scope)
 
 
 @router.post("/")
-def add_task(task: TaskCreate, session_id: str = Depends(require_session)):
+async def add_task(task: TaskCreate, session_id: str = Depends(require_session)):
     """Create a new task"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated. Visit /auth/login first.")
-    try:
-        return create_task(
-            credentials,
-            title=task.title,
-            notes=task.notes,
-            task_list_id=task.task_list_id
-        )
-    except HttpError as e:
-        raise HTTPException(status_code=e.resp.status, detail=str(e))
+    return await create_task_async(
+        credentials,
+        title=task.title,
+        notes=task.notes,
+        task_list_id=task.task_list_id
+    )
 
 
 @router.put("/{task_id}/complete")
-def mark_complete(task_id: str, task_list_id: str = "@default", session_id: str = Depends(require_session)):
+async def mark_complete(task_id: str, task_list_id: str = "@default", session_id: str = Depends(require_session)):
     """Mark a task as completed"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated. Visit /auth/login first.")
-    try:
-        return complete_task(credentials, task_id, task_list_id)
-    except HttpError as e:
-        raise HTTPException(status_code=e.resp.status, detail=str(e))
+    return await complete_task_async(credentials, task_id, task_list_id)
 
 
 @router.delete("/{task_id}")
-def remove_task(task_id: str, task_list_id: str = "@default", session_id: str = Depends(require_session)):
+async def remove_task(task_id: str, task_list_id: str = "@default", session_id: str = Depends(require_session)):
     """Delete a task"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated. Visit /auth/login first.")
-    try:
-        return delete_task(credentials, task_id, task_list_id)
-    except HttpError as e:
-        raise HTTPException(status_code=e.resp.status, detail=str(e))
+    return await delete_task_async(credentials, task_id, task_list_id)
@@ -2,29 +2,56 @@
 Google Tasks Service
 Integrates with Google Tasks API
 """
-from googleapiclient.discovery import build
+from google_services.client import build_service
+from google_services.cache import cached, invalidates
+from google_services.singleflight import single_flight
+from google_services.fields import TASK, TASK_LIST, Selection
 from google.oauth2.credentials import Credentials
+from typing import Optional
 
 
 def get_tasks_service(credentials: Credentials):
     """Create Google Tasks service instance"""
-    return build("tasks", "v1", credentials=credentials)
+    return build_service("tasks", "v1", credentials)
 
 
-def list_task_lists(credentials: Credentials):
+@cached("tasks.lists", ttl=60)
+@single_flight("tasks.lists")
+def list_task_lists(credentials: Credentials, fields: Selection = None):
     """List all task lists for the user"""
     service = get_tasks_service(credentials)
-    results = service.tasklists().list(maxResults=10).execute()
+    results = service.tasklists().list(maxResults=10, **TASK_LIST.items_param(fields)).execute()
     return results.get("items", [])
 
 
-def list_tasks(credentials: Credentials, task_list_id: str = "@default"):
+def list_tasks(credentials: Credentials, task_list_id: str = "@default", fields: Selection = None):
     """List all tasks in a task list"""
+    return list_tasks_page(credentials, task_list_id, fields)["items"]
+
+
+@cached("tasks.items", ttl=30)
+@single_flight("tasks.items")
+def list_tasks_page(
+    credentials: Credentials,
+    task_list_id: str = "@default",
+    fields: Selection = None,
+    max_results: int = 100,
+    page_token: Optional[str] = None,
+):
+    """One page of list_tasks: {"items": [...], "nextPageToken": ...}"""
     service = get_tasks_service(credentials)
-    results = service.tasks().list(tasklist=task_list_id).execute()
-    return results.get("items", [])
+    results = _list_tasks_request(service, task_list_id, fields, max_results, page_token).execute()
+    return {"items": results.get("items", []), "nextPageToken": results.get("nextPageToken")}
+
+
+def _list_tasks_request(service, task_list_id: str, fields: Selection, max_results: int, page_token: Optional[str]):
+    """Build the tasks.list request for list_tasks_page"""
+    return service.tasks().list(
+        tasklist=task_list_id, maxResults=max_results, pageToken=page_token, **TASK.items_param(fields)
+    )
 
 
+@invalidates("tasks.items")
 def create_task(credentials: Credentials, title: str, notes: str = "", task_list_id: str = "@default"):
     """Create a new task"""
     service = get_tasks_service(credentials)
@@ -38,6 +65,7 @@ def create_task(credentials: Credentials, title: str, notes: str = "", task_list
     return result
 
 
+@invalidates("tasks.items")
 def complete_task(credentials: Credentials, task_id: str, task_list_id: str = "@default"):
     """Mark a task as completed"""
     service = get_tasks_service(credentials)
@@ -49,8 +77,72 @@ def complete_task(credentials: Credentials, task_id: str, task_list_id: str = "@
     return result
 
 
+@invalidates("tasks.items")
 def delete_task(credentials: Credentials, task_id: str, task_list_id: str = "@default"):
     """Delete a task"""
     service = get_tasks_service(credentials)
     service.tasks().delete(tasklist=task_list_id, task=task_id).execute()
     return {"message": "Task deleted successfully"}
+
+
+# ============== ASYNC ==============
+
+@cached("tasks.lists", ttl=60)
+@single_flight("tasks.lists")
+async def list_task_lists_async(credentials: Credentials, fields: Selection = None):
+    """Async variant of list_task_lists"""
+    service = get_tasks_service(credentials)
+    results = await service.tasklists().list(maxResults=10, **TASK_LIST.items_param(fields)).execute_async()
+    return results.get("items", [])
+
+
+async def list_tasks_async(credentials: Credentials, task_list_id: str = "@default", fields: Selection = None):
+    """Async variant of list_tasks"""
+    return (await list_tasks_page_async(credentials, task_list_id, fields))["items"]
+
+
+@cached("tasks.items", ttl=30)
+@single_flight("tasks.items")
+async def list_tasks_page_async(
+    credentials: Credentials,
+    task_list_id: str = "@default",
+    fields: Selection = None,
+    max_results: int = 100,
+    page_token: Optional[str] = None,
+):
+    """Async variant of list_tasks_page"""
+    service = get_tasks_service(credentials)
+    results = await _list_tasks_request(service, task_list_id, fields, max_results, page_token).execute_async()
+    return {"items": results.get("items", []), "nextPageToken": results.get("nextPageToken")}
+
+
+@invalidates("tasks.items")
+async def create_task_async(credentials: Credentials, title: str, notes: str = "", task_list_id: str = "@default"):
+    """Async variant of create_task"""
+    service = get_tasks_service(credentials)
+    
+    task = {
+        "title": title,
+        "notes": notes,
+    }
+    
+    return await service.tasks().insert(tasklist=task_list_id, body=task).execute_async()
+
+
+@invalidates("tasks.items")
+async def complete_task_async(credentials: Credentials, task_id: str, task_list_id: str = "@default"):
+    """Async variant of complete_task"""
+    service = get_tasks_service(credentials)
+    
+    task = await service.tasks().get(tasklist=task_list_id, task=task_id).execute_async()
+    task["status"] = "completed"
+    
+    return await service.tasks().update(tasklist=task_list_id, task=task_id, body=task).execute_async()
+
+
+@invalidates("tasks.items")
+async def delete_task_async(credentials: Credentials, task_id: str, task_list_id: str = "@default"):
+    """Async variant of delete_task"""
+    service = get_tasks_service(credentials)
+    await service.tasks().delete(tasklist=task_list_id, task=task_id).execute_async()
+    return {"message": "Task deleted successfully"}
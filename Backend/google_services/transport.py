@@ -0,0 +1,246 @@
+"""
+Upstream HTTP Transport
+Keep-alive connection pools shared by every user for traffic to Google APIs
+
+Sync calls run on a bounded pool of httplib2.Http objects. Each request borrows
+one, so the TCP/TLS connections it holds are reused by whoever borrows it next.
+User credentials are not stored in the pool; AuthorizedHttp adds them to each
+request's headers. Async calls use one shared httpx.AsyncClient per event loop.
+
+Both pools record connection counts, connection reuse and time spent waiting
+for a free slot (see pool_stats()).
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import httplib2
+import httpx
+from googleapiclient.http import build_http
+
+from config import GOOGLE_HTTP_MAX_CONNECTIONS, GOOGLE_HTTP_TIMEOUT_SECONDS
+
+
+class PoolStats:
+    """Thread-safe request / connection / wait counters for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, new_connections: int, wait_seconds: float):
+        with self._lock:
+            self.requests += 1
+            self.new_connections += new_connections
+            self.wait_seconds += wait_seconds
+            if wait_seconds > self.max_wait_seconds:
+                self.max_wait_seconds = wait_seconds
+
+    def snapshot(self, open_connections: int) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.requests
+            reused = max(requests - self.new_connections, 0)
+            return {
+                "connections_open": open_connections,
+                "requests": requests,
+                "new_connections": self.new_connections,
+                "reuse_ratio": round(reused / requests, 4) if requests else 0.0,
+                "wait_ms_avg": round(self.wait_seconds * 1000 / requests, 3) if requests else 0.0,
+                "wait_ms_max": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+def _open_sockets(http: httplib2.Http) -> set:
+    return {id(conn.sock) for conn in list(http.connections.values()) if conn.sock is not None}
+
+
+class HttpPool:
+    """
+    Bounded pool of httplib2.Http objects shared across threads.
+
+    httplib2.Http is not thread-safe, so a request holds an Http exclusively
+    while it runs. Idle Https are reused most-recently-used first, since those
+    are the most likely to still have open connections.
+    """
+
+    def __init__(self, max_size: int, timeout: float):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.stats = PoolStats()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle: List[httplib2.Http] = []
+        self._all: List[httplib2.Http] = []
+
+    def _new_http(self) -> httplib2.Http:
+        http = build_http()
+        http.timeout = self.timeout
+        with self._lock:
+            self._all.append(http)
+        return http
+
+    @contextmanager
+    def borrow(self):
+        """Hold one pooled Http for the duration of a request"""
+        started = time.perf_counter()
+        self._slots.acquire()
+        wait = time.perf_counter() - started
+        try:
+            with self._lock:
+                http = self._idle.pop() if self._idle else None
+            if http is None:
+                http = self._new_http()
+        except BaseException:
+            self._slots.release()
+            raise
+        try:
+            yield http, wait
+        finally:
+            with self._lock:
+                self._idle.append(http)
+            self._slots.release()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        with self.borrow() as (http, wait):
+            before = _open_sockets(http)
+            try:
+                return http.request(uri, method, body=body, headers=headers, **kwargs)
+            finally:
+                self.stats.record(len(_open_sockets(http) - before), wait)
+
+    def open_connections(self) -> int:
+        with self._lock:
+            https = list(self._all)
+        return sum(len(_open_sockets(http)) for http in https)
+
+    def close(self):
+        """Close the connections held by idle Https"""
+        with self._lock:
+            for http in self._idle:
+                http.close()
+
+
+class PooledHttp:
+    """
+    httplib2.Http stand-in backed by an HttpPool.
+
+    Wrapped per user by google_auth_httplib2.AuthorizedHttp, which injects the
+    user's Authorization header into each request before it reaches the pool.
+    """
+
+    def __init__(self, pool: HttpPool):
+        self.pool = pool
+        self.follow_redirects = True
+        # 308 is used for resumable uploads, not redirects (as in build_http)
+        self.redirect_codes = httplib2.REDIRECT_CODES - {308}
+
+    @property
+    def timeout(self):
+        return self.pool.timeout
+
+    @property
+    def connections(self) -> Dict[str, Any]:
+        return {}
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        return self.pool.request(uri, method, body=body, headers=headers, **kwargs)
+
+    def close(self):
+        """No-op: pooled connections outlive any one caller"""
+
+
+_http_pool = HttpPool(GOOGLE_HTTP_MAX_CONNECTIONS, GOOGLE_HTTP_TIMEOUT_SECONDS)
+_pooled_http = PooledHttp(_http_pool)
+
+
+def get_http() -> PooledHttp:
+    """Return the process-wide pooled httplib2-compatible transport"""
+    return _pooled_http
+
+
+# ============== ASYNC ==============
+
+# Shared async client (recreated if the running event loop changes)
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_stats = PoolStats()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the process-wide httpx client for the running event loop"""
+    global _async_client, _async_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            timeout=GOOGLE_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=GOOGLE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=GOOGLE_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_async_client():
+    """Close the shared httpx client (called on application shutdown)"""
+    global _async_client, _async_client_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+async def send_async(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request on the shared async client and record pool metrics.
+
+    Uses httpcore's trace hook: a connect event marks a new connection, and
+    the time before request headers go out (minus connecting) is pool wait.
+    """
+    started = time.perf_counter()
+    state = {"new": 0, "connecting": 0.0, "connect_started": 0.0, "sent": None}
+
+    async def trace(event: str, info: Dict[str, Any]):
+        now = time.perf_counter()
+        if event == "connection.connect_tcp.started":
+            state["new"] += 1
+            state["connect_started"] = now
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            state["connecting"] += now - state["connect_started"]
+            state["connect_started"] = now
+        elif event.endswith("send_request_headers.started") and state["sent"] is None:
+            state["sent"] = now
+
+    try:
+        return await get_async_client().request(method, url, extensions={"trace": trace}, **kwargs)
+    finally:
+        sent = state["sent"] if state["sent"] is not None else time.perf_counter()
+        _async_stats.record(state["new"], max(sent - started - state["connecting"], 0.0))
+
+
+def _async_open_connections() -> int:
+    pool = getattr(getattr(_async_client, "_transport", None), "_pool", None)
+    if pool is None:
+        return 0
+    return sum(1 for conn in pool.connections if not conn.is_closed())
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Connection pool metrics for the sync and async transports"""
+    return {
+        "sync": {
+            "max_size": _http_pool.max_size,
+            **_http_pool.stats.snapshot(_http_pool.open_connections()),
+        },
+        "async": {
+            "max_size": GOOGLE_HTTP_MAX_CONNECTIONS,
+            **_async_stats.snapshot(_async_open_connections()),
+        },
+    }
@@ -2,19 +2,28 @@
 Google User Profile Service
 Get user information from Google
 """
-from googleapiclient.discovery import build
+from google_services.client import build_service
+from google_services.cache import cached
+from google_services.singleflight import single_flight
 from google.oauth2.credentials import Credentials
 
 
 def get_user_service(credentials: Credentials):
     """Create Google OAuth2 service instance"""
-    return build("oauth2", "v2", credentials=credentials)
+    return build_service("oauth2", "v2", credentials)
 
 
+@cached("user.info", ttl=600)
+@single_flight("user.info")
 def get_user_info(credentials: Credentials):
     """Get user profile information"""
     service = get_user_service(credentials)
     user_info = service.userinfo().get().execute()
+    return _format_user_info(user_info)
+
+
+def _format_user_info(user_info: dict):
+    """Shape a userinfo response for the API"""
     return {
         "id": user_info.get("id"),
         "email": user_info.get("email"),
@@ -22,3 +31,12 @@ def get_user_info(credentials: Credentials):
         "picture": user_info.get("picture"),
         "locale": user_info.get("locale"),
     }
+
+
+@cached("user.info", ttl=600)
+@single_flight("user.info")
+async def get_user_info_async(credentials: Credentials):
+    """Async variant of get_user_info"""
+    service = get_user_service(credentials)
+    user_info = await service.userinfo().get().execute_async()
+    return _format_user_info(user_info)
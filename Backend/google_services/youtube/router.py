@@ -3,103 +3,175 @@ YouTube API Routes
 """
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Optional
-from auth.router import get_credentials
+from auth.router import get_credentials_async
 from auth.dependencies import require_session
+from responses import FastJSONRoute
+from google_services.fields import (
+    YOUTUBE_CHANNEL,
+    YOUTUBE_LIKED_VIDEO,
+    YOUTUBE_PLAYLIST,
+    YOUTUBE_PLAYLIST_ITEM,
+    YOUTUBE_SEARCH_RESULT,
+    YOUTUBE_SUBSCRIPTION,
+    YOUTUBE_VIDEO,
+    Selection,
+    field_selection,
+)
+from google_services.pagination import cursor_scope, decode_cursor, page_size, paginated
 from google_services.youtube_service import (
-    search_videos,
-    get_video_details,
-    get_channel_info,
-    list_playlists,
-    get_playlist_items,
-    list_subscriptions,
-    get_liked_videos,
+    search_videos_async,
+    get_video_details_async,
+    get_channel_info_async,
+    list_playlists_async,
+    get_playlist_items_async,
+    list_subscriptions_async,
+    get_liked_videos_async,
 )
 
-router = APIRouter(prefix="/youtube", tags=["YouTube"])
+router = APIRouter(prefix="/youtube", tags=["YouTube"], route_class=FastJSONRoute)
 
 
 @router.get("/search")
-def search(query: str, max_results: int = 10, order: str = "relevance", session_id: str = Depends(require_session)):
+async def search(
+    query: str,
+    max_results: int = 10,
+    order: str = "relevance",
+    fields: Selection = Depends(field_selection(YOUTUBE_SEARCH_RESULT)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
     """
-    Search for YouTube videos.
+    Search for YouTube videos (next page: `cursor` from X-Next-Cursor).
     Order options: relevance, date, rating, viewCount, title
+    `fields` limits each video to e.g. id,title,url
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return search_videos(credentials, query, max_results, order)
+    scope = cursor_scope("youtube.search", query=query, order=order, fields=fields)
+    page = await search_videos_async(
+        credentials, query, page_size(max_results, "youtube.search"), order, fields, decode_cursor(cursor, scope)
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
 
 
 @router.get("/videos/{video_id}")
-def get_video(video_id: str, session_id: str = Depends(require_session)):
+async def get_video(
+    video_id: str,
+    fields: Selection = Depends(field_selection(YOUTUBE_VIDEO)),
+    session_id: str = Depends(require_session),
+):
     """Get detailed information about a specific video"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     
-    video = get_video_details(credentials, video_id)
+    video = await get_video_details_async(credentials, video_id, fields)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     return video
 
 
 @router.get("/channel")
-def get_my_channel(session_id: str = Depends(require_session)):
+async def get_my_channel(
+    fields: Selection = Depends(field_selection(YOUTUBE_CHANNEL)), session_id: str = Depends(require_session)
+):
     """Get the authenticated user's channel info"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     
-    channel = get_channel_info(credentials)
+    channel = await get_channel_info_async(credentials, None, fields)
     if not channel:
         raise HTTPException(status_code=404, detail="No channel found for this user")
     return channel
 
 
 @router.get("/channel/{channel_id}")
-def get_channel(channel_id: str, session_id: str = Depends(require_session)):
+async def get_channel(
+    channel_id: str,
+    fields: Selection = Depends(field_selection(YOUTUBE_CHANNEL)),
+    session_id: str = Depends(require_session),
+):
     """Get information about a specific channel"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
     
-    channel = get_channel_info(credentials, channel_id)
+    channel = await get_channel_info_async(credentials, channel_id, fields)
     if not channel:
         raise HTTPException(status_code=404, detail="Channel not found")
     return channel
 
 
 @router.get("/playlists")
-def get_playlists(max_results: int = 25, session_id: str = Depends(require_session)):
-    """List user's playlists"""
-    credentials = get_credentials(session_id)
+async def get_playlists(
+    max_results: int = 25,
+    fields: Selection = Depends(field_selection(YOUTUBE_PLAYLIST)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """List user's playlists (next page: `cursor` from X-Next-Cursor)"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_playlists(credentials, max_results)
+    scope = cursor_scope("youtube.playlists", fields=fields)
+    page = await list_playlists_async(
+        credentials, page_size(max_results, "youtube.playlists"), decode_cursor(cursor, scope), fields
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
 
 
 @router.get("/playlists/{playlist_id}/items")
-def get_playlist_videos(playlist_id: str, max_results: int = 50, session_id: str = Depends(require_session)):
-    """Get videos in a playlist"""
-    credentials = get_credentials(session_id)
+async def get_playlist_videos(
+    playlist_id: str,
+    max_results: int = 50,
+    fields: Selection = Depends(field_selection(YOUTUBE_PLAYLIST_ITEM)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """Get videos in a playlist (next page: `cursor` from X-Next-Cursor)"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_playlist_items(credentials, playlist_id, max_results)
+    scope = cursor_scope("youtube.playlist_items", playlist_id=playlist_id, fields=fields)
+    page = await get_playlist_items_async(
+        credentials, playlist_id, page_size(max_results, "youtube.playlist_items"), decode_cursor(cursor, scope), fields
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
 
 
 @router.get("/subscriptions")
-def get_subscriptions(max_results: int = 25, session_id: str = Depends(require_session)):
-    """List user's subscriptions"""
-    credentials = get_credentials(session_id)
+async def get_subscriptions(
+    max_results: int = 25,
+    fields: Selection = Depends(field_selection(YOUTUBE_SUBSCRIPTION)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """List user's subscriptions (next page: `cursor` from X-Next-Cursor)"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return list_subscriptions(credentials, max_results)
+    scope = cursor_scope("youtube.subscriptions", fields=fields)
+    page = await list_subscriptions_async(
+        credentials, page_size(max_results, "youtube.subscriptions"), decode_cursor(cursor, scope), fields
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
 
 
 @router.get("/liked")
-def get_liked(session_id: str = Depends(require_session)):
-    """Get user's liked videos"""
-    credentials = get_credentials(session_id)
+async def get_liked(
+    max_results: int = 25,
+    fields: Selection = Depends(field_selection(YOUTUBE_LIKED_VIDEO)),
+    cursor: Optional[str] = None,
+    session_id: str = Depends(require_session),
+):
+    """Get user's liked videos (next page: `cursor` from X-Next-Cursor)"""
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_liked_videos(credentials)
+    scope = cursor_scope("youtube.liked", fields=fields)
+    page = await get_liked_videos_async(
+        credentials, page_size(max_results, "youtube.liked"), decode_cursor(cursor, scope), fields
+    )
+    return paginated(page, page["next_page_token"], scope, "next_page_token")
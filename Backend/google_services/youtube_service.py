@@ -2,33 +2,81 @@
 YouTube Service
 Integrates with YouTube Data API v3
 """
-from googleapiclient.discovery import build
-from typing import Any, Optional
+from google_services.client import build_service
+from google_services.cache import cached
+from google_services.singleflight import single_flight
+from google_services.fields import (
+    YOUTUBE_CHANNEL,
+    YOUTUBE_LIKED_VIDEO,
+    YOUTUBE_PLAYLIST,
+    YOUTUBE_PLAYLIST_ITEM,
+    YOUTUBE_SEARCH_RESULT,
+    YOUTUBE_SUBSCRIPTION,
+    YOUTUBE_VIDEO,
+    Resource,
+    Selection,
+)
+from typing import Any, Dict, Optional
 
 
 def get_youtube_service(credentials: Any):
     """Create YouTube service instance"""
-    return build("youtube", "v3", credentials=credentials)
+    return build_service("youtube", "v3", credentials)
 
 
-def search_videos(credentials: Any, query: str, max_results: int = 10, order: str = "relevance"):
+def _selection_params(resource: Resource, fields: Selection, part: str, envelope: str = "") -> Dict[str, str]:
+    """
+    `part` and `fields` keywords for a list call: parts no selected field reads
+    are dropped ("id" when none are left), and `envelope` names the top-level
+    response fields the formatter still reads
+    """
+    if fields is None:
+        return {"part": part}
+    needed = {resource.fields[name].split("/")[0] for name in fields}
+    return {
+        "part": ",".join(name for name in part.split(",") if name in needed) or "id",
+        "fields": f"{envelope}items({resource.mask(fields)})",
+    }
+
+
+def search_videos(
+    credentials: Any,
+    query: str,
+    max_results: int = 10,
+    order: str = "relevance",
+    fields: Selection = None,
+    page_token: Optional[str] = None,
+):
     """
     Search for YouTube videos
     order options: relevance, date, rating, viewCount, title
     """
     service = get_youtube_service(credentials)
     
-    response = service.search().list(
-        part="snippet",
+    response = _search_request(service, query, max_results, order, fields, page_token).execute()
+    
+    return _format_search_results(response, fields)
+
+
+def _search_request(
+    service, query: str, max_results: int, order: str, fields: Selection = None, page_token: Optional[str] = None
+):
+    """Build the search.list request for videos matching a query"""
+    return service.search().list(
         q=query,
         type="video",
         maxResults=max_results,
-        order=order
-    ).execute()
-    
+        order=order,
+        pageToken=page_token,
+        **_selection_params(YOUTUBE_SEARCH_RESULT, fields, "snippet", "pageInfo/totalResults,nextPageToken,")
+    )
+
+
+def _format_search_results(response: dict, fields: Selection = None):
+    """Shape a search.list response for the API"""
     videos = []
     for item in response.get("items", []):
-        videos.append({
+        videos.append(YOUTUBE_SEARCH_RESULT.project({
             "id": item.get("id", {}).get("videoId"),
             "title": item.get("snippet", {}).get("title"),
             "description": item.get("snippet", {}).get("description"),
@@ -36,7 +84,7 @@ def search_videos(credentials: Any, query: str, max_results: int = 10, order: st
             "channel_title": item.get("snippet", {}).get("channelTitle"),
             "published_at": item.get("snippet", {}).get("publishedAt"),
             "url": f"https://www.youtube.com/watch?v={item.get('id', {}).get('videoId')}"
-        })
+        }, fields))
     
     return {
         "total_results": response.get("pageInfo", {}).get("totalResults"),
@@ -45,21 +93,31 @@ def search_videos(credentials: Any, query: str, max_results: int = 10, order: st
     }
 
 
-def get_video_details(credentials: Any, video_id: str):
+def get_video_details(credentials: Any, video_id: str, fields: Selection = None):
     """Get detailed information about a video"""
     service = get_youtube_service(credentials)
     
-    response = service.videos().list(
-        part="snippet,contentDetails,statistics",
-        id=video_id
-    ).execute()
+    response = _video_request(service, video_id, fields).execute()
     
+    return _format_video_details(response, fields)
+
+
+def _video_request(service, video_id: str, fields: Selection = None):
+    """Build the videos.list request for one video"""
+    return service.videos().list(
+        id=video_id,
+        **_selection_params(YOUTUBE_VIDEO, fields, "snippet,contentDetails,statistics")
+    )
+
+
+def _format_video_details(response: dict, fields: Selection = None):
+    """Shape the first item of a videos.list response, or None"""
     if not response.get("items"):
         return None
     
     item = response["items"][0]
     
-    return {
+    return YOUTUBE_VIDEO.project({
         "id": item.get("id"),
         "title": item.get("snippet", {}).get("title"),
         "description": item.get("snippet", {}).get("description"),
@@ -73,30 +131,38 @@ def get_video_details(credentials: Any, video_id: str):
         "comment_count": item.get("statistics", {}).get("commentCount"),
         "tags": item.get("snippet", {}).get("tags", []),
         "url": f"https://www.youtube.com/watch?v={item.get('id')}"
-    }
+    }, fields)
 
 
-def get_channel_info(credentials: Any, channel_id: Optional[str] = None):
+def get_channel_info(credentials: Any, channel_id: Optional[str] = None, fields: Selection = None):
     """Get channel information (defaults to authenticated user's channel if no ID)"""
     service = get_youtube_service(credentials)
-    
+    response = _channel_request(service, channel_id, fields).execute()
+    return _format_channel(response, fields)
+
+
+def _channel_request(service, channel_id: Optional[str], fields: Selection = None):
+    """Build the channels.list request for a channel ID or the user's own channel"""
+    params = _selection_params(YOUTUBE_CHANNEL, fields, "snippet,contentDetails,statistics")
     if channel_id:
-        response = service.channels().list(
-            part="snippet,contentDetails,statistics",
-            id=channel_id
-        ).execute()
-    else:
-        response = service.channels().list(
-            part="snippet,contentDetails,statistics",
-            mine=True
-        ).execute()
-    
+        return service.channels().list(
+            id=channel_id,
+            **params
+        )
+    return service.channels().list(
+        mine=True,
+        **params
+    )
+
+
+def _format_channel(response: dict, fields: Selection = None):
+    """Shape the first item of a channels.list response, or None"""
     if not response.get("items"):
         return None
     
     item = response["items"][0]
     
-    return {
+    return YOUTUBE_CHANNEL.project({
         "id": item.get("id"),
         "title": item.get("snippet", {}).get("title"),
         "description": item.get("snippet", {}).get("description"),
@@ -106,46 +172,72 @@ def get_channel_info(credentials: Any, channel_id: Optional[str] = None):
         "video_count": item.get("statistics", {}).get("videoCount"),
         "view_count": item.get("statistics", {}).get("viewCount"),
         "uploads_playlist": item.get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads")
-    }
+    }, fields)
 
 
-def list_playlists(credentials: Any, max_results: int = 25):
+@cached("youtube.playlists", ttl=300)
+@single_flight("youtube.playlists")
+def list_playlists(credentials: Any, max_results: int = 25, page_token: Optional[str] = None, fields: Selection = None):
     """List user's playlists"""
     service = get_youtube_service(credentials)
     
-    response = service.playlists().list(
-        part="snippet,contentDetails",
-        mine=True,
-        maxResults=max_results
-    ).execute()
+    response = _playlists_request(service, max_results, page_token, fields).execute()
     
+    return _format_playlists(response, fields)
+
+
+def _playlists_request(service, max_results: int, page_token: Optional[str], fields: Selection = None):
+    """Build the playlists.list request for the user's playlists"""
+    return service.playlists().list(
+        mine=True,
+        maxResults=max_results,
+        pageToken=page_token,
+        **_selection_params(YOUTUBE_PLAYLIST, fields, "snippet,contentDetails", "nextPageToken,")
+    )
+
+
+def _format_playlists(response: dict, fields: Selection = None):
+    """Shape a playlists.list response for the API"""
     playlists = []
     for item in response.get("items", []):
-        playlists.append({
+        playlists.append(YOUTUBE_PLAYLIST.project({
             "id": item.get("id"),
             "title": item.get("snippet", {}).get("title"),
             "description": item.get("snippet", {}).get("description"),
             "thumbnail": item.get("snippet", {}).get("thumbnails", {}).get("default", {}).get("url"),
             "video_count": item.get("contentDetails", {}).get("itemCount"),
             "published_at": item.get("snippet", {}).get("publishedAt")
-        })
+        }, fields))
     
-    return {"playlists": playlists, "total": len(playlists)}
+    return {"playlists": playlists, "total": len(playlists), "next_page_token": response.get("nextPageToken")}
 
 
-def get_playlist_items(credentials: Any, playlist_id: str, max_results: int = 50):
+def get_playlist_items(
+    credentials: Any, playlist_id: str, max_results: int = 50, page_token: Optional[str] = None, fields: Selection = None
+):
     """Get videos in a playlist"""
     service = get_youtube_service(credentials)
     
-    response = service.playlistItems().list(
-        part="snippet,contentDetails",
-        playlistId=playlist_id,
-        maxResults=max_results
-    ).execute()
+    response = _playlist_items_request(service, playlist_id, max_results, page_token, fields).execute()
     
+    return _format_playlist_items(response, fields)
+
+
+def _playlist_items_request(service, playlist_id: str, max_results: int, page_token: Optional[str], fields: Selection = None):
+    """Build the playlistItems.list request for one playlist"""
+    return service.playlistItems().list(
+        playlistId=playlist_id,
+        maxResults=max_results,
+        pageToken=page_token,
+        **_selection_params(YOUTUBE_PLAYLIST_ITEM, fields, "snippet,contentDetails", "pageInfo/totalResults,nextPageToken,")
+    )
+
+
+def _format_playlist_items(response: dict, fields: Selection = None):
+    """Shape a playlistItems.list response for the API"""
     items = []
     for item in response.get("items", []):
-        items.append({
+        items.append(YOUTUBE_PLAYLIST_ITEM.project({
             "video_id": item.get("contentDetails", {}).get("videoId"),
             "title": item.get("snippet", {}).get("title"),
             "description": item.get("snippet", {}).get("description"),
@@ -153,7 +245,7 @@ def get_playlist_items(credentials: Any, playlist_id: str, max_results: int = 50
             "position": item.get("snippet", {}).get("position"),
             "added_at": item.get("contentDetails", {}).get("videoPublishedAt"),
             "url": f"https://www.youtube.com/watch?v={item.get('contentDetails', {}).get('videoId')}"
-        })
+        }, fields))
     
     return {
         "items": items,
@@ -162,47 +254,143 @@ def get_playlist_items(credentials: Any, playlist_id: str, max_results: int = 50
     }
 
 
-def list_subscriptions(credentials: Any, max_results: int = 25):
+def list_subscriptions(credentials: Any, max_results: int = 25, page_token: Optional[str] = None, fields: Selection = None):
     """List user's subscriptions"""
     service = get_youtube_service(credentials)
     
-    response = service.subscriptions().list(
-        part="snippet",
-        mine=True,
-        maxResults=max_results
-    ).execute()
+    response = _subscriptions_request(service, max_results, page_token, fields).execute()
     
+    return _format_subscriptions(response, fields)
+
+
+def _subscriptions_request(service, max_results: int, page_token: Optional[str], fields: Selection = None):
+    """Build the subscriptions.list request for the user's subscriptions"""
+    return service.subscriptions().list(
+        mine=True,
+        maxResults=max_results,
+        pageToken=page_token,
+        **_selection_params(YOUTUBE_SUBSCRIPTION, fields, "snippet", "nextPageToken,")
+    )
+
+
+def _format_subscriptions(response: dict, fields: Selection = None):
+    """Shape a subscriptions.list response for the API"""
     subscriptions = []
     for item in response.get("items", []):
-        subscriptions.append({
+        subscriptions.append(YOUTUBE_SUBSCRIPTION.project({
             "channel_id": item.get("snippet", {}).get("resourceId", {}).get("channelId"),
             "title": item.get("snippet", {}).get("title"),
             "description": item.get("snippet", {}).get("description"),
             "thumbnail": item.get("snippet", {}).get("thumbnails", {}).get("default", {}).get("url")
-        })
+        }, fields))
     
-    return {"subscriptions": subscriptions, "total": len(subscriptions)}
+    return {"subscriptions": subscriptions, "total": len(subscriptions), "next_page_token": response.get("nextPageToken")}
 
 
-def get_liked_videos(credentials: Any, max_results: int = 25):
+def get_liked_videos(credentials: Any, max_results: int = 25, page_token: Optional[str] = None, fields: Selection = None):
     """Get user's liked videos"""
     service = get_youtube_service(credentials)
     
-    response = service.videos().list(
-        part="snippet,contentDetails,statistics",
-        myRating="like",
-        maxResults=max_results
-    ).execute()
+    response = _liked_videos_request(service, max_results, page_token, fields).execute()
     
+    return _format_liked_videos(response, fields)
+
+
+def _liked_videos_request(service, max_results: int, page_token: Optional[str], fields: Selection = None):
+    """Build the videos.list(myRating=like) request"""
+    return service.videos().list(
+        myRating="like",
+        maxResults=max_results,
+        pageToken=page_token,
+        **_selection_params(YOUTUBE_LIKED_VIDEO, fields, "snippet,contentDetails,statistics", "nextPageToken,")
+    )
+
+
+def _format_liked_videos(response: dict, fields: Selection = None):
+    """Shape a videos.list(myRating=like) response for the API"""
     videos = []
     for item in response.get("items", []):
-        videos.append({
+        videos.append(YOUTUBE_LIKED_VIDEO.project({
             "id": item.get("id"),
             "title": item.get("snippet", {}).get("title"),
             "channel_title": item.get("snippet", {}).get("channelTitle"),
             "thumbnail": item.get("snippet", {}).get("thumbnails", {}).get("default", {}).get("url"),
             "view_count": item.get("statistics", {}).get("viewCount"),
             "url": f"https://www.youtube.com/watch?v={item.get('id')}"
-        })
+        }, fields))
+    
+    return {"videos": videos, "total": len(videos), "next_page_token": response.get("nextPageToken")}
+
+
+# ============== ASYNC ==============
+
+async def search_videos_async(
+    credentials: Any,
+    query: str,
+    max_results: int = 10,
+    order: str = "relevance",
+    fields: Selection = None,
+    page_token: Optional[str] = None,
+):
+    """Async variant of search_videos"""
+    service = get_youtube_service(credentials)
+    
+    response = await _search_request(service, query, max_results, order, fields, page_token).execute_async()
+    
+    return _format_search_results(response, fields)
+
+
+async def get_video_details_async(credentials: Any, video_id: str, fields: Selection = None):
+    """Async variant of get_video_details"""
+    service = get_youtube_service(credentials)
+    
+    response = await _video_request(service, video_id, fields).execute_async(hedge=True)
+    
+    return _format_video_details(response, fields)
+
+
+async def get_channel_info_async(credentials: Any, channel_id: Optional[str] = None, fields: Selection = None):
+    """Async variant of get_channel_info"""
+    service = get_youtube_service(credentials)
+    response = await _channel_request(service, channel_id, fields).execute_async()
+    return _format_channel(response, fields)
+
+
+@cached("youtube.playlists", ttl=300)
+@single_flight("youtube.playlists")
+async def list_playlists_async(credentials: Any, max_results: int = 25, page_token: Optional[str] = None, fields: Selection = None):
+    """Async variant of list_playlists"""
+    service = get_youtube_service(credentials)
+    
+    response = await _playlists_request(service, max_results, page_token, fields).execute_async()
+    
+    return _format_playlists(response, fields)
+
+
+async def get_playlist_items_async(
+    credentials: Any, playlist_id: str, max_results: int = 50, page_token: Optional[str] = None, fields: Selection = None
+):
+    """Async variant of get_playlist_items"""
+    service = get_youtube_service(credentials)
+    
+    response = await _playlist_items_request(service, playlist_id, max_results, page_token, fields).execute_async()
+    
+    return _format_playlist_items(response, fields)
+
+
+async def list_subscriptions_async(credentials: Any, max_results: int = 25, page_token: Optional[str] = None, fields: Selection = None):
+    """Async variant of list_subscriptions"""
+    service = get_youtube_service(credentials)
+    
+    response = await _subscriptions_request(service, max_results, page_token, fields).execute_async()
+    
+    return _format_subscriptions(response, fields)
+
+
+async def get_liked_videos_async(credentials: Any, max_results: int = 25, page_token: Optional[str] = None, fields: Selection = None):
+    """Async variant of get_liked_videos"""
+    service = get_youtube_service(credentials)
+    
+    response = await _liked_videos_request(service, max_results, page_token, fields).execute_async()
     
-    return {"videos": videos, "total": len(videos)}
+    return _format_liked_videos(response, fields)
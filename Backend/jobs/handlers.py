@@ -0,0 +1,63 @@
+"""
+Job Handlers
+The long-running operations that can be run as background jobs
+
+Each handler is `async def handler(credentials, params, progress) -> result`,
+where `await progress(done, total, message)` records how far it has got.
+Handlers page through their source so progress is visible while they run.
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from google_services.keep_service import list_notes_async, format_note_for_display
+from google_services.contacts_service import fetch_contacts_page_async
+from google_services.sheets_service import read_range_async
+
+Progress = Callable[[int, Optional[int], str], Awaitable[None]]
+
+
+async def keep_all_notes(credentials: Any, params: Dict[str, Any], progress: Progress):
+    """All Keep notes (params: include_trashed)"""
+    filter_str = None if params.get("include_trashed") else "trashed=false"
+    notes = []
+    page_token = None
+    while True:
+        result = await list_notes_async(credentials, page_size=100, page_token=page_token, filter_str=filter_str)
+        notes.extend(format_note_for_display(note) for note in result.get("notes", []))
+        await progress(len(notes), None, f"Fetched {len(notes)} notes")
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            break
+    return {"notes": notes, "total": len(notes)}
+
+
+async def all_contacts(credentials: Any, params: Dict[str, Any], progress: Progress):
+    """Every contact, paging through the People API"""
+    contacts = []
+    page_token = None
+    while True:
+        page = await fetch_contacts_page_async(credentials, page_size=1000, page_token=page_token)
+        contacts.extend(page["contacts"])
+        await progress(len(contacts), page.get("totalItems"), f"Fetched {len(contacts)} contacts")
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            break
+    return {"contacts": contacts, "total": len(contacts)}
+
+
+async def sheets_read(credentials: Any, params: Dict[str, Any], progress: Progress):
+    """A (large) range of a spreadsheet (params: spreadsheet_id, range)"""
+    spreadsheet_id = params.get("spreadsheet_id")
+    if not spreadsheet_id:
+        raise ValueError("params.spreadsheet_id is required")
+    await progress(0, 1, "Reading range")
+    result = await read_range_async(credentials, spreadsheet_id, params.get("range", "Sheet1"))
+    await progress(1, 1, f"Read {len(result['values'])} rows")
+    return result
+
+
+# Job kind -> handler
+HANDLERS: Dict[str, Callable[..., Awaitable[Any]]] = {
+    "keep.all_notes": keep_all_notes,
+    "contacts.all": all_contacts,
+    "sheets.read": sheets_read,
+}
@@ -0,0 +1,131 @@
+"""
+Background Jobs API Routes
+Start long-running operations and poll or stream their progress
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from auth.router import get_credentials_async
+from auth.dependencies import require_session
+from responses import FastJSONResponse, FastJSONRoute, dumps
+from config import JOB_POLL_INTERVAL_SECONDS, JOB_STREAM_MAX_SECONDS
+from google_services.cache import user_key
+from jobs.handlers import HANDLERS
+from jobs.runner import JobQueueFull, cancel_job, fail_orphaned_jobs, submit_job
+from jobs.store import TERMINAL_STATUSES, get_job_store
+
+router = APIRouter(prefix="/jobs", tags=["Background Jobs"], route_class=FastJSONRoute)
+
+
+class JobCreate(BaseModel):
+    kind: str  # keep.all_notes, contacts.all or sheets.read
+    params: Dict[str, Any] = {}
+
+
+def _public(job: Dict[str, Any], include_result: bool = True) -> Dict[str, Any]:
+    view = {key: value for key, value in job.items() if key not in ("owner", "expires_at", "lease_expires_at", "_id")}
+    if not include_result:
+        view.pop("result", None)
+    return view
+
+
+async def _owned_credentials(session_id: str):
+    credentials = await get_credentials_async(session_id)
+    if not credentials:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+    return credentials
+
+
+async def _owned_job(job_id: str, owner: str) -> Dict[str, Any]:
+    await fail_orphaned_jobs(owner)
+    job = await get_job_store().get(job_id)
+    if job is None or job["owner"] != owner:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("")
+async def create_job(body: JobCreate, session_id: str = Depends(require_session)):
+    """
+    Start a background job; returns 202 with the job id.
+
+    Kinds: `keep.all_notes` (params: include_trashed), `contacts.all`,
+    `sheets.read` (params: spreadsheet_id, range).
+    """
+    if body.kind not in HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind. Available: {', '.join(HANDLERS)}")
+    credentials = await _owned_credentials(session_id)
+    try:
+        job = await submit_job(body.kind, body.params, user_key(credentials), credentials)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return FastJSONResponse(
+        {**_public(job), "status_url": f"/jobs/{job['job_id']}", "events_url": f"/jobs/{job['job_id']}/events"},
+        status_code=202,
+    )
+
+
+@router.get("")
+async def list_jobs(session_id: str = Depends(require_session)):
+    """Your recent jobs (without results)"""
+    credentials = await _owned_credentials(session_id)
+    await fail_orphaned_jobs(user_key(credentials))
+    jobs = await get_job_store().list_for_owner(user_key(credentials))
+    return {"jobs": [_public(job, include_result=False) for job in jobs]}
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, include_result: bool = True, session_id: str = Depends(require_session)):
+    """Job status and progress, plus the result once it has succeeded"""
+    credentials = await _owned_credentials(session_id)
+    return _public(await _owned_job(job_id, user_key(credentials)), include_result)
+
+
+@router.get("/{job_id}/events")
+async def stream_job(job_id: str, session_id: str = Depends(require_session)):
+    """
+    NDJSON stream of job snapshots, one line per change.
+
+    Ends with the final snapshot (including the result) once the job finishes,
+    or after JOB_STREAM_MAX_SECONDS, in which case reconnect to keep following.
+    """
+    credentials = await _owned_credentials(session_id)
+    owner = user_key(credentials)
+    job = await _owned_job(job_id, owner)
+
+    async def snapshots():
+        last: Optional[Dict[str, Any]] = None
+        current = job
+        ends_at = time.monotonic() + JOB_STREAM_MAX_SECONDS
+        while True:
+            finished = current["status"] in TERMINAL_STATUSES
+            view = _public(current, include_result=finished)
+            if view != last:
+                yield dumps(view) + b"\n"
+                last = view
+            if finished or time.monotonic() >= ends_at:
+                return
+            await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+            current = await get_job_store().get(job_id) or current
+
+    return StreamingResponse(
+        snapshots(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/{job_id}")
+async def delete_job(job_id: str, session_id: str = Depends(require_session)):
+    """Cancel a queued or running job"""
+    credentials = await _owned_credentials(session_id)
+    job = await _owned_job(job_id, user_key(credentials))
+    if job["status"] in TERMINAL_STATUSES:
+        return {"message": f"Job already {job['status']}", "job_id": job_id}
+    if not cancel_job(job_id):
+        raise HTTPException(status_code=409, detail="Job is running on another instance")
+    return {"message": "Job cancelled", "job_id": job_id}
@@ -0,0 +1,190 @@
+"""
+Job Runner
+Runs accepted jobs in the background on a bounded pool of asyncio workers
+
+submit_job() records the job as queued and returns at once; the job then
+waits for one of JOB_MAX_WORKERS slots on this instance, runs its handler and
+writes progress and the outcome to the job store. At most JOB_MAX_PENDING jobs
+may be queued or running per instance.
+
+Jobs live only as long as their instance: on serverless hosts an instance can
+be frozen or recycled mid-job. While it has jobs, an instance renews their
+leases every JOB_LEASE_SECONDS / 3; fail_orphaned_jobs() marks jobs whose lease
+lapsed as failed, so they don't stay "running" on an instance that is gone.
+"""
+import asyncio
+import secrets
+from typing import Any, Dict, Optional, Set
+
+from googleapiclient.errors import HttpError
+
+from config import JOB_LEASE_SECONDS, JOB_MAX_PENDING, JOB_MAX_RESULT_BYTES, JOB_MAX_WORKERS
+from metrics import Counter, Gauge
+from responses import dumps
+from jobs.handlers import HANDLERS
+from jobs.store import expires_at, get_job_store, lease_expires_at, utcnow
+
+jobs_total = Counter("jobs_total", "Finished background jobs by kind and status", ("kind", "status"))
+jobs_pending = Gauge("jobs_pending", "Background jobs queued or running on this instance")
+
+# job_id -> task, for jobs accepted by this instance
+_tasks: Dict[str, asyncio.Task] = {}
+_slots: Optional[asyncio.Semaphore] = None
+_heartbeat: Optional[asyncio.Task] = None
+
+
+class JobQueueFull(Exception):
+    """Raised when this instance already has JOB_MAX_PENDING jobs"""
+
+
+class JobResultTooLarge(Exception):
+    """Raised for a result above JOB_MAX_RESULT_BYTES"""
+
+
+def _failed(error: str) -> Dict[str, Any]:
+    return {"status": "failed", "error": error, "finished_at": utcnow(), "expires_at": expires_at()}
+
+
+def _worker_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(JOB_MAX_WORKERS)
+    return _slots
+
+
+def _error_message(e: BaseException) -> str:
+    if isinstance(e, HttpError):
+        return f"Google API error {e.resp.status}: {e.reason or e}"
+    return str(e) or type(e).__name__
+
+
+async def _run(job: Dict[str, Any], credentials: Any) -> str:
+    store = get_job_store()
+    job_id, kind = job["job_id"], job["kind"]
+    async with _worker_slots():
+        await store.update(job_id, {"status": "running", "started_at": utcnow()})
+
+        async def progress(done: int, total: Optional[int], message: str):
+            await store.update(job_id, {"progress": {"done": done, "total": total, "message": message}})
+
+        try:
+            result = await HANDLERS[kind](credentials, job["params"], progress)
+            size = len(dumps(result))
+            if size > JOB_MAX_RESULT_BYTES:
+                raise JobResultTooLarge(
+                    f"Result too large to store ({size} bytes, limit {JOB_MAX_RESULT_BYTES}); narrow the job's params"
+                )
+        except Exception as e:
+            print(f"❌ Job {job_id} ({kind}) failed: {e}")
+            await store.update(job_id, _failed(_error_message(e)))
+            return "failed"
+        try:
+            await store.update(job_id, {
+                "status": "succeeded", "result": result, "finished_at": utcnow(), "expires_at": expires_at(),
+            })
+        except Exception as e:
+            # e.g. a transient MongoDB error; don't leave the job "running"
+            print(f"❌ Job {job_id} ({kind}) result could not be stored: {e}")
+            await store.update(job_id, _failed(f"Result could not be stored: {e}"))
+            return "failed"
+        return "succeeded"
+
+
+# Pending store writes recording cancelled or crashed jobs
+_final_writes: Set[asyncio.Future] = set()
+
+
+def _finished(job_id: str, kind: str, task: asyncio.Task):
+    """Done callback: bookkeeping, and recording cancellation (even before the job started) or a crash"""
+    _tasks.pop(job_id, None)
+    jobs_pending.set(len(_tasks))
+    if task.cancelled():
+        status = "cancelled"
+        _final_write(job_id, {"status": status, "finished_at": utcnow(), "expires_at": expires_at()})
+    elif task.exception() is not None:
+        # Even recording the failure failed; try once more so pollers see an outcome
+        status = "failed"
+        print(f"❌ Job {job_id} ({kind}) crashed: {task.exception()}")
+        _final_write(job_id, _failed(f"Job crashed: {task.exception()}"))
+    else:
+        status = task.result()
+    jobs_total.inc(kind, status)
+
+
+async def _renew_leases():
+    """Extend the leases of this instance's jobs until it has none left"""
+    store = get_job_store()
+    while _tasks:
+        try:
+            await store.renew_leases(list(_tasks), lease_expires_at())
+        except Exception as e:
+            print(f"⚠️ Job lease renewal failed: {e}")
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+
+
+def _start_heartbeat():
+    global _heartbeat
+    if _heartbeat is None or _heartbeat.done():
+        _heartbeat = asyncio.ensure_future(_renew_leases())
+
+
+async def fail_orphaned_jobs(owner: str) -> int:
+    """Mark the owner's queued/running jobs whose lease lapsed, on other instances, as failed"""
+    return await get_job_store().fail_stale(
+        owner, list(_tasks), _failed("Job was lost: the instance running it stopped before it finished")
+    )
+
+
+def _final_write(job_id: str, fields: Dict[str, Any]):
+    write = asyncio.ensure_future(get_job_store().update(job_id, fields))
+    _final_writes.add(write)
+    write.add_done_callback(_final_writes.discard)
+
+
+async def submit_job(kind: str, params: Dict[str, Any], owner: str, credentials: Any) -> Dict[str, Any]:
+    """Record a new job and start it in the background"""
+    if len(_tasks) >= JOB_MAX_PENDING:
+        raise JobQueueFull(f"Too many jobs in progress (max {JOB_MAX_PENDING})")
+    now = utcnow()
+    job = {
+        "job_id": secrets.token_urlsafe(12),
+        "kind": kind,
+        "owner": owner,
+        "params": params,
+        "status": "queued",
+        "progress": {"done": 0, "total": None, "message": "Queued"},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "started_at": None,
+        "finished_at": None,
+        "expires_at": expires_at(),
+        "lease_expires_at": lease_expires_at(),
+    }
+    await get_job_store().create(job)
+    task = asyncio.create_task(_run(job, credentials))
+    task.add_done_callback(lambda done: _finished(job["job_id"], kind, done))
+    _tasks[job["job_id"]] = task
+    jobs_pending.set(len(_tasks))
+    _start_heartbeat()
+    return job
+
+
+def cancel_job(job_id: str) -> bool:
+    """Cancel a job running on this instance; False if it isn't here"""
+    task = _tasks.get(job_id)
+    if task is None:
+        return False
+    task.cancel()
+    return True
+
+
+async def shutdown_jobs():
+    """Cancel this instance's jobs (app shutdown); they are recorded as cancelled"""
+    tasks = list(_tasks.values())
+    if _heartbeat is not None:
+        tasks.append(_heartbeat)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.gather(*_final_writes, return_exceptions=True)
@@ -0,0 +1,166 @@
+"""
+Job Stores
+Where background job state lives: MongoDB (shared by every instance) or memory
+
+A job is a plain dict:
+    {job_id, kind, owner, params, status, progress: {done, total, message},
+     result, error, created_at, started_at, finished_at, expires_at,
+     lease_expires_at}
+status is one of queued, running, succeeded, failed, cancelled. Finished jobs
+are kept for JOB_RETENTION_SECONDS (a TTL index in MongoDB). Queued and
+running jobs hold a lease that the instance running them renews; see
+jobs.runner.
+"""
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from config import JOB_LEASE_SECONDS, JOB_RETENTION_SECONDS, JOB_STORE
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def expires_at() -> datetime:
+    return utcnow() + timedelta(seconds=JOB_RETENTION_SECONDS)
+
+
+def lease_expires_at() -> datetime:
+    return utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)
+
+
+class MemoryJobStore:
+    """Per-process job store for local runs"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self):
+        now = utcnow()
+        for job_id in [job_id for job_id, job in self._jobs.items() if job["expires_at"] < now]:
+            del self._jobs[job_id]
+
+    async def create(self, job: Dict[str, Any]):
+        with self._lock:
+            self._purge()
+            self._jobs[job["job_id"]] = dict(job)
+
+    async def update(self, job_id: str, fields: Dict[str, Any]):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    async def list_for_owner(self, owner: str, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values() if job["owner"] == owner]
+        jobs.sort(key=lambda job: job["created_at"], reverse=True)
+        return jobs[:limit]
+
+    async def renew_leases(self, job_ids: List[str], until: datetime):
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job is not None and job["status"] in ACTIVE_STATUSES:
+                    job["lease_expires_at"] = until
+
+    async def fail_stale(self, owner: str, exclude: List[str], fields: Dict[str, Any]) -> int:
+        now = utcnow()
+        with self._lock:
+            stale = [
+                job for job in self._jobs.values()
+                if job["owner"] == owner and job["status"] in ACTIVE_STATUSES
+                and job["job_id"] not in exclude and job.get("lease_expires_at", now) < now
+            ]
+            for job in stale:
+                job.update(fields)
+        return len(stale)
+
+
+class MongoJobStore:
+    """Job store in the app's MongoDB database (jobs collection)"""
+
+    def __init__(self):
+        self._indexed = False
+
+    def _collection(self):
+        from database import get_database
+        collection = get_database().jobs
+        if not self._indexed:
+            collection.create_index("job_id", unique=True)
+            collection.create_index([("owner", 1), ("created_at", -1)])
+            collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+        return collection
+
+    def _create(self, job: Dict[str, Any]):
+        self._collection().insert_one(dict(job))
+
+    def _update(self, job_id: str, fields: Dict[str, Any]):
+        self._collection().update_one({"job_id": job_id}, {"$set": fields})
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._collection().find_one({"job_id": job_id}, {"_id": 0})
+
+    def _list_for_owner(self, owner: str, limit: int) -> List[Dict[str, Any]]:
+        cursor = self._collection().find({"owner": owner}, {"_id": 0, "result": 0}).sort("created_at", -1).limit(limit)
+        return list(cursor)
+
+    def _renew_leases(self, job_ids: List[str], until: datetime):
+        self._collection().update_many(
+            {"job_id": {"$in": job_ids}, "status": {"$in": list(ACTIVE_STATUSES)}},
+            {"$set": {"lease_expires_at": until}},
+        )
+
+    def _fail_stale(self, owner: str, exclude: List[str], fields: Dict[str, Any]) -> int:
+        # Conditional on the lapsed lease, so a job renewed meanwhile is left alone
+        result = self._collection().update_many(
+            {
+                "owner": owner,
+                "status": {"$in": list(ACTIVE_STATUSES)},
+                "job_id": {"$nin": exclude},
+                "lease_expires_at": {"$lt": utcnow()},
+            },
+            {"$set": fields},
+        )
+        return result.modified_count
+
+    async def create(self, job: Dict[str, Any]):
+        await asyncio.to_thread(self._create, job)
+
+    async def update(self, job_id: str, fields: Dict[str, Any]):
+        await asyncio.to_thread(self._update, job_id, fields)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def list_for_owner(self, owner: str, limit: int = 50) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._list_for_owner, owner, limit)
+
+    async def renew_leases(self, job_ids: List[str], until: datetime):
+        await asyncio.to_thread(self._renew_leases, job_ids, until)
+
+    async def fail_stale(self, owner: str, exclude: List[str], fields: Dict[str, Any]) -> int:
+        return await asyncio.to_thread(self._fail_stale, owner, exclude, fields)
+
+
+_store = None
+
+
+def get_job_store():
+    """The configured job store (JOB_STORE=mongo or memory)"""
+    global _store
+    if _store is None:
+        _store = MongoJobStore() if JOB_STORE == "mongo" else MemoryJobStore()
+    return _store
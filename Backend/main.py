@@ -1,9 +1,18 @@
-from fastapi import FastAPI, HTTPException, Query, Depends, Cookie
+from fastapi import FastAPI, HTTPException, Query, Depends, Cookie, Request, Response
+from fastapi.responses import JSONResponse
+from googleapiclient.errors import HttpError
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from typing import Optional
+import asyncio
 import os
-from auth.router import router as auth_router, get_credentials
-from auth.dependencies import require_session
+from auth.router import router as auth_router, get_credentials_async, credentials_cache
+from auth.dependencies import require_admin_key, require_session
+from admin.router import router as admin_router
+from batch.router import router as batch_router
+from dashboard.router import router as dashboard_router
+from jobs.router import router as jobs_router
+from jobs.runner import shutdown_jobs
 from google_services.calendar.router import router as calendar_router
 from google_services.tasks.router import router as tasks_router
 from google_services.gmail.router import router as gmail_router
@@ -12,9 +21,29 @@ from google_services.contacts.router import router as contacts_router
 from google_services.sheets.router import router as sheets_router
 from google_services.youtube.router import router as youtube_router
 from google_services.photos.router import router as photos_router
-from google_services.maps import geocode_address
-from google_services.user_service import get_user_info
-from smart_assistant import get_smart_summary
+from google_services.search.router import router as search_router
+from google_services.breaker import CircuitOpenError
+from google_services.cache import cache_stats
+from google_services.hedging import hedging_stats
+from google_services.scheduler import get_scheduler
+from google_services.singleflight import single_flight_stats
+from google_services.transport import close_async_client, pool_stats
+from google_services.maps import geocode_address_async
+from google_services.user_service import get_user_info_async
+import metrics
+from profiling import ProfilingMiddleware, profiling_enabled
+from responses import CompressionMiddleware, ConditionalGetMiddleware, FastJSONResponse
+from tracing import TracingMiddleware, shutdown_tracing, tracing_enabled
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Stop background jobs, release the shared upstream HTTP connections and flush traces on shutdown"""
+    yield
+    await shutdown_jobs()
+    await close_async_client()
+    await asyncio.to_thread(shutdown_tracing)
+
 
 app = FastAPI(
     title="Google Services API",
@@ -37,7 +66,9 @@ app = FastAPI(
     ## 🧠 NEW: Smart Assistant
     - `/smart-summary` - Get AI analysis of all your events & tasks with prioritized recommendations
     """,
-    version="2.2.0"
+    version="2.2.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Get allowed origins from environment
@@ -57,10 +88,55 @@ app.add_middleware(
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["Content-Type", "Authorization", "Cookie", "X-Requested-With", "Accept"],
-    expose_headers=["Set-Cookie"],
+    allow_headers=["Content-Type", "Authorization", "Cookie", "X-Requested-With", "Accept", "If-None-Match", "traceparent"],
+    expose_headers=["Set-Cookie", "ETag", "X-Profile-Id", "X-Next-Cursor", "X-Trace-Id"],
 )
 
+# ETag / 304 for JSON GETs (inside compression so ETags hash the plain body)
+app.add_middleware(ConditionalGetMiddleware)
+
+# gzip/brotli for complete responses above RESPONSE_COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency, error and in-flight metrics (served at /metrics)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Request traces (tracing.py) when TRACING_EXPORTER is "file" or "otlp"
+if tracing_enabled():
+    app.add_middleware(TracingMiddleware)
+
+# On-demand request profiles (X-Profile: 1 plus the admin key, or sampled); outermost
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+
+@app.exception_handler(HttpError)
+async def google_http_error_handler(request: Request, exc: HttpError):
+    """
+    Return upstream Google errors with a meaningful status instead of a bare 500.
+    
+    4xx statuses pass through (429 keeps its Retry-After); 5xx become 502.
+    """
+    status = exc.resp.status
+    headers = {}
+    if status == 429 and exc.resp.get("retry-after"):
+        headers["Retry-After"] = exc.resp["retry-after"]
+    return JSONResponse(
+        status_code=status if 400 <= status < 500 else 502,
+        content={"detail": exc.reason or str(exc), "upstream_status": status},
+        headers=headers,
+    )
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    """Fail fast with 503 while an upstream API's circuit breaker is open"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "api": exc.api},
+        headers={"Retry-After": str(max(int(exc.retry_after + 0.999), 1))},
+    )
+
+
 # Include all routers
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(calendar_router)
@@ -71,6 +147,11 @@ app.include_router(contacts_router)
 app.include_router(sheets_router)
 app.include_router(youtube_router)
 app.include_router(photos_router)
+app.include_router(search_router)
+app.include_router(dashboard_router)
+app.include_router(jobs_router)
+app.include_router(batch_router)
+app.include_router(admin_router)
 
 
 @app.get("/", tags=["Info"])
@@ -99,12 +180,54 @@ def debug_config():
     }
 
 
+@app.get("/metrics", tags=["Debug"], include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus metrics: route, upstream Google API and MongoDB latency histograms"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/debug/pool", tags=["Debug"], dependencies=[Depends(require_admin_key)])
+def debug_pool():
+    """Upstream Google connection pool metrics - open connections, reuse ratio, wait time (requires X-Admin-Key)"""
+    return pool_stats()
+
+
+@app.get("/debug/cache", tags=["Debug"], dependencies=[Depends(require_admin_key)])
+def debug_cache():
+    """Response cache statistics per tier (l1 in-process, l2 shared): entries, hit ratio, revalidations (requires X-Admin-Key)"""
+    return cache_stats()
+
+
+@app.get("/debug/singleflight", tags=["Debug"], dependencies=[Depends(require_admin_key)])
+def debug_singleflight():
+    """Single-flight counters - calls, upstream calls, calls collapsed into another (requires X-Admin-Key)"""
+    return single_flight_stats()
+
+
+@app.get("/debug/scheduler", tags=["Debug"], dependencies=[Depends(require_admin_key)])
+def debug_scheduler():
+    """Upstream scheduler slots in use, queue depth and waiting users (requires X-Admin-Key)"""
+    return get_scheduler().stats()
+
+
+@app.get("/debug/hedging", tags=["Debug"], dependencies=[Depends(require_admin_key)])
+def debug_hedging():
+    """Hedge delay per API method and the remaining hedge budget (requires X-Admin-Key)"""
+    return hedging_stats()
+
+
+@app.get("/debug/credentials-cache", tags=["Debug"], dependencies=[Depends(require_admin_key)])
+def debug_credentials_cache():
+    """In-process credentials cache statistics - entries, hits/misses, evictions (requires X-Admin-Key)"""
+    return credentials_cache.stats()
+
+
 # Vercel serverless handler
 handler = app
 
 
 @app.get("/smart-summary", tags=["🧠 Smart Assistant"])
-def smart_summary(
+async def smart_summary(
     context: Optional[str] = Query(
         None, 
         description="Optional context like 'Focus on work tasks' or 'I have a deadline tomorrow'"
@@ -124,7 +247,7 @@ def smart_summary(
     **Optional**: Add `context` parameter to personalize.
     Example: `/smart-summary?context=I need to focus on the client project`
     """
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     
     if not credentials:
         raise HTTPException(
@@ -136,21 +259,23 @@ def smart_summary(
         )
     
     try:
-        return get_smart_summary(credentials, user_context=context)
+        # Imported here: the Gemini SDK is only loaded once this route is used
+        from smart_assistant import get_smart_summary_async
+        return await get_smart_summary_async(credentials, user_context=context)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/user/me", tags=["User"])
-def get_current_user(session_id: str = Depends(require_session)):
+async def get_current_user(session_id: str = Depends(require_session)):
     """Get current authenticated user's profile"""
-    credentials = get_credentials(session_id)
+    credentials = await get_credentials_async(session_id)
     if not credentials:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    return get_user_info(credentials)
+    return await get_user_info_async(credentials)
 
 
 @app.get("/maps/geocode", tags=["Maps"])
-def geocode(address: str):
+async def geocode(address: str):
     """Geocode an address using Google Maps API"""
-    return geocode_address(address)
+    return await geocode_address_async(address)
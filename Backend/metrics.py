@@ -0,0 +1,230 @@
+"""
+Metrics
+Prometheus text-format counters, gauges and latency histograms
+
+Collects per-route request latency (MetricsMiddleware), per-method upstream
+Google API latency (google_services.client) and per-command MongoDB latency
+(mongo_command_listener), rendered at GET /metrics. Comparing a route's latency
+with the upstream calls it makes shows our own overhead apart from Google's.
+"""
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values: str):
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def _samples(self) -> List[str]:
+        lines = []
+        bucket_labels = self.labels + ("le",)
+        for key, series in self._series.items():
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels, key + (repr(bound),))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels, key + ('+Inf',))} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-1])}")
+        return lines
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ============== METRICS ==============
+
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests currently being handled by this worker")
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route", ("method", "route", "status"))
+http_request_errors = Counter(
+    "http_request_errors_total", "Responses with status >= 400 by route", ("method", "route", "status"))
+
+google_api_requests_in_flight = Gauge(
+    "google_api_requests_in_flight", "Upstream Google API requests currently in flight")
+google_api_request_duration = Histogram(
+    "google_api_request_duration_seconds", "Upstream Google API latency by API method", ("method", "status"))
+google_api_errors = Counter(
+    "google_api_errors_total", "Upstream Google API responses with status >= 400", ("method", "status"))
+
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ("command", "outcome"))
+mongo_command_errors = Counter(
+    "mongo_command_errors_total", "Failed MongoDB commands", ("command",))
+
+
+def observe_google_api(method: str, status: int, seconds: float):
+    """Record one upstream Google API call (status 0 means no response)"""
+    google_api_request_duration.observe(seconds, method, str(status))
+    if status == 0 or status >= 400:
+        google_api_errors.inc(method, str(status))
+
+
+# ============== HTTP MIDDLEWARE ==============
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request.
+
+    Requests are labelled by route template (e.g. /gmail/messages/{message_id})
+    so path parameters don't create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_duration.observe(time.perf_counter() - started, method, route, str(status))
+            if status >= 400:
+                http_request_errors.inc(method, route, str(status))
+
+
+# ============== MONGODB ==============
+
+def mongo_command_listener():
+    """
+    pymongo CommandListener feeding mongo_command_duration.
+
+    Commands issued within a traced request also get a client span. Built on
+    demand so pymongo is only imported once MongoDB is first used.
+    """
+    from pymongo import monitoring
+    from tracing import KIND_CLIENT, NOOP_SPAN, start_span
+
+    # (connection, request id) -> span of a command still running
+    spans: Dict[Tuple[Any, int], Any] = {}
+
+    class MongoCommandListener(monitoring.CommandListener):
+        def started(self, event):
+            trace = start_span(f"mongo.{event.command_name}", {
+                "db.system": "mongodb",
+                "db.namespace": event.database_name,
+                "db.operation.name": event.command_name,
+            }, kind=KIND_CLIENT)
+            if trace is not NOOP_SPAN:
+                spans[(event.connection_id, event.request_id)] = trace
+
+        def succeeded(self, event):
+            mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, "success")
+            trace = spans.pop((event.connection_id, event.request_id), None)
+            if trace is not None:
+                trace.end()
+
+        def failed(self, event):
+            mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, "failure")
+            mongo_command_errors.inc(event.command_name)
+            trace = spans.pop((event.connection_id, event.request_id), None)
+            if trace is not None:
+                trace.error(str(event.failure.get("errmsg", "command failed")))
+                trace.end()
+
+    return MongoCommandListener()
@@ -0,0 +1,201 @@
+"""
+Request Profiling
+On-demand sampling profiles of individual HTTP requests
+
+A request is profiled when it carries `X-Profile: 1` together with a valid
+X-Admin-Key, or when it is picked at random (PROFILING_SAMPLE_RATE). While it
+runs, a background thread samples the stack of every thread in the process
+every PROFILING_INTERVAL_MS, so the profile shows where time goes - discovery
+parsing, JSON encoding, pymongo, waiting on Google - including work done in
+the threadpool. Concurrent requests are sampled too; profile against a quiet
+instance for a clean picture. One request is profiled at a time.
+
+Profiles are kept in memory (the last PROFILING_MAX_PROFILES) in collapsed-stack
+format - one `thread;outer;...;inner count` line per stack - which
+flamegraph.pl, speedscope and inferno read directly. The response carries an
+X-Profile-Id header; fetch the profile from /admin/profiles/{id}.
+"""
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from auth.dependencies import is_admin_key
+from config import (
+    ADMIN_API_KEY,
+    PROFILING_INTERVAL_MS,
+    PROFILING_MAX_PROFILES,
+    PROFILING_MAX_SECONDS,
+    PROFILING_SAMPLE_RATE,
+)
+
+# Leaf frames of threads parked with nothing to do (idle threadpool workers)
+_IDLE_LEAVES = {("threading", "Condition.wait"), ("queue", "Queue.get")}
+
+# Never profile the profile endpoints themselves
+_EXCLUDED_PREFIX = "/admin/profiles"
+
+
+# ============== SAMPLER ==============
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class _Sampler(threading.Thread):
+    """Counts the collapsed stacks of all other threads until stopped"""
+
+    def __init__(self, interval: float, max_seconds: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        ends_at = time.monotonic() + self.max_seconds
+        while not self._stop_event.wait(self.interval) and time.monotonic() < ends_at:
+            self._sample()
+
+    def _sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if not stack or tuple(stack[0].split(":", 1)) in _IDLE_LEAVES:
+                continue
+            stack.append(names.get(ident, f"thread-{ident}"))
+            collapsed = ";".join(reversed(stack))
+            self.stacks[collapsed] = self.stacks.get(collapsed, 0) + 1
+        self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ============== PROFILE STORE ==============
+
+class ProfileStore:
+    """The most recent profiles, oldest dropped first"""
+
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Dict[str, Any]):
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries, newest first"""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [{key: value for key, value in profile.items() if key != "stacks"} for profile in reversed(profiles)]
+
+
+_store = ProfileStore(PROFILING_MAX_PROFILES)
+
+
+def get_profile_store() -> ProfileStore:
+    return _store
+
+
+def collapsed(profile: Dict[str, Any]) -> str:
+    """Collapsed-stack text of a profile, heaviest stacks first"""
+    stacks = sorted(profile["stacks"].items(), key=lambda item: item[1], reverse=True)
+    return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+def profiling_enabled() -> bool:
+    """Whether any request can be profiled (header-triggered needs ADMIN_API_KEY)"""
+    return PROFILING_SAMPLE_RATE > 0 or bool(ADMIN_API_KEY)
+
+
+# ============== HTTP MIDDLEWARE ==============
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requested or sampled HTTP requests.
+
+    Other requests pass through after a scan of their headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = threading.Lock()
+
+    def _trigger(self, scope) -> Optional[str]:
+        if scope["path"].startswith(_EXCLUDED_PREFIX):
+            return None
+        requested = admin_key = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                requested = value
+            elif name == b"x-admin-key":
+                admin_key = value
+        if requested == b"1" and admin_key is not None and is_admin_key(admin_key.decode("latin-1")):
+            return "header"
+        if PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = secrets.token_urlsafe(9)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = _Sampler(PROFILING_INTERVAL_MS / 1000, PROFILING_MAX_SECONDS)
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            self._busy.release()
+            _store.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "trigger": trigger,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "interval_ms": PROFILING_INTERVAL_MS,
+                "samples": sampler.samples,
+                "stacks": sampler.stacks,
+            })
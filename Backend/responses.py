@@ -0,0 +1,335 @@
+"""
+Response Pipeline
+Fast JSON serialization and negotiated gzip/brotli compression
+
+FastJSONRoute lets product routes return plain dicts and lists that are
+serialized straight to bytes with orjson, skipping FastAPI's per-object
+jsonable_encoder pass (the bulk of the CPU for large lists such as
+/calendar/events or /contacts/). ConditionalGetMiddleware tags JSON GET
+responses with a content ETag and answers a matching If-None-Match with 304.
+CompressionMiddleware then compresses complete responses above
+RESPONSE_COMPRESSION_MIN_BYTES with brotli (when the `brotli` package is
+installed) or gzip, whichever the client prefers.
+
+Compare the before/after cost per endpoint with benchmarks/bench_responses.py.
+"""
+import functools
+import gzip
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+from config import (
+    RESPONSE_BROTLI_QUALITY,
+    RESPONSE_COMPRESSION_MIN_BYTES,
+    RESPONSE_GZIP_LEVEL,
+)
+from tracing import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# ============== JSON ==============
+
+def _default(value: Any) -> Any:
+    """orjson fallback for types it doesn't know natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            content = jsonable_encoder(content)
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        with span("response.serialize") as trace:
+            body = dumps(content)
+            trace.set("response.bytes", len(body))
+            return body
+
+
+def _takes_response(endpoint: Callable) -> bool:
+    """Endpoints that set headers/cookies on an injected Response need FastAPI's normal path"""
+    return any(param.annotation is Response for param in inspect.signature(endpoint).parameters.values())
+
+
+class FastJSONRoute(APIRoute):
+    """
+    APIRoute that returns dict/list results as FastJSONResponse directly.
+
+    FastAPI passes Response objects through untouched, so the result never goes
+    through jsonable_encoder. Routes with a response_model, or that take a
+    Response parameter, keep the default behaviour.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        response_model = kwargs.get("response_model")
+        if isinstance(response_model, DefaultPlaceholder):
+            response_model = response_model.value
+        if response_model is None \
+                and inspect.signature(endpoint).return_annotation is inspect.Signature.empty \
+                and not _takes_response(endpoint):
+            endpoint = _fast_json_endpoint(endpoint, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _fast_json_endpoint(endpoint: Callable, status_code: Optional[int]) -> Callable:
+    status = status_code if isinstance(status_code, int) else 200
+
+    def wrap(result: Any) -> Any:
+        if isinstance(result, (dict, list)):
+            return FastJSONResponse(result, status_code=status)
+        return result
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def fast_endpoint(*args, **kwargs):
+            return wrap(await endpoint(*args, **kwargs))
+    else:
+        @functools.wraps(endpoint)
+        def fast_endpoint(*args, **kwargs):
+            return wrap(endpoint(*args, **kwargs))
+    return fast_endpoint
+
+
+# ============== COMPRESSION ==============
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported content coding for an Accept-Encoding header"""
+    accepted = _accepted_encodings(accept_encoding)
+    candidates: List[Tuple[float, int, str]] = []
+    for preference, coding in enumerate(("br", "gzip")):
+        if coding == "br" and brotli is None:
+            continue
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > 0:
+            candidates.append((q, -preference, coding))
+    return max(candidates)[2] if candidates else None
+
+
+def vary_on_encoding(headers: MutableHeaders):
+    """Mark a response whose representation depends on Accept-Encoding (once)"""
+    vary = headers.get("vary", "")
+    if "accept-encoding" not in vary.lower() and vary.strip() != "*":
+        headers.add_vary_header("Accept-Encoding")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete responses with br or gzip.
+
+    Only single-message bodies are compressed; streamed responses (e.g. NDJSON)
+    pass through untouched so they keep flushing incrementally. Every response
+    that could have been compressed carries Vary: Accept-Encoding, including
+    small or identity-encoded ones, so shared caches key on the coding.
+    """
+
+    def __init__(self, app, minimum_size: int = RESPONSE_COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith(("image/", "video/", "audio/"))
+            ):
+                await send(start)
+                await send(message)
+                return
+            vary_on_encoding(headers)
+            if encoding is None or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            with span("response.compress", {"response.encoding": encoding, "response.bytes": len(body)}):
+                body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            etag = headers.get("etag")
+            if etag and etag.startswith('"'):
+                # A strong ETag must differ per content-coding
+                headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+            headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+# ============== CONDITIONAL GET ==============
+
+# Suffixes CompressionMiddleware adds to strong ETags of encoded variants
+_ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _normalize_etag(tag: str) -> str:
+    """Opaque tag without W/ or an encoding suffix (If-None-Match uses weak comparison)"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def matching_etag(if_none_match: str, etag: str) -> Optional[str]:
+    """The tag from If-None-Match that matches etag, if any"""
+    target = _normalize_etag(etag)
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag and _normalize_etag(tag) == target):
+            return etag if tag == "*" else tag
+    return None
+
+
+class ConditionalGetMiddleware:
+    """
+    ASGI middleware adding ETags to JSON GET responses and answering If-None-Match.
+
+    The ETag is a hash of the uncompressed body, so an unchanged list costs the
+    client a 304 with no body instead of a full download and parse. Responses
+    are session-scoped, so they are marked private and revalidated on every use
+    (Cache-Control: private, no-cache) and vary on the session credentials.
+    Must sit inside CompressionMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                start["status"] != 200
+                or message.get("more_body", False)
+                or "etag" in headers
+                or not headers.get("content-type", "").startswith("application/json")
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            etag = content_etag(body)
+            headers["ETag"] = etag
+            if "cache-control" not in headers:
+                headers["Cache-Control"] = "private, no-cache"
+            headers.add_vary_header("Authorization")
+            headers.add_vary_header("Cookie")
+            # The 304 loses its Content-Type, so mark the coding here too
+            vary_on_encoding(headers)
+
+            matched = matching_etag(if_none_match, etag) if if_none_match else None
+            if matched is None:
+                await send(start)
+                await send(message)
+                return
+
+            # 304: same validators and caching headers, no body
+            headers["ETag"] = matched
+            for name in ("content-length", "content-type"):
+                if name in headers:
+                    del headers[name]
+            await send({**start, "status": 304})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
+
@@ -3,18 +3,65 @@ Smart Assistant Service
 Single endpoint that aggregates Google Calendar, Tasks & Gmail data 
 and uses Gemini AI to provide intelligent task management advice
 """
-from google import genai
-from google.genai import types
-from googleapiclient.discovery import build
+from google_services.client import build_service
 from google.oauth2.credentials import Credentials
 from datetime import datetime, timedelta
 from dateutil import parser as date_parser
 from typing import Optional, List, Dict, Any
 from config import GEMINI_API_KEY
+from tracing import span
+import asyncio
 import base64
 
-# Configure Gemini client
-gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+# Gemini client, created on first use (google.genai is slow to import)
+_gemini_client = None
+
+
+def get_gemini_client():
+    """Return the shared Gemini client, importing google.genai on first call"""
+    global _gemini_client
+    if _gemini_client is None:
+        from google import genai
+        _gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+    return _gemini_client
+
+
+def _generate_config():
+    from google.genai import types
+    return types.GenerateContentConfig(system_instruction=SYSTEM_INSTRUCTION)
+
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Gemini system instruction - kept concise to reduce token usage
+SYSTEM_INSTRUCTION = """You are a productivity assistant. Be VERY concise.
+
+Provide output in this exact format:
+
+**📧 EMAILS** (max 5 items)
+• [Sender]: [Action needed] - [Urgent/Normal]
+
+**📅 MEETINGS** (max 5 items)
+• [Time] - [Event name] - [Duration]
+
+**✅ TASKS** (max 5 items)
+• [Task] - [Due date if any]
+
+**⚡ TOP 3 PRIORITIES**
+1. [Most important action]
+2. [Second priority]
+3. [Third priority]
+
+**🗓️ DAY PLAN**
+• Morning: [Focus work/meetings]
+• Afternoon: [Key activities]
+• Best time for deep work: [Suggested slot]
+
+Rules:
+- One line per item, no extra explanation
+- Skip sections if empty
+- Suggest time blocks around meetings
+- Max 180 words total"""
 
 
 def find_overlapping_events(events: List[Dict]) -> List[str]:
@@ -37,27 +84,30 @@ def find_overlapping_events(events: List[Dict]) -> List[str]:
 
 def get_all_events(credentials: Credentials, days_ahead: int = 15) -> List[Dict[str, Any]]:
     """Fetch all calendar events for the next N days (default 15)"""
-    service = build("calendar", "v3", credentials=credentials)
-    
+    service = build_service("calendar", "v3", credentials)
+    events = _events_request(service, days_ahead).execute()
+    return events.get("items", [])
+
+
+def _events_request(service, days_ahead: int):
+    """Build the events.list request covering the next N days"""
     now = datetime.utcnow()
     time_min = now.isoformat() + "Z"
     time_max = (now + timedelta(days=days_ahead)).isoformat() + "Z"
     
-    events = service.events().list(
+    return service.events().list(
         calendarId="primary",
         timeMin=time_min,
         timeMax=time_max,
         maxResults=50,
         singleEvents=True,
         orderBy="startTime",
-    ).execute()
-    
-    return events.get("items", [])
+    )
 
 
 def get_all_tasks(credentials: Credentials) -> List[Dict[str, Any]]:
     """Fetch all pending tasks from all task lists"""
-    service = build("tasks", "v1", credentials=credentials)
+    service = build_service("tasks", "v1", credentials)
     
     all_tasks = []
     
@@ -84,8 +134,33 @@ def get_all_tasks(credentials: Credentials) -> List[Dict[str, Any]]:
 
 def get_unread_emails(credentials: Credentials, max_results: int = 10) -> List[Dict[str, Any]]:
     """Fetch unread emails that contain tasks, action items, or pending work from clients"""
-    service = build("gmail", "v1", credentials=credentials)
+    service = build_service("gmail", "v1", credentials)
+    
+    results = service.users().messages().list(
+        userId="me",
+        maxResults=max_results,
+        q=_unread_tasks_query()
+    ).execute()
+    
+    messages = results.get("messages", [])
+    
+    detailed_emails = []
+    for msg in messages:
+        try:
+            msg_detail = service.users().messages().get(
+                userId="me",
+                id=msg["id"],
+                format="full"
+            ).execute()
+            detailed_emails.append(_format_email(msg, msg_detail))
+        except Exception:
+            continue
     
+    return detailed_emails
+
+
+def _unread_tasks_query() -> str:
+    """Gmail search query for unread emails likely to contain pending work"""
     # Query for unread emails with task-related keywords
     # Filters for emails likely containing pending tasks or client requests
     task_keywords = [
@@ -109,56 +184,38 @@ def get_unread_emails(credentials: Credentials, max_results: int = 10) -> List[D
     
     # Build Gmail search query: is:unread AND (keyword1 OR keyword2 OR ...)
     keywords_query = " OR ".join([f'"{kw}"' for kw in task_keywords])
-    search_query = f"is:unread ({keywords_query})"
+    return f"is:unread ({keywords_query})"
+
+
+def _format_email(msg: Dict[str, Any], msg_detail: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract sender, subject and a truncated plain-text body from a full message"""
+    headers = {h["name"]: h["value"] for h in msg_detail.get("payload", {}).get("headers", [])}
     
-    results = service.users().messages().list(
-        userId="me",
-        maxResults=max_results,
-        q=search_query
-    ).execute()
+    # Extract body content
+    body = ""
+    payload = msg_detail.get("payload", {})
     
-    messages = results.get("messages", [])
+    if "parts" in payload:
+        for part in payload["parts"]:
+            if part.get("mimeType") == "text/plain":
+                data = part.get("body", {}).get("data", "")
+                if data:
+                    body = base64.urlsafe_b64decode(data).decode("utf-8")
+                break
+    elif "body" in payload and "data" in payload["body"]:
+        body = base64.urlsafe_b64decode(payload["body"]["data"]).decode("utf-8")
     
-    detailed_emails = []
-    for msg in messages:
-        try:
-            msg_detail = service.users().messages().get(
-                userId="me",
-                id=msg["id"],
-                format="full"
-            ).execute()
-            
-            headers = {h["name"]: h["value"] for h in msg_detail.get("payload", {}).get("headers", [])}
-            
-            # Extract body content
-            body = ""
-            payload = msg_detail.get("payload", {})
-            
-            if "parts" in payload:
-                for part in payload["parts"]:
-                    if part.get("mimeType") == "text/plain":
-                        data = part.get("body", {}).get("data", "")
-                        if data:
-                            body = base64.urlsafe_b64decode(data).decode("utf-8")
-                        break
-            elif "body" in payload and "data" in payload["body"]:
-                body = base64.urlsafe_b64decode(payload["body"]["data"]).decode("utf-8")
-            
-            # Truncate body to avoid token limits
-            body = body[:500] if len(body) > 500 else body
-            
-            detailed_emails.append({
-                "id": msg["id"],
-                "from": headers.get("From", "Unknown"),
-                "subject": headers.get("Subject", "No Subject"),
-                "date": headers.get("Date", ""),
-                "snippet": msg_detail.get("snippet", ""),
-                "body": body
-            })
-        except Exception:
-            continue
+    # Truncate body to avoid token limits
+    body = body[:500] if len(body) > 500 else body
     
-    return detailed_emails
+    return {
+        "id": msg["id"],
+        "from": headers.get("From", "Unknown"),
+        "subject": headers.get("Subject", "No Subject"),
+        "date": headers.get("Date", ""),
+        "snippet": msg_detail.get("snippet", ""),
+        "body": body
+    }
 
 
 def format_schedule_data(events: List[Dict], tasks: List[Dict], emails: List[Dict]) -> str:
@@ -212,39 +269,21 @@ def get_smart_summary(credentials: Credentials, user_context: Optional[str] = No
     tasks = get_all_tasks(credentials)
     emails = get_unread_emails(credentials)
     
-    # Format data for Gemini
-    schedule_data = format_schedule_data(events, tasks, emails)
+    # Generate AI response
+    response = get_gemini_client().models.generate_content(
+        model=GEMINI_MODEL,
+        contents=_build_prompt(events, tasks, emails, user_context),
+        config=_generate_config()
+    )
     
-    # Gemini system instruction - kept concise to reduce token usage
-    system_instruction = """You are a productivity assistant. Be VERY concise.
-
-Provide output in this exact format:
-
-**📧 EMAILS** (max 5 items)
-• [Sender]: [Action needed] - [Urgent/Normal]
+    return _build_summary(response.text, events)
 
-**📅 MEETINGS** (max 5 items)
-• [Time] - [Event name] - [Duration]
-
-**✅ TASKS** (max 5 items)
-• [Task] - [Due date if any]
-
-**⚡ TOP 3 PRIORITIES**
-1. [Most important action]
-2. [Second priority]
-3. [Third priority]
-
-**🗓️ DAY PLAN**
-• Morning: [Focus work/meetings]
-• Afternoon: [Key activities]
-• Best time for deep work: [Suggested slot]
-
-Rules:
-- One line per item, no extra explanation
-- Skip sections if empty
-- Suggest time blocks around meetings
-- Max 180 words total"""
 
+def _build_prompt(events: List[Dict], tasks: List[Dict], emails: List[Dict], user_context: Optional[str]) -> str:
+    """Build the minimal Gemini prompt from the fetched data"""
+    # Format data for Gemini
+    schedule_data = format_schedule_data(events, tasks, emails)
+    
     # Build the prompt - kept minimal
     prompt = f"""Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}
 
@@ -253,16 +292,12 @@ Rules:
     if user_context:
         prompt += f"\nContext: {user_context}"
     
-    # Generate AI response
-    config = types.GenerateContentConfig(system_instruction=system_instruction)
-    
-    response = gemini_client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=config
-    )
-    
-    ai_summary = response.text or "Unable to generate summary."
+    return prompt
+
+
+def _build_summary(text: Optional[str], events: List[Dict]) -> Dict[str, Any]:
+    """Wrap Gemini's answer (plus overlap warnings) into the API response"""
+    ai_summary = text or "Unable to generate summary."
     
     # Add overlap warning if any
     overlaps = find_overlapping_events(events)
@@ -274,3 +309,94 @@ Rules:
         "generated_at": datetime.now().isoformat(),
         "ai_analysis": ai_summary
     }
+
+
+# ============== ASYNC ==============
+
+async def get_all_events_async(credentials: Credentials, days_ahead: int = 15) -> List[Dict[str, Any]]:
+    """Async variant of get_all_events"""
+    service = build_service("calendar", "v3", credentials)
+    events = await _events_request(service, days_ahead).execute_async()
+    return events.get("items", [])
+
+
+async def get_all_tasks_async(credentials: Credentials) -> List[Dict[str, Any]]:
+    """Async variant of get_all_tasks; the task lists are read concurrently"""
+    service = build_service("tasks", "v1", credentials)
+    
+    task_lists = (await service.tasklists().list(maxResults=10).execute_async()).get("items", [])
+    
+    results = await asyncio.gather(*(
+        service.tasks().list(
+            tasklist=task_list.get("id"),
+            showCompleted=False,
+            maxResults=100
+        ).execute_async()
+        for task_list in task_lists
+    ))
+    
+    all_tasks = []
+    for task_list, tasks in zip(task_lists, results):
+        list_name = task_list.get("title", "Unknown List")
+        for task in tasks.get("items", []):
+            task["listName"] = list_name
+            all_tasks.append(task)
+    
+    return all_tasks
+
+
+async def get_unread_emails_async(credentials: Credentials, max_results: int = 10) -> List[Dict[str, Any]]:
+    """Async variant of get_unread_emails; message bodies are fetched concurrently"""
+    service = build_service("gmail", "v1", credentials)
+    
+    results = await service.users().messages().list(
+        userId="me",
+        maxResults=max_results,
+        q=_unread_tasks_query()
+    ).execute_async()
+    
+    messages = results.get("messages", [])
+    details = await asyncio.gather(
+        *(
+            service.users().messages().get(userId="me", id=msg["id"], format="full").execute_async()
+            for msg in messages
+        ),
+        return_exceptions=True,
+    )
+    
+    detailed_emails = []
+    for msg, detail in zip(messages, details):
+        if isinstance(detail, Exception):
+            continue
+        try:
+            detailed_emails.append(_format_email(msg, detail))
+        except Exception:
+            continue
+    
+    return detailed_emails
+
+
+async def _traced_stage(name: str, fetch):
+    """Await one data source under its own span, so slow summaries show which stage"""
+    with span(name):
+        return await fetch
+
+
+async def get_smart_summary_async(credentials: Credentials, user_context: Optional[str] = None) -> Dict[str, Any]:
+    """Async variant of get_smart_summary; the three sources are fetched concurrently"""
+    with span("smart_summary.fetch"):
+        events, tasks, emails = await asyncio.gather(
+            _traced_stage("smart_summary.events", get_all_events_async(credentials)),
+            _traced_stage("smart_summary.tasks", get_all_tasks_async(credentials)),
+            _traced_stage("smart_summary.emails", get_unread_emails_async(credentials)),
+        )
+    
+    with span("smart_summary.gemini", {"gemini.model": GEMINI_MODEL}):
+        response = await get_gemini_client().aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=_build_prompt(events, tasks, emails, user_context),
+            config=_generate_config()
+        )
+    
+    with span("smart_summary.build"):
+        return _build_summary(response.text, events)
@@ -0,0 +1,17 @@
+"""
+Shared fixtures for the unit tests
+
+Run from Backend/: python -m pytest
+The tests exercise the in-process primitives only; nothing talks to Google
+or MongoDB.
+"""
+import pytest
+from google.oauth2.credentials import Credentials
+
+
+@pytest.fixture
+def make_credentials():
+    """Factory for OAuth credentials with a distinct access token per user"""
+    def make(token: str = "token-a", **kwargs) -> Credentials:
+        return Credentials(token, **kwargs)
+    return make
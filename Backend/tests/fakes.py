@@ -0,0 +1,81 @@
+"""Stand-ins for Google requests and MongoDB collections used by the cache and single-flight tests"""
+import asyncio
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from google_services.cache import prepare_request
+
+
+class FakeRequest:
+    """Just enough of HttpRequest for prepare_request()"""
+
+    def __init__(self, method: str = "GET"):
+        self.method = method
+        self.headers = {}
+        self.callbacks = []
+
+    def add_response_callback(self, callback):
+        self.callbacks.append(callback)
+
+
+class FakeUpstream:
+    """Answers 304 to a matching If-None-Match, else 200 with the current body and ETag"""
+
+    def __init__(self, body, etag="v1"):
+        self.body, self.etag = body, etag
+        self.sent = []
+
+    def call(self):
+        request = self._send()
+        return self._answer(request)
+
+    async def call_async(self, delay: float = 0.02):
+        """call() that takes `delay` seconds, so concurrent callers overlap"""
+        request = self._send()
+        await asyncio.sleep(delay)
+        return self._answer(request)
+
+    def _send(self) -> FakeRequest:
+        request = FakeRequest()
+        prepare_request(request)
+        self.sent.append(request.headers.get("If-None-Match"))
+        return request
+
+    def _answer(self, request: FakeRequest):
+        status = 304 if request.headers.get("If-None-Match") == self.etag else 200
+        resp = httplib2.Response({"status": str(status), "etag": self.etag})
+        for callback in request.callbacks:
+            callback(resp)
+        if status == 304:
+            raise HttpError(resp, b"")
+        return dict(self.body)
+
+
+class FakeCollection:
+    """In-memory stand-in for the few pymongo collection calls the shared cache tier makes"""
+
+    def __init__(self):
+        self.docs = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("MongoDB unreachable")
+
+    def find_one(self, query):
+        self._check()
+        doc = self.docs.get(query["_id"])
+        if doc is None or doc["expires_at"] <= query["expires_at"]["$gt"]:
+            return None
+        return dict(doc)
+
+    def replace_one(self, query, doc, upsert=False):
+        self._check()
+        self.docs[query["_id"]] = dict(doc)
+
+    def delete_many(self, query):
+        self._check()
+        for doc_id, doc in list(self.docs.items()):
+            if doc["user"] == query["user"] and doc["op"] in query["op"]["$in"]:
+                del self.docs[doc_id]
@@ -0,0 +1,81 @@
+"""Per-session, deduplicated OAuth token refresh (auth.router)"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+import auth.router as auth_router
+
+
+@pytest.fixture
+def token_endpoint(monkeypatch):
+    """Counts refreshes and saves; each refresh issues token-1, token-2, ..."""
+    refreshes, saves = [], []
+
+    def refresh(credentials, request):
+        time.sleep(0.05)
+        refreshes.append(credentials)
+        credentials.token = f"token-{len(refreshes)}"
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(Credentials, "refresh", refresh)
+    monkeypatch.setattr(auth_router, "save_credentials", lambda credentials, session_id: saves.append(session_id))
+    return refreshes, saves
+
+
+def _expiring(token: str = "old", seconds: float = -60) -> Credentials:
+    return Credentials(token, refresh_token="refresh", expiry=datetime.utcnow() + timedelta(seconds=seconds))
+
+
+def test_concurrent_refreshes_of_a_session_call_google_once(token_endpoint):
+    refreshes, saves = token_endpoint
+    credentials = _expiring()
+    auth_router.credentials_cache["session-concurrent"] = credentials
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            auth_router.refresh_session_credentials("session-concurrent", credentials)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(refreshes) == 1
+    assert saves == ["session-concurrent"]
+    assert {result.token for result in results} == {"token-1"}
+
+
+def test_token_not_yet_due_is_left_alone(token_endpoint):
+    refreshes, _ = token_endpoint
+    credentials = _expiring("fresh", seconds=3600)
+    auth_router.credentials_cache["session-fresh"] = credentials
+    assert auth_router.refresh_session_credentials("session-fresh", credentials).token == "fresh"
+    assert refreshes == []
+
+
+def test_rejected_token_is_refreshed_even_if_not_due(token_endpoint):
+    refreshes, _ = token_endpoint
+    credentials = _expiring("revoked", seconds=3600)
+    auth_router.credentials_cache["session-revoked"] = credentials
+    refreshed = auth_router.refresh_session_credentials("session-revoked", credentials, rejected_token="revoked")
+    assert refreshed.token == "token-1"
+    # A second request rejected with the same, already replaced token reuses the new one
+    again = auth_router.refresh_session_credentials("session-revoked", credentials, rejected_token="revoked")
+    assert again.token == "token-1"
+    assert len(refreshes) == 1
+
+
+def test_background_refresh_is_scheduled_once_per_session(token_endpoint):
+    refreshes, _ = token_endpoint
+    credentials = _expiring("soon", seconds=120)
+    auth_router.credentials_cache["session-soon"] = credentials
+    for _ in range(3):
+        auth_router.schedule_refresh("session-soon", credentials)
+    deadline = time.monotonic() + 2
+    while "session-soon" in auth_router._background_refreshes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(refreshes) == 1
+    assert credentials.token == "token-1"
@@ -0,0 +1,105 @@
+"""Multi-operation /batch endpoint (batch.router)"""
+import asyncio
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import batch.router as batch_router
+from auth.dependencies import require_session
+from auth.router import get_credentials_async
+from google_services.pagination import paginated
+
+
+def make_app(credentials) -> FastAPI:
+    app = FastAPI()
+    routes = APIRouter(prefix="/things")
+
+    @routes.get("/me")
+    async def me(session_id: str = Depends(require_session)):
+        resolved = await get_credentials_async(session_id)
+        return {"session": session_id, "resolved": resolved is credentials}
+
+    @routes.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="No such thing")
+
+    @routes.post("/echo")
+    async def echo(body: dict):
+        return body
+
+    @routes.get("/paged")
+    async def paged():
+        return paginated({"items": [1]}, "google-token", "things.paged:x")
+
+    @routes.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(3):
+                await asyncio.sleep(0.01)
+                yield f"{i}\n".encode()
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app.include_router(routes)
+    app.include_router(batch_router.router)
+    return app
+
+
+@pytest.fixture
+def client(monkeypatch, make_credentials):
+    credentials = make_credentials("token-batch")
+
+    async def get_credentials(session_id):
+        return credentials
+
+    monkeypatch.setattr(batch_router, "get_credentials_async", get_credentials)
+    return TestClient(make_app(credentials))
+
+
+def run(client, *requests, session="session-batch"):
+    return client.post("/batch", json={"requests": list(requests)}, headers={"Authorization": f"Bearer {session}"})
+
+
+def test_sub_requests_share_the_resolved_session(client):
+    response = run(client, {"id": "me", "path": "/things/me"})
+    assert response.status_code == 200
+    assert response.json()["responses"] == [
+        {"id": "me", "status": 200, "body": {"session": "session-batch", "resolved": True}},
+    ]
+
+
+def test_each_result_has_its_own_status_in_request_order(client):
+    results = run(
+        client,
+        {"id": "a", "path": "/things/missing"},
+        {"id": "b", "method": "POST", "path": "/things/echo", "body": {"x": 1}},
+    ).json()["responses"]
+    assert [(result["id"], result["status"]) for result in results] == [("a", 404), ("b", 200)]
+    assert results[1]["body"] == {"x": 1}
+
+
+def test_listings_return_their_next_cursor(client):
+    [result] = run(client, {"path": "/things/paged"}).json()["responses"]
+    assert result["body"] == {"items": [1]}
+    assert result["next_cursor"]
+
+
+def test_streamed_bodies_arrive_in_full(client):
+    [result] = run(client, {"path": "/things/stream"}).json()["responses"]
+    assert (result["status"], result["body"]) == (200, "0\n1\n2\n")
+
+
+@pytest.mark.parametrize("path", ["/batch", "/auth/logout", "/admin/breakers", "things/me"])
+def test_blocked_paths_are_refused(client, path):
+    [result] = run(client, {"path": path}).json()["responses"]
+    assert result["status"] == 400
+
+
+def test_batch_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr(batch_router, "BATCH_MAX_OPERATIONS", 2)
+    assert run(client, *[{"path": "/things/me"}] * 3).status_code == 400
+
+
+def test_batch_needs_a_session(client):
+    assert client.post("/batch", json={"requests": [{"path": "/things/me"}]}).status_code == 401
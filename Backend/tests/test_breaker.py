@@ -0,0 +1,120 @@
+"""Per-API circuit breakers (google_services.breaker) and their admin endpoints"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import auth.dependencies
+from admin.router import router as admin_router
+from google_services import breaker
+from google_services.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def thresholds(monkeypatch):
+    monkeypatch.setattr(breaker, "BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(breaker, "BREAKER_FAILURE_RATE", 0.5)
+    monkeypatch.setattr(breaker, "BREAKER_SLOW_CALL_SECONDS", 1.0)
+    monkeypatch.setattr(breaker, "BREAKER_SLOW_CALL_RATE", 0.5)
+    monkeypatch.setattr(breaker, "BREAKER_OPEN_SECONDS", 30)
+    monkeypatch.setattr(breaker, "BREAKER_HALF_OPEN_CALLS", 2)
+
+
+def call(circuit: CircuitBreaker, failed=False, seconds=0.01):
+    trial = circuit.acquire()
+    circuit.record(trial, failed, seconds)
+
+
+def opened(api: str = "testapi") -> CircuitBreaker:
+    circuit = CircuitBreaker(api)
+    for _ in range(4):
+        call(circuit, failed=True)
+    assert circuit.state == OPEN
+    return circuit
+
+
+def test_breaker_opens_once_the_failure_rate_is_reached():
+    circuit = CircuitBreaker("testapi")
+    for failed in (False, True, False):
+        call(circuit, failed=failed)
+    assert circuit.state == CLOSED
+    call(circuit, failed=True)
+    assert circuit.state == OPEN
+
+
+def test_too_few_calls_never_open_the_breaker():
+    circuit = CircuitBreaker("testapi")
+    for _ in range(3):
+        call(circuit, failed=True)
+    assert circuit.state == CLOSED
+
+
+def test_slow_calls_open_the_breaker():
+    circuit = CircuitBreaker("testapi")
+    for _ in range(4):
+        call(circuit, seconds=2.0)
+    assert circuit.state == OPEN
+
+
+def test_unjudged_outcomes_do_not_count():
+    circuit = CircuitBreaker("testapi")
+    for _ in range(10):
+        call(circuit, failed=None)
+    assert circuit.state == CLOSED
+    assert circuit.snapshot()["window_calls"] == 0
+
+
+def test_open_breaker_fails_fast():
+    circuit = opened()
+    with pytest.raises(CircuitOpenError) as raised:
+        circuit.acquire()
+    assert 0 < raised.value.retry_after <= 30
+    assert circuit.snapshot()["rejected"] == 1
+
+
+def test_half_open_trials_close_the_breaker_when_they_succeed():
+    circuit = opened()
+    circuit.opened_at -= 31
+    assert circuit.acquire() is True
+    assert circuit.state == HALF_OPEN
+    assert circuit.acquire() is True
+    with pytest.raises(CircuitOpenError):
+        circuit.acquire()
+    circuit.record(True, False, 0.01)
+    circuit.record(True, False, 0.01)
+    assert circuit.state == CLOSED
+
+
+def test_a_failed_trial_reopens_the_breaker():
+    circuit = opened()
+    circuit.opened_at -= 31
+    call(circuit, failed=True)
+    assert circuit.state == OPEN
+    assert circuit.snapshot()["times_opened"] == 2
+
+
+def test_reset_closes_the_breaker():
+    circuit = opened()
+    circuit.reset()
+    assert circuit.state == CLOSED
+    assert circuit.acquire() is False
+
+
+def test_breakers_are_per_api(monkeypatch):
+    monkeypatch.setattr(breaker, "BREAKER_ENABLED", True)
+    assert breaker.breaker_for("gmail.users.messages.list") is breaker.get_breaker("gmail")
+    assert breaker.breaker_for("newapi.things.list").api == "newapi"
+    monkeypatch.setattr(breaker, "BREAKER_ENABLED", False)
+    assert breaker.breaker_for("gmail.users.messages.list") is None
+
+
+def test_breaker_endpoints_require_the_admin_key(monkeypatch):
+    monkeypatch.setattr(auth.dependencies, "ADMIN_API_KEY", "secret")
+    app = FastAPI()
+    app.include_router(admin_router)
+    client = TestClient(app)
+    assert client.get("/admin/breakers").status_code == 403
+    assert client.get("/admin/breakers", headers={"X-Admin-Key": "wrong"}).status_code == 403
+    response = client.get("/admin/breakers", headers={"X-Admin-Key": "secret"})
+    assert response.status_code == 200
+    assert "gmail" in response.json()["breakers"]
+    assert client.post("/admin/breakers/gmail/reset").status_code == 403
@@ -0,0 +1,227 @@
+"""Per-user response cache: TTL, LRU by size and ETag revalidation (google_services.cache)"""
+import asyncio
+
+import pytest
+
+from google_services import cache
+from google_services.cache import MongoSharedCache, ResponseCache, cached, invalidates, user_key
+from tests.fakes import FakeCollection, FakeUpstream
+
+
+@pytest.fixture(autouse=True)
+def in_process_cache(monkeypatch):
+    monkeypatch.setattr(cache, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(cache, "_shared", cache.NullSharedCache())
+    cache.get_cache().clear()
+    yield
+    cache.get_cache().clear()
+
+
+# ============== ResponseCache ==============
+
+def test_fresh_entry_is_a_hit():
+    store = ResponseCache(max_bytes=1000)
+    store.store(("u", "op", "[]"), '{"a": 1}', None, ttl=60)
+    entry, fresh = store.lookup(("u", "op", "[]"))
+    assert fresh and entry.value == '{"a": 1}'
+
+
+def test_expired_entry_without_etag_is_dropped():
+    store = ResponseCache(max_bytes=1000)
+    store.store(("u", "op", "[]"), "1", None, ttl=0)
+    assert store.lookup(("u", "op", "[]")) == (None, False)
+    assert store.stats()["entries"] == 0
+
+
+def test_expired_entry_with_etag_is_kept_for_revalidation():
+    store = ResponseCache(max_bytes=1000)
+    store.store(("u", "op", "[]"), "1", "etag-1", ttl=0)
+    entry, fresh = store.lookup(("u", "op", "[]"))
+    assert not fresh and entry.etag == "etag-1"
+    store.renew(("u", "op", "[]"), ttl=60)
+    assert store.lookup(("u", "op", "[]"))[1]
+
+
+def test_least_recently_used_entry_is_evicted_by_size():
+    store = ResponseCache(max_bytes=10)
+    store.store(("u", "op", "a"), "aaaa", None, ttl=60)
+    store.store(("u", "op", "b"), "bbbb", None, ttl=60)
+    store.lookup(("u", "op", "a"))
+    store.store(("u", "op", "c"), "cccc", None, ttl=60)
+    assert store.lookup(("u", "op", "b")) == (None, False)
+    assert store.lookup(("u", "op", "a"))[1]
+    assert store.stats()["evictions"] == 1
+
+
+def test_value_larger_than_the_cache_is_not_stored():
+    store = ResponseCache(max_bytes=3)
+    store.store(("u", "op", "a"), "toolong", None, ttl=60)
+    assert store.stats()["entries"] == 0
+
+
+def test_invalidate_drops_only_that_users_op():
+    store = ResponseCache(max_bytes=1000)
+    store.store(("alice", "tasks.items", "a"), "1", None, ttl=60)
+    store.store(("alice", "tasks.lists", "a"), "2", None, ttl=60)
+    store.store(("bob", "tasks.items", "a"), "3", None, ttl=60)
+    assert store.invalidate("alice", ["tasks.items"]) == 1
+    assert store.lookup(("alice", "tasks.items", "a")) == (None, False)
+    assert store.lookup(("alice", "tasks.lists", "a"))[1]
+    assert store.lookup(("bob", "tasks.items", "a"))[1]
+
+
+# ============== @cached ==============
+
+def test_cached_call_is_served_without_calling_google(make_credentials):
+    upstream = FakeUpstream({"items": [1]})
+
+    @cached("test.fresh", ttl=60)
+    def fetch(credentials, list_id):
+        return upstream.call()
+
+    credentials = make_credentials()
+    assert fetch(credentials, "a") == {"items": [1]}
+    assert fetch(credentials, "a") == {"items": [1]}
+    assert fetch(credentials, "b") == {"items": [1]}
+    assert upstream.sent == [None, None]
+
+
+def test_stale_entry_is_revalidated_with_its_etag(make_credentials):
+    upstream = FakeUpstream({"items": [1]}, etag="v1")
+
+    @cached("test.stale", ttl=0)
+    def fetch(credentials):
+        return upstream.call()
+
+    credentials = make_credentials()
+    assert fetch(credentials) == {"items": [1]}
+    assert fetch(credentials) == {"items": [1]}
+    assert upstream.sent == [None, "v1"]
+    assert cache.get_cache().stats()["revalidated"] == 1
+
+    upstream.body, upstream.etag = {"items": [2]}, "v2"
+    assert fetch(credentials) == {"items": [2]}
+    assert upstream.sent[-1] == "v1"
+
+
+def test_async_variant_revalidates_the_same_way(make_credentials):
+    upstream = FakeUpstream({"items": [1]}, etag="v1")
+
+    @cached("test.async", ttl=0)
+    async def fetch(credentials):
+        return upstream.call()
+
+    credentials = make_credentials()
+    assert asyncio.run(fetch(credentials)) == {"items": [1]}
+    assert asyncio.run(fetch(credentials)) == {"items": [1]}
+    assert upstream.sent == [None, "v1"]
+
+
+def test_writes_invalidate_the_users_entries(make_credentials):
+    upstream = FakeUpstream({"items": [1]})
+
+    @cached("test.items", ttl=60)
+    def fetch(credentials):
+        return upstream.call()
+
+    @invalidates("test.items")
+    def write(credentials):
+        return None
+
+    credentials = make_credentials()
+    fetch(credentials)
+    write(credentials)
+    fetch(credentials)
+    assert upstream.sent == [None, None]
+
+
+def test_users_do_not_share_entries(make_credentials):
+    assert user_key(make_credentials("a")) != user_key(make_credentials("b"))
+
+
+# ============== Shared tier ==============
+
+@pytest.fixture
+def shared(monkeypatch):
+    """MongoSharedCache over an in-memory collection; returns the collection"""
+    collection = FakeCollection()
+    tier = MongoSharedCache(max_value_bytes=1000, retry_seconds=60)
+    monkeypatch.setattr(tier, "_collection", lambda: collection)
+    monkeypatch.setattr(cache, "_shared", tier)
+    return collection
+
+
+def test_shared_tier_serves_another_workers_miss(shared, make_credentials):
+    upstream = FakeUpstream({"items": [1]})
+
+    @cached("test.shared", ttl=60)
+    def fetch(credentials):
+        return upstream.call()
+
+    credentials = make_credentials()
+    fetch(credentials)
+    # Another worker: empty in-process tier, same shared tier
+    cache.get_cache().clear()
+    assert fetch(credentials) == {"items": [1]}
+    assert upstream.sent == [None]
+    assert cache.cache_stats()["l2"]["hits"] == 1
+    # The hit was copied into the in-process tier
+    assert cache.get_cache().stats()["entries"] == 1
+
+
+def test_async_reads_use_the_shared_tier_too(shared, make_credentials):
+    upstream = FakeUpstream({"items": [1]})
+
+    @cached("test.shared.async", ttl=60)
+    async def fetch(credentials):
+        return upstream.call()
+
+    credentials = make_credentials()
+    asyncio.run(fetch(credentials))
+    cache.get_cache().clear()
+    assert asyncio.run(fetch(credentials)) == {"items": [1]}
+    assert upstream.sent == [None]
+
+
+def test_writes_invalidate_the_shared_tier(shared, make_credentials):
+    @cached("test.shared.items", ttl=60)
+    def fetch(credentials):
+        return {"items": [1]}
+
+    @invalidates("test.shared.items")
+    def write(credentials):
+        return None
+
+    credentials = make_credentials()
+    fetch(credentials)
+    assert len(shared.docs) == 1
+    write(credentials)
+    assert shared.docs == {}
+
+
+def test_oversized_values_stay_local(shared, make_credentials):
+    @cached("test.shared.big", ttl=60)
+    def fetch(credentials):
+        return {"blob": "x" * 2000}
+
+    fetch(make_credentials())
+    assert shared.docs == {}
+    assert cache.cache_stats()["l2"]["oversized"] == 1
+
+
+def test_unreachable_shared_tier_is_bypassed(shared, make_credentials):
+    upstream = FakeUpstream({"items": [1]})
+
+    @cached("test.shared.down", ttl=60)
+    def fetch(credentials):
+        return upstream.call()
+
+    shared.fail = True
+    credentials = make_credentials()
+    assert fetch(credentials) == {"items": [1]}
+    stats = cache.cache_stats()["l2"]
+    assert stats["errors"] == 1 and not stats["available"]
+    # Bypassed from now on: no further MongoDB calls or errors
+    cache.get_cache().clear()
+    assert fetch(credentials) == {"items": [1]}
+    assert cache.cache_stats()["l2"]["errors"] == 1
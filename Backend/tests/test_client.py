@@ -0,0 +1,43 @@
+"""Process-wide discovery/resource cache (google_services.client)"""
+import pytest
+
+from google_services import client
+
+
+@pytest.fixture(autouse=True)
+def fresh_service_cache():
+    client.clear_service_cache()
+    yield
+    client.clear_service_cache()
+
+
+def test_discovery_document_is_parsed_once_per_api(make_credentials, monkeypatch):
+    loads = []
+    original = client.load_discovery_document
+
+    def counting(api, version, static_discovery=True):
+        loads.append((api, version))
+        return original(api, version, static_discovery)
+
+    monkeypatch.setattr(client, "load_discovery_document", counting)
+    client.build_service("tasks", "v1", make_credentials("a"))
+    client.build_service("tasks", "v1", make_credentials("b"))
+    assert loads == [("tasks", "v1")]
+    assert client.cached_apis() == ["tasks.v1"]
+
+
+def test_nested_resources_are_shared_between_users(make_credentials):
+    alice = client.build_service("tasks", "v1", make_credentials("a"))
+    bob = client.build_service("tasks", "v1", make_credentials("b"))
+    assert alice.tasklists()._node is bob.tasklists()._node
+
+
+def test_requests_are_bound_to_the_callers_credentials(make_credentials):
+    alice_credentials, bob_credentials = make_credentials("a"), make_credentials("b")
+    alice = client.build_service("tasks", "v1", alice_credentials)
+    bob = client.build_service("tasks", "v1", bob_credentials)
+    alice_request = alice.tasklists().list()
+    bob_request = bob.tasklists().list()
+    assert isinstance(alice_request, client.GoogleHttpRequest)
+    assert alice_request.http.credentials is alice_credentials
+    assert bob_request.http.credentials is bob_credentials
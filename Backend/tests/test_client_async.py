@@ -0,0 +1,67 @@
+"""Async execution path: token refresh on 401 goes through the session (google_services.client)"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from google.oauth2.credentials import Credentials
+
+import auth.router as auth_router
+from google_services import client
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake Google answering 200 for the token "new" and 401 for anything else"""
+    refreshes, saves, seen = [], [], []
+
+    def refresh(credentials, request):
+        time.sleep(0.02)
+        refreshes.append(credentials)
+        credentials.token = "new"
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    async def send_async(method, uri, content=None, headers=None):
+        seen.append(headers.get("authorization"))
+        status = 200 if headers.get("authorization") == "Bearer new" else 401
+        return httpx.Response(status, json={"ok": True}, request=httpx.Request(method, uri))
+
+    monkeypatch.setattr(Credentials, "refresh", refresh)
+    monkeypatch.setattr(auth_router, "save_credentials", lambda credentials, session_id: saves.append(session_id))
+    monkeypatch.setattr(client, "send_async", send_async)
+    return refreshes, saves, seen
+
+
+def _unexpired(token: str) -> Credentials:
+    return Credentials(token, refresh_token="refresh", expiry=datetime.utcnow() + timedelta(hours=1))
+
+
+def test_concurrent_401s_share_one_refresh_and_persist_it(upstream):
+    refreshes, saves, _ = upstream
+    auth_router.credentials_cache["session-401"] = _unexpired("revoked")
+
+    async def main():
+        credentials = await auth_router.get_credentials_async("session-401")
+        service = client.build_service("tasks", "v1", credentials)
+        return await asyncio.gather(*[service.tasklists().list().execute_async() for _ in range(5)])
+
+    results = asyncio.run(main())
+    assert results == [{"ok": True}] * 5
+    assert len(refreshes) == 1
+    assert saves == ["session-401"]
+    assert auth_router.credentials_cache.get("session-401").token == "new"
+
+
+def test_credentials_without_a_session_refresh_directly(upstream):
+    refreshes, saves, seen = upstream
+    credentials = _unexpired("revoked")
+
+    async def main():
+        service = client.build_service("tasks", "v1", credentials)
+        return await service.tasklists().list().execute_async()
+
+    assert asyncio.run(main()) == {"ok": True}
+    assert refreshes == [credentials]
+    assert saves == []
+    assert seen == ["Bearer revoked", "Bearer new"]
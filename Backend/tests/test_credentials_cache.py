@@ -0,0 +1,76 @@
+"""Bounded in-process credentials cache (auth.credentials_cache) and its refresh locks"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from google.oauth2.credentials import Credentials
+
+import auth.router as auth_router
+from auth.credentials_cache import CredentialsCache
+
+
+def test_least_recently_used_session_is_evicted():
+    evicted = []
+    cache = CredentialsCache(max_entries=2, idle_ttl=60, on_evict=evicted.append)
+    cache["a"], cache["b"] = "creds-a", "creds-b"
+    assert cache.get("a") == "creds-a"
+    cache["c"] = "creds-c"
+    assert evicted == ["b"]
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_idle_sessions_expire():
+    evicted = []
+    cache = CredentialsCache(max_entries=10, idle_ttl=0.01, on_evict=evicted.append)
+    cache["a"] = "creds-a"
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert evicted == ["a"]
+    assert cache.stats()["expirations"] == 1
+
+
+def test_pop_is_not_an_eviction():
+    evicted = []
+    cache = CredentialsCache(max_entries=10, idle_ttl=60, on_evict=evicted.append)
+    cache["a"] = "creds-a"
+    assert cache.pop("a") == "creds-a"
+    assert cache.pop("a", "gone") == "gone"
+    assert evicted == []
+
+
+def test_eviction_during_a_refresh_keeps_the_sessions_lock(monkeypatch):
+    refreshing, release, refreshes = threading.Event(), threading.Event(), []
+
+    def refresh(credentials, request):
+        refreshing.set()
+        release.wait(2)
+        refreshes.append(credentials)
+        credentials.token = "new"
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(Credentials, "refresh", refresh)
+    monkeypatch.setattr(auth_router, "save_credentials", lambda credentials, session_id: None)
+    credentials = Credentials("old", refresh_token="refresh", expiry=datetime.utcnow() - timedelta(minutes=1))
+    auth_router.credentials_cache["session-evicted"] = credentials
+
+    first = threading.Thread(target=auth_router.refresh_session_credentials, args=("session-evicted", credentials))
+    second = threading.Thread(target=auth_router.refresh_session_credentials, args=("session-evicted", credentials))
+    first.start()
+    try:
+        assert refreshing.wait(2)
+        held = auth_router._session_lock("session-evicted")
+        # The cache drops the session (size or idle TTL) while its refresh is running
+        auth_router._forget_refresh_lock("session-evicted")
+        assert auth_router._session_lock("session-evicted") is held
+        second.start()
+    finally:
+        release.set()
+        first.join()
+        if second.ident is not None:
+            second.join()
+    assert len(refreshes) == 1
+
+    # Once idle, the lock is dropped
+    auth_router._forget_refresh_lock("session-evicted")
+    assert "session-evicted" not in auth_router._refresh_locks
@@ -0,0 +1,66 @@
+"""Concurrent /dashboard sections with per-section timeouts (dashboard.router)"""
+import asyncio
+import time
+
+import httplib2
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from googleapiclient.errors import HttpError
+
+import dashboard.router as dashboard_router
+from auth.dependencies import require_session
+from google_services.breaker import CircuitOpenError
+
+
+def section(result=None, delay: float = 0.0, error: Exception = None):
+    async def call(credentials):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return call
+
+
+@pytest.fixture
+def client(monkeypatch, make_credentials):
+    credentials = make_credentials("token-dashboard")
+
+    async def get_credentials(session_id):
+        return credentials
+
+    monkeypatch.setattr(dashboard_router, "get_credentials_async", get_credentials)
+    monkeypatch.setattr(dashboard_router, "SECTIONS", {
+        "profile": section({"name": "Ada"}, delay=0.1),
+        "events": section(["standup"], delay=0.1),
+        "emails": section(error=HttpError(httplib2.Response({"status": "500"}), b"{}")),
+        "albums": section(error=CircuitOpenError("photoslibrary", 12)),
+        "storage": section({"used": 1}, delay=5),
+    })
+    app = FastAPI()
+    app.include_router(dashboard_router.router)
+    app.dependency_overrides[require_session] = lambda: "session-dashboard"
+    return TestClient(app)
+
+
+def test_sections_run_concurrently(client):
+    started = time.perf_counter()
+    body = client.get("/dashboard", params={"sections": "profile,events"}).json()
+    assert body["sections"] == {"profile": {"name": "Ada"}, "events": ["standup"]}
+    assert body["errors"] == {}
+    # Two 100ms sections side by side, not one after the other
+    assert time.perf_counter() - started < 0.19
+
+
+def test_failed_sections_are_reported_beside_the_rest(client):
+    body = client.get("/dashboard", params={"timeout": 0.3}).json()
+    assert set(body["sections"]) == {"profile", "events"}
+    assert body["errors"]["emails"]["status"] == 502
+    assert body["errors"]["albums"]["status"] == 503
+    assert body["errors"]["storage"]["status"] == 504
+
+
+def test_unknown_sections_are_rejected(client):
+    response = client.get("/dashboard", params={"sections": "profile,weather"})
+    assert response.status_code == 400
+    assert "weather" in response.json()["detail"]
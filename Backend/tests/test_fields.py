@@ -0,0 +1,72 @@
+"""Client-selectable fields mapped to Google field masks (google_services.fields)"""
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from google_services.fields import CONTACT, DRIVE_FILE, InvalidFields, Resource, field_selection
+
+NOTE = Resource("note", {
+    "id": "name",
+    "title": "title",
+    "content": "body",
+    "items": "body",
+}, always=("id",), minimal="name")
+
+
+def test_no_selection_means_the_default():
+    assert NOTE.parse(None) is None
+    assert NOTE.parse("  ") is None
+
+
+def test_selection_is_in_declaration_order_with_always_fields():
+    assert NOTE.parse("items, title") == ("id", "title", "items")
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(InvalidFields) as raised:
+        NOTE.parse("title,colour")
+    assert "colour" in str(raised.value)
+
+
+def test_mask_merges_shared_fragments():
+    assert NOTE.mask(("content", "items")) == "body"
+    assert NOTE.mask(None) == "name,title,body"
+    assert NOTE.mask(None, default=("title",)) == "title"
+
+
+def test_mask_is_never_empty():
+    assert CONTACT.mask(CONTACT.parse("resourceName")) == "metadata"
+
+
+def test_items_param_keeps_the_page_token():
+    assert DRIVE_FILE.items_param(None) == {}
+    assert DRIVE_FILE.items_param(("id", "name")) == {"fields": "nextPageToken,items(id,name)"}
+
+
+def test_subset_limits_the_fields():
+    short = NOTE.subset("id", "title")
+    assert tuple(short.fields) == ("id", "title")
+    assert short.always == ("id",)
+    with pytest.raises(InvalidFields):
+        short.parse("content")
+
+
+def test_project_keeps_selected_keys():
+    note = {"id": "notes/1", "title": "Groceries", "content": "milk"}
+    assert NOTE.project(note, ("id", "title", "items")) == {"id": "notes/1", "title": "Groceries"}
+    assert NOTE.project(note, None) is note
+
+
+def test_field_selection_dependency():
+    app = FastAPI()
+
+    @app.get("/notes")
+    def notes(selected=Depends(field_selection(NOTE))):
+        return {"selected": selected}
+
+    client = TestClient(app)
+    assert client.get("/notes").json() == {"selected": None}
+    assert client.get("/notes?fields=title").json() == {"selected": ["id", "title"]}
+    response = client.get("/notes?fields=bogus")
+    assert response.status_code == 400
+    assert "bogus" in response.json()["detail"]
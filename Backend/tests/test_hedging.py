@@ -0,0 +1,150 @@
+"""Hedged reads and the hedge budget (google_services.hedging)"""
+import asyncio
+
+import pytest
+
+from google_services import hedging
+from google_services.hedging import HedgeBudget, LatencyTracker, hedged
+
+
+class FakeRequest:
+    def __init__(self, method_id: str, method: str = "GET"):
+        self.method = method
+        self.methodId = method_id
+        self.resumable = None
+
+
+@pytest.fixture(autouse=True)
+def hedging_on(monkeypatch):
+    monkeypatch.setattr(hedging, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(hedging, "_budget", HedgeBudget(ratio=0.5, burst=1))
+
+
+def slow_then_fast():
+    """send() whose first attempt hangs and whose later attempts answer at once"""
+    attempts, cancelled = [], []
+
+    async def send():
+        attempts.append(1)
+        if len(attempts) == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+        return f"attempt {len(attempts)}"
+
+    return send, attempts, cancelled
+
+
+def with_delay(method_id: str, delay: float = 0.01) -> FakeRequest:
+    hedging._tracker(method_id).delay = delay
+    return FakeRequest(method_id)
+
+
+# ============== Delay and budget ==============
+
+def test_no_hedge_delay_until_enough_samples(monkeypatch):
+    monkeypatch.setattr(hedging, "HEDGE_MIN_SAMPLES", 20)
+    tracker = LatencyTracker()
+    for _ in range(19):
+        tracker.record(0.1)
+    assert tracker.delay is None
+
+
+def test_hedge_delay_is_the_latency_percentile(monkeypatch):
+    monkeypatch.setattr(hedging, "HEDGE_MIN_SAMPLES", 20)
+    monkeypatch.setattr(hedging, "HEDGE_PERCENTILE", 90)
+    monkeypatch.setattr(hedging, "HEDGE_MIN_DELAY_SECONDS", 0.0)
+    tracker = LatencyTracker()
+    for i in range(1, 21):
+        tracker.record(i / 100)
+    assert tracker.delay == pytest.approx(0.19)
+
+
+def test_hedge_delay_has_a_floor(monkeypatch):
+    monkeypatch.setattr(hedging, "HEDGE_MIN_SAMPLES", 10)
+    monkeypatch.setattr(hedging, "HEDGE_MIN_DELAY_SECONDS", 0.05)
+    tracker = LatencyTracker()
+    for _ in range(10):
+        tracker.record(0.001)
+    assert tracker.delay == 0.05
+
+
+def test_budget_is_spent_then_earned_back():
+    budget = HedgeBudget(ratio=0.25, burst=2)
+    assert budget.spend() and budget.spend()
+    assert not budget.spend()
+    for _ in range(3):
+        budget.earn()
+    assert not budget.spend()
+    budget.earn()
+    assert budget.spend()
+
+
+def test_budget_never_exceeds_its_burst():
+    budget = HedgeBudget(ratio=1, burst=2)
+    for _ in range(10):
+        budget.earn()
+    assert budget.tokens == 2
+
+
+# ============== hedged() ==============
+
+def test_slow_primary_is_hedged_and_cancelled():
+    send, attempts, cancelled = slow_then_fast()
+    result = asyncio.run(hedged(with_delay("test.hedge.win"), send))
+    assert result == "attempt 2"
+    assert len(attempts) == 2
+    assert cancelled == [1]
+
+
+def test_no_hedge_without_a_delay_estimate():
+    calls = []
+
+    async def send():
+        calls.append(1)
+        return "ok"
+
+    assert asyncio.run(hedged(FakeRequest("test.hedge.cold"), send)) == "ok"
+    assert len(calls) == 1
+
+
+def test_no_hedge_once_the_budget_is_spent(monkeypatch):
+    monkeypatch.setattr(hedging, "_budget", HedgeBudget(ratio=0, burst=0))
+    attempts = []
+
+    async def send():
+        attempts.append(1)
+        await asyncio.sleep(0.03)
+        return "primary"
+
+    assert asyncio.run(hedged(with_delay("test.hedge.budget"), send)) == "primary"
+    assert len(attempts) == 1
+
+
+def test_writes_are_never_hedged():
+    send, attempts, _ = slow_then_fast()
+    request = FakeRequest("test.hedge.write", method="POST")
+    hedging._tracker("test.hedge.write").delay = 0.01
+
+    async def main():
+        return await asyncio.wait_for(hedged(request, send), timeout=0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+    assert len(attempts) == 1
+
+
+def test_a_failed_attempt_waits_for_the_other():
+    attempts = []
+
+    async def send():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            return "primary"
+        raise ValueError("hedge failed")
+
+    assert asyncio.run(hedged(with_delay("test.hedge.fail"), send)) == "primary"
+    assert len(attempts) == 2
@@ -0,0 +1,157 @@
+"""Background jobs: runner, leases and the orphan sweep (jobs)"""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import jobs.router as jobs_router
+from auth.dependencies import require_session
+from google_services.cache import user_key
+from jobs import runner, store
+from jobs.handlers import HANDLERS
+from jobs.store import MemoryJobStore, utcnow
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    job_store = MemoryJobStore()
+    monkeypatch.setattr(store, "_store", job_store)
+    monkeypatch.setattr(runner, "_slots", None)
+    monkeypatch.setattr(runner, "_heartbeat", None)
+    return job_store
+
+
+def handler(result=None, hold: float = 0.0, error: Exception = None):
+    async def run(credentials, params, progress):
+        await progress(1, 2, "halfway")
+        await asyncio.sleep(hold)
+        if error is not None:
+            raise error
+        return result
+    return run
+
+
+def orphan(owner: str, lease_seconds: float) -> dict:
+    """A running job as another instance would have left it"""
+    now = utcnow()
+    return {
+        "job_id": f"orphan-{lease_seconds}", "kind": "test.kind", "owner": owner, "params": {},
+        "status": "running", "progress": {"done": 0, "total": None, "message": ""},
+        "result": None, "error": None, "created_at": now, "started_at": now, "finished_at": None,
+        "expires_at": now + timedelta(hours=1), "lease_expires_at": now + timedelta(seconds=lease_seconds),
+    }
+
+
+def run_job(kind: str, owner: str = "owner-a"):
+    async def main():
+        job = await runner.submit_job(kind, {}, owner, None)
+        await asyncio.gather(*runner._tasks.values(), return_exceptions=True)
+        return await store.get_job_store().get(job["job_id"])
+    return asyncio.run(main())
+
+
+# ============== Runner ==============
+
+def test_job_reports_progress_and_its_result(monkeypatch):
+    monkeypatch.setitem(HANDLERS, "test.kind", handler(result={"rows": 3}))
+    job = run_job("test.kind")
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"rows": 3}
+    assert job["progress"]["message"] == "halfway"
+    assert runner._tasks == {}
+
+
+def test_failing_job_records_the_error(monkeypatch):
+    monkeypatch.setitem(HANDLERS, "test.kind", handler(error=ValueError("bad params")))
+    job = run_job("test.kind")
+    assert (job["status"], job["error"]) == ("failed", "bad params")
+
+
+def test_oversized_result_fails_the_job(monkeypatch):
+    monkeypatch.setattr(runner, "JOB_MAX_RESULT_BYTES", 10)
+    monkeypatch.setitem(HANDLERS, "test.kind", handler(result={"rows": "x" * 100}))
+    job = run_job("test.kind")
+    assert job["status"] == "failed"
+    assert "too large" in job["error"]
+
+
+def test_cancelled_job_is_recorded(monkeypatch):
+    monkeypatch.setitem(HANDLERS, "test.kind", handler(hold=10))
+
+    async def main():
+        job = await runner.submit_job("test.kind", {}, "owner-a", None)
+        await asyncio.sleep(0.01)
+        assert runner.cancel_job(job["job_id"])
+        await runner.shutdown_jobs()
+        return await store.get_job_store().get(job["job_id"])
+
+    assert asyncio.run(main())["status"] == "cancelled"
+
+
+def test_queue_is_bounded(monkeypatch):
+    monkeypatch.setattr(runner, "JOB_MAX_PENDING", 1)
+    monkeypatch.setitem(HANDLERS, "test.kind", handler(hold=10))
+
+    async def main():
+        await runner.submit_job("test.kind", {}, "owner-a", None)
+        try:
+            with pytest.raises(runner.JobQueueFull):
+                await runner.submit_job("test.kind", {}, "owner-a", None)
+        finally:
+            await runner.shutdown_jobs()
+
+    asyncio.run(main())
+
+
+# ============== Leases ==============
+
+def test_lapsed_lease_fails_the_orphan(memory_store):
+    async def main():
+        await memory_store.create(orphan("owner-a", -1))
+        await memory_store.create(orphan("owner-a", 60))
+        assert await runner.fail_orphaned_jobs("owner-a") == 1
+        return await memory_store.get("orphan--1"), await memory_store.get("orphan-60")
+
+    lost, live = asyncio.run(main())
+    assert lost["status"] == "failed"
+    assert "lost" in lost["error"]
+    assert live["status"] == "running"
+
+
+def test_heartbeat_keeps_a_long_job_alive(monkeypatch, memory_store):
+    monkeypatch.setattr(runner, "JOB_LEASE_SECONDS", 0.06)
+    monkeypatch.setattr(store, "JOB_LEASE_SECONDS", 0.06)
+    monkeypatch.setitem(HANDLERS, "test.kind", handler(result="done", hold=0.2))
+
+    async def main():
+        job = await runner.submit_job("test.kind", {}, "owner-a", None)
+        await asyncio.sleep(0.15)
+        # Another instance sweeping now must not see a lapsed lease
+        assert await memory_store.fail_stale("owner-a", [], runner._failed("lost")) == 0
+        await asyncio.gather(*runner._tasks.values())
+        return await memory_store.get(job["job_id"])
+
+    assert asyncio.run(main())["status"] == "succeeded"
+
+
+def test_deleting_an_orphan_reports_it_failed(monkeypatch, memory_store, make_credentials):
+    credentials = make_credentials("token-jobs")
+
+    async def get_credentials(session_id):
+        return credentials
+
+    monkeypatch.setattr(jobs_router, "get_credentials_async", get_credentials)
+    asyncio.run(memory_store.create(orphan(user_key(credentials), -1)))
+    app = FastAPI()
+    app.include_router(jobs_router.router)
+    app.dependency_overrides[require_session] = lambda: "session-jobs"
+    client = TestClient(app)
+
+    response = client.delete("/jobs/orphan--1")
+    assert response.status_code == 200
+    assert response.json()["message"] == "Job already failed"
+    [listed] = client.get("/jobs").json()["jobs"]
+    assert listed["status"] == "failed"
+    assert "lease_expires_at" not in listed
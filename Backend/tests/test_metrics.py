@@ -0,0 +1,80 @@
+"""Prometheus-style counters, gauges, histograms and the request middleware (metrics)"""
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import metrics
+from metrics import Counter, Gauge, Histogram, MetricsMiddleware
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Keep metrics created by a test out of the process-wide registry"""
+    monkeypatch.setattr(metrics, "_registry", list(metrics._registry))
+
+
+def test_counter_renders_labelled_samples():
+    counter = Counter("test_calls_total", "Calls", ("method",))
+    counter.inc("GET")
+    counter.inc("GET", amount=2)
+    counter.inc('we"ird')
+    assert counter.render() == [
+        "# HELP test_calls_total Calls",
+        "# TYPE test_calls_total counter",
+        'test_calls_total{method="GET"} 3',
+        'test_calls_total{method="we\\"ird"} 1',
+    ]
+
+
+def test_gauge_goes_up_and_down():
+    gauge = Gauge("test_in_flight", "In flight")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.render()[-1] == "test_in_flight 1"
+    gauge.set(0.5)
+    assert gauge.render()[-1] == "test_in_flight 0.5"
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "/x")
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{route="/x",le="0.1"} 1',
+        'test_seconds_bucket{route="/x",le="1.0"} 2',
+        'test_seconds_bucket{route="/x",le="+Inf"} 3',
+        'test_seconds_count{route="/x"} 3',
+        'test_seconds_sum{route="/x"} 5.55',
+    ]
+
+
+def test_google_api_errors_include_transport_failures():
+    metrics.observe_google_api("test.api.get", 0, 0.01)
+    metrics.observe_google_api("test.api.get", 200, 0.01)
+    rendered = metrics.render()
+    assert 'google_api_errors_total{method="test.api.get",status="0"} 1' in rendered
+    assert 'google_api_errors_total{method="test.api.get",status="200"}' not in rendered
+
+
+def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+
+    @app.get("/test-metrics/{item_id}")
+    def item(item_id: str):
+        if item_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app)
+    client.get("/test-metrics/a")
+    client.get("/test-metrics/b")
+    client.get("/test-metrics/missing")
+    client.get("/test-metrics-nowhere")
+
+    rendered = metrics.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/test-metrics/{item_id}",status="200"} 2' in rendered
+    assert 'http_request_errors_total{method="GET",route="/test-metrics/{item_id}",status="404"} 1' in rendered
+    assert 'route="unmatched"' in rendered
+    assert "/test-metrics/a" not in rendered
@@ -0,0 +1,75 @@
+"""Opaque cursors and page-size caps for list endpoints (google_services.pagination)"""
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from google_services import pagination
+from google_services.pagination import (
+    NEXT_CURSOR_HEADER,
+    cursor_scope,
+    decode_cursor,
+    encode_cursor,
+    page_size,
+    paginated,
+)
+
+
+def test_cursor_round_trips_the_page_token():
+    scope = cursor_scope("drive.files", folder="root", q=None)
+    cursor = encode_cursor(scope, "google-token")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, scope) == "google-token"
+
+
+def test_no_page_token_means_no_cursor():
+    assert encode_cursor("drive.files:x", None) is None
+    assert decode_cursor(None, "drive.files:x") is None
+
+
+def test_scope_depends_on_the_query_not_its_order():
+    assert cursor_scope("gmail.messages", q="a", label="x") == cursor_scope("gmail.messages", label="x", q="a")
+    assert cursor_scope("gmail.messages", q="a") != cursor_scope("gmail.messages", q="b")
+
+
+def test_cursor_from_another_listing_is_rejected():
+    cursor = encode_cursor(cursor_scope("gmail.messages", q="a"), "token")
+    for scope in (cursor_scope("gmail.messages", q="b"), cursor_scope("drive.files", q="a")):
+        with pytest.raises(HTTPException) as raised:
+            decode_cursor(cursor, scope)
+        assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24", "WzFd"])
+def test_garbled_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor, "drive.files:x")
+    assert raised.value.status_code == 400
+
+
+def test_page_size_is_capped_by_config_and_upstream(monkeypatch):
+    monkeypatch.setattr(pagination, "PAGINATION_MAX_PAGE_SIZE", 200)
+    assert page_size(1000, "drive.files") == 200
+    assert page_size(1000, "contacts.search") == 30
+    assert page_size(0, "drive.files") == 1
+    assert page_size(25, "youtube.search") == 25
+
+
+def test_paginated_sets_the_next_cursor_header():
+    response = paginated([1, 2], "google-token", "drive.files:x")
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    assert decode_cursor(cursor, "drive.files:x") == "google-token"
+    assert json.loads(response.body) == [1, 2]
+
+
+def test_last_page_has_no_cursor():
+    response = paginated({"items": []}, None, "drive.files:x", token_key="nextPageToken")
+    assert NEXT_CURSOR_HEADER.lower() not in response.headers
+    assert json.loads(response.body) == {"items": [], "nextPageToken": None}
+
+
+def test_token_key_carries_the_cursor_not_the_raw_token():
+    response = paginated({"videos": [], "next_page_token": "raw"}, "raw", "youtube.search:x", token_key="next_page_token")
+    body = json.loads(response.body)
+    assert body["next_page_token"] == response.headers[NEXT_CURSOR_HEADER]
+    assert body["next_page_token"] != "raw"
@@ -0,0 +1,79 @@
+"""On-demand request profiling (profiling) and its admin endpoints"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import auth.dependencies
+import profiling
+from admin.router import router as admin_router
+from profiling import ProfileStore, ProfilingMiddleware, collapsed
+
+ADMIN = {"X-Admin-Key": "secret"}
+
+
+def busy_work():
+    """Keeps a threadpool thread busy for the sampler to see"""
+    ends_at = time.monotonic() + 0.05
+    while time.monotonic() < ends_at:
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(auth.dependencies, "ADMIN_API_KEY", "secret")
+    monkeypatch.setattr(profiling, "PROFILING_SAMPLE_RATE", 0)
+    monkeypatch.setattr(profiling, "PROFILING_INTERVAL_MS", 1)
+    monkeypatch.setattr(profiling, "_store", ProfileStore(max_profiles=5))
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        busy_work()
+        return {"ok": True}
+
+    app.include_router(admin_router)
+    app.add_middleware(ProfilingMiddleware)
+    return TestClient(app)
+
+
+def test_requests_are_not_profiled_by_default(client):
+    assert "x-profile-id" not in client.get("/work").headers
+    assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "1"}).headers
+    assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "1", "X-Admin-Key": "wrong"}).headers
+
+
+def test_profiled_request_records_its_stacks(client):
+    response = client.get("/work", headers={"X-Profile": "1", **ADMIN})
+    assert response.json() == {"ok": True}
+    profile_id = response.headers["x-profile-id"]
+
+    [summary] = client.get("/admin/profiles", headers=ADMIN).json()["profiles"]
+    assert (summary["id"], summary["route"], summary["trigger"], summary["status"]) == (profile_id, "/work", "header", 200)
+    assert summary["samples"] > 0
+    text = client.get(f"/admin/profiles/{profile_id}", headers=ADMIN).text
+    assert "test_profiling:busy_work" in text
+
+
+def test_sample_rate_profiles_without_the_header(client, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_SAMPLE_RATE", 1.0)
+    assert "x-profile-id" in client.get("/work").headers
+    assert profiling.get_profile_store().list()[0]["trigger"] == "sampled"
+
+
+def test_profile_endpoints_require_the_admin_key(client):
+    assert client.get("/admin/profiles").status_code == 403
+
+
+def test_store_keeps_the_newest_profiles():
+    store = ProfileStore(max_profiles=2)
+    for i in range(3):
+        store.add({"id": str(i), "stacks": {}})
+    assert [profile["id"] for profile in store.list()] == ["2", "1"]
+    assert store.get("0") is None
+
+
+def test_collapsed_lists_heaviest_stacks_first():
+    profile = {"stacks": {"main;a": 1, "main;b": 3}}
+    assert collapsed(profile) == "main;b 3\nmain;a 1\n"
@@ -0,0 +1,163 @@
+"""Response pipeline: orjson serialization, negotiated compression and conditional GETs (responses)"""
+import asyncio
+import json
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+import responses
+from responses import (
+    CompressionMiddleware,
+    ConditionalGetMiddleware,
+    FastJSONResponse,
+    FastJSONRoute,
+    choose_encoding,
+    content_etag,
+    dumps,
+    matching_etag,
+)
+
+BIG = {"items": [{"id": i, "title": f"item {i}"} for i in range(200)]}
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    router = APIRouter(route_class=FastJSONRoute)
+
+    @router.get("/big")
+    def big():
+        return BIG
+
+    @router.get("/small")
+    def small():
+        return {"ok": True}
+
+    @router.post("/created", status_code=201)
+    def created():
+        return {"id": 1}
+
+    @router.get("/missing")
+    def missing():
+        return FastJSONResponse({"detail": "gone"}, status_code=404)
+
+    app.include_router(router)
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return app
+
+
+@pytest.fixture
+def client():
+    return TestClient(make_app())
+
+
+def test_dumps_matches_the_stdlib_encoding():
+    content = {"a": [1, 2.5, None], "b": "é"}
+    assert json.loads(dumps(content)) == content
+
+
+def test_dumps_handles_sets_and_non_string_keys():
+    assert json.loads(dumps({"tags": {"x"}, 1: "one"})) == {"tags": ["x"], "1": "one"}
+
+
+def test_fast_route_keeps_the_declared_status(client):
+    response = client.post("/created")
+    assert response.status_code == 201
+    assert response.json() == {"id": 1}
+
+
+def test_fast_route_skips_the_encoder_for_dicts():
+    endpoint = FastJSONRoute("/x", lambda: {"a": 1}).endpoint
+    assert isinstance(endpoint(), FastJSONResponse)
+
+
+def test_choose_encoding_follows_client_preference(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    assert choose_encoding("gzip, br") == "gzip"
+    assert choose_encoding("br") is None
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("*") == "gzip"
+    assert choose_encoding("") is None
+
+
+def test_large_bodies_are_gzipped(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == BIG
+    assert "accept-encoding" in response.headers["vary"].lower()
+
+
+def test_small_and_identity_responses_still_vary_on_encoding(client):
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/big", headers={"Accept-Encoding": "identity"})
+    for response in (small, identity):
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"].lower().count("accept-encoding") == 1
+    assert identity.json() == BIG
+
+
+def test_streamed_responses_pass_through():
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson")]})
+        await send({"type": "http.response.body", "body": b"x" * 1000, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=10)(scope, None, send))
+    assert sent[1]["body"] == b"x" * 1000
+    assert (b"content-encoding", b"gzip") not in sent[0]["headers"]
+
+
+# ============== Conditional GET ==============
+
+def test_json_gets_carry_a_content_etag(client):
+    response = client.get("/small", headers={"Accept-Encoding": "identity"})
+    assert response.headers["etag"] == content_etag(response.content)
+    assert response.headers["cache-control"] == "private, no-cache"
+    vary = response.headers["vary"].lower()
+    assert "authorization" in vary and "cookie" in vary
+
+
+def test_matching_if_none_match_gets_a_bodyless_304(client):
+    etag = client.get("/small", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    response = client.get("/small", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "content-type" not in response.headers
+    assert response.headers["vary"].lower().count("accept-encoding") == 1
+
+
+def test_gzip_variant_etag_revalidates_against_either_coding(client):
+    gzipped = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    etag = gzipped.headers["etag"]
+    assert etag.endswith('-gzip"')
+    for coding in ("gzip", "identity"):
+        response = client.get("/big", headers={"Accept-Encoding": coding, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+
+def test_stale_etag_gets_the_full_body(client):
+    response = client.get("/small", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+
+
+def test_errors_and_writes_are_not_tagged(client):
+    assert "etag" not in client.get("/missing").headers
+    assert "etag" not in client.post("/created").headers
+
+
+def test_matching_etag_uses_weak_comparison():
+    assert matching_etag('W/"abc"', '"abc"') == 'W/"abc"'
+    assert matching_etag('"x", "abc-br"', '"abc"') == '"abc-br"'
+    assert matching_etag("*", '"abc"') == '"abc"'
+    assert matching_etag('"other"', '"abc"') is None
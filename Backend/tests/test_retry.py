@@ -0,0 +1,183 @@
+"""Retry policy and per-user token buckets (google_services.retry)"""
+import asyncio
+import json
+import time
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from google_services import retry
+from google_services.retry import (
+    ThrottledError,
+    TokenBucket,
+    call_with_retry,
+    call_with_retry_async,
+    retry_after_seconds,
+)
+
+
+class FakeRequest:
+    def __init__(self, method: str = "GET", method_id: str = "tasks.tasklists.list"):
+        self.method = method
+        self.methodId = method_id
+        self.resumable = None
+
+
+def http_error(status: int, retry_after: str = None, content: dict = None) -> HttpError:
+    headers = {"status": str(status)}
+    if retry_after is not None:
+        headers["retry-after"] = retry_after
+    return HttpError(httplib2.Response(headers), json.dumps(content or {}).encode("utf-8"))
+
+
+def failing(*errors, result="ok"):
+    """send() raising each error in turn, then returning result"""
+    calls = []
+
+    def send():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return send, calls
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(retry, "_backoff", lambda attempt: 0.0)
+
+
+# ============== TokenBucket ==============
+
+def test_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_wait_over_the_cap_raises_and_leaves_the_bucket_untouched():
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.reserve()
+    with pytest.raises(ThrottledError) as raised:
+        bucket.reserve(max_wait=0.5)
+    assert raised.value.resp.status == 429
+    assert raised.value.resp["retry-after"] == "1"
+    # The rejected call took no token: the next one still waits about 1s, not 2s
+    assert bucket.reserve() == pytest.approx(1.0, abs=0.05)
+
+
+def test_refund_returns_the_token():
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.reserve()
+    bucket.refund()
+    assert bucket.reserve() == pytest.approx(0.0, abs=0.01)
+
+
+def test_pause_holds_every_call():
+    bucket = TokenBucket(rate=100, burst=10)
+    bucket.pause(2)
+    assert bucket.reserve() == pytest.approx(2.0, abs=0.05)
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({"retry-after": "Thu, 01 Jan 1970 00:00:00 GMT"}) == 0.0
+    assert retry_after_seconds({}) is None
+
+
+# ============== Retry policy ==============
+
+def test_5xx_is_retried_for_idempotent_requests():
+    send, calls = failing(http_error(503), http_error(500))
+    assert call_with_retry(FakeRequest("GET"), None, send) == "ok"
+    assert len(calls) == 3
+
+
+def test_5xx_is_not_retried_for_writes():
+    send, calls = failing(http_error(503))
+    with pytest.raises(HttpError):
+        call_with_retry(FakeRequest("POST", "tasks.tasks.insert"), None, send)
+    assert len(calls) == 1
+
+
+def test_rate_limit_403_is_retried_even_for_writes():
+    limited = http_error(403, content={"error": {"errors": [{"reason": "userRateLimitExceeded"}]}})
+    send, calls = failing(limited)
+    assert call_with_retry(FakeRequest("POST", "tasks.tasks.insert"), None, send) == "ok"
+    assert len(calls) == 2
+
+
+def test_other_4xx_are_not_retried():
+    send, calls = failing(http_error(404))
+    with pytest.raises(HttpError):
+        call_with_retry(FakeRequest("GET"), None, send)
+    assert len(calls) == 1
+
+
+def test_attempts_are_capped(monkeypatch):
+    monkeypatch.setattr(retry, "GOOGLE_RETRY_MAX_ATTEMPTS", 3)
+    send, calls = failing(*[http_error(503)] * 5)
+    with pytest.raises(HttpError):
+        call_with_retry(FakeRequest("GET"), None, send)
+    assert len(calls) == 3
+
+
+def test_retry_after_longer_than_the_max_delay_is_returned(monkeypatch):
+    monkeypatch.setattr(retry, "GOOGLE_RETRY_MAX_DELAY", 5)
+    send, calls = failing(http_error(429, retry_after="60"))
+    with pytest.raises(HttpError) as raised:
+        call_with_retry(FakeRequest("GET"), None, send)
+    assert raised.value.resp["retry-after"] == "60"
+    assert len(calls) == 1
+
+
+def test_retry_after_pauses_the_users_bucket(monkeypatch, make_credentials):
+    monkeypatch.setattr(retry, "GOOGLE_RATE_LIMIT_PER_SECOND", 100)
+    credentials = make_credentials("paused-user")
+    send, calls = failing(http_error(429, retry_after="0.05"))
+    started = time.monotonic()
+    assert call_with_retry(FakeRequest("GET"), credentials, send) == "ok"
+    assert time.monotonic() - started >= 0.05
+    assert retry.bucket_for(credentials).paused_until > 0
+
+
+def test_async_cancellation_while_pacing_refunds_the_token(monkeypatch, make_credentials):
+    monkeypatch.setattr(retry, "GOOGLE_RATE_LIMIT_PER_SECOND", 1)
+    monkeypatch.setattr(retry, "GOOGLE_RATE_LIMIT_BURST", 1)
+    credentials = make_credentials("cancelled-user")
+    bucket = retry.bucket_for(credentials)
+    bucket.reserve()
+    sent = []
+
+    async def send():
+        sent.append(1)
+        return "ok"
+
+    async def main():
+        waiting = asyncio.ensure_future(call_with_retry_async(FakeRequest("GET"), credentials, send))
+        await asyncio.sleep(0.05)
+        assert bucket.tokens < 0
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(main())
+    assert sent == []
+    assert bucket.tokens > -0.5
+
+
+def test_async_throttled_call_fails_at_once(monkeypatch, make_credentials):
+    monkeypatch.setattr(retry, "GOOGLE_RATE_LIMIT_PER_SECOND", 0.1)
+    monkeypatch.setattr(retry, "GOOGLE_RATE_LIMIT_BURST", 1)
+    monkeypatch.setattr(retry, "GOOGLE_RATE_LIMIT_MAX_WAIT_SECONDS", 1)
+    credentials = make_credentials("throttled-user")
+    retry.bucket_for(credentials).reserve()
+
+    async def send():
+        return "ok"
+
+    with pytest.raises(ThrottledError):
+        asyncio.run(call_with_retry_async(FakeRequest("GET"), credentials, send))
@@ -0,0 +1,148 @@
+"""Per-user caps and round-robin fairness for upstream calls (google_services.scheduler)"""
+import asyncio
+import threading
+import time
+
+from google_services.scheduler import FairScheduler, _Waiter
+
+
+def run_attempts(scheduler: FairScheduler, users, hold: float = 0.01):
+    """Run one async attempt per entry of users; returns (start order, peak concurrency per user)"""
+    order, running, peak = [], {}, {}
+
+    async def attempt(user, index):
+        async with scheduler.slot_async(user):
+            order.append((user, index))
+            running[user] = running.get(user, 0) + 1
+            peak[user] = max(peak.get(user, 0), running[user])
+            await asyncio.sleep(hold)
+            running[user] -= 1
+
+    async def main():
+        await asyncio.gather(*[attempt(user, index) for index, user in enumerate(users)])
+
+    asyncio.run(main())
+    return order, peak
+
+
+def test_per_user_cap():
+    scheduler = FairScheduler(capacity=10, per_user=2)
+    _, peak = run_attempts(scheduler, ["alice"] * 6)
+    assert peak == {"alice": 2}
+    assert scheduler.stats()["active"] == 0
+
+
+def test_global_cap():
+    scheduler = FairScheduler(capacity=3, per_user=3)
+    total, peak_total = [0], [0]
+
+    async def attempt(user):
+        async with scheduler.slot_async(user):
+            total[0] += 1
+            peak_total[0] = max(peak_total[0], total[0])
+            await asyncio.sleep(0.01)
+            total[0] -= 1
+
+    async def main():
+        await asyncio.gather(*[attempt(f"user-{i % 4}") for i in range(12)])
+
+    asyncio.run(main())
+    assert peak_total[0] == 3
+
+
+def test_freed_slots_go_round_robin_across_waiting_users():
+    scheduler = FairScheduler(capacity=1, per_user=1)
+    order, _ = run_attempts(scheduler, ["alice"] * 4 + ["bob"] * 2)
+    users = [user for user, _ in order]
+    # bob queued behind four of alice's attempts but alternates with her
+    assert users == ["alice", "alice", "bob", "alice", "bob", "alice"]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = FairScheduler(capacity=1, per_user=1)
+
+    async def main():
+        async with scheduler.slot_async("alice"):
+            waiting = asyncio.ensure_future(scheduler.slot_async("bob").__aenter__())
+            await asyncio.sleep(0.01)
+            assert scheduler.stats()["queued"] == 1
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            assert scheduler.stats()["queued"] == 0
+
+    asyncio.run(main())
+    assert scheduler.stats()["active"] == 0
+
+
+def test_waiter_cancelled_after_its_grant_gives_the_slot_back():
+    scheduler = FairScheduler(capacity=1, per_user=1)
+
+    async def waiting_attempt():
+        async with scheduler.slot_async("bob"):
+            await asyncio.sleep(1)
+
+    async def main():
+        alice = scheduler.slot_async("alice")
+        await alice.__aenter__()
+        bob = asyncio.ensure_future(waiting_attempt())
+        await asyncio.sleep(0.01)
+        # Grant bob the slot and cancel him before he gets to run
+        await alice.__aexit__(None, None, None)
+        assert scheduler.stats()["active"] == 1
+        bob.cancel()
+        await asyncio.gather(bob, return_exceptions=True)
+
+    asyncio.run(main())
+    stats = scheduler.stats()
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_waiter_on_a_closed_loop_is_skipped():
+    scheduler = FairScheduler(capacity=1, per_user=1)
+    closed = asyncio.new_event_loop()
+    closed.close()
+    with scheduler.slot("alice"):
+        assert scheduler._try_enter("bob", lambda: _Waiter(closed)) is not None
+        started = threading.Event()
+
+        def carol():
+            with scheduler.slot("carol"):
+                started.set()
+
+        thread = threading.Thread(target=carol)
+        thread.start()
+        time.sleep(0.02)
+        assert not started.is_set()
+    thread.join(1)
+    assert started.is_set()
+    stats = scheduler.stats()
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_sync_attempts_respect_the_per_user_cap():
+    scheduler = FairScheduler(capacity=10, per_user=2)
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def attempt():
+        with scheduler.slot("alice"):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=attempt) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert scheduler.stats()["active"] == 0
+
+
+def test_no_user_skips_scheduling():
+    scheduler = FairScheduler(capacity=1, per_user=1)
+    with scheduler.slot("alice"):
+        with scheduler.slot(None):
+            pass
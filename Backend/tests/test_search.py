@@ -0,0 +1,114 @@
+"""Unified search: scoring, fan-out under a deadline and Keep's optional scope (google_services.search_service)"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httplib2
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from googleapiclient.errors import HttpError
+
+import google_services.search.router as search_router
+from auth.dependencies import require_session
+from google_services import search_service
+from google_services.search_service import default_sources, score_hit, search_all, source_granted
+
+KEEP_SCOPE = "https://www.googleapis.com/auth/keep.readonly"
+NOW = datetime(2026, 1, 31, tzinfo=timezone.utc)
+
+
+def source(*hits, delay: float = 0.0, error: Exception = None):
+    async def search(credentials, query, limit):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return [dict(hit) for hit in hits]
+    return search
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """Replace the real sources; returns the dict to fill"""
+    fake = {}
+    monkeypatch.setattr(search_service, "SOURCES", fake)
+    return fake
+
+
+# ============== Scoring ==============
+
+def test_title_matches_outrank_snippet_matches():
+    in_title = score_hit({"title": "Budget review"}, ["budget"], NOW)
+    in_snippet = score_hit({"title": "Notes", "snippet": "the budget"}, ["budget"], NOW)
+    assert in_title > in_snippet > 0
+
+
+def test_recent_hits_get_a_boost():
+    fresh = score_hit({"title": "x", "timestamp": NOW.isoformat()}, ["y"], NOW)
+    old = score_hit({"title": "x", "timestamp": (NOW - timedelta(days=365)).isoformat()}, ["y"], NOW)
+    assert fresh == pytest.approx(search_service.RECENCY_WEIGHT)
+    assert old < 0.01
+
+
+def test_gmail_dates_are_understood():
+    hit = {"title": "x", "timestamp": "Sat, 31 Jan 2026 00:00:00 +0000"}
+    assert score_hit(hit, [], NOW) == pytest.approx(search_service.RECENCY_WEIGHT)
+
+
+# ============== Fan-out ==============
+
+def test_hits_are_merged_and_ranked_across_sources(sources):
+    sources["gmail"] = source({"id": "m1", "title": "lunch", "snippet": "budget"})
+    sources["drive"] = source({"id": "f1", "title": "budget 2026"}, {"id": "f2", "title": "other"})
+    result = asyncio.run(search_all(None, "budget", ["gmail", "drive"], limit=2, deadline=1))
+    assert [(hit["source"], hit["id"]) for hit in result["hits"]] == [("drive", "f1"), ("gmail", "m1")]
+    assert result["errors"] == {}
+    assert set(result["timings_ms"]) == {"gmail", "drive"}
+
+
+def test_a_failing_source_is_reported_not_fatal(sources):
+    forbidden = HttpError(httplib2.Response({"status": "403"}), b"{}")
+    sources["gmail"] = source({"id": "m1", "title": "budget"})
+    sources["drive"] = source(error=forbidden)
+    result = asyncio.run(search_all(None, "budget", ["gmail", "drive"], limit=10, deadline=1))
+    assert [hit["id"] for hit in result["hits"]] == ["m1"]
+    assert result["errors"]["drive"]["status"] == 403
+
+
+def test_slow_sources_time_out(sources):
+    sources["gmail"] = source({"id": "m1", "title": "budget"})
+    sources["drive"] = source({"id": "f1", "title": "budget"}, delay=5)
+    result = asyncio.run(search_all(None, "budget", ["gmail", "drive"], limit=10, deadline=0.05))
+    assert [hit["id"] for hit in result["hits"]] == ["m1"]
+    assert result["errors"]["drive"]["status"] == 504
+
+
+# ============== Keep scope ==============
+
+def test_keep_is_searched_only_with_its_scope(make_credentials):
+    without = make_credentials(scopes=["https://www.googleapis.com/auth/drive"])
+    with_keep = make_credentials(scopes=["https://www.googleapis.com/auth/drive", KEEP_SCOPE])
+    assert not source_granted(without, "keep")
+    assert source_granted(with_keep, "keep")
+    assert "keep" not in default_sources(without)
+    assert default_sources(with_keep) == ["gmail", "drive", "contacts", "keep"]
+
+
+def test_search_route_needs_the_scope_of_requested_sources(monkeypatch, sources, make_credentials):
+    credentials = make_credentials(scopes=["https://www.googleapis.com/auth/drive"])
+
+    async def get_credentials(session_id):
+        return credentials
+
+    for name in ("gmail", "drive", "contacts", "keep"):
+        sources[name] = source({"id": f"{name}-1", "title": "budget"})
+    monkeypatch.setattr(search_router, "get_credentials_async", get_credentials)
+    app = FastAPI()
+    app.include_router(search_router.router)
+    app.dependency_overrides[require_session] = lambda: "session-search"
+    client = TestClient(app)
+
+    searched = client.get("/search", params={"q": "budget", "stream": "false"}).json()
+    assert {hit["source"] for hit in searched["hits"]} == {"gmail", "drive", "contacts"}
+    response = client.get("/search", params={"q": "budget", "sources": "drive,keep"})
+    assert response.status_code == 403
+    assert "keep" in response.json()["detail"]
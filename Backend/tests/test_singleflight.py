@@ -0,0 +1,155 @@
+"""Single-flight coalescing of identical concurrent reads (google_services.singleflight)"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from google_services import cache
+from google_services.cache import cached
+from google_services.singleflight import single_flight
+from tests.fakes import FakeUpstream
+
+
+@pytest.fixture(autouse=True)
+def in_process_cache(monkeypatch):
+    monkeypatch.setattr(cache, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(cache, "_shared", cache.NullSharedCache())
+    cache.get_cache().clear()
+    yield
+    cache.get_cache().clear()
+
+
+def test_concurrent_identical_calls_share_one_upstream_call(make_credentials):
+    upstream = FakeUpstream({"items": [1]})
+
+    @single_flight("test.collapse")
+    async def fetch(credentials, list_id):
+        return await upstream.call_async()
+
+    async def main():
+        credentials = make_credentials()
+        return await asyncio.gather(*[fetch(credentials, "a") for _ in range(5)], fetch(credentials, "b"))
+
+    results = asyncio.run(main())
+    assert len(upstream.sent) == 2
+    assert results == [{"items": [1]}] * 6
+    results[1]["items"].append(2)
+    assert results[2] == {"items": [1]}
+
+
+def test_different_users_are_not_collapsed(make_credentials):
+    upstream = FakeUpstream({"items": [1]})
+
+    @single_flight("test.users")
+    async def fetch(credentials):
+        return await upstream.call_async()
+
+    async def main():
+        await asyncio.gather(fetch(make_credentials("a")), fetch(make_credentials("b")))
+
+    asyncio.run(main())
+    assert len(upstream.sent) == 2
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others(make_credentials):
+    upstream = FakeUpstream({"items": [1]})
+
+    @single_flight("test.cancel")
+    async def fetch(credentials):
+        return await upstream.call_async(0.05)
+
+    async def main():
+        credentials = make_credentials()
+        leader = asyncio.ensure_future(fetch(credentials))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(fetch(credentials))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == {"items": [1]}
+    assert len(upstream.sent) == 1
+
+
+def test_errors_reach_every_caller(make_credentials):
+    calls = []
+
+    @single_flight("test.error")
+    async def fetch(credentials):
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        raise ValueError("upstream broke")
+
+    async def main():
+        credentials = make_credentials()
+        return await asyncio.gather(fetch(credentials), fetch(credentials), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_sync_calls_from_threads_are_collapsed(make_credentials):
+    calls = []
+
+    @single_flight("test.threads")
+    def fetch(credentials):
+        calls.append(1)
+        time.sleep(0.05)
+        return {"items": [1]}
+
+    credentials = make_credentials()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetch(credentials))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [{"items": [1]}] * 4
+
+
+# ============== Under @cached ==============
+
+def test_304_on_a_collapsed_flight_only_reaches_callers_holding_the_entry(make_credentials):
+    upstream = FakeUpstream({"items": [1]}, etag="v1")
+
+    @cached("test.revalidate", ttl=0)
+    @single_flight("test.revalidate")
+    async def fetch(credentials):
+        return await upstream.call_async(0.05)
+
+    async def evicted_caller(credentials):
+        # Joins while the leader is revalidating, after its own entry was evicted
+        await asyncio.sleep(0.01)
+        cache.get_cache().clear()
+        return await fetch(credentials)
+
+    async def main():
+        credentials = make_credentials()
+        await fetch(credentials)
+        return await asyncio.gather(fetch(credentials), fetch(credentials), evicted_caller(credentials))
+
+    results = asyncio.run(main())
+    assert results == [{"items": [1]}] * 3
+    # Initial load, the revalidation shared by the two callers holding the entry,
+    # and an unconditional request for the caller without one
+    assert sorted(upstream.sent, key=str) == [None, None, "v1"]
+
+
+def test_collapsed_callers_keep_the_etag_of_the_shared_response(make_credentials):
+    upstream = FakeUpstream({"items": [1]}, etag="v1")
+
+    @cached("test.etag", ttl=0)
+    @single_flight("test.etag")
+    async def fetch(credentials):
+        return await upstream.call_async()
+
+    async def main():
+        credentials = make_credentials()
+        await asyncio.gather(fetch(credentials), fetch(credentials), fetch(credentials))
+        await fetch(credentials)
+
+    asyncio.run(main())
+    assert upstream.sent == [None, "v1"]
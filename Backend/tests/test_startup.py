@@ -0,0 +1,19 @@
+"""Cold start of the serverless entry point (main)"""
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_startup import BACKEND_DIR, DEFERRED_MODULES
+
+
+def test_heavy_modules_stay_off_the_import_path():
+    check = (
+        "import sys, main; "
+        f"print('loaded:', *[name for name in {DEFERRED_MODULES!r} if name in sys.modules])"
+    )
+    env = {**os.environ, "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "test-key")}
+    result = subprocess.run(
+        [sys.executable, "-c", check], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    # main prints its own startup lines; ours is the last
+    assert result.stdout.strip().splitlines()[-1] == "loaded:"
@@ -0,0 +1,145 @@
+"""Request tracing from route to upstream call (tracing)"""
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import tracing
+from tracing import (
+    NOOP_SPAN,
+    STATUS_ERROR,
+    TracingMiddleware,
+    export_request,
+    parse_traceparent,
+    span,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def add(self, item):
+        self.spans.append(item)
+
+    def named(self, name):
+        [item] = [item for item in self.spans if item.name == name]
+        return item
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    exporter = CollectingExporter()
+    monkeypatch.setattr(tracing, "_exporter", exporter)
+    monkeypatch.setattr(tracing, "TRACING_SAMPLE_RATE", 1.0)
+    return exporter
+
+
+@pytest.fixture
+def client(exported):
+    app = FastAPI()
+
+    @app.get("/traced/{item_id}")
+    async def traced(item_id: str):
+        with span("service.call", {"item": item_id}):
+            await asyncio.gather(upstream("a"), upstream("b"))
+        return {"ok": True}
+
+    @app.get("/threaded")
+    def threaded():
+        with span("service.sync"):
+            return {"ok": True}
+
+    @app.get("/broken")
+    async def broken():
+        with span("service.fail"):
+            raise ValueError("boom")
+
+    app.add_middleware(TracingMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+async def upstream(name):
+    with span(f"google.{name}"):
+        await asyncio.sleep(0)
+
+
+def test_span_outside_a_request_is_a_noop(exported):
+    with span("nothing") as current:
+        current.set("key", "value")
+    assert current is NOOP_SPAN
+    assert exported.spans == []
+
+
+def test_request_spans_form_one_tree(client, exported):
+    response = client.get("/traced/42")
+    root = exported.named("GET /traced/{item_id}")
+    assert response.headers["x-trace-id"] == root.trace_id
+    assert root.attributes["http.response.status_code"] == 200
+    call = exported.named("service.call")
+    assert (call.parent_id, call.attributes["item"]) == (root.span_id, "42")
+    # Concurrent tasks inherit the active span
+    for name in ("google.a", "google.b"):
+        assert exported.named(name).parent_id == call.span_id
+    assert {item.trace_id for item in exported.spans} == {root.trace_id}
+
+
+def test_threadpool_routes_are_traced(client, exported):
+    client.get("/threaded")
+    assert exported.named("service.sync").parent_id == exported.named("GET /threaded").span_id
+
+
+def test_caller_traceparent_is_continued(client, exported):
+    response = client.get("/threaded", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+    assert response.headers["x-trace-id"] == TRACE_ID
+    assert exported.named("GET /threaded").parent_id == PARENT_ID
+
+
+def test_unsampled_traceparent_is_not_traced(client, exported):
+    response = client.get("/threaded", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"})
+    assert "x-trace-id" not in response.headers
+    assert exported.spans == []
+
+
+def test_errors_mark_their_spans(client, exported):
+    assert client.get("/broken").status_code == 500
+    failed = exported.named("service.fail")
+    assert (failed.status, failed.status_message) == (STATUS_ERROR, "ValueError: boom")
+    assert exported.named("GET /broken").status == STATUS_ERROR
+
+
+@pytest.mark.parametrize("header", [
+    "garbage",
+    f"00-{'0' * 32}-{PARENT_ID}-01",
+    f"ff-{TRACE_ID}-{PARENT_ID}-01",
+    f"00-{TRACE_ID}-{PARENT_ID}-zz",
+])
+def test_invalid_traceparent_is_ignored(header):
+    assert parse_traceparent(header) is None
+
+
+def test_export_request_is_otlp_json(client, exported):
+    client.get("/threaded")
+    body = json.loads(export_request(exported.spans))
+    [resource] = body["resourceSpans"]
+    assert resource["resource"]["attributes"][0]["key"] == "service.name"
+    spans = resource["scopeSpans"][0]["spans"]
+    root = next(item for item in spans if "parentSpanId" not in item)
+    status = next(attr for attr in root["attributes"] if attr["key"] == "http.response.status_code")
+    assert status["value"] == {"intValue": "200"}
+
+
+def test_exporter_flushes_batches_on_shutdown():
+    written = []
+    exporter = tracing._Exporter(written.append)
+    root = tracing.Span("root", TRACE_ID, "", tracing.KIND_SERVER, None)
+    root.end_ns = 1
+    exporter.add(root)
+    exporter.shutdown()
+    [body] = written
+    assert json.loads(body)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "root"
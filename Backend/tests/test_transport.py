@@ -0,0 +1,91 @@
+"""Shared keep-alive connection pools for upstream traffic (google_services.transport)"""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from google_services import transport
+from google_services.transport import HttpPool, PooledHttp, PoolStats, send_async
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.05)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_sequential_requests_reuse_one_connection(server):
+    pool = HttpPool(max_size=4, timeout=5)
+    for _ in range(5):
+        response, content = pool.request(f"{server}/")
+        assert response.status == 200 and content == b'{"ok": true}'
+    stats = pool.stats.snapshot(pool.open_connections())
+    assert (stats["requests"], stats["new_connections"], stats["reuse_ratio"]) == (5, 1, 0.8)
+    assert stats["connections_open"] == 1
+    pool.close()
+
+
+def test_pool_is_bounded_and_records_waits(server):
+    pool = HttpPool(max_size=1, timeout=5)
+    threads = [threading.Thread(target=pool.request, args=(f"{server}/slow",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats.snapshot(pool.open_connections())
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1
+    assert stats["wait_ms_max"] >= 40
+    assert len(pool._all) == 1
+    pool.close()
+
+
+def test_pooled_http_stands_in_for_httplib2(server):
+    http = PooledHttp(HttpPool(max_size=1, timeout=5))
+    response, _ = http.request(f"{server}/")
+    assert response.status == 200
+    assert http.timeout == 5
+    assert 308 not in http.redirect_codes
+    http.close()
+
+
+def test_async_requests_reuse_the_loops_client(server, monkeypatch):
+    monkeypatch.setattr(transport, "_async_stats", PoolStats())
+
+    async def main():
+        for _ in range(3):
+            response = await send_async("GET", f"{server}/")
+            assert response.json() == {"ok": True}
+        client = transport.get_async_client()
+        stats = transport.pool_stats()["async"]
+        await transport.close_async_client()
+        return client, stats
+
+    client, stats = asyncio.run(main())
+    assert (stats["requests"], stats["new_connections"], stats["connections_open"]) == (3, 1, 1)
+    # A new event loop gets a new client
+    other, _ = asyncio.run(main())
+    assert other is not client
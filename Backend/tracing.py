@@ -0,0 +1,339 @@
+"""
+Request Tracing
+Spans from route handling down to each Google API call, exported as OTLP/JSON
+
+TracingMiddleware opens a root span per HTTP request, continuing the caller's
+trace when it sends a W3C `traceparent`. Inside it the session dependency,
+credential lookup (cache, MongoDB or token refresh), discovery builds, every
+upstream Google call and attempt, MongoDB commands and response serialization
+add child spans. The current span lives in a ContextVar, so it follows the
+request into asyncio tasks and threadpool calls; outside a traced request
+span() costs one ContextVar lookup.
+
+Finished spans are batched by a background thread and either appended to
+TRACING_FILE as OTLP/JSON lines (the format of the collector's otlpjsonfile
+receiver) or POSTed to an OTLP/HTTP endpoint with JSON encoding.
+benchmarks/otlp_sink.py is a local stand-in collector that prints each
+trace as a per-stage breakdown. Responses carry an X-Trace-Id header.
+"""
+import json
+import queue
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    TRACING_BATCH_SIZE,
+    TRACING_EXPORT_INTERVAL_SECONDS,
+    TRACING_EXPORTER,
+    TRACING_FILE,
+    TRACING_MAX_QUEUE,
+    TRACING_OTLP_ENDPOINT,
+    TRACING_SAMPLE_RATE,
+    TRACING_SERVICE_NAME,
+)
+from metrics import Counter
+
+# OTLP span kinds and status codes
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+spans_dropped = Counter("tracing_spans_dropped_total", "Finished spans dropped because the export queue was full")
+span_exports_failed = Counter("tracing_export_failures_total", "Span batches the exporter failed to deliver")
+
+
+# ============== SPANS ==============
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "attributes",
+                 "start_ns", "end_ns", "status", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str, kind: int, attributes: Optional[Dict[str, Any]]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def error(self, message: str):
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        _exporter.add(self)
+
+
+class _NoopSpan:
+    """Stands in for a span outside a traced request"""
+
+    trace_id = None
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def error(self, message: str):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def tracing_enabled() -> bool:
+    return TRACING_EXPORTER in ("file", "otlp")
+
+
+def current_span():
+    """The active span, or NOOP_SPAN outside a traced request"""
+    return _current.get() or NOOP_SPAN
+
+
+def _describe(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = KIND_INTERNAL):
+    """
+    Child of the active span, without making it the active one.
+
+    For operations reported through separate start/finish callbacks (MongoDB
+    command events); the caller ends it. NOOP_SPAN outside a traced request.
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = KIND_INTERNAL):
+    """Run the block in a child span of the active one (a no-op outside a traced request)"""
+    parent = _current.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    current = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        if current.status == STATUS_UNSET:
+            current.error(_describe(e))
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+# ============== EXPORT ==============
+
+def _value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(item: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": item.trace_id,
+        "spanId": item.span_id,
+        "name": item.name,
+        "kind": item.kind,
+        "startTimeUnixNano": str(item.start_ns),
+        "endTimeUnixNano": str(item.end_ns),
+        "attributes": _attributes(item.attributes),
+        "status": {"code": item.status, "message": item.status_message} if item.status_message else {"code": item.status},
+    }
+    if item.parent_id:
+        data["parentSpanId"] = item.parent_id
+    return data
+
+
+def export_request(spans: List[Span]) -> bytes:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of finished spans"""
+    return json.dumps({"resourceSpans": [{
+        "resource": {"attributes": _attributes({"service.name": TRACING_SERVICE_NAME})},
+        "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [_otlp_span(item) for item in spans]}],
+    }]}, separators=(",", ":")).encode("utf-8")
+
+
+def _write_file(body: bytes):
+    with open(TRACING_FILE, "ab") as f:
+        f.write(body + b"\n")
+
+
+def _post_otlp(body: bytes):
+    import httpx
+    response = httpx.post(
+        TRACING_OTLP_ENDPOINT, content=body, headers={"Content-Type": "application/json"}, timeout=10,
+    )
+    response.raise_for_status()
+
+
+class _Exporter:
+    """Queues finished spans and ships them in batches from a daemon thread"""
+
+    def __init__(self, write):
+        self._write = write
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=TRACING_MAX_QUEUE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add(self, item: Span):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            spans_dropped.inc()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + TRACING_EXPORT_INTERVAL_SECONDS
+            while len(batch) < TRACING_BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if batch:
+                self._export(batch)
+
+    def _export(self, batch: List[Span]):
+        try:
+            self._write(export_request(batch))
+        except Exception as e:
+            span_exports_failed.inc()
+            print(f"⚠️ Trace export failed ({len(batch)} spans): {e}")
+
+    def shutdown(self, timeout: float = 5):
+        """Export what is queued and stop the thread"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+_exporter = _Exporter(_post_otlp if TRACING_EXPORTER == "otlp" else _write_file)
+
+
+def shutdown_tracing():
+    """Flush spans still queued (app shutdown)"""
+    _exporter.shutdown()
+
+
+# ============== HTTP MIDDLEWARE ==============
+
+def parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    """(trace id, parent span id, sampled) from a W3C traceparent header, None if invalid"""
+    parts = value.strip().lower().split("-")
+    if len(parts) < 4 or parts[0] == "ff" or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening the root span of each sampled HTTP request.
+
+    The span is named after the matched route once routing has run, and ends
+    when the last body chunk has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        sampled = parent[2] if parent is not None else random.random() < TRACING_SAMPLE_RATE
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        trace_id, parent_id = (parent[0], parent[1]) if parent is not None else (secrets.token_hex(16), "")
+        root = Span(method, trace_id, parent_id, KIND_SERVER, {
+            "http.request.method": method,
+            "url.path": scope["path"],
+        })
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode())]
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.error(_describe(e))
+            raise
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{method} {route}"
+                root.set("http.route", route)
+            root.set("http.response.status_code", status)
+            if status >= 500 and root.status == STATUS_UNSET:
+                root.error(f"HTTP {status}")
+            root.end()